@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -22,13 +23,23 @@ from apps.tool_config_app import router as tool_config_router
 from apps.user_management_app import router as user_management_router
 from apps.voice_app import router as voice_router
 from consts.const import IS_SPEED_MODE
+from nexent.core.models.embedding_model import close_async_http_sessions
 
 # Import monitoring utilities
 from utils.monitoring import monitoring_manager
 
 # Create logger instance
 logger = logging.getLogger("base_app")
-app = FastAPI(root_path="/api")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Pooled aiohttp sessions of the embedding clients are bound to the server event loop, close them with it
+    await close_async_http_sessions()
+
+
+app = FastAPI(root_path="/api", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
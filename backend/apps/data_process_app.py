@@ -4,13 +4,15 @@ from http import HTTPStatus
 from typing import Optional
 
 from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from consts.model import (
     BatchTaskRequest,
     ConvertStateRequest,
+    FilterImagesRequest,
     TaskRequest,
 )
+from data_process.inference_executor import InferenceQueueFullError
 from data_process.tasks import process_and_forward, process_sync
 from services.data_process_service import get_data_process_service
 
@@ -200,6 +202,52 @@ async def get_index_tasks(index_name: str):
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/events")
+async def stream_task_events(index_name: Optional[str] = None):
+    """
+    Stream task progress as server-sent events
+
+    Pushes every stage transition of process and forward tasks (extracting_text, vectorizing_and_storing,
+    completed, ...) as it happens, instead of polling the task list. With index_name, only tasks of that
+    knowledge base are streamed and their latest states are sent first as a "snapshot" event.
+    """
+    return StreamingResponse(
+        service.stream_task_events(index_name),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/actor_pool/metrics")
+async def get_actor_pool_metrics():
+    """Get queue length, throughput and utilisation of every processing actor"""
+    try:
+        return await service.get_actor_pool_metrics()
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/cache/metrics")
+async def get_chunk_cache_metrics():
+    """Get size and hit rate of the cache of processed chunks"""
+    try:
+        return service.get_chunk_cache_metrics()
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/inference/metrics")
+async def get_inference_metrics():
+    """Get queue depth, request counts and latency of the CLIP inference worker processes"""
+    try:
+        return service.get_inference_metrics()
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.get("/{task_id}/details")
 async def get_task_details(task_id: str):
     """Get detailed information about a task, including results"""
@@ -233,12 +281,43 @@ async def filter_important_image(
             status_code=HTTPStatus.OK,
             content=result
         )
+    except InferenceQueueFullError as e:
+        raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail=str(e),
+                            headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}")
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error processing image: {str(e)}")
 
 
+@router.post("/filter_important_images")
+async def filter_important_images(request: FilterImagesRequest):
+    """
+    Check which of a batch of images are important
+
+    Downloads the images concurrently and scores them in batched CLIP forward passes in the inference worker
+    processes, reusing cached prompt and image embeddings. Returns one result per URL, in the order of the
+    request, or 503 when too many images are already waiting for inference.
+    """
+    try:
+        results = await service.filter_important_images(
+            image_urls=request.image_urls,
+            positive_prompt=request.positive_prompt,
+            negative_prompt=request.negative_prompt
+        )
+        return JSONResponse(
+            status_code=HTTPStatus.OK,
+            content={"results": results}
+        )
+    except InferenceQueueFullError as e:
+        raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail=str(e),
+                            headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Error processing images: {str(e)}")
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error processing images: {str(e)}")
+
+
 @router.post("/process_text_file")
 async def process_text_file(
         file: UploadFile = File(...),
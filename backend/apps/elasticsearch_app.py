@@ -38,18 +38,67 @@ def create_new_index(
         index_name: str = Path(..., description="Name of the index to create"),
         embedding_dim: Optional[int] = Query(
             None, description="Dimension of the embedding vectors"),
+        vector_index_type: Optional[str] = Query(
+            None, description="HNSW variant of the embedding field: hnsw, int8_hnsw, int4_hnsw or bbq_hnsw"),
+        hnsw_m: Optional[int] = Query(
+            None, description="Number of neighbors per node in the HNSW graph"),
+        hnsw_ef_construction: Optional[int] = Query(
+            None, description="Number of candidates considered while building the HNSW graph"),
         es_core: ElasticSearchCore = Depends(get_es_core),
         authorization: Optional[str] = Header(None)
 ):
     """Create a new vector index and store it in the knowledge table"""
     try:
         user_id, tenant_id = get_current_user_id(authorization)
-        return ElasticSearchService.create_index(index_name, embedding_dim, es_core, user_id, tenant_id)
+        return ElasticSearchService.create_index(index_name, embedding_dim, es_core, user_id, tenant_id,
+                                                 vector_index_type, hnsw_m, hnsw_ef_construction)
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error creating index: {str(e)}")
 
 
+@router.post("/{index_name}/vector_index/migrate")
+def migrate_vector_index(
+        index_name: str = Path(..., description="Name of the index to migrate"),
+        vector_index_type: str = Query(
+            ..., description="Target HNSW variant: hnsw, int8_hnsw, int4_hnsw or bbq_hnsw"),
+        hnsw_m: Optional[int] = Query(
+            None, description="Number of neighbors per node in the HNSW graph"),
+        hnsw_ef_construction: Optional[int] = Query(
+            None, description="Number of candidates considered while building the HNSW graph"),
+        es_core: ElasticSearchCore = Depends(get_es_core),
+        authorization: Optional[str] = Header(None)
+):
+    """Rebuild an existing index with quantized or retuned vector index options via reindex"""
+    try:
+        get_current_user_id(authorization)
+        return ElasticSearchService.migrate_vector_index(index_name, vector_index_type, hnsw_m, hnsw_ef_construction, es_core)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail=f"Invalid vector index options: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error migrating vector index '{index_name}': {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error migrating vector index: {str(e)}")
+
+
+@router.put("/{index_name}/search_profile")
+def set_search_profile(
+        index_name: str = Path(..., description="Name of the index"),
+        profile: Dict[str, Any] = Body(
+            ..., description="kNN search profile: num_candidates_multiplier, min_num_candidates, similarity, path_or_url, source_type"),
+        es_core: ElasticSearchCore = Depends(get_es_core),
+        authorization: Optional[str] = Header(None)
+):
+    """Store the kNN search profile used by semantic and hybrid search on an index"""
+    try:
+        get_current_user_id(authorization)
+        return ElasticSearchService.set_search_profile(index_name, profile, es_core)
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error updating search profile: {str(e)}")
+
+
 @router.delete("/{index_name}")
 async def delete_index(
         index_name: str = Path(..., description="Name of the index to delete"),
@@ -93,17 +142,19 @@ def create_index_documents(
         index_name: str = Path(..., description="Name of the index"),
         data: List[Dict[str, Any]
                    ] = Body(..., description="Document List to process"),
+        batch_offset: Optional[int] = Query(
+            None, ge=0, description="Position of the first chunk in its file when a file is sent in pages"),
         es_core: ElasticSearchCore = Depends(get_es_core),
         authorization: Optional[str] = Header(None)
 ):
     """
     Index documents with embeddings, creating the index if it doesn't exist.
-    Accepts a document list from data processing.
+    Accepts a document list from data processing, the whole list at once or page by page with batch_offset.
     """
     try:
         user_id, tenant_id = get_current_user_id(authorization)
         embedding_model = get_embedding_model(tenant_id)
-        return ElasticSearchService.index_documents(embedding_model, index_name, data, es_core)
+        return ElasticSearchService.index_documents(embedding_model, index_name, data, es_core, batch_offset)
     except Exception as e:
         error_msg = str(e)
         logger.error(f"Error indexing documents: {error_msg}")
@@ -111,6 +162,30 @@ def create_index_documents(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error indexing documents: {error_msg}")
 
 
+@router.put("/{index_name}/documents")
+def update_index_documents(
+        index_name: str = Path(..., description="Name of the index"),
+        path_or_url: str = Query(..., description="Path or URL of the updated document"),
+        data: List[Dict[str, Any]
+                   ] = Body(..., description="All chunks of the new document version"),
+        es_core: ElasticSearchCore = Depends(get_es_core),
+        authorization: Optional[str] = Header(None)
+):
+    """
+    Replace the chunks of an indexed document with a new version.
+    Only chunks whose content changed are embedded again.
+    """
+    try:
+        user_id, tenant_id = get_current_user_id(authorization)
+        embedding_model = get_embedding_model(tenant_id)
+        return ElasticSearchService.update_documents(embedding_model, index_name, path_or_url, data, es_core)
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"Error updating documents: {error_msg}")
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"Error updating documents: {error_msg}")
+
+
 @router.get("/{index_name}/files")
 async def get_index_files(
         index_name: str = Path(..., description="Name of the index"),
@@ -191,3 +266,12 @@ def health_check(es_core: ElasticSearchCore = Depends(get_es_core)):
         return ElasticSearchService.health_check(es_core)
     except Exception as e:
         raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"{str(e)}")
+
+
+@router.get("/embedding_cache/metrics")
+def get_embedding_cache_metrics(es_core: ElasticSearchCore = Depends(get_es_core)):
+    """Get size and hit rate of the cache of indexed chunk embeddings"""
+    try:
+        return es_core.get_embedding_cache_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"{str(e)}")
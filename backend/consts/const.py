@@ -21,6 +21,23 @@ ES_API_KEY = os.getenv("ELASTICSEARCH_API_KEY")
 ES_PASSWORD = os.getenv("ELASTIC_PASSWORD")
 ES_USERNAME = "elastic"
 ELASTICSEARCH_SERVICE = os.getenv("ELASTICSEARCH_SERVICE")
+# Default dense_vector index options for new knowledge bases: hnsw, int8_hnsw, int4_hnsw or bbq_hnsw
+ES_VECTOR_INDEX_TYPE = os.getenv("ES_VECTOR_INDEX_TYPE") or None
+ES_HNSW_M = int(os.getenv("ES_HNSW_M")) if os.getenv("ES_HNSW_M") else None
+ES_HNSW_EF_CONSTRUCTION = int(os.getenv("ES_HNSW_EF_CONSTRUCTION")) if os.getenv(
+    "ES_HNSW_EF_CONSTRUCTION") else None
+# Hybrid search fusion: auto (server-side linear retriever when available), linear, rrf or python
+ES_HYBRID_FUSION = os.getenv("ES_HYBRID_FUSION", "auto")
+
+
+# Query Embedding Cache Configuration
+EMBEDDING_CACHE_MAX_SIZE = int(os.getenv("EMBEDDING_CACHE_MAX_SIZE", "2048"))
+EMBEDDING_CACHE_TTL_S = int(os.getenv("EMBEDDING_CACHE_TTL_S", "3600"))
+EMBEDDING_CACHE_REDIS_ENABLED = os.getenv(
+    "EMBEDDING_CACHE_REDIS_ENABLED", "false").lower() == "true"
+# Vectors of indexed chunks, reused when the same content is indexed again
+DOCUMENT_EMBEDDING_CACHE_MAX_SIZE = int(os.getenv("DOCUMENT_EMBEDDING_CACHE_MAX_SIZE", "20000"))
+DOCUMENT_EMBEDDING_CACHE_TTL_S = int(os.getenv("DOCUMENT_EMBEDDING_CACHE_TTL_S", "86400"))
 
 
 # Data Processing Service Configuration
@@ -32,6 +49,12 @@ CLIP_MODEL_PATH = os.getenv("CLIP_MODEL_PATH")
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
 MAX_CONCURRENT_UPLOADS = 5
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
+# Uploads stream to MinIO in parts of this size with at most MINIO_UPLOAD_CONCURRENCY parts in flight per file
+MINIO_UPLOAD_PART_SIZE = int(os.getenv("MINIO_UPLOAD_PART_MB", "8")) * 1024 * 1024
+MINIO_UPLOAD_CONCURRENCY = int(os.getenv("MINIO_UPLOAD_CONCURRENCY", "4"))
+# Downloads fetch objects with ranged GETs of this size, at most MINIO_DOWNLOAD_CONCURRENCY at a time
+MINIO_DOWNLOAD_RANGE_SIZE = int(os.getenv("MINIO_DOWNLOAD_RANGE_MB", "8")) * 1024 * 1024
+MINIO_DOWNLOAD_CONCURRENCY = int(os.getenv("MINIO_DOWNLOAD_CONCURRENCY", "4"))
 
 
 # Supabase Configuration
@@ -56,6 +79,14 @@ EXA_SEARCH_API_KEY = os.getenv('EXA_SEARCH_API_KEY')
 
 # Image Filter Configuration
 IMAGE_FILTER = os.getenv("IMAGE_FILTER", "false").lower() == "true"
+# Images per batched CLIP forward pass, and image embeddings cached by URL
+IMAGE_FILTER_BATCH_SIZE = int(os.getenv("IMAGE_FILTER_BATCH_SIZE", "32"))
+IMAGE_FILTER_CACHE_SIZE = int(os.getenv("IMAGE_FILTER_CACHE_SIZE", "4096"))
+IMAGE_FILTER_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_FILTER_DOWNLOAD_CONCURRENCY", "16"))
+# CLIP inference runs in a pool of worker processes, requests beyond the queue size are rejected
+IMAGE_FILTER_WORKERS = int(os.getenv("IMAGE_FILTER_WORKERS", "2"))
+IMAGE_FILTER_QUEUE_SIZE = int(os.getenv("IMAGE_FILTER_QUEUE_SIZE", "64"))
+IMAGE_FILTER_TIMEOUT_S = float(os.getenv("IMAGE_FILTER_TIMEOUT_S", "30"))
 
 
 # Default User and Tenant IDs
@@ -99,6 +130,30 @@ DP_REDIS_CHUNKS_POLL_INTERVAL_MS = int(
 FORWARD_REDIS_RETRY_DELAY_S = int(
     os.getenv("FORWARD_REDIS_RETRY_DELAY_S", "5"))
 FORWARD_REDIS_RETRY_MAX = int(os.getenv("FORWARD_REDIS_RETRY_MAX", "12"))
+# The forward task sends chunks to main_service in pages of this many chunks, each with its own timeout
+DP_FORWARD_PAGE_SIZE = int(os.getenv("DP_FORWARD_PAGE_SIZE", "200"))
+DP_FORWARD_PAGE_TIMEOUT_S = int(os.getenv("DP_FORWARD_PAGE_TIMEOUT_S", "120"))
+# How processed chunks reach the forward task: "redis" stores compressed segments in Redis,
+# "ray" keeps them in the Ray object store through a named hand-off actor
+DP_CHUNK_HANDOFF = os.getenv("DP_CHUNK_HANDOFF", "redis").lower()
+DP_CHUNK_HANDOFF_TIMEOUT_S = int(os.getenv("DP_CHUNK_HANDOFF_TIMEOUT_S", "60"))
+# Pool of processing actors shared by all workers. A size of 0 derives it from the cluster CPUs,
+# a max size above the size lets the pool grow under load and shrink after DP_ACTOR_POOL_IDLE_S
+DP_ACTOR_POOL_ENABLED = os.getenv("DP_ACTOR_POOL_ENABLED", "true").lower() == "true"
+DP_ACTOR_POOL_SIZE = int(os.getenv("DP_ACTOR_POOL_SIZE", "0"))
+DP_ACTOR_POOL_MAX_SIZE = int(os.getenv("DP_ACTOR_POOL_MAX_SIZE", "0"))
+DP_ACTOR_POOL_IDLE_S = int(os.getenv("DP_ACTOR_POOL_IDLE_S", "300"))
+# Leases of pool actors not released within this many seconds (a dead worker) are reaped, above the task time limit
+DP_ACTOR_LEASE_TIMEOUT_S = int(os.getenv("DP_ACTOR_LEASE_TIMEOUT_S", "3900"))
+# Files from this size on are processed by the large-file lane of the pool
+DP_LARGE_FILE_MB = int(os.getenv("DP_LARGE_FILE_MB", "20"))
+# Files fetched by processing actors stay in memory up to this size and spill to local disk beyond
+DP_FILE_SPOOL_MAX_MB = int(os.getenv("DP_FILE_SPOOL_MAX_MB", "64"))
+# Content-addressed cache of processed chunks in Redis, entries expire after DP_CHUNK_CACHE_TTL_S unused
+# and the least recently used ones are evicted above DP_CHUNK_CACHE_MAX_MB of compressed chunks
+DP_CHUNK_CACHE_ENABLED = os.getenv("DP_CHUNK_CACHE_ENABLED", "true").lower() == "true"
+DP_CHUNK_CACHE_MAX_MB = int(os.getenv("DP_CHUNK_CACHE_MAX_MB", "1024"))
+DP_CHUNK_CACHE_TTL_S = int(os.getenv("DP_CHUNK_CACHE_TTL_S", "604800"))
 
 
 # Ray Configuration
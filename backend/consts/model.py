@@ -169,6 +169,8 @@ class IndexingResponse(BaseModel):
     message: str
     total_indexed: int
     total_submitted: int
+    # Offset of the next page when documents are sent in pages
+    next_offset: Optional[int] = None
 
 
 # Request models
@@ -304,6 +306,13 @@ class ConvertStateRequest(BaseModel):
     forward_state: str = ""
 
 
+class FilterImagesRequest(BaseModel):
+    """Request schema for /tasks/filter_important_images endpoint"""
+    image_urls: List[str] = Field(..., description="URLs of the images to filter")
+    positive_prompt: str = "an important image"
+    negative_prompt: str = "an unimportant image"
+
+
 # ---------------------------------------------------------------------------
 # Memory Feature Data Models (Missing previously)
 # ---------------------------------------------------------------------------
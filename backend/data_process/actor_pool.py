@@ -0,0 +1,191 @@
+"""
+Pool of DataProcessorRayActor instances shared by all Celery workers of the cluster.
+
+A named, detached ActorPoolDispatcher owns the processing actors and assigns every file to one of them.
+Files of at least large_file_bytes go to a separate lane of actors, so large PDFs do not queue in front of
+small text files. Within a lane the actor with the fewest files in flight, then the fewest queued bytes,
+is chosen. When every small-lane actor is busy, a small file takes an idle large-lane actor before it
+queues. When every actor of a lane is busy and the pool is below max_size, an actor is added; actors
+above the base size are removed again after idle_timeout_s without work.
+
+Every acquired actor is held under a lease. A lease the caller never released, e.g. because its Celery
+worker died, is reaped after lease_timeout_s so the actor is counted as free again.
+"""
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import ray
+
+from .ray_actors import DataProcessorRayActor
+
+logger = logging.getLogger("data_process.actor_pool")
+
+LANE_SMALL = "small"
+LANE_LARGE = "large"
+
+
+def default_pool_size(actor_num_cpus: int) -> int:
+    """Number of processing actors the CPUs of the Ray cluster can run at the same time"""
+    total_cpus = int(ray.cluster_resources().get("CPU", actor_num_cpus))
+    return max(1, total_cpus // max(1, actor_num_cpus))
+
+
+@ray.remote(num_cpus=0)
+class ActorPoolDispatcher:
+    """
+    Ray actor assigning files to a pool of DataProcessorRayActor instances by lane and load.
+
+    Callers acquire an actor before processing a file and release it afterwards, which is how the
+    dispatcher knows the queue of every actor and how long it was busy.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_size: Optional[int] = None,
+        large_file_bytes: int = 20 * 1024 * 1024,
+        idle_timeout_s: float = 300,
+        lease_timeout_s: float = 3900,
+    ):
+        self._size = max(1, size)
+        self._max_size = max(self._size, max_size or self._size)
+        self._large_file_bytes = large_file_bytes
+        self._idle_timeout_s = idle_timeout_s
+        self._lease_timeout_s = lease_timeout_s
+        self._actors: Dict[int, Dict[str, Any]] = {}
+        # Outstanding leases by id, with the slot and file size they hold and when they were acquired
+        self._leases: Dict[str, Dict[str, Any]] = {}
+        self._reaped_leases = 0
+        self._next_slot = 0
+        # A single actor serves both lanes, otherwise a quarter of the pool (at least one actor) takes large files
+        large_lane_size = max(1, self._size // 4) if self._size > 1 else 0
+        for index in range(self._size):
+            self._add_actor(LANE_LARGE if index < large_lane_size else LANE_SMALL)
+        logger.info(
+            f"[ActorPool] Started {self._size} processing actors ({large_lane_size} for large files), max size {self._max_size}")
+
+    async def acquire(self, file_size: int = 0) -> Tuple[str, Any]:
+        """
+        Pick the processing actor for a file and count the file as queued on it.
+
+        Returns:
+            Tuple[str, Any]: Id of the lease, to be passed to release, and the actor handle
+        """
+        self._reap_expired_leases()
+        self._remove_idle_actors()
+        lane = LANE_LARGE if file_size >= self._large_file_bytes else LANE_SMALL
+        candidates = self._lane_slots(lane) or list(self._actors)
+        slot = min(candidates, key=lambda s: (
+            self._actors[s]["in_flight"], self._actors[s]["queued_bytes"], s))
+        if self._actors[slot]["in_flight"] > 0 and lane == LANE_SMALL:
+            # Small files are quick, an idle large-lane actor serves one rather than leaving it queued
+            idle_large = [s for s in self._lane_slots(LANE_LARGE) if self._actors[s]["in_flight"] == 0]
+            if idle_large:
+                slot = idle_large[0]
+        if self._actors[slot]["in_flight"] > 0 and len(self._actors) < self._max_size:
+            slot = self._add_actor(lane)
+
+        state = self._actors[slot]
+        now = time.monotonic()
+        if state["in_flight"] == 0:
+            state["busy_since"] = now
+        state["in_flight"] += 1
+        state["queued_bytes"] += max(0, file_size)
+        lease_id = uuid.uuid4().hex
+        self._leases[lease_id] = {"slot": slot, "file_size": max(0, file_size), "acquired_at": now}
+        return lease_id, state["handle"]
+
+    async def release(self, lease_id: str, success: bool = True):
+        """Count the file of a lease as done, a lease that was already reaped is ignored"""
+        lease = self._leases.pop(lease_id, None)
+        if lease is None:
+            return
+        self._end_lease(lease, success)
+
+    def _end_lease(self, lease: Dict[str, Any], success: bool):
+        state = self._actors.get(lease["slot"])
+        if state is None:
+            return
+        now = time.monotonic()
+        state["in_flight"] = max(0, state["in_flight"] - 1)
+        state["queued_bytes"] = max(0, state["queued_bytes"] - lease["file_size"])
+        state["completed" if success else "failed"] += 1
+        state["last_active"] = now
+        if state["in_flight"] == 0 and state["busy_since"] is not None:
+            state["busy_seconds"] += now - state["busy_since"]
+            state["busy_since"] = None
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        """Queue length, throughput and utilisation of every actor in the pool"""
+        self._reap_expired_leases()
+        now = time.monotonic()
+        actors: List[Dict[str, Any]] = []
+        for slot, state in sorted(self._actors.items()):
+            busy_seconds = state["busy_seconds"]
+            if state["busy_since"] is not None:
+                busy_seconds += now - state["busy_since"]
+            uptime = max(now - state["created_at"], 1e-9)
+            actors.append({
+                "slot": slot,
+                "lane": state["lane"],
+                "in_flight": state["in_flight"],
+                "queued_bytes": state["queued_bytes"],
+                "completed": state["completed"],
+                "failed": state["failed"],
+                "busy_seconds": round(busy_seconds, 3),
+                "utilisation": round(min(1.0, busy_seconds / uptime), 4),
+            })
+        return {
+            "size": len(self._actors),
+            "base_size": self._size,
+            "max_size": self._max_size,
+            "large_file_bytes": self._large_file_bytes,
+            "leases": len(self._leases),
+            "reaped_leases": self._reaped_leases,
+            "actors": actors,
+        }
+
+    def _lane_slots(self, lane: str) -> List[int]:
+        return [slot for slot, state in self._actors.items() if state["lane"] == lane]
+
+    def _add_actor(self, lane: str) -> int:
+        slot = self._next_slot
+        self._next_slot += 1
+        now = time.monotonic()
+        self._actors[slot] = {
+            "handle": DataProcessorRayActor.remote(),
+            "lane": lane,
+            "base": len(self._actors) < self._size,
+            "in_flight": 0,
+            "queued_bytes": 0,
+            "completed": 0,
+            "failed": 0,
+            "busy_seconds": 0.0,
+            "busy_since": None,
+            "created_at": now,
+            "last_active": now,
+        }
+        if not self._actors[slot]["base"]:
+            logger.info(f"[ActorPool] Added actor {slot} to the {lane} lane, pool size {len(self._actors)}")
+        return slot
+
+    def _reap_expired_leases(self):
+        now = time.monotonic()
+        for lease_id, lease in list(self._leases.items()):
+            if now - lease["acquired_at"] > self._lease_timeout_s:
+                # The caller never released it, most likely its worker died while the file was processed
+                logger.warning(f"[ActorPool] Reaping lease {lease_id} on actor {lease['slot']} held for "
+                               f"{now - lease['acquired_at']:.0f}s")
+                del self._leases[lease_id]
+                self._reaped_leases += 1
+                self._end_lease(lease, success=False)
+
+    def _remove_idle_actors(self):
+        now = time.monotonic()
+        for slot, state in list(self._actors.items()):
+            if not state["base"] and state["in_flight"] == 0 and now - state["last_active"] > self._idle_timeout_s:
+                ray.kill(state["handle"])
+                del self._actors[slot]
+                logger.info(f"[ActorPool] Removed idle actor {slot}, pool size {len(self._actors)}")
@@ -0,0 +1,166 @@
+"""
+Content-addressed cache of processed chunks, shared by every processing actor through Redis.
+
+Entries are keyed by the SHA-256 of the file bytes together with the file extension, the chunking strategy
+and the processing parameters, so the same content uploaded again or into another knowledge base is chunked
+only once. Chunks are stored as compressed segments, see chunk_store. Entries expire ttl_seconds after their
+last use, and the least recently used entries are evicted once the cache holds more than max_bytes.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .chunk_store import iter_chunk_segments, write_chunks
+
+logger = logging.getLogger("data_process.chunk_cache")
+
+# Bump when the chunk format changes so entries written by older processors are not served
+CACHE_FORMAT_VERSION = 1
+# Parameters that do not change the chunks of a file
+VOLATILE_PARAMS = frozenset({"task_id", "split_max_workers"})
+
+
+def chunk_cache_key(content_sha256: str, filename: Optional[str], chunking_strategy: str,
+                    params: Dict[str, Any]) -> str:
+    """
+    Build the cache key of a file processed with the given strategy and parameters.
+
+    The SHA-256 hex digest of the file content is computed by the caller while reading the file.
+    The extension is part of the key because it selects the processor.
+    """
+    options = json.dumps({
+        "version": CACHE_FORMAT_VERSION,
+        "extension": os.path.splitext(filename or "")[1].lower(),
+        "chunking_strategy": chunking_strategy,
+        "params": {key: value for key, value in params.items() if key not in VOLATILE_PARAMS},
+    }, sort_keys=True, default=str)
+    options_digest = hashlib.sha256(options.encode("utf-8")).hexdigest()[:16]
+    return f"{content_sha256}:{options_digest}"
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class ChunkCache:
+    """
+    Redis cache of processed chunks.
+
+    Besides the segment list of every entry, a sorted set orders the entries by last use and a hash holds
+    their compressed size, so eviction does not have to scan keys. Hit, miss and eviction counters live
+    in Redis as well, making the hit rate a cluster-wide figure.
+    """
+
+    def __init__(self, client, max_bytes: int = 1024 * 1024 * 1024, ttl_seconds: int = 7 * 24 * 60 * 60,
+                 prefix: str = "dp:cache:chunks"):
+        """
+        Args:
+            client: Redis client, must not decode responses to read entries
+            max_bytes: Compressed size above which the least recently used entries are evicted
+            ttl_seconds: Entries unused for this long expire
+            prefix: Prefix of all keys of the cache
+        """
+        self._client = client
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._prefix = prefix
+        self._index_key = f"{prefix}:index"
+        self._sizes_key = f"{prefix}:sizes"
+        self._stats_key = f"{prefix}:stats"
+
+    def get(self, key: str, filename: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read the chunks cached under key.
+
+        Args:
+            key: Key built by chunk_cache_key
+            filename: Filename of the file being processed, replaces the one stored in the chunks
+
+        Returns:
+            The cached chunks, or None on a miss
+        """
+        segments = iter_chunk_segments(self._client, self._data_key(key))
+        if segments is None:
+            self._client.hincrby(self._stats_key, "misses", 1)
+            return None
+        chunks = [chunk for segment in segments for chunk in segment]
+        if filename is not None:
+            for chunk in chunks:
+                if "filename" in chunk:
+                    chunk["filename"] = filename
+
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self._index_key, {key: time.time()})
+        pipe.expire(self._data_key(key), self.ttl_seconds)
+        pipe.hincrby(self._stats_key, "hits", 1)
+        pipe.execute()
+        return chunks
+
+    def put(self, key: str, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Cache chunks under key and evict entries beyond the size limit.
+
+        Returns:
+            Compressed size of the entry in bytes
+        """
+        size = write_chunks(self._client, self._data_key(key), chunks, ttl_seconds=self.ttl_seconds)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self._index_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, size)
+        pipe.hincrby(self._stats_key, "stores", 1)
+        pipe.execute()
+        self._evict()
+        return size
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Number of entries, their compressed size and the hit rate of lookups"""
+        stats = {_decode(name): int(value) for name, value in self._client.hgetall(self._stats_key).items()}
+        sizes = self._client.hgetall(self._sizes_key)
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": len(sizes),
+            "bytes": sum(int(size) for size in sizes.values()),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "stores": stats.get("stores", 0),
+            "evictions": stats.get("evictions", 0),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _data_key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    def _evict(self):
+        # Entries unused for ttl_seconds have expired on their own, forget their bookkeeping
+        expired = [_decode(key) for key in
+                   self._client.zrangebyscore(self._index_key, 0, time.time() - self.ttl_seconds)]
+        if expired:
+            self._forget(expired)
+
+        sizes = {_decode(key): int(size) for key, size in self._client.hgetall(self._sizes_key).items()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key in (_decode(key) for key in self._client.zrange(self._index_key, 0, -1)):
+            if total <= self.max_bytes:
+                break
+            total -= sizes.get(key, 0)
+            evicted.append(key)
+        if evicted:
+            self._forget(evicted, delete_data=True)
+            self._client.hincrby(self._stats_key, "evictions", len(evicted))
+            logger.info(f"Evicted {len(evicted)} chunk cache entries, {total} bytes left")
+
+    def _forget(self, keys: List[str], delete_data: bool = False):
+        pipe = self._client.pipeline(transaction=False)
+        if delete_data:
+            pipe.delete(*[self._data_key(key) for key in keys])
+        pipe.zrem(self._index_key, *keys)
+        pipe.hdel(self._sizes_key, *keys)
+        pipe.execute()
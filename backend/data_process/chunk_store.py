@@ -0,0 +1,120 @@
+"""
+Compact hand-off of processed chunks from the process task to the forward task through Redis.
+
+Chunks are stored as a Redis list of segments. A segment holds up to segment_size chunks serialized as JSON
+lines and compressed with zstd, or zlib when zstandard is not installed. The first byte of a segment names
+its codec, so a reader decodes segments written by any worker. Segments are read one at a time, letting the
+reader work on the first segment while later ones are still in Redis.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger("data_process.chunk_store")
+
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+DEFAULT_SEGMENT_SIZE = 256
+CHUNKS_TTL_SECONDS = 2 * 60 * 60
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+def encode_segment(chunks: List[Dict[str, Any]]) -> bytes:
+    """Serialize chunks as JSON lines and compress them, prefixed with the codec byte"""
+    payload = "\n".join(json.dumps(chunk, ensure_ascii=False) for chunk in chunks).encode("utf-8")
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return CODEC_ZLIB + zlib.compress(payload, ZLIB_LEVEL)
+
+
+def decode_segment(data: bytes) -> List[Dict[str, Any]]:
+    """Decompress and parse a segment written by encode_segment"""
+    codec, body = data[:1], data[1:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("Chunk segment is zstd compressed but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == CODEC_ZLIB:
+        payload = zlib.decompress(body)
+    else:
+        raise ValueError(f"Unknown chunk segment codec {codec!r}")
+    if not payload:
+        return []
+    return [json.loads(line) for line in payload.decode("utf-8").split("\n")]
+
+
+def write_chunks(
+    client,
+    key: str,
+    chunks: List[Dict[str, Any]],
+    segment_size: int = DEFAULT_SEGMENT_SIZE,
+    ttl_seconds: int = CHUNKS_TTL_SECONDS,
+) -> int:
+    """
+    Store chunks under key as a list of compressed segments.
+
+    The list is replaced in one MULTI/EXEC transaction, so a reader never sees a partially written list.
+    An empty chunk list is stored as one empty segment to tell the reader processing is done.
+
+    Args:
+        client: Redis client, must not decode responses
+        key: Redis key of the segment list
+        chunks: Processed chunks
+        segment_size: Maximum number of chunks per segment
+        ttl_seconds: Expiration of the key
+
+    Returns:
+        Number of compressed bytes stored
+    """
+    segments = [encode_segment(chunks[i:i + segment_size]) for i in range(0, len(chunks), segment_size)]
+    if not segments:
+        segments = [encode_segment([])]
+
+    pipe = client.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.rpush(key, *segments)
+    pipe.expire(key, ttl_seconds)
+    pipe.execute()
+    return sum(len(segment) for segment in segments)
+
+
+def iter_chunk_segments(client, key: str) -> Optional[Iterator[List[Dict[str, Any]]]]:
+    """
+    Iterate the chunk segments stored under key, fetching each segment only when it is reached.
+
+    Values written as a single JSON string by older workers are read as one segment.
+
+    Args:
+        client: Redis client, must not decode responses
+        key: Redis key written by write_chunks
+
+    Returns:
+        Iterator of chunk lists, or None when the key does not exist yet
+    """
+    key_type = client.type(key)
+    if isinstance(key_type, bytes):
+        key_type = key_type.decode("utf-8")
+
+    if key_type == "list":
+        return _iter_list_segments(client, key, client.llen(key))
+    if key_type == "string":
+        value = client.get(key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return iter([json.loads(value)])
+    return None
+
+
+def _iter_list_segments(client, key: str, length: int) -> Iterator[List[Dict[str, Any]]]:
+    for index in range(length):
+        data = client.lindex(key, index)
+        if data is None:
+            raise ValueError(f"Chunk segment {index} of {key} disappeared while reading")
+        yield decode_segment(data)
@@ -0,0 +1,130 @@
+"""
+Batched CLIP scoring of images against a positive and a negative prompt.
+
+Images are embedded in batched forward passes and their normalized embeddings returned as lists, for the caller to
+cache them by URL so images that show up again in web search results are never run through CLIP twice. Prompt pair
+embeddings are cached by the scorer.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of embeddings"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class ClipScorer:
+    """Score images with a CLIP model and processor, caching prompt embeddings"""
+
+    def __init__(self, model, processor, batch_size: int = 32, text_cache_size: int = 256):
+        """
+        Args:
+            model: transformers CLIPModel
+            processor: transformers CLIPProcessor of the model
+            batch_size: Maximum number of images per forward pass
+            text_cache_size: Number of prompt pairs whose embeddings are kept
+        """
+        self.model = model
+        self.processor = processor
+        self.batch_size = batch_size
+        self.text_cache = EmbeddingCache(text_cache_size)
+
+    def embed_images(self, images: Dict[str, Any]) -> Dict[str, List[float]]:
+        """
+        Embed images in batched forward passes.
+
+        Args:
+            images: RGB PIL images by URL
+
+        Returns:
+            Normalized image embeddings by URL, as lists so they can be cached and sent between processes
+        """
+        import torch
+
+        embeddings = {}
+        with torch.no_grad():
+            urls = list(images)
+            for start in range(0, len(urls), self.batch_size):
+                batch = urls[start:start + self.batch_size]
+                inputs = self.processor(images=[images[url] for url in batch], return_tensors="pt")
+                features = self.model.get_image_features(**inputs)
+                features = features / features.norm(dim=-1, keepdim=True)
+                embeddings.update(zip(batch, features.tolist()))
+        return embeddings
+
+    def score(self, embeddings: Dict[str, List[float]], positive_prompt: str,
+              negative_prompt: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Score image embeddings against a prompt pair.
+
+        Args:
+            embeddings: Image embeddings by URL, as returned by embed_images
+            positive_prompt: Text describing an important image
+            negative_prompt: Text describing an unimportant image
+
+        Returns:
+            (negative, positive) probabilities by URL
+        """
+        import torch
+
+        if not embeddings:
+            return {}
+        with torch.no_grad():
+            text_embeddings = self._get_text_embeddings(negative_prompt, positive_prompt)
+            urls = list(embeddings)
+            image_embeddings = torch.tensor([embeddings[url] for url in urls], dtype=text_embeddings.dtype)
+            logits = self.model.logit_scale.exp() * image_embeddings @ text_embeddings.t()
+            probabilities = logits.softmax(dim=1).tolist()
+        return {url: (negative, positive) for url, (negative, positive) in zip(urls, probabilities)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit rate of the prompt embedding cache"""
+        return {"prompts": self.text_cache.stats()}
+
+    def _get_text_embeddings(self, negative_prompt: str, positive_prompt: str):
+        key = (negative_prompt, positive_prompt)
+        embeddings = self.text_cache.get(key)
+        if embeddings is None:
+            inputs = self.processor(text=[negative_prompt, positive_prompt], return_tensors="pt", padding=True)
+            embeddings = self.model.get_text_features(**inputs)
+            embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
+            self.text_cache.put(key, embeddings)
+        return embeddings
@@ -0,0 +1,253 @@
+"""
+Process pool running CLIP inference off the event loop of the data process service.
+
+Every worker process loads the CLIP model once, when it starts, and then embeds and scores the batches of images sent
+to it. Requests are admitted into a bounded queue: once max_pending of them are queued or running, further requests
+are rejected with InferenceQueueFullError instead of piling up behind slow images, and a request that does not
+complete within its timeout fails with InferenceTimeoutError. Image embeddings returned by the workers are cached by
+URL in the service process, so every worker benefits from them.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .clip_scorer import ClipScorer, EmbeddingCache
+
+logger = logging.getLogger("data_process.inference_executor")
+
+# Number of most recent requests the latency percentiles are computed over
+LATENCY_WINDOW = 1024
+
+# CLIP scorer of the current worker process, None when the model could not be loaded
+_scorer: Optional[ClipScorer] = None
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when an inference request is rejected because the queue is full"""
+
+
+class InferenceTimeoutError(Exception):
+    """Raised when an inference request does not complete within its timeout"""
+
+
+def _init_worker(model_path: str, batch_size: int, num_threads: int):
+    """Load the CLIP model into the worker process, runs once when the process starts"""
+    global _scorer
+    try:
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+
+        torch.set_num_threads(num_threads)
+        _scorer = ClipScorer(CLIPModel.from_pretrained(model_path), CLIPProcessor.from_pretrained(model_path),
+                             batch_size=batch_size)
+        logger.info(f"CLIP model loaded in inference worker {os.getpid()}")
+    except Exception as e:
+        logger.warning(f"Failed to load CLIP model in inference worker {os.getpid()}, "
+                       f"size-only filtering will be used: {str(e)}")
+        _scorer = None
+
+
+def _run_timed(fn: Callable, *args) -> Tuple[float, Any]:
+    """Run a function in the worker process, returning the seconds it took along with its result"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _score_images(images: Dict[str, Any], positive_prompt: str, negative_prompt: str,
+                  cached: Dict[str, List[float]]) -> Optional[Tuple[Dict[str, Tuple[float, float]],
+                                                                   Dict[str, List[float]]]]:
+    """Embed and score images in the worker process. None when the CLIP model is not available."""
+    if _scorer is None:
+        return None
+    embeddings = _scorer.embed_images(images)
+    probabilities = _scorer.score({**cached, **embeddings}, positive_prompt, negative_prompt)
+    return probabilities, embeddings
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    """Average and percentiles of latency samples in seconds, in milliseconds"""
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    samples = sorted(samples)
+    return {
+        "avg": round(sum(samples) / len(samples) * 1000, 2),
+        "p50": round(samples[(len(samples) - 1) // 2] * 1000, 2),
+        "p95": round(samples[int((len(samples) - 1) * 0.95)] * 1000, 2),
+        "max": round(samples[-1] * 1000, 2),
+    }
+
+
+class InferenceExecutor:
+    """Bounded pool of CLIP worker processes, awaited by the async handlers of the service"""
+
+    def __init__(self, model_path: str, workers: int = 2, max_pending: int = 64, timeout_s: float = 30.0,
+                 batch_size: int = 32, image_cache_size: int = 4096):
+        """
+        Args:
+            model_path: Path or name of the CLIP model every worker loads
+            workers: Number of worker processes
+            max_pending: Maximum number of requests queued or running, further requests are rejected
+            timeout_s: Seconds a request may take, queueing included, before it fails
+            batch_size: Maximum number of images per forward pass
+            image_cache_size: Number of image embeddings kept by URL
+        """
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.timeout_s = timeout_s
+        self.batch_size = batch_size
+        self.image_cache = EmbeddingCache(image_cache_size)
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._inference_times = deque(maxlen=LATENCY_WINDOW)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned rather than forked, torch is not fork safe once its thread pools have started
+                num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker,
+                                                 initargs=(self.model_path, self.batch_size, num_threads))
+            return self._pool
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run a module level function in a worker process.
+
+        Args:
+            fn: Function to run, it and its arguments must be picklable
+            *args: Arguments of the function
+            timeout: Seconds the request may take, defaults to timeout_s
+
+        Returns:
+            The result of the function
+
+        Raises:
+            InferenceQueueFullError: max_pending requests are already queued or running
+            InferenceTimeoutError: The request did not complete within the timeout
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise InferenceQueueFullError(f"Inference queue is full, {self._pending} requests pending")
+            self._pending += 1
+
+        submitted = time.perf_counter()
+        pool = None
+        try:
+            pool = self._get_pool()
+            future = pool.submit(_run_timed, fn, *args)
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+                if isinstance(e, BrokenProcessPool) and self._pool is pool:
+                    self._pool = None
+            raise
+        # Counted as pending until the worker is done with it, even after the caller timed out
+        future.add_done_callback(lambda done: self._on_done(done, pool, submitted))
+
+        timeout = self.timeout_s if timeout is None else timeout
+        try:
+            _, result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise InferenceTimeoutError(f"Inference did not complete within {timeout}s")
+        return result
+
+    def _on_done(self, future: Future, pool: ProcessPoolExecutor, submitted: float):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self._failed += 1
+                if isinstance(error, BrokenProcessPool):
+                    # A worker died, e.g. killed for running out of memory, start a new pool on the next request
+                    logger.error(f"Inference worker pool is broken, it will be restarted: {str(error)}")
+                    if self._pool is pool:
+                        self._pool = None
+                return
+            self._completed += 1
+            self._latencies.append(time.perf_counter() - submitted)
+            self._inference_times.append(future.result()[0])
+
+    def get_cached_images(self, image_urls: List[str]) -> Dict[str, List[float]]:
+        """Get the cached embeddings of the given image URLs, the others need to be downloaded and scored"""
+        cached = {}
+        for url in image_urls:
+            embedding = self.image_cache.get(url)
+            if embedding is not None:
+                cached[url] = embedding
+        return cached
+
+    async def score_images(self, images: Dict[str, Any], positive_prompt: str, negative_prompt: str,
+                           cached: Optional[Dict[str, List[float]]] = None,
+                           timeout: Optional[float] = None) -> Optional[Dict[str, Tuple[float, float]]]:
+        """
+        Score images against a prompt pair in a worker process, caching the embeddings of the images.
+
+        Args:
+            images: RGB PIL images to embed by URL
+            positive_prompt: Text describing an important image
+            negative_prompt: Text describing an unimportant image
+            cached: Embeddings by URL previously returned by get_cached_images
+            timeout: Seconds the request may take, defaults to timeout_s
+
+        Returns:
+            (negative, positive) probabilities by URL, for the images and the cached embeddings. None when the
+            CLIP model is not available in the workers.
+        """
+        result = await self.run(_score_images, images, positive_prompt, negative_prompt, cached or {},
+                                timeout=timeout)
+        if result is None:
+            return None
+        probabilities, embeddings = result
+        for url, embedding in embeddings.items():
+            self.image_cache.put(url, embedding)
+        return probabilities
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, request counts, latency and image cache hit rate of the executor"""
+        with self._lock:
+            metrics = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "timeout_s": self.timeout_s,
+                "queue_depth": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                # From admission to completion, queueing included, and the time spent in the worker
+                "latency_ms": _summarize(list(self._latencies)),
+                "inference_ms": _summarize(list(self._inference_times)),
+            }
+        metrics["image_cache"] = self.image_cache.stats()
+        return metrics
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker processes, requests still queued are cancelled"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
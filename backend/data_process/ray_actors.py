@@ -1,12 +1,18 @@
+import asyncio
 import logging
-import json
-from typing import Any, Dict, List, Optional
+import mimetypes
+import os
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 
 import ray
 
-from consts.const import RAY_ACTOR_NUM_CPUS, REDIS_BACKEND_URL
-from database.attachment_db import get_file_stream
+from consts.const import DP_CHUNK_CACHE_ENABLED, DP_CHUNK_CACHE_MAX_MB, DP_CHUNK_CACHE_TTL_S, DP_FILE_SPOOL_MAX_MB, \
+    RAY_ACTOR_NUM_CPUS, REDIS_BACKEND_URL
+from database.attachment_db import get_file_spooled
 from nexent.data_process import DataProcessCore
+from .chunk_cache import ChunkCache, chunk_cache_key
+from .chunk_store import CHUNKS_TTL_SECONDS, write_chunks
 
 logger = logging.getLogger("data_process.ray_actors")
 # This now controls the number of CPUs requested by each DataProcessorRayActor instance.
@@ -14,6 +20,20 @@ logger = logging.getLogger("data_process.ray_actors")
 # underlying processing library (e.g., unstructured) can leverage it.
 
 
+def build_file_metadata(filename: str, file_size: int, md5: str) -> Dict[str, Any]:
+    """
+    Describe a file from the size and MD5 digest computed while it was read.
+
+    The etag is the MD5 hex digest of the content, which is what MinIO reports for single-part uploads.
+    """
+    content_type, _ = mimetypes.guess_type(os.path.basename(filename or ""))
+    return {
+        "file_size": file_size,
+        "content_type": content_type or "application/octet-stream",
+        "etag": md5,
+    }
+
+
 @ray.remote(num_cpus=RAY_ACTOR_NUM_CPUS)
 class DataProcessorRayActor:
     """
@@ -25,6 +45,7 @@ class DataProcessorRayActor:
         logger.info(
             f"Ray actor initialized using {RAY_ACTOR_NUM_CPUS} CPU cores...")
         self._processor = DataProcessCore()
+        self._chunk_cache: Optional[ChunkCache] = None
 
     def process_file(
         self,
@@ -50,19 +71,79 @@ class DataProcessorRayActor:
         logger.info(
             f"[RayActor] Processing start: source='{source}', destination='{destination}', strategy='{chunking_strategy}', task_id='{task_id}'")
 
-        if task_id:
-            params['task_id'] = task_id
+        file_data, digests = self._read_file(source)
+        with file_data:
+            return self._chunk_file(file_data, digests["sha256"], source, chunking_strategy, task_id, **params)
+
+    def process_file_with_metadata(
+        self,
+        source: str,
+        chunking_strategy: str,
+        destination: str,
+        task_id: Optional[str] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """
+        Process a file like process_file and also describe the file from the digests computed while reading it.
+
+        Lets the caller pass file size, content type and etag on to later steps without asking
+        the object store again.
 
+        Returns:
+            Dict[str, Any]: {"chunks": processed chunks, "file_metadata": see build_file_metadata}
+        """
+        logger.info(
+            f"[RayActor] Processing start: source='{source}', destination='{destination}', strategy='{chunking_strategy}', task_id='{task_id}'")
+
+        file_data, digests = self._read_file(source)
+        file_metadata = build_file_metadata(source, digests["file_size"], digests["md5"])
+        with file_data:
+            chunks = self._chunk_file(file_data, digests["sha256"], source, chunking_strategy, task_id, **params)
+        return {"chunks": chunks, "file_metadata": file_metadata}
+
+    @staticmethod
+    def _read_file(source: str) -> Tuple[BinaryIO, Dict[str, Any]]:
+        # Files are fetched with ranged GETs into a spooled temporary file that spills to disk when large,
+        # and processors read it as a stream instead of a bytes copy on the heap
         try:
-            file_stream = get_file_stream(source)
-            if file_stream is None:
+            result = get_file_spooled(source, max_memory_size=DP_FILE_SPOOL_MAX_MB * 1024 * 1024)
+            if result is None:
                 raise FileNotFoundError(
                     f"Unable to fetch file from URL: {source}")
-            file_data = file_stream.read()
+            return result
         except Exception as e:
             logger.error(f"Failed to fetch file from {source}: {e}")
             raise
 
+    def _chunk_file(
+        self,
+        file_data: BinaryIO,
+        content_sha256: str,
+        source: str,
+        chunking_strategy: str,
+        task_id: Optional[str] = None,
+        **params
+    ) -> List[Dict[str, Any]]:
+        if task_id:
+            params['task_id'] = task_id
+        # Page ranges of large documents are partitioned within the CPUs reserved for this actor
+        params.setdefault('split_max_workers', RAY_ACTOR_NUM_CPUS)
+
+        # Content processed before with the same strategy and parameters is served from the chunk cache
+        chunk_cache = self._get_chunk_cache()
+        cache_key = None
+        if chunk_cache is not None:
+            cache_key = chunk_cache_key(content_sha256, source, chunking_strategy, params)
+            try:
+                cached_chunks = chunk_cache.get(cache_key, filename=source)
+            except Exception as e:
+                logger.warning(f"[RayActor] Chunk cache lookup failed for source='{source}': {e}")
+                cached_chunks = None
+            if cached_chunks is not None:
+                logger.info(
+                    f"[RayActor] Chunk cache hit: reused {len(cached_chunks)} chunks for source='{source}'")
+                return cached_chunks
+
         chunks = self._processor.file_process(
             file_data=file_data,
             filename=source,
@@ -85,15 +166,32 @@ class DataProcessorRayActor:
 
         logger.info(
             f"[RayActor] Processing done: produced {len(chunks)} chunks for source='{source}'")
+        if cache_key is not None:
+            try:
+                chunk_cache.put(cache_key, chunks)
+            except Exception as e:
+                logger.warning(f"[RayActor] Chunk cache store failed for source='{source}': {e}")
         return chunks
 
+    def _get_chunk_cache(self) -> Optional[ChunkCache]:
+        if not DP_CHUNK_CACHE_ENABLED or not REDIS_BACKEND_URL:
+            return None
+        if self._chunk_cache is None:
+            import redis
+            self._chunk_cache = ChunkCache(
+                redis.Redis.from_url(REDIS_BACKEND_URL, decode_responses=False),
+                max_bytes=DP_CHUNK_CACHE_MAX_MB * 1024 * 1024,
+                ttl_seconds=DP_CHUNK_CACHE_TTL_S,
+            )
+        return self._chunk_cache
+
     def store_chunks_in_redis(self, redis_key: str, chunks: List[Dict[str, Any]]) -> bool:
         """
         Store processed chunks into Redis under a given key.
 
         This is used to decouple Celery task execution from Ray processing, allowing
         Celery to submit work and return immediately while Ray persists results for
-        a subsequent step to retrieve.
+        a subsequent step to retrieve. Chunks are written as compressed segments, see chunk_store.
         """
         if not REDIS_BACKEND_URL:
             logger.error(
@@ -102,31 +200,109 @@ class DataProcessorRayActor:
         try:
             import redis
             client = redis.Redis.from_url(
-                REDIS_BACKEND_URL, decode_responses=True)
-            # Use a compact JSON for storage
+                REDIS_BACKEND_URL, decode_responses=False)
             if chunks is None:
                 logger.error(
                     f"[RayActor] store_chunks_in_redis received None chunks for key '{redis_key}'")
-                serialized = json.dumps([])
-            else:
-                try:
-                    serialized = json.dumps(chunks, ensure_ascii=False)
-                except Exception as ser_exc:
-                    logger.error(
-                        f"[RayActor] JSON serialization failed for key '{redis_key}': {ser_exc}")
-                    # Fallback to empty list to avoid poisoning Redis with invalid data
-                    serialized = json.dumps([])
-            client.set(redis_key, serialized)
-            # Optionally set an expiration to avoid leaks (e.g., 2 hours)
-            client.expire(redis_key, 2 * 60 * 60)
+                chunks = []
             try:
-                count_logged = len(chunks) if isinstance(chunks, list) else 0
-            except Exception:
-                count_logged = 0
+                stored_bytes = write_chunks(client, redis_key, chunks)
+            except (TypeError, ValueError) as ser_exc:
+                logger.error(
+                    f"[RayActor] JSON serialization failed for key '{redis_key}': {ser_exc}")
+                # Fallback to empty list to avoid poisoning Redis with invalid data
+                chunks = []
+                stored_bytes = write_chunks(client, redis_key, chunks)
             logger.info(
-                f"[RayActor] Stored {count_logged} chunks in Redis at key '{redis_key}', value_len={len(serialized)}")
+                f"[RayActor] Stored {len(chunks)} chunks in Redis at key '{redis_key}', compressed_len={stored_bytes}")
             return True
         except Exception as exc:
             logger.error(
                 f"Failed to store chunks in Redis at key {redis_key}: {exc}")
             return False
+
+
+@ray.remote(num_cpus=0)
+def summarize_processing_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe a processing result for status reporting, so the caller does not have to fetch its chunks.
+
+    Returns:
+        Dict[str, Any]: chunks_count and file_metadata of the result
+    """
+    chunks = result.get("chunks") or []
+    return {"chunks_count": len(chunks), "file_metadata": result.get("file_metadata")}
+
+
+@ray.remote(num_cpus=0)
+class ChunkHandoffRayActor:
+    """
+    Ray actor handing processing results from the process task to the forward task.
+
+    The object reference of the result of DataProcessorRayActor.process_file_with_metadata is put wrapped
+    in a list, so Ray does not resolve it and the actor only holds the reference: the chunks stay in the
+    object store until the forward task fetches them, and never go through Redis. A forward task waiting in
+    take is woken as soon as the reference is put, without polling.
+
+    Taking a result does not remove it, a forward task redelivered after its worker was lost takes it again.
+    The result is dropped once the forward task acknowledges it with ack, or when it was neither put nor
+    taken again within ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: int = CHUNKS_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        self._results: Dict[str, Tuple[float, List[Any]]] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+
+    async def put(self, key: str, result_refs: List[Any]) -> None:
+        """
+        Keep the reference to a processing result until the forward task acknowledges it.
+
+        Args:
+            key: Hand-off key of the process task
+            result_refs: Single item list holding the object reference of the processing result
+        """
+        self._drop_expired()
+        self._results[key] = (time.monotonic(), result_refs)
+        self._get_event(key).set()
+        logger.info(f"[ChunkHandoff] Holding processing result for key '{key}'")
+
+    async def take(self, key: str, timeout: float) -> Optional[List[Any]]:
+        """
+        Wait until the result of key is put, it is kept until acknowledged.
+
+        Returns:
+            Optional[List[Any]]: Single item list holding the object reference of the processing result,
+            or None if it did not arrive within timeout
+        """
+        self._drop_expired()
+        try:
+            await asyncio.wait_for(self._get_event(key).wait(), timeout)
+        except asyncio.TimeoutError:
+            self._events.pop(key, None)
+            return None
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        # Restart the TTL, the forward task holding the result may still need to take it again
+        self._results[key] = (time.monotonic(), entry[1])
+        return entry[1]
+
+    async def ack(self, key: str) -> None:
+        """Drop the result of key once the forward task has indexed its chunks"""
+        self._drop_expired()
+        if self._results.pop(key, None) is not None:
+            logger.info(f"[ChunkHandoff] Released processing result for key '{key}'")
+        self._events.pop(key, None)
+
+    def _get_event(self, key: str) -> asyncio.Event:
+        if key not in self._events:
+            self._events[key] = asyncio.Event()
+        return self._events[key]
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (last_used, _) in self._results.items() if now - last_used > self._ttl_seconds]:
+            logger.warning(f"[ChunkHandoff] Dropping processing result for key '{key}' that was never acknowledged")
+            self._results.pop(key, None)
+            self._events.pop(key, None)
@@ -0,0 +1,105 @@
+"""
+Task progress events published over Redis pub/sub.
+
+The Celery signal handlers of the worker publish an event whenever a process or forward task changes stage, on one
+channel per knowledge base. The data process service relays them to clients as server-sent events, so following the
+progress of tasks costs one message per transition instead of polling every worker for every task.
+"""
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger("data_process.task_events")
+
+TASK_EVENTS_PREFIX = "dp:task_events"
+# Comment line sent to idle clients so proxies keep the stream open
+SSE_HEARTBEAT = ": keepalive\n\n"
+
+# Stage a task reached by task name and state, the same stages the tasks record in their meta
+TASK_STAGES = {
+    ("process", "STARTED"): "extracting_text",
+    ("process", "SUCCESS"): "text_extracted",
+    ("process", "FAILURE"): "text_extraction_failed",
+    ("forward", "STARTED"): "vectorizing_and_storing",
+    ("forward", "SUCCESS"): "completed",
+    ("forward", "FAILURE"): "forward_task_failed",
+}
+
+
+def task_events_channel(index_name: str) -> str:
+    """Channel the events of the tasks of a knowledge base are published on"""
+    return f"{TASK_EVENTS_PREFIX}:{index_name}"
+
+
+def build_task_event(task_id: str, task_name: str, status: str, kwargs: Optional[Dict[str, Any]],
+                     error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build the event of a task state change from the task arguments.
+
+    Args:
+        task_id: Celery task ID
+        task_name: Full or short name of the task, e.g. "data_process.tasks.process"
+        status: Celery state the task reached
+        kwargs: Keyword arguments of the task, which carry index_name and source
+        error: Error message of a failed task
+
+    Returns:
+        The event, or None for tasks that do not belong to a knowledge base
+    """
+    task_name = task_name.rsplit(".", 1)[-1]
+    kwargs = kwargs or {}
+    index_name = kwargs.get("index_name")
+    if task_name not in ("process", "forward") or not index_name:
+        return None
+    return {
+        "id": task_id,
+        "task_name": task_name,
+        "index_name": index_name,
+        "path_or_url": kwargs.get("source", ""),
+        "original_filename": kwargs.get("original_filename") or "",
+        "status": status,
+        "stage": TASK_STAGES.get((task_name, status)),
+        "error": error,
+        "timestamp": time.time(),
+    }
+
+
+def publish_task_event(client, event: Optional[Dict[str, Any]]) -> None:
+    """Publish an event on the channel of its knowledge base, a failure is logged and not raised"""
+    if event is None:
+        return
+    try:
+        client.publish(task_events_channel(event["index_name"]), json.dumps(event, ensure_ascii=False))
+    except Exception as e:
+        logger.warning(f"Failed to publish {event['status']} event of task {event['id']}: {str(e)}")
+
+
+async def subscribe_task_events(pubsub, index_name: Optional[str] = None) -> None:
+    """Subscribe an asyncio pub/sub to the events of one knowledge base, or of all of them"""
+    if index_name:
+        await pubsub.subscribe(task_events_channel(index_name))
+    else:
+        await pubsub.psubscribe(f"{TASK_EVENTS_PREFIX}:*")
+
+
+async def iter_task_events(pubsub, heartbeat_s: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Yield the events received by a subscribed asyncio pub/sub as they arrive.
+
+    None is yielded whenever no event arrived for heartbeat_s seconds, for the caller to keep its client alive.
+    """
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat_s)
+        if message is None:
+            yield None
+            continue
+        try:
+            yield json.loads(message["data"])
+        except (json.JSONDecodeError, TypeError, KeyError) as e:
+            logger.warning(f"Skipping unreadable task event: {e}")
+
+
+def format_sse(data: Any, event: str = "task") -> str:
+    """Format data as one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -7,7 +7,8 @@ import logging
 import os
 import threading
 import time
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 
 import aiohttp
 import ray
@@ -16,9 +17,23 @@ from celery.exceptions import Retry
 
 from consts.const import ELASTICSEARCH_SERVICE
 from utils.file_management_utils import get_file_size
+from utils.task_index_utils import RESULT_FIELDS, TaskIndex
 from .app import app
-from .ray_actors import DataProcessorRayActor
+from .actor_pool import ActorPoolDispatcher, default_pool_size
+from .chunk_store import iter_chunk_segments
+from .ray_actors import ChunkHandoffRayActor, DataProcessorRayActor, summarize_processing_result
 from consts.const import (
+    DP_ACTOR_LEASE_TIMEOUT_S,
+    DP_ACTOR_POOL_ENABLED,
+    DP_ACTOR_POOL_IDLE_S,
+    DP_ACTOR_POOL_MAX_SIZE,
+    DP_ACTOR_POOL_SIZE,
+    DP_CHUNK_HANDOFF,
+    DP_CHUNK_HANDOFF_TIMEOUT_S,
+    DP_FORWARD_PAGE_SIZE,
+    DP_FORWARD_PAGE_TIMEOUT_S,
+    DP_LARGE_FILE_MB,
+    RAY_ACTOR_NUM_CPUS,
     REDIS_BACKEND_URL,
     FORWARD_REDIS_RETRY_DELAY_S,
     FORWARD_REDIS_RETRY_MAX,
@@ -30,6 +45,9 @@ logger = logging.getLogger("data_process.tasks")
 # Thread lock for initializing Ray to prevent race conditions
 ray_init_lock = threading.Lock()
 
+# Index of tasks by knowledge base, created on first use
+_task_index = None
+
 
 def init_ray_in_worker():
     """
@@ -120,8 +138,155 @@ def get_ray_actor() -> Any:
     return actor
 
 
+def get_actor_pool() -> Any:
+    """
+    Returns the cluster-wide ActorPoolDispatcher, creating it on first use.
+    The pool is sized from the CPUs of the Ray cluster unless DP_ACTOR_POOL_SIZE is set.
+    """
+    with ray_init_lock:
+        init_ray_in_worker()
+    size = DP_ACTOR_POOL_SIZE or default_pool_size(RAY_ACTOR_NUM_CPUS)
+    return ActorPoolDispatcher.options(
+        name="dp_actor_pool",
+        namespace="nexent_data_process",
+        lifetime="detached",
+        get_if_exists=True,
+    ).remote(
+        size,
+        max_size=DP_ACTOR_POOL_MAX_SIZE or size,
+        large_file_bytes=DP_LARGE_FILE_MB * 1024 * 1024,
+        idle_timeout_s=DP_ACTOR_POOL_IDLE_S,
+        lease_timeout_s=DP_ACTOR_LEASE_TIMEOUT_S,
+    )
+
+
+@contextmanager
+def lease_ray_actor(file_size: int = 0):
+    """
+    Lease a processing actor for one file from the actor pool and give it back afterwards.
+    Falls back to a dedicated actor per file when the pool is disabled.
+    """
+    if not DP_ACTOR_POOL_ENABLED:
+        yield get_ray_actor()
+        return
+
+    pool = get_actor_pool()
+    lease_id, actor = ray.get(pool.acquire.remote(file_size))
+    success = False
+    try:
+        yield actor
+        success = True
+    finally:
+        pool.release.remote(lease_id, success)
+
+
+def get_chunk_handoff() -> Any:
+    """
+    Returns the cluster-wide ChunkHandoffRayActor, creating it on first use.
+    The actor is named and detached so process and forward workers share it.
+    """
+    with ray_init_lock:
+        init_ray_in_worker()
+    return ChunkHandoffRayActor.options(
+        name="dp_chunk_handoff",
+        namespace="nexent_data_process",
+        lifetime="detached",
+        get_if_exists=True,
+    ).remote()
+
+
+def get_task_index() -> TaskIndex:
+    """Returns the index of tasks by knowledge base, kept in the Celery result backend"""
+    global _task_index
+    if _task_index is None:
+        import redis
+        _task_index = TaskIndex(redis.Redis.from_url(REDIS_BACKEND_URL, decode_responses=True))
+    return _task_index
+
+
+def record_task_state(task_id: str, task_name: str, status: str, index_name: str, source: str,
+                      **fields) -> None:
+    """Record a task state in the task index, a failure is logged and does not fail the task"""
+    try:
+        get_task_index().record_state(task_id, task_name, index_name, source, status, **fields)
+    except Exception as e:
+        logger.warning(f"Failed to record state {status} of task {task_id} in the task index: {str(e)}")
+
+
+def record_submitted_chain(result: Any, index_name: Optional[str], source: str, source_type: Optional[str] = None,
+                           original_filename: Optional[str] = None) -> None:
+    """
+    Record the tasks of a submitted process -> forward chain in the task index, so they are listed
+    for their knowledge base before a worker picks them up.
+
+    Args:
+        result: AsyncResult of the chain, i.e. of its forward task
+    """
+    if not index_name:
+        return
+    task_ids = {'forward': result.id}
+    parent = getattr(result, 'parent', None)
+    if parent is not None and getattr(parent, 'id', None):
+        task_ids['process'] = parent.id
+    try:
+        get_task_index().add_submitted(task_ids, index_name, source, source_type=source_type,
+                                       original_filename=original_filename)
+    except Exception as e:
+        logger.warning(f"Failed to record submitted tasks {task_ids} in the task index: {str(e)}")
+
+
+def hand_off_chunks(actor: Any, result_ref: Any, task_id: str) -> Dict[str, Any]:
+    """
+    Wait for the Ray processing result and make its chunks available to the forward task.
+
+    With DP_CHUNK_HANDOFF="ray" only the result reference is passed to the hand-off actor, so the chunks
+    stay in the Ray object store until the forward task fetches them. Otherwise the chunks are fetched
+    and stored in Redis by the actor.
+
+    Returns:
+        Dict with chunks_count, file_metadata and the redis_key or handoff_key forward reads the chunks from
+    """
+    key = f"dp:{task_id}:chunks"
+    if DP_CHUNK_HANDOFF == "ray":
+        # Summarized where the result is, then put wrapped in a list so Ray passes the reference as is
+        summary = ray.get(summarize_processing_result.remote(result_ref))
+        ray.get(get_chunk_handoff().put.remote(key, [result_ref]))
+        return {
+            'chunks_count': summary.get('chunks_count', 0),
+            'file_metadata': summary.get('file_metadata'),
+            'handoff_key': key,
+            'redis_key': None,
+        }
+
+    ray_result = ray.get(result_ref)
+    chunks = ray_result.get("chunks")
+    # Persist chunks into Redis via Ray
+    actor.store_chunks_in_redis.remote(key, chunks)
+    return {
+        'chunks_count': len(chunks) if chunks else 0,
+        'file_metadata': ray_result.get("file_metadata"),
+        'handoff_key': None,
+        'redis_key': key,
+    }
+
+
 class LoggingTask(Task):
-    """Base task class with enhanced logging"""
+    """Base task class with enhanced logging, recording state changes in the task index"""
+
+    def update_state(self, task_id=None, state=None, meta=None, **kwargs):
+        """Update the task state, states of tasks that belong to an index are recorded in the task index"""
+        super().update_state(task_id=task_id, state=state, meta=meta, **kwargs)
+        if state and meta and meta.get('index_name') and meta.get('task_name'):
+            record_task_state(
+                task_id or self.request.id,
+                meta['task_name'],
+                state,
+                meta['index_name'],
+                meta.get('source', ''),
+                source_type=meta.get('source_type'),
+                original_filename=meta.get('original_filename'),
+                **{key: meta[key] for key in RESULT_FIELDS if key in meta}
+            )
 
     def on_success(self, retval, task_id, args, kwargs):
         """Log successful task completion"""
@@ -136,6 +301,26 @@ class LoggingTask(Task):
             exc_type = exc.__class__.__name__
             exc_msg = str(exc)
             logger.error(f"Exception type: {exc_type}, message: {exc_msg}")
+        # Tasks raise their metadata as a JSON message, fall back to the task arguments otherwise
+        try:
+            error_info = json.loads(str(exc))
+            if not isinstance(error_info, dict):
+                error_info = {}
+        except (json.JSONDecodeError, TypeError):
+            error_info = {}
+        index_name = error_info.get('index_name') or kwargs.get('index_name')
+        task_name = error_info.get('task_name') or self.name.rsplit('.', 1)[-1]
+        if index_name and task_name in ('process', 'forward'):
+            record_task_state(
+                task_id,
+                task_name,
+                states.FAILURE,
+                index_name,
+                error_info.get('source') or kwargs.get('source', ''),
+                source_type=kwargs.get('source_type'),
+                original_filename=error_info.get('original_filename') or kwargs.get('original_filename'),
+                error=error_info.get('message', str(exc))
+            )
         # Let Celery handle the exception serialization automatically
         return super().on_failure(exc, task_id, args, kwargs, einfo)
 
@@ -183,12 +368,12 @@ def process(
             'stage': 'extracting_text'
         }
     )
-    # Get the data processor instance
-    actor = get_ray_actor()
-
     try:
         # Process the file based on the source type
         file_size_mb = 0
+        # Size, content type and etag of the file, described by the actor from the bytes it read
+        file_metadata = None
+        handoff = None
         if source_type == "local":
             # Check file existence and size for optimization
             if not os.path.exists(source):
@@ -204,25 +389,21 @@ def process(
             # Submit Ray work and WAIT for processing to complete
             logger.info(
                 f"[{self.request.id}] PROCESS TASK: Submitting Ray processing for source='{source}', strategy='{chunking_strategy}', destination='{source_type}'")
-            chunks_ref = actor.process_file.remote(
-                source,
-                chunking_strategy,
-                destination=source_type,
-                task_id=task_id,
-                **params
-            )
-            # Wait for Ray processing to complete (this keeps task in STARTED/"PROCESSING" state)
-            logger.info(
-                f"[{self.request.id}] PROCESS TASK: Waiting for Ray processing to complete...")
-            chunks = ray.get(chunks_ref)
-            logger.info(
-                f"[{self.request.id}] PROCESS TASK: Ray processing completed, got {len(chunks) if chunks else 0} chunks")
-
-            # Persist chunks into Redis via Ray (synchronous to ensure data is ready before forward task)
-            redis_key = f"dp:{task_id}:chunks"
-            actor.store_chunks_in_redis.remote(redis_key, chunks)
+            with lease_ray_actor(file_size) as actor:
+                result_ref = actor.process_file_with_metadata.remote(
+                    source,
+                    chunking_strategy,
+                    destination=source_type,
+                    task_id=task_id,
+                    **params
+                )
+                # Wait for Ray processing to complete (this keeps task in STARTED/"PROCESSING" state)
+                logger.info(
+                    f"[{self.request.id}] PROCESS TASK: Waiting for Ray processing to complete...")
+                handoff = hand_off_chunks(actor, result_ref, task_id)
+            file_metadata = handoff['file_metadata']
             logger.info(
-                f"[{self.request.id}] PROCESS TASK: Stored chunks in Redis at key '{redis_key}'")
+                f"[{self.request.id}] PROCESS TASK: Ray processing completed, handed {handoff['chunks_count']} chunks to forward via {DP_CHUNK_HANDOFF}")
 
             end_time = time.time()
             elapsed_time = end_time - start_time
@@ -235,28 +416,30 @@ def process(
             logger.info(
                 f"[{self.request.id}] PROCESS TASK: Processing from URL: {source}")
 
+            # The pool dispatches by file size, a single lookup per file
+            file_size = get_file_size(source_type, source) if DP_ACTOR_POOL_ENABLED else 0
+
             # For URL source, core.py expects a non-local destination to trigger URL fetching
             logger.info(
                 f"[{self.request.id}] PROCESS TASK: Submitting Ray processing for URL='{source}', strategy='{chunking_strategy}', destination='{source_type}'")
-            chunks_ref = actor.process_file.remote(
-                source,
-                chunking_strategy,
-                destination=source_type,
-                task_id=task_id,
-                **params
-            )
-            # Wait for Ray processing to complete (this keeps task in STARTED/"PROCESSING" state)
-            logger.info(
-                f"[{self.request.id}] PROCESS TASK: Waiting for Ray processing to complete...")
-            chunks = ray.get(chunks_ref)
+            with lease_ray_actor(file_size) as actor:
+                result_ref = actor.process_file_with_metadata.remote(
+                    source,
+                    chunking_strategy,
+                    destination=source_type,
+                    task_id=task_id,
+                    **params
+                )
+                # Wait for Ray processing to complete (this keeps task in STARTED/"PROCESSING" state)
+                logger.info(
+                    f"[{self.request.id}] PROCESS TASK: Waiting for Ray processing to complete...")
+                handoff = hand_off_chunks(actor, result_ref, task_id)
+            file_metadata = handoff['file_metadata']
             logger.info(
-                f"[{self.request.id}] PROCESS TASK: Ray processing completed, got {len(chunks) if chunks else 0} chunks")
+                f"[{self.request.id}] PROCESS TASK: Ray processing completed, handed {handoff['chunks_count']} chunks to forward via {DP_CHUNK_HANDOFF}")
 
-            # Persist chunks into Redis via Ray (synchronous to ensure data is ready before forward task)
-            redis_key = f"dp:{task_id}:chunks"
-            actor.store_chunks_in_redis.remote(redis_key, chunks)
-            logger.info(
-                f"[{self.request.id}] PROCESS TASK: Stored chunks in Redis at key '{redis_key}'")
+            if file_metadata:
+                file_size_mb = file_metadata.get("file_size", 0) / (1024 * 1024)
 
             end_time = time.time()
             elapsed_time = end_time - start_time
@@ -273,7 +456,7 @@ def process(
         self.update_state(
             state=states.SUCCESS,
             meta={
-                'chunks_count': len(chunks) if chunks else 0,
+                'chunks_count': handoff['chunks_count'],
                 'processing_time': elapsed_time,
                 'source': source,
                 'index_name': index_name,
@@ -288,14 +471,16 @@ def process(
         logger.info(
             f"[{self.request.id}] PROCESS TASK: Processing complete, waiting for forward task")
 
-        # Prepare data for the next task in the chain; pass redis_key
+        # Prepare data for the next task in the chain; pass the key to read the chunks with
         returned_data = {
-            'redis_key': f"dp:{task_id}:chunks",
+            'redis_key': handoff['redis_key'],
+            'handoff_key': handoff['handoff_key'],
             'chunks': None,
             'source': source,
             'index_name': index_name,
             'original_filename': original_filename,
-            'task_id': task_id
+            'task_id': task_id,
+            'file_metadata': file_metadata
         }
 
         return returned_data
@@ -364,8 +549,36 @@ def forward(
 
     try:
         chunks = processed_data.get('chunks')
+        # Chunks are consumed segment by segment, chunks carried in the payload form a single segment
+        chunk_segments = [chunks] if chunks is not None else None
+        handoff_key = None
+        # Chunks handed off through Ray are fetched from the object store, with the reference the hand-off
+        # actor returns as soon as the process task put it
+        if (not chunks) and processed_data.get('handoff_key'):
+            handoff_key = processed_data.get('handoff_key')
+            try:
+                result_refs = ray.get(get_chunk_handoff().take.remote(
+                    handoff_key, DP_CHUNK_HANDOFF_TIMEOUT_S))
+                result = ray.get(result_refs[0]) if result_refs else None
+            except Exception as exc:
+                raise Exception(json.dumps({
+                    "message": f"Failed to take chunks from Ray hand-off: {str(exc)}",
+                    "index_name": original_index_name,
+                    "task_name": "forward",
+                    "source": original_source,
+                    "original_filename": filename
+                }, ensure_ascii=False))
+            if result is None:
+                raise Exception(json.dumps({
+                    "message": f"Chunks for '{handoff_key}' did not arrive in Ray hand-off within {DP_CHUNK_HANDOFF_TIMEOUT_S}s",
+                    "index_name": original_index_name,
+                    "task_name": "forward",
+                    "source": original_source,
+                    "original_filename": filename
+                }, ensure_ascii=False))
+            chunk_segments = [result.get('chunks') or []]
         # If chunks are not in payload, try loading from Redis via the redis_key
-        if (not chunks) and processed_data.get('redis_key'):
+        elif (not chunks) and processed_data.get('redis_key'):
             redis_key = processed_data.get('redis_key')
             if not REDIS_BACKEND_URL:
                 raise Exception(json.dumps({
@@ -378,21 +591,9 @@ def forward(
             try:
                 import redis
                 client = redis.Redis.from_url(
-                    REDIS_BACKEND_URL, decode_responses=True)
-                cached = client.get(redis_key)
-                if cached:
-                    try:
-                        logger.debug(
-                            f"[{self.request.id}] FORWARD TASK: Retrieved Redis key '{redis_key}', payload_length={len(cached)}")
-                        chunks = json.loads(cached)
-                    except json.JSONDecodeError as jde:
-                        # Log raw prefix to help diagnose incorrect writes
-                        raw_preview = cached[:120] if isinstance(
-                            cached, str) else str(type(cached))
-                        logger.error(
-                            f"[{self.request.id}] FORWARD TASK: JSON decode error for key '{redis_key}': {str(jde)}; raw_prefix={raw_preview!r}")
-                        raise
-                else:
+                    REDIS_BACKEND_URL, decode_responses=False)
+                chunk_segments = iter_chunk_segments(client, redis_key)
+                if chunk_segments is None:
                     # No busy-wait: release the worker slot and retry later
                     retry_num = getattr(self.request, 'retries', 0)
                     logger.info(
@@ -408,6 +609,8 @@ def forward(
                             "original_filename": filename
                         }, ensure_ascii=False))
                     )
+                logger.debug(
+                    f"[{self.request.id}] FORWARD TASK: Reading chunk segments from Redis key '{redis_key}'")
             except Retry:
                 raise
             except Exception as exc:
@@ -425,7 +628,7 @@ def forward(
         if processed_data.get('original_filename'):
             filename = processed_data.get('original_filename')
         logger.info(
-            f"[{self.request.id}] FORWARD TASK: Received data for source '{original_source}' with {len(chunks) if chunks else 'None'} chunks")
+            f"[{self.request.id}] FORWARD TASK: Received data for source '{original_source}'")
 
         # Update task state to FORWARDING
         self.update_state(
@@ -440,7 +643,7 @@ def forward(
             }
         )
 
-        if chunks is None:
+        if chunk_segments is None:
             raise Exception(json.dumps({
                 "message": "No chunks received for forwarding",
                 "index_name": original_index_name,
@@ -448,93 +651,95 @@ def forward(
                 "source": original_source,
                 "original_filename": original_filename
             }, ensure_ascii=False))
-        if len(chunks) == 0:
-            logger.warning(
-                f"[{self.request.id}] FORWARD TASK: Empty chunks list received for source {original_source}")
-        formatted_chunks = []
-        for i, chunk in enumerate(chunks):
-            # Extract text and metadata
-            content = chunk.get("content", "")
-            metadata = chunk.get("metadata", {})
-
-            # Validate chunk content
-            if not content or len(content.strip()) == 0:
-                logger.warning(
-                    f"[{self.request.id}] FORWARD TASK: Chunk {i+1} has empty text content, skipping")
-                continue
-
+        # The file is the same for every chunk, prefer the size described by the process task
+        # and only ask the file store when the payload lacks it (e.g. sent by an older worker)
+        file_metadata = processed_data.get('file_metadata') or {}
+        file_size = file_metadata.get('file_size')
+        if file_size is None:
             file_size = get_file_size(source_type, original_source) if isinstance(
                 original_source, str) else 0
 
-            # Format as expected by the Elasticsearch API
-            formatted_chunk = {
-                "metadata": metadata,
-                "filename": filename or (os.path.basename(original_source) if original_source and isinstance(original_source, str) else ""),
-                "path_or_url": original_source,
-                "content": content,
-                "process_source": "Unstructured",
-                "source_type": source_type,
-                "file_size": file_size,
-                "create_time": metadata.get("creation_date"),
-                "date": metadata.get("date"),
-            }
-            formatted_chunks.append(formatted_chunk)
-
-        if len(formatted_chunks) == 0:
-            raise Exception(json.dumps({
-                "message": "No valid chunks to forward after formatting",
+        def index_error(message: str) -> Exception:
+            return Exception(json.dumps({
+                "message": message,
                 "index_name": original_index_name,
                 "task_name": "forward",
                 "source": original_source,
                 "original_filename": original_filename
             }, ensure_ascii=False))
 
-        async def index_documents():
-            elasticsearch_url = ELASTICSEARCH_SERVICE
-            if not elasticsearch_url:
-                raise Exception(json.dumps({
-                    "message": "ELASTICSEARCH_SERVICE env is not set",
-                    "index_name": original_index_name,
-                    "task_name": "forward",
-                    "source": original_source,
-                    "original_filename": original_filename
-                }, ensure_ascii=False))
-            route_url = f"/indices/{original_index_name}/documents"
-            full_url = elasticsearch_url + route_url
-            headers = {"Content-Type": "application/json"}
-            if authorization:
-                headers["Authorization"] = authorization
+        chunks_count = 0
+        formatted_count = 0
 
+        def format_segments():
+            """Format the chunks of each segment as expected by the Elasticsearch API, reading a segment only when it is reached"""
+            nonlocal chunks_count
+            try:
+                for segment in chunk_segments:
+                    formatted_chunks = []
+                    for chunk in segment:
+                        chunks_count += 1
+                        # Extract text and metadata
+                        content = chunk.get("content", "")
+                        metadata = chunk.get("metadata", {})
+
+                        # Validate chunk content
+                        if not content or len(content.strip()) == 0:
+                            logger.warning(
+                                f"[{self.request.id}] FORWARD TASK: Chunk {chunks_count} has empty text content, skipping")
+                            continue
+
+                        # Format as expected by the Elasticsearch API
+                        formatted_chunk = {
+                            "metadata": metadata,
+                            "filename": filename or (os.path.basename(original_source) if original_source and isinstance(original_source, str) else ""),
+                            "path_or_url": original_source,
+                            "content": content,
+                            "process_source": "Unstructured",
+                            "source_type": source_type,
+                            "file_size": file_size,
+                            "create_time": metadata.get("creation_date"),
+                            "date": metadata.get("date"),
+                        }
+                        formatted_chunks.append(formatted_chunk)
+                    yield formatted_chunks
+            except Exception as exc:
+                raise index_error(f"Failed to read chunks: {str(exc)}")
+
+        async def index_page(session, full_url: str, headers: Dict[str, str], page: List[Dict],
+                             offset: int) -> Any:
+            """Send one page of chunks, retrying only this page; chunk IDs make a resent page idempotent"""
             max_retries = 5
             retry_delay = 5
+            result = None
             for retry in range(max_retries):
                 try:
-                    connector = aiohttp.TCPConnector(verify_ssl=False)
-                    # Increased timeout for large documents
-                    timeout = aiohttp.ClientTimeout(total=120)
-
-                    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                        async with session.post(
-                            full_url,
-                            headers=headers,
-                            json=formatted_chunks,
-                            raise_for_status=True
-                        ) as response:
-                            result = await response.json()
-                            return result
+                    async with session.post(
+                        full_url,
+                        headers=headers,
+                        params={"batch_offset": offset},
+                        json=page,
+                        raise_for_status=True
+                    ) as response:
+                        result = await response.json()
+                    # Chunks main_service failed to store are sent again, the stored ones are overwritten
+                    if isinstance(result, dict) and result.get("success") and \
+                            result.get("total_indexed", 0) < result.get("total_submitted", len(page)) and \
+                            retry < max_retries - 1:
+                        wait_time = retry_delay * (retry + 1)
+                        logger.warning(
+                            f"[{self.request.id}] FORWARD TASK: Page at offset {offset} partially indexed "
+                            f"({result.get('total_indexed', 0)}/{result.get('total_submitted')}). Retrying in {wait_time}s...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    return result
 
                 except aiohttp.ClientResponseError as e:
                     if e.status == 503 and retry < max_retries - 1:
                         wait_time = retry_delay * (retry + 1)
                         await asyncio.sleep(wait_time)
                     else:
-                        raise Exception(json.dumps({
-                            "message": f"ElasticSearch service unavailable: {str(e)}",
-                            "index_name": original_index_name,
-                            "task_name": "forward",
-                            "source": original_source,
-                            "original_filename": original_filename
-                        }, ensure_ascii=False))
+                        raise index_error(f"ElasticSearch service unavailable: {str(e)}")
                 except aiohttp.ClientConnectorError as e:
                     logger.error(
                         f"[{self.request.id}] FORWARD TASK: Connection error to {full_url}: {str(e)}")
@@ -544,27 +749,15 @@ def forward(
                             f"[{self.request.id}] FORWARD TASK: Connection error when indexing documents: {str(e)}. Retrying in {wait_time}s...")
                         await asyncio.sleep(wait_time)
                     else:
-                        raise Exception(json.dumps({
-                            "message": f"Failed to connect to API: {str(e)}",
-                            "index_name": original_index_name,
-                            "task_name": "forward",
-                            "source": original_source,
-                            "original_filename": original_filename
-                        }, ensure_ascii=False))
+                        raise index_error(f"Failed to connect to API: {str(e)}")
                 except asyncio.TimeoutError as e:
                     if retry < max_retries - 1:
                         wait_time = retry_delay * (retry + 1)
                         logger.warning(
-                            f"[{self.request.id}] FORWARD TASK: Timeout when indexing documents: {str(e)}. Retrying in {wait_time}s...")
+                            f"[{self.request.id}] FORWARD TASK: Timeout when indexing page at offset {offset}: {str(e)}. Retrying in {wait_time}s...")
                         await asyncio.sleep(wait_time)
                     else:
-                        raise Exception(json.dumps({
-                            "message": f"Timeout after {max_retries} attempts: {str(e)}",
-                            "index_name": original_index_name,
-                            "task_name": "forward",
-                            "source": original_source,
-                            "original_filename": original_filename
-                        }, ensure_ascii=False))
+                        raise index_error(f"Timeout after {max_retries} attempts: {str(e)}")
                 except Exception as e:
                     if retry < max_retries - 1:
                         wait_time = retry_delay * (retry + 1)
@@ -572,16 +765,64 @@ def forward(
                             f"[{self.request.id}] FORWARD TASK: Unexpected error when indexing documents: {str(e)}. Retrying in {wait_time}s...")
                         await asyncio.sleep(wait_time)
                     else:
-                        raise Exception(json.dumps({
-                            "message": f"Unexpected error when indexing documents: {str(e)}",
-                            "index_name": original_index_name,
-                            "task_name": "forward",
-                            "source": original_source,
-                            "original_filename": original_filename
-                        }, ensure_ascii=False))
+                        raise index_error(f"Unexpected error when indexing documents: {str(e)}")
+            return result
+
+        async def index_documents():
+            nonlocal formatted_count
+            elasticsearch_url = ELASTICSEARCH_SERVICE
+            if not elasticsearch_url:
+                raise index_error("ELASTICSEARCH_SERVICE env is not set")
+            route_url = f"/indices/{original_index_name}/documents"
+            full_url = elasticsearch_url + route_url
+            headers = {"Content-Type": "application/json"}
+            if authorization:
+                headers["Authorization"] = authorization
+
+            # Chunks are sent in pages with a cursor, so a large document never has to fit in one request
+            # and a failure only costs the page it happened in. Each segment is indexed as soon as it is
+            # decoded, the cursor runs on across segments so batch_offset is the position in the file.
+            page_size = max(1, DP_FORWARD_PAGE_SIZE)
+            total_indexed = 0
+            connector = aiohttp.TCPConnector(verify_ssl=False)
+            timeout = aiohttp.ClientTimeout(total=DP_FORWARD_PAGE_TIMEOUT_S)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                for formatted_chunks in format_segments():
+                    segment_offset = formatted_count
+                    formatted_count += len(formatted_chunks)
+                    offset = segment_offset
+                    while offset < formatted_count:
+                        page = formatted_chunks[offset - segment_offset:offset - segment_offset + page_size]
+                        result = await index_page(session, full_url, headers, page, offset)
+                        if not isinstance(result, dict) or not result.get("success"):
+                            return result
+                        total_indexed += result.get("total_indexed", 0)
+                        if result.get("total_indexed", 0) < result.get("total_submitted", len(page)):
+                            return {
+                                "success": True,
+                                "message": f"Indexing stopped at the page at offset {offset}",
+                                "total_indexed": total_indexed,
+                                "total_submitted": formatted_count
+                            }
+                        # Pages before next_offset are acknowledged by main_service
+                        offset = result.get("next_offset") or offset + len(page)
+                        logger.debug(
+                            f"[{self.request.id}] FORWARD TASK: Acknowledged {offset} chunks")
+
+            if chunks_count == 0:
+                logger.warning(
+                    f"[{self.request.id}] FORWARD TASK: Empty chunks list received for source {original_source}")
+            if formatted_count == 0:
+                raise index_error("No valid chunks to forward after formatting")
+            return {
+                "success": True,
+                "message": f"Indexed {total_indexed} chunks in pages of {page_size}",
+                "total_indexed": total_indexed,
+                "total_submitted": formatted_count
+            }
 
         logger.info(
-            f"[{self.request.id}] FORWARD TASK: Starting ES indexing for {len(formatted_chunks)} chunks to index '{original_index_name}'...")
+            f"[{self.request.id}] FORWARD TASK: Starting ES indexing to index '{original_index_name}'...")
         es_result = run_async(index_documents())
         logger.debug(
             f"[{self.request.id}] FORWARD TASK: API response from main_server for source '{original_source}': {es_result}")
@@ -589,7 +830,7 @@ def forward(
         if isinstance(es_result, dict) and es_result.get("success"):
             total_indexed = es_result.get("total_indexed", 0)
             total_submitted = es_result.get(
-                "total_submitted", len(formatted_chunks))
+                "total_submitted", formatted_count)
             logger.debug(f"[{self.request.id}] FORWARD TASK: main_server reported {total_indexed}/{total_submitted} documents indexed successfully for '{original_source}'. Message: {es_result.get('message')}")
 
             if total_indexed < total_submitted:
@@ -623,13 +864,20 @@ def forward(
                 "source": original_source,
                 "original_filename": original_filename
             }, ensure_ascii=False))
+        if handoff_key:
+            # The hand-off keeps the result until it is indexed, in case this task is redelivered
+            try:
+                get_chunk_handoff().ack.remote(handoff_key)
+            except Exception as exc:
+                logger.warning(
+                    f"[{self.request.id}] FORWARD TASK: Failed to release '{handoff_key}' from Ray hand-off, it expires after its TTL: {str(exc)}")
         end_time = time.time()
         logger.info(
             f"[{self.request.id}] FORWARD TASK: Updating task state to SUCCESS after ES indexing completion")
         self.update_state(
             state=states.SUCCESS,
             meta={
-                'chunks_stored': len(chunks),
+                'chunks_stored': chunks_count,
                 'storage_time': end_time - start_time,
                 'source': original_source,
                 'index_name': original_index_name,
@@ -641,13 +889,13 @@ def forward(
         )
 
         logger.info(
-            f"[{self.request.id}] FORWARD TASK: Successfully stored {len(chunks)} chunks to index {original_index_name} in {end_time - start_time:.2f}s")
+            f"[{self.request.id}] FORWARD TASK: Successfully stored {chunks_count} chunks to index {original_index_name} in {end_time - start_time:.2f}s")
         return {
             'task_id': task_id,
             'source': original_source,
             'index_name': original_index_name,
             'original_filename': original_filename,
-            'chunks_stored': len(chunks),
+            'chunks_stored': chunks_count,
             'storage_time': end_time - start_time,
             'es_result': es_result
         }
@@ -732,6 +980,8 @@ def process_and_forward(
             "Celery chain apply_async() did not return a valid result or result.id")
         return ""
     logger.info(f"Created task chain ID: {result.id}")
+    record_submitted_chain(result, index_name, source, source_type=source_type,
+                           original_filename=original_filename)
 
     return result.id
 
@@ -781,22 +1031,21 @@ def process_sync(
     logger.info(
         f"Synchronous processing file: {source} with strategy: {chunking_strategy}")
 
-    # Get the data processor instance
-    actor = get_ray_actor()
-
     try:
         # Process the file based on the source type
         if source_type == "local":
-            # The unified actor call, mapping 'file' source_type to 'local' destination
-            chunks_ref = actor.process_file.remote(
-                source,
-                chunking_strategy,
-                destination=source_type,
-                task_id=task_id,
-                **params
-            )
-
-            chunks = ray.get(chunks_ref)
+            file_size = os.path.getsize(source) if os.path.exists(source) else 0
+            with lease_ray_actor(file_size) as actor:
+                # The unified actor call, mapping 'file' source_type to 'local' destination
+                chunks_ref = actor.process_file.remote(
+                    source,
+                    chunking_strategy,
+                    destination=source_type,
+                    task_id=task_id,
+                    **params
+                )
+
+                chunks = ray.get(chunks_ref)
         else:
             raise NotImplementedError(
                 f"Source type '{source_type}' not yet implemented")
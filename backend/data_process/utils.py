@@ -24,8 +24,8 @@ def get_all_task_ids_from_redis(redis_client: redis.Redis) -> List[str]:
     """
     task_ids = []
     try:
-        # Get all keys matching Celery result pattern
-        result_keys = redis_client.keys('celery-task-meta-*')
+        # Iterate keys matching Celery result pattern incrementally, KEYS would block Redis for the whole keyspace
+        result_keys = redis_client.scan_iter(match='celery-task-meta-*', count=1000)
 
         # Extract task IDs from keys
         for key in result_keys:
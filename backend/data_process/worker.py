@@ -17,6 +17,7 @@ Usage:
     QUEUES=forward_q WORKER_CONCURRENCY=2 python worker.py
 """
 
+import json
 import logging
 import os
 import sys
@@ -48,6 +49,7 @@ from consts.const import (
 
 from .app import app
 from .ray_config import RayConfig
+from .task_events import build_task_event, publish_task_event
 
 # Global worker state for monitoring and debugging
 worker_state = {
@@ -63,6 +65,28 @@ worker_state = {
 
 logger = logging.getLogger("data_process.worker")
 
+# Redis client task progress events are published with, created on first use
+_events_client = None
+
+
+def get_events_client():
+    """Get the Redis client task progress events are published with"""
+    global _events_client
+    if _events_client is None:
+        import redis
+        _events_client = redis.from_url(REDIS_URL, socket_timeout=5)
+    return _events_client
+
+
+def publish_task_state(task_id, task, state, kwargs, error=None):
+    """Publish the state change of a task that belongs to a knowledge base"""
+    event = build_task_event(task_id, getattr(task, 'name', '') or '', state, kwargs, error=error)
+    if event is not None:
+        try:
+            publish_task_event(get_events_client(), event)
+        except Exception as e:
+            logger.warning(f"Failed to publish state {state} of task {task_id}: {str(e)}")
+
 
 # ============================================================================
 # WORKER INITIALIZATION SIGNALS
@@ -217,6 +241,7 @@ def worker_shutdown_handler(**kwargs):
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kwds):
     """Handler before task execution"""
     logger.debug(f"📋 Task started: {task.name}[{task_id}]")
+    publish_task_state(task_id, task, 'STARTED', kwargs)
 
 
 @task_postrun.connect
@@ -225,17 +250,26 @@ def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs
     if state == 'SUCCESS':
         worker_state['tasks_completed'] += 1
         # No log output for successful tasks, to reduce noise
-        pass
+        publish_task_state(task_id, task, state, kwargs)
     else:
         logger.debug(f"⚠️ Task ended: {task.name}[{task_id}] - State: {state}")
+        # Failures are published by task_failure_handler with their error
+        if state != 'FAILURE':
+            publish_task_state(task_id, task, state, kwargs)
 
 
 @task_failure.connect
-def task_failure_handler(sender=None, task_id=None, exception=None, einfo=None, **kwds):
+def task_failure_handler(sender=None, task_id=None, exception=None, args=None, kwargs=None, einfo=None, **kwds):
     """Handler when task fails"""
     worker_state['tasks_failed'] += 1
     logger.error(
         f"❌ Task failed: {sender.name}[{task_id}] - Exception: {str(exception)}")
+    # Tasks raise their error as a JSON message with the error text in "message"
+    try:
+        error = json.loads(str(exception)).get('message', str(exception))
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        error = str(exception)
+    publish_task_state(task_id, sender, 'FAILURE', kwargs, error=error)
 
 
 # ============================================================================
@@ -1,11 +1,24 @@
+import asyncio
+import hashlib
 import io
+import logging
 import os
+import tempfile
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, BinaryIO, Dict, List, Optional
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
 
+from consts.const import MINIO_DOWNLOAD_CONCURRENCY, MINIO_DOWNLOAD_RANGE_SIZE, MINIO_UPLOAD_CONCURRENCY, \
+    MINIO_UPLOAD_PART_SIZE
 from .client import minio_client
 
+logger = logging.getLogger("attachment_db")
+
+# S3 rejects multipart uploads whose parts, except the last one, are smaller than this
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 def generate_object_name(file_name: str, prefix: str = "attachments") -> str:
     """
@@ -108,6 +121,102 @@ def upload_fileobj(
     return response
 
 
+async def upload_stream(
+        read: Callable[[int], Awaitable[bytes]],
+        file_name: str,
+        bucket: Optional[str] = None,
+        prefix: str = "attachments",
+        part_size: int = MINIO_UPLOAD_PART_SIZE,
+        max_concurrency: int = MINIO_UPLOAD_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Stream a file to MinIO part by part without holding it in memory
+
+    A file smaller than one part is stored with a single request, larger files with a multipart upload that
+    keeps at most max_concurrency parts in flight, so at most (max_concurrency + 1) * part_size bytes are
+    buffered whatever the file size. The SHA-256 of the content is computed while reading.
+
+    Args:
+        read: Coroutine function returning up to n bytes and b"" at the end of the file, such as UploadFile.read
+        file_name: File name
+        bucket: Bucket name, if not specified will use default bucket
+        prefix: Object name prefix, default is "attachments"
+        part_size: Size of the parts, raised to the 5 MiB minimum of S3
+        max_concurrency: Maximum number of parts uploaded at the same time
+
+    Returns:
+        Dict[str, Any]: Upload result as returned by upload_fileobj, with the sha256 of the content on success
+    """
+    object_name = generate_object_name(file_name, prefix=prefix)
+    content_type = get_content_type(file_name)
+    part_size = max(part_size, MULTIPART_MIN_PART_SIZE)
+    digest = hashlib.sha256()
+    file_size = 0
+
+    async def read_part() -> bytes:
+        # read may return short reads before the end of the file, fill the part so only the last one is small
+        nonlocal file_size
+        buffer = bytearray()
+        while len(buffer) < part_size:
+            data = await read(part_size - len(buffer))
+            if not data:
+                break
+            buffer += data
+        # hashlib releases the GIL on large buffers, keep the event loop free while hashing
+        await asyncio.to_thread(digest.update, buffer)
+        file_size += len(buffer)
+        return bytes(buffer)
+
+    response = {"object_name": object_name, "file_name": file_name, "content_type": content_type}
+    try:
+        data = await read_part()
+        if len(data) < part_size:
+            url = await asyncio.to_thread(minio_client.put_object, object_name, data, bucket, content_type)
+        else:
+            url = await _upload_multipart(data, read_part, object_name, bucket, content_type,
+                                          max(1, max_concurrency))
+        response.update({"success": True, "url": url, "sha256": digest.hexdigest()})
+    except Exception as e:
+        response.update({"success": False, "error": str(e)})
+
+    response.update({"file_size": file_size, "upload_time": datetime.now().isoformat()})
+    return response
+
+
+async def _upload_multipart(
+        first_part: bytes,
+        read_part: Callable[[], Awaitable[bytes]],
+        object_name: str,
+        bucket: Optional[str],
+        content_type: str,
+        max_concurrency: int
+) -> str:
+    upload_id = await asyncio.to_thread(minio_client.create_multipart_upload, object_name, bucket, content_type)
+    parts: List[Dict[str, Any]] = []
+    pending = set()
+    try:
+        data, part_number = first_part, 1
+        while data:
+            if len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                parts.extend(task.result() for task in done)
+            pending.add(asyncio.ensure_future(asyncio.to_thread(
+                minio_client.upload_part, object_name, upload_id, part_number, data, bucket)))
+            part_number += 1
+            data = await read_part()
+        parts.extend(await asyncio.gather(*pending))
+        pending = set()
+        return await asyncio.to_thread(minio_client.complete_multipart_upload, object_name, upload_id, parts, bucket)
+    except BaseException:
+        # Let the parts in flight finish before aborting, otherwise they would outlive the abort
+        await asyncio.gather(*pending, return_exceptions=True)
+        try:
+            await asyncio.to_thread(minio_client.abort_multipart_upload, object_name, upload_id, bucket)
+        except Exception:
+            pass
+        raise
+
+
 def download_file(object_name: str, file_path: str, bucket: Optional[str] = None) -> Dict[str, Any]:
     """
     Download file from MinIO to local
@@ -242,6 +351,61 @@ def get_file_stream(object_name: str, bucket: Optional[str] = None) -> Optional[
         return None
 
 
+def get_file_spooled(
+        object_name: str,
+        bucket: Optional[str] = None,
+        max_memory_size: int = 64 * 1024 * 1024,
+        range_size: int = MINIO_DOWNLOAD_RANGE_SIZE,
+        max_concurrency: int = MINIO_DOWNLOAD_CONCURRENCY
+) -> Optional[Tuple[BinaryIO, Dict[str, Any]]]:
+    """
+    Download a file from MinIO into a spooled temporary file with ranged GETs
+
+    Up to max_concurrency ranges download at the same time while the completed ones are written in order
+    and hashed, so hashing overlaps the download and at most max_concurrency ranges are buffered. The file
+    stays in memory up to max_memory_size bytes and spills to local disk beyond.
+
+    Args:
+        object_name: Object name in MinIO
+        bucket: Bucket name, if not specified use default bucket
+        max_memory_size: Size above which the file is moved to disk
+        range_size: Size of the ranged GETs
+        max_concurrency: Maximum number of ranges downloaded at the same time
+
+    Returns:
+        Optional[Tuple[BinaryIO, Dict[str, Any]]]: The file positioned at its start, to be closed by the caller,
+        and the file_size, md5 and sha256 of its content, or None if failed
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory_size)
+    md5, sha256 = hashlib.md5(), hashlib.sha256()
+    try:
+        file_size = minio_client.get_object_size(object_name, bucket)
+        ranges = iter([(start, min(start + range_size, file_size) - 1)
+                       for start in range(0, file_size, range_size)])
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            pending = deque()
+
+            def submit_next() -> None:
+                byte_range = next(ranges, None)
+                if byte_range is not None:
+                    pending.append(executor.submit(minio_client.get_file_range, object_name, *byte_range, bucket))
+
+            for _ in range(max(1, max_concurrency)):
+                submit_next()
+            while pending:
+                data = pending.popleft().result()
+                submit_next()
+                md5.update(data)
+                sha256.update(data)
+                spooled.write(data)
+        spooled.seek(0)
+        return spooled, {"file_size": file_size, "md5": md5.hexdigest(), "sha256": sha256.hexdigest()}
+    except Exception as e:
+        logger.error(f"Failed to download {object_name}: {e}")
+        spooled.close()
+        return None
+
+
 def get_content_type(file_path: str) -> str:
     """
     Get content type based on file extension
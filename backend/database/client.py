@@ -163,6 +163,77 @@ class MinioClient:
         except Exception as e:
             return False, str(e)
 
+    def put_object(self, object_name: str, data: bytes, bucket: Optional[str] = None,
+                   content_type: Optional[str] = None) -> str:
+        """
+        Upload bytes as an object in a single request, raises on failure
+
+        Args:
+            object_name: Object name
+            data: Object content
+            bucket: Bucket name, if not specified use default bucket
+            content_type: Content type of the object
+
+        Returns:
+            str: File URL
+        """
+        bucket = bucket or self.default_bucket
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=bucket, Key=object_name, Body=data, **extra)
+        return f"/{bucket}/{object_name}"
+
+    def create_multipart_upload(self, object_name: str, bucket: Optional[str] = None,
+                                content_type: Optional[str] = None) -> str:
+        """
+        Start a multipart upload, raises on failure
+
+        Returns:
+            str: Upload ID to pass to upload_part, complete_multipart_upload and abort_multipart_upload
+        """
+        bucket = bucket or self.default_bucket
+        extra = {"ContentType": content_type} if content_type else {}
+        response = self.client.create_multipart_upload(Bucket=bucket, Key=object_name, **extra)
+        return response["UploadId"]
+
+    def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes,
+                    bucket: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Upload one part of a multipart upload, raises on failure
+
+        Args:
+            object_name: Object name
+            upload_id: Upload ID returned by create_multipart_upload
+            part_number: Position of the part, starting at 1
+            data: Part content, at least 5 MiB except for the last part
+            bucket: Bucket name, if not specified use default bucket
+
+        Returns:
+            Dict[str, Any]: Part descriptor to pass to complete_multipart_upload
+        """
+        bucket = bucket or self.default_bucket
+        response = self.client.upload_part(Bucket=bucket, Key=object_name, UploadId=upload_id,
+                                           PartNumber=part_number, Body=data)
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def complete_multipart_upload(self, object_name: str, upload_id: str, parts: List[Dict[str, Any]],
+                                  bucket: Optional[str] = None) -> str:
+        """
+        Assemble the uploaded parts into the object, raises on failure
+
+        Returns:
+            str: File URL
+        """
+        bucket = bucket or self.default_bucket
+        parts = sorted(parts, key=lambda part: part["PartNumber"])
+        self.client.complete_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id,
+                                              MultipartUpload={"Parts": parts})
+        return f"/{bucket}/{object_name}"
+
+    def abort_multipart_upload(self, object_name: str, upload_id: str, bucket: Optional[str] = None) -> None:
+        """Abort a multipart upload and free the parts stored so far, raises on failure"""
+        bucket = bucket or self.default_bucket
+        self.client.abort_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id)
+
     def download_file(self, object_name: str, file_path: str, bucket: Optional[str] = None) -> Tuple[bool, str]:
         """
         Download file from MinIO to local
@@ -255,6 +326,33 @@ class MinioClient:
         except Exception as e:
             return False, str(e)
 
+    def get_object_size(self, object_name: str, bucket: Optional[str] = None) -> int:
+        """Size of an object in bytes, raises if it does not exist"""
+        bucket = bucket or self.default_bucket
+        response = self.client.head_object(Bucket=bucket, Key=object_name)
+        return int(response['ContentLength'])
+
+    def get_file_range(self, object_name: str, start: int, end: int, bucket: Optional[str] = None) -> bytes:
+        """
+        Read bytes [start, end] of an object with a ranged GET, raises on failure
+
+        Args:
+            object_name: Object name
+            start: First byte
+            end: Last byte, inclusive
+            bucket: Bucket name, if not specified use default bucket
+
+        Returns:
+            bytes: Content of the range
+        """
+        bucket = bucket or self.default_bucket
+        response = self.client.get_object(Bucket=bucket, Key=object_name, Range=f"bytes={start}-{end}")
+        body = response['Body']
+        try:
+            return body.read()
+        finally:
+            body.close()
+
     def get_file_stream(self, object_name: str, bucket: Optional[str] = None) -> Tuple[bool, Any]:
         """
         Get file binary stream from MinIO
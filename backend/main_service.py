@@ -3,7 +3,8 @@ import logging
 import warnings
 import asyncio
 
-from consts.const import APP_VERSION
+from consts.const import APP_VERSION, DOCUMENT_EMBEDDING_CACHE_MAX_SIZE, DOCUMENT_EMBEDDING_CACHE_TTL_S, \
+    EMBEDDING_CACHE_MAX_SIZE, EMBEDDING_CACHE_TTL_S, EMBEDDING_CACHE_REDIS_ENABLED
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -13,12 +14,33 @@ load_dotenv()
 from apps.base_app import app
 from utils.logging_utils import configure_logging, configure_elasticsearch_logging
 from services.tool_configuration_service import initialize_tools_on_startup
+from services.redis_service import get_redis_service
+from nexent.core.models.embedding_model import configure_document_embedding_cache, configure_embedding_cache
+from nexent.core.nlp.tokenizer import warm_up_tokenizer
 
 configure_logging(logging.INFO)
 configure_elasticsearch_logging()
 logger = logging.getLogger("main_service")
 
 
+def configure_query_embedding_cache():
+    """
+    Size the process-wide query and document embedding caches and attach Redis as their second tier when enabled
+    """
+    redis_client = None
+    if EMBEDDING_CACHE_REDIS_ENABLED:
+        try:
+            redis_client = get_redis_service().client
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis tier disabled: {str(e)}")
+    configure_embedding_cache(max_size=EMBEDDING_CACHE_MAX_SIZE,
+                              ttl_seconds=EMBEDDING_CACHE_TTL_S,
+                              redis_client=redis_client)
+    configure_document_embedding_cache(max_size=DOCUMENT_EMBEDDING_CACHE_MAX_SIZE,
+                                       ttl_seconds=DOCUMENT_EMBEDDING_CACHE_TTL_S,
+                                       redis_client=redis_client)
+
+
 async def startup_initialization():
     """
     Perform initialization tasks during server startup
@@ -26,6 +48,10 @@ async def startup_initialization():
     logger.info("Starting server initialization...")
     logger.info(f"APP version is: {APP_VERSION}")
     try:
+        configure_query_embedding_cache()
+        # Load jieba before serving so the first knowledge base search is not slowed down
+        await asyncio.to_thread(warm_up_tokenizer)
+
         # Initialize tools on startup - service layer handles detailed logging
         await initialize_tools_on_startup()
         logger.info("Server initialization completed successfully!")
@@ -8,25 +8,82 @@ import tempfile
 import threading
 import time
 import warnings
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 
 import aiohttp
 import redis
-import torch
+import redis.asyncio
 from PIL import Image
 from celery import states, chain
-from transformers import CLIPProcessor, CLIPModel
 from nexent.data_process.core import DataProcessCore
 
-from consts.const import CLIP_MODEL_PATH, IMAGE_FILTER, REDIS_BACKEND_URL, REDIS_URL
+from consts.const import CLIP_MODEL_PATH, DP_ACTOR_POOL_ENABLED, DP_CHUNK_CACHE_ENABLED, DP_CHUNK_CACHE_MAX_MB, \
+    DP_CHUNK_CACHE_TTL_S, IMAGE_FILTER, IMAGE_FILTER_BATCH_SIZE, IMAGE_FILTER_CACHE_SIZE, \
+    IMAGE_FILTER_DOWNLOAD_CONCURRENCY, IMAGE_FILTER_QUEUE_SIZE, IMAGE_FILTER_TIMEOUT_S, IMAGE_FILTER_WORKERS, \
+    REDIS_BACKEND_URL, REDIS_URL
 from consts.model import BatchTaskRequest
 from data_process.app import app as celery_app
-from data_process.tasks import process, forward
+from data_process.chunk_cache import ChunkCache
+from data_process.inference_executor import InferenceExecutor, InferenceQueueFullError
+from data_process.task_events import SSE_HEARTBEAT, format_sse, iter_task_events, subscribe_task_events
+from data_process.tasks import process, forward, get_actor_pool, record_submitted_chain
 from data_process.utils import get_task_info, get_all_task_ids_from_redis
+from utils.task_index_utils import TaskIndex
 
 # Configure logging
 logger = logging.getLogger("data_process.service")
 
+# Shortest side images are reduced to before they are sent to the CLIP workers, at least the input size of
+# common CLIP models (224 or 336), so the processor still only downscales
+CLIP_IMAGE_SIZE = 336
+
+
+def _open_rgb_image(source) -> Image.Image:
+    """Open and decode an image from a path or file object, converted to RGB. Blocking, call it from a thread."""
+    image = Image.open(source)
+
+    # Convert RGBA to RGB if necessary
+    if image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[3])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    else:
+        image.load()
+    return image
+
+
+def _open_rgb_image_from_temp_file(image_data: bytes, suffix: str) -> Image.Image:
+    """Open an image that cannot be decoded from memory by writing it to a temporary file first"""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+        temp_file.write(image_data)
+        temp_file.flush()
+        try:
+            return _open_rgb_image(temp_file.name)
+        finally:
+            os.unlink(temp_file.name)
+
+
+def _downscale_for_clip(image: Image.Image) -> Image.Image:
+    """Reduce an image to the CLIP input size so only a small image is pickled to a worker. Blocking, call it from a thread."""
+    scale = CLIP_IMAGE_SIZE / min(image.width, image.height)
+    if scale >= 1:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.BICUBIC, reducing_gap=3.0)
+
+
+def _image_filter_result(is_important: bool, confidence: float, positive: float, negative: float) -> Dict[str, Any]:
+    return {
+        "is_important": is_important,
+        "confidence": confidence,
+        "probabilities": {
+            "positive": positive,
+            "negative": negative
+        }
+    }
+
 
 class DataProcessService:
     def __init__(self):
@@ -38,8 +95,9 @@ class DataProcessService:
         # Initialize components in a modular way
         self._init_redis_client()
 
-        # Don't init clip model here, otherwise it will drastically slow down the first call from data process.
-        # self._init_clip_model()
+        # CLIP inference runs in worker processes started on first use, so the service starts quickly and
+        # inference never blocks the event loop
+        self.inference_executor = None
 
         # Suppress PIL warning about palette images
         warnings.filterwarnings(
@@ -72,22 +130,18 @@ class DataProcessService:
         except Exception as e:
             logger.error(f"Failed to initialize Redis client: {str(e)}")
 
-    def _init_clip_model(self):
-        """Initializes the CLIP model and processor."""
-        if getattr(self, 'clip_available', False):
-            return
-        self.model = None
-        self.processor = None
-        self.clip_available = False
-        try:
-            self.model = CLIPModel.from_pretrained(CLIP_MODEL_PATH)
-            self.processor = CLIPProcessor.from_pretrained(CLIP_MODEL_PATH)
-            self.clip_available = True
-            logger.info("CLIP model loaded successfully")
-        except Exception as e:
-            logger.warning(
-                f"Failed to load CLIP model, size-only filtering will be used: {str(e)}")
-            self.clip_available = False
+    def _get_inference_executor(self) -> InferenceExecutor:
+        """Get the CLIP inference executor, its worker processes load the model when they start"""
+        if self.inference_executor is None:
+            self.inference_executor = InferenceExecutor(
+                CLIP_MODEL_PATH,
+                workers=IMAGE_FILTER_WORKERS,
+                max_pending=IMAGE_FILTER_QUEUE_SIZE,
+                timeout_s=IMAGE_FILTER_TIMEOUT_S,
+                batch_size=IMAGE_FILTER_BATCH_SIZE,
+                image_cache_size=IMAGE_FILTER_CACHE_SIZE
+            )
+        return self.inference_executor
 
     async def start(self):
         """Start the data processing service"""
@@ -95,6 +149,8 @@ class DataProcessService:
 
     async def stop(self):
         """Stop the data processing service"""
+        if self.inference_executor is not None:
+            self.inference_executor.shutdown()
         logger.info("Data processing service stopped")
 
     def _get_celery_inspector(self):
@@ -123,6 +179,27 @@ class DataProcessService:
         """Get task by ID (async)"""
         return await get_task_info(task_id)
 
+    async def get_actor_pool_metrics(self) -> Dict[str, Any]:
+        """Get queue length and utilisation of every actor in the processing actor pool"""
+        if not DP_ACTOR_POOL_ENABLED:
+            return {"enabled": False, "actors": []}
+        metrics = await get_actor_pool().get_metrics.remote()
+        return {"enabled": True, **metrics}
+
+    def get_chunk_cache_metrics(self) -> Dict[str, Any]:
+        """Get size and hit rate of the processed chunk cache"""
+        if not DP_CHUNK_CACHE_ENABLED or self.redis_client is None:
+            return {"enabled": False}
+        cache = ChunkCache(self.redis_client, max_bytes=DP_CHUNK_CACHE_MAX_MB * 1024 * 1024,
+                           ttl_seconds=DP_CHUNK_CACHE_TTL_S)
+        return {"enabled": True, **cache.get_metrics()}
+
+    def get_inference_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, latency and image cache hit rate of the CLIP inference executor"""
+        if not IMAGE_FILTER:
+            return {"enabled": False}
+        return {"enabled": True, **self._get_inference_executor().get_metrics()}
+
     async def get_all_tasks(self, filter: bool = True) -> List[Dict[str, Any]]:
         """Get all tasks
 
@@ -205,16 +282,52 @@ class DataProcessService:
     async def get_index_tasks(self, index_name: str, filter: bool = True) -> List[Dict[str, Any]]:
         """Get all active tasks for a specific index
 
+        The latest tasks of every file are read from the task index in a single pipelined read.
+        Only without a Redis client are all tasks collected and filtered by index.
+
         Args:
             index_name: Name of the index to filter tasks for
 
         Returns:
             List[Dict[str, Any]]: Tasks for the specified index
         """
+        if self.redis_client is not None:
+            try:
+                return await asyncio.to_thread(TaskIndex(self.redis_client).get_index_tasks, index_name)
+            except Exception as e:
+                logger.error(f"Error reading the task index of {index_name}: {str(e)}")
+                return []
         task_list = await self.get_all_tasks(filter)
         # May got multiple tasks for the same index
         return [task for task in task_list if task.get('index_name') == index_name]
 
+    async def stream_task_events(self, index_name: Optional[str] = None,
+                                 heartbeat_s: float = 15.0) -> AsyncIterator[str]:
+        """Stream task progress as server-sent events
+
+        Subscribes to the events the workers publish on every stage transition. With an index name,
+        the latest tasks of the index are sent first as a snapshot, after subscribing so no transition is missed.
+
+        Args:
+            index_name: Knowledge base to follow, all of them when not set
+            heartbeat_s: Seconds without events after which a keepalive comment is sent
+
+        Yields:
+            str: Server-sent events, "snapshot" once and then "task" events
+        """
+        client = redis.asyncio.from_url(REDIS_URL, decode_responses=True)
+        pubsub = client.pubsub()
+        try:
+            await subscribe_task_events(pubsub, index_name)
+            if index_name:
+                tasks = await self.get_index_tasks(index_name)
+                yield format_sse({"index_name": index_name, "tasks": tasks}, event="snapshot")
+            async for event in iter_task_events(pubsub, heartbeat_s):
+                yield format_sse(event) if event is not None else SSE_HEARTBEAT
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
     def check_image_size(self, width: int, height: int, min_width: int = 200, min_height: int = 200) -> bool:
         """Check if the image dimensions meet the minimum requirements
 
@@ -246,40 +359,19 @@ class DataProcessService:
             return await self._load_image(session, image_url)
 
     async def _load_image(self, session: aiohttp.ClientSession, path: str) -> Optional[Image.Image]:
-        """Internal method to load an image from various sources"""
+        """Internal method to load an image from various sources, decoding it on a worker thread"""
         try:
             # Check if input is base64 encoded
             if path.startswith('data:image'):
                 # Extract the base64 data after the comma
                 base64_data = path.split(',')[1]
                 image_data = base64.b64decode(base64_data)
-                image = Image.open(io.BytesIO(image_data))
-
-                # Convert RGBA to RGB if necessary
-                if image.mode == 'RGBA':
-                    background = Image.new('RGB', image.size, (255, 255, 255))
-                    background.paste(image, mask=image.split()[3])
-                    image = background
-                elif image.mode != 'RGB':
-                    image = image.convert('RGB')
-
-                return image
+                return await asyncio.to_thread(_open_rgb_image, io.BytesIO(image_data))
 
             # Check if the path is a local file
             if os.path.isfile(path):
                 try:
-                    image = Image.open(path)
-
-                    # Convert RGBA to RGB if necessary
-                    if image.mode == 'RGBA':
-                        background = Image.new(
-                            'RGB', image.size, (255, 255, 255))
-                        background.paste(image, mask=image.split()[3])
-                        image = background
-                    elif image.mode != 'RGB':
-                        image = image.convert('RGB')
-
-                    return image
+                    return await asyncio.to_thread(_open_rgb_image, path)
                 except Exception as e:
                     logger.info(f"Failed to load local image: {str(e)}")
                     return None
@@ -295,38 +387,13 @@ class DataProcessService:
 
                 image_data = await response.read()
 
-                try:
-                    # For other formats, try direct loading
-                    image = Image.open(io.BytesIO(image_data))
-
-                    # Convert RGBA to RGB if necessary
-                    if image.mode == 'RGBA':
-                        background = Image.new(
-                            'RGB', image.size, (255, 255, 255))
-                        background.paste(image, mask=image.split()[3])
-                        image = background
-                    elif image.mode != 'RGB':
-                        image = image.convert('RGB')
-
-                    return image
-                except Exception:
-                    # If direct loading fails, try downloading to a temporary file first
-                    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(path)[1], delete=False) as temp_file:
-                        temp_file.write(image_data)
-                        temp_file.flush()
-                        try:
-                            image = Image.open(temp_file.name)
-
-                            if image.mode == 'RGBA':
-                                background = Image.new(
-                                    'RGB', image.size, (255, 255, 255))
-                                background.paste(image, mask=image.split()[3])
-                                image = background
-                            elif image.mode != 'RGB':
-                                image = image.convert('RGB')
-                            return image
-                        finally:
-                            os.unlink(temp_file.name)
+            try:
+                # For other formats, try direct loading
+                return await asyncio.to_thread(_open_rgb_image, io.BytesIO(image_data))
+            except Exception:
+                # If direct loading fails, try downloading to a temporary file first
+                return await asyncio.to_thread(_open_rgb_image_from_temp_file, image_data,
+                                               os.path.splitext(path)[1])
 
         except Exception as e:
             logger.info(f"Error loading {path}: {str(e)}")
@@ -343,108 +410,95 @@ class DataProcessService:
 
         Returns:
             Dict[str, Any]: JSON object with is_important boolean and confidence score
+
+        Raises:
+            InferenceQueueFullError: Too many images are waiting for CLIP inference
         """
         try:
-            # Process image from URL
-            img = await self.load_image(image_url)
-
-            if img is None or not self.check_image_size(img.width, img.height):
-                logger.info(
-                    f"Image not loaded or does not meet minimum size requirements (200x200 pixels): {image_url}")
-                return {
-                    "is_important": False,
-                    "confidence": 0.0,
-                    "probabilities": {
-                        "positive": 0.0,
-                        "negative": 0.0
-                    }
-                }
-
-            # If IMAGE_FILTER is False, or CLIP model is not available, skip CLIP calculation and return as important
-            if not IMAGE_FILTER:
-                logger.info(
-                    f"IMAGE_FILTER is disabled, returning image as important: {image_url}")
-                return {
-                    "is_important": True,
-                    "confidence": 1.0,
-                    "probabilities": {
-                        "positive": 1.0,
-                        "negative": 0.0
-                    }
-                }
-
-            # Lazy load CLIP model
-            if not self.clip_available:
-                self._init_clip_model()
-
-            if not self.clip_available:
-                logger.warning(
-                    f"CLIP model not available, returning image as important: {image_url}")
-                return {
-                    "is_important": True,
-                    "confidence": 1.0,
-                    "probabilities": {
-                        "positive": 1.0,
-                        "negative": 0.0
-                    }
-                }
-
-            # Convert RGBA to RGB if necessary
-            if img.mode == 'RGBA':
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[3])
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Try to use CLIP model with fallback to size-only filter
-            try:
-                # Prepare inputs for CLIP
-                inputs = self.processor(
-                    text=[negative_prompt, positive_prompt],
-                    images=img,
-                    return_tensors="pt",
-                    padding=True
-                )
+            results = await self.filter_important_images([image_url], positive_prompt, negative_prompt)
+        except InferenceQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing image: {str(e)}")
+            raise Exception(f"Error processing image: {str(e)}")
+        result = results[0]
+        result.pop("image_url")
+        return result
 
-                # Get model outputs
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
+    async def filter_important_images(self, image_urls: List[str], positive_prompt: str = "an important image",
+                                      negative_prompt: str = "an unimportant image") -> List[Dict[str, Any]]:
+        """Filter which of a batch of images are important using CLIP model
 
-                # Get image-text similarity scores
-                logits_per_image = outputs.logits_per_image
-                probs = logits_per_image.softmax(dim=1)
+        Images whose embedding is cached by URL are neither downloaded nor embedded again. The others are
+        downloaded concurrently, decoded on worker threads and embedded in batched forward passes by the
+        inference executor, so a slow image never blocks the event loop.
 
-                # Extract probabilities
-                neg_prob, pos_prob = probs[0].tolist()
+        Args:
+            image_urls: URLs of the images
+            positive_prompt: Text describing an important image
+            negative_prompt: Text describing an unimportant image
 
-                # Determine if image is important based on probability
-                is_important = pos_prob > 0.6 and neg_prob < 0.5
+        Returns:
+            List[Dict[str, Any]]: One result per URL in request order, with image_url and the fields
+                returned by filter_important_image
 
-                return {
-                    "is_important": bool(is_important),
-                    "confidence": float(pos_prob),
-                    "probabilities": {
-                        "positive": float(pos_prob),
-                        "negative": float(neg_prob)
-                    }
-                }
+        Raises:
+            InferenceQueueFullError: Too many images are waiting for CLIP inference
+        """
+        urls = list(dict.fromkeys(image_urls))
+        executor = self._get_inference_executor() if IMAGE_FILTER else None
+        cached = executor.get_cached_images(urls) if executor else {}
+        to_load = [url for url in urls if url not in cached]
+
+        semaphore = asyncio.Semaphore(IMAGE_FILTER_DOWNLOAD_CONCURRENCY)
+
+        async def load(session: aiohttp.ClientSession, url: str) -> Optional[Image.Image]:
+            """Load an image of sufficient size, downscaled for CLIP right after decoding so the full image is released"""
+            async with semaphore:
+                img = await self._load_image(session, url)
+                if img is None or not self.check_image_size(img.width, img.height):
+                    return None
+                if executor is None:
+                    return img
+                return await asyncio.to_thread(_downscale_for_clip, img)
+
+        connector = aiohttp.TCPConnector()
+        timeout = aiohttp.ClientTimeout(total=5)
+        async with aiohttp.ClientSession(connector=connector, trust_env=True, timeout=timeout) as session:
+            loaded = await asyncio.gather(*(load(session, url) for url in to_load))
+
+        results = {}
+        images = {}
+        for url, img in zip(to_load, loaded):
+            if img is None:
+                results[url] = _image_filter_result(False, 0.0, 0.0, 0.0)
+            else:
+                images[url] = img
+
+        if executor is None:
+            # IMAGE_FILTER is disabled, images of sufficient size are important
+            results.update({url: _image_filter_result(True, 1.0, 1.0, 0.0) for url in images})
+        elif images or cached:
+            try:
+                probabilities = await executor.score_images(images, positive_prompt, negative_prompt, cached)
+            except InferenceQueueFullError:
+                raise
             except Exception as e:
-                # CLIP model processing failed, fall back to size-only filtering
+                # CLIP model processing failed or timed out, fall back to size-only filtering
                 logger.warning(
                     f"CLIP processing failed, using size-only filter: {str(e)}")
-                return {
-                    "is_important": True,
-                    "confidence": 0.8,  # Arbitrary high confidence value
-                    "probabilities": {
-                        "positive": 0.8,
-                        "negative": 0.2
-                    }
-                }
+                results.update({url: _image_filter_result(True, 0.8, 0.8, 0.2) for url in [*images, *cached]})
+            else:
+                if probabilities is None:
+                    # CLIP model is not available, images of sufficient size are important
+                    logger.warning("CLIP model not available, returning images as important")
+                    results.update({url: _image_filter_result(True, 1.0, 1.0, 0.0) for url in [*images, *cached]})
+                else:
+                    for url, (neg_prob, pos_prob) in probabilities.items():
+                        results[url] = _image_filter_result(pos_prob > 0.6 and neg_prob < 0.5, pos_prob,
+                                                            pos_prob, neg_prob)
 
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
-            raise Exception(f"Error processing image: {str(e)}")
+        return [{"image_url": url, **results[url]} for url in image_urls]
 
     async def create_batch_tasks_impl(self, authorization: Optional[str], request: BatchTaskRequest):
         task_ids = []
@@ -486,6 +540,8 @@ class DataProcessService:
             )
 
             task_result = task_chain.apply_async()
+            record_submitted_chain(task_result, index_name, source, source_type=source_type,
+                                   original_filename=original_filename)
 
             task_ids.append(task_result.id)
             logger.debug(f"Created task {task_result.id} for source: {source}")
@@ -20,9 +20,10 @@ from fastapi import Body, Depends, Path, Query
 from fastapi.responses import StreamingResponse
 from nexent.core.models.embedding_model import OpenAICompatibleEmbedding, JinaEmbedding, BaseEmbedding
 from nexent.core.nlp.tokenizer import calculate_term_weights
-from nexent.vector_database.elasticsearch_core import ElasticSearchCore
+from nexent.vector_database.elasticsearch_core import ElasticSearchCore, KnnSearchProfile
 
-from consts.const import ES_API_KEY, ES_HOST, LANGUAGE
+from consts.const import ES_API_KEY, ES_HOST, ES_HNSW_EF_CONSTRUCTION, ES_HNSW_M, ES_HYBRID_FUSION, ES_VECTOR_INDEX_TYPE, \
+    LANGUAGE
 from database.attachment_db import delete_file
 from database.knowledge_db import (
     create_knowledge_record,
@@ -50,6 +51,10 @@ elastic_core = ElasticSearchCore(
     api_key=ES_API_KEY,
     verify_certs=False,
     ssl_show_warn=False,
+    vector_index_type=ES_VECTOR_INDEX_TYPE,
+    hnsw_m=ES_HNSW_M,
+    hnsw_ef_construction=ES_HNSW_EF_CONSTRUCTION,
+    hybrid_fusion=ES_HYBRID_FUSION,
 )
 
 
@@ -267,13 +272,17 @@ class ElasticSearchService:
                 None, description="ID of the user creating the knowledge base"),
             tenant_id: Optional[str] = Body(
                 None, description="ID of the tenant creating the knowledge base"),
+            vector_index_type: Optional[str] = None,
+            hnsw_m: Optional[int] = None,
+            hnsw_ef_construction: Optional[int] = None,
     ):
         try:
             if es_core.client.indices.exists(index=index_name):
                 raise Exception(f"Index {index_name} already exists")
             embedding_model = get_embedding_model(tenant_id)
             success = es_core.create_vector_index(index_name, embedding_dim=embedding_dim or (
-                embedding_model.embedding_dim if embedding_model else 1024))
+                embedding_model.embedding_dim if embedding_model else 1024),
+                index_type=vector_index_type, m=hnsw_m, ef_construction=hnsw_ef_construction)
             if not success:
                 raise Exception(f"Failed to create index {index_name}")
             knowledge_data = {"index_name": index_name,
@@ -285,6 +294,45 @@ class ElasticSearchService:
         except Exception as e:
             raise Exception(f"Error creating index: {str(e)}")
 
+    @staticmethod
+    def migrate_vector_index(
+            index_name: str = Path(...,
+                                   description="Name of the index to migrate"),
+            vector_index_type: str = Query(
+                ..., description="Target HNSW variant: hnsw, int8_hnsw, int4_hnsw or bbq_hnsw"),
+            hnsw_m: Optional[int] = Query(
+                None, description="Number of neighbors per node in the HNSW graph"),
+            hnsw_ef_construction: Optional[int] = Query(
+                None, description="Number of candidates considered while building the HNSW graph"),
+            es_core: ElasticSearchCore = Depends(get_es_core),
+    ):
+        """Rebuild an existing index with new dense_vector index options via reindex"""
+        if not es_core.client.indices.exists(index=index_name):
+            raise Exception(f"Index {index_name} not found")
+        result = es_core.migrate_vector_index(
+            index_name, vector_index_type, m=hnsw_m, ef_construction=hnsw_ef_construction)
+        return {"status": "success",
+                "message": f"Index {index_name} migrated to {vector_index_type}",
+                **result}
+
+    @staticmethod
+    def set_search_profile(
+            index_name: str = Path(...,
+                                   description="Name of the index"),
+            profile: Dict[str, Any] = Body(
+                ..., description="kNN search profile: num_candidates_multiplier, min_num_candidates, similarity, path_or_url, source_type"),
+            es_core: ElasticSearchCore = Depends(get_es_core),
+    ):
+        """Store the kNN search profile used by semantic and hybrid search on an index"""
+        if not es_core.client.indices.exists(index=index_name):
+            raise Exception(f"Index {index_name} not found")
+        search_profile = KnnSearchProfile.from_dict(profile)
+        if not es_core.set_search_profile(index_name, search_profile):
+            raise Exception(f"Failed to update search profile of index {index_name}")
+        return {"status": "success",
+                "message": f"Search profile of index {index_name} updated",
+                "profile": search_profile.to_dict()}
+
     @staticmethod
     async def delete_index(
             index_name: str = Path(...,
@@ -468,13 +516,78 @@ class ElasticSearchService:
                 raise Exception(
                     f"Error getting info for index {index_name}: {error_msg}")
 
+    @staticmethod
+    def _build_index_documents(data: List[Dict[str, Any]], embedding_model: BaseEmbedding) -> List[Dict[str, Any]]:
+        """
+        Transform chunks sent by data processing to the documents stored in the index
+
+        Args:
+            data: List containing document data to be indexed
+            embedding_model: Embedding model whose name is recorded in every document
+
+        Returns:
+            List of documents, items that are not dictionaries are skipped
+        """
+        documents = []
+
+        for idx, item in enumerate(data):
+            # All items should be dictionaries
+            if not isinstance(item, dict):
+                logger.warning(f"Skipping item {idx} - not a dictionary")
+                continue
+
+            # Extract metadata
+            metadata = item.get("metadata", {})
+            source = item.get("path_or_url")
+            text = item.get("content", "")
+            source_type = item.get("source_type")
+            file_size = item.get("file_size")
+            file_name = item.get("filename", os.path.basename(
+                source) if source and source_type == "local" else "")
+
+            # Get from metadata
+            title = metadata.get("title", "")
+            language = metadata.get("languages", ["null"])[
+                0] if metadata.get("languages") else "null"
+            author = metadata.get("author", "null")
+            date = metadata.get("date", time.strftime(
+                "%Y-%m-%d", time.gmtime()))
+            create_time = metadata.get("creation_date", time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.gmtime()))
+
+            # Set embedding model name from the embedding model
+            embedding_model_name = ""
+            if embedding_model:
+                embedding_model_name = embedding_model.model
+
+            # Create document
+            document = {
+                "title": title,
+                "filename": file_name,
+                "path_or_url": source,
+                "source_type": source_type,
+                "language": language,
+                "author": author,
+                "date": date,
+                "content": text,
+                "process_source": "Unstructured",
+                "file_size": file_size,
+                "create_time": create_time,
+                "languages": metadata.get("languages", []),
+                "embedding_model_name": embedding_model_name
+            }
+
+            documents.append(document)
+        return documents
+
     @staticmethod
     def index_documents(
             embedding_model: BaseEmbedding,
             index_name: str = Path(..., description="Name of the index"),
             data: List[Dict[str, Any]
                        ] = Body(..., description="Document List to process"),
-            es_core: ElasticSearchCore = Depends(get_es_core)
+            es_core: ElasticSearchCore = Depends(get_es_core),
+            batch_offset: Optional[int] = None
     ):
         """
         Index documents and create vector embeddings, create index if it doesn't exist
@@ -484,9 +597,12 @@ class ElasticSearchService:
             index_name: Index name
             data: List containing document data to be indexed
             es_core: ElasticSearchCore instance
+            batch_offset: Position of the first item of data in its file when a file is sent in pages.
+                Chunks then get deterministic IDs, so a page sent again overwrites what it indexed before
 
         Returns:
-            IndexingResponse object containing indexing result information
+            IndexingResponse object containing indexing result information, with the offset of the
+            next page when batch_offset is set
         """
         try:
             if not index_name:
@@ -503,56 +619,8 @@ class ElasticSearchService:
                         f"Failed to create index {index_name}: {str(create_error)}")
 
             # Transform indexing request results to documents
-            documents = []
-
-            for idx, item in enumerate(data):
-                # All items should be dictionaries
-                if not isinstance(item, dict):
-                    logger.warning(f"Skipping item {idx} - not a dictionary")
-                    continue
-
-                # Extract metadata
-                metadata = item.get("metadata", {})
-                source = item.get("path_or_url")
-                text = item.get("content", "")
-                source_type = item.get("source_type")
-                file_size = item.get("file_size")
-                file_name = item.get("filename", os.path.basename(
-                    source) if source and source_type == "local" else "")
-
-                # Get from metadata
-                title = metadata.get("title", "")
-                language = metadata.get("languages", ["null"])[
-                    0] if metadata.get("languages") else "null"
-                author = metadata.get("author", "null")
-                date = metadata.get("date", time.strftime(
-                    "%Y-%m-%d", time.gmtime()))
-                create_time = metadata.get("creation_date", time.strftime(
-                    "%Y-%m-%dT%H:%M:%S", time.gmtime()))
-
-                # Set embedding model name from the embedding model
-                embedding_model_name = ""
-                if embedding_model:
-                    embedding_model_name = embedding_model.model
-
-                # Create document
-                document = {
-                    "title": title,
-                    "filename": file_name,
-                    "path_or_url": source,
-                    "source_type": source_type,
-                    "language": language,
-                    "author": author,
-                    "date": date,
-                    "content": text,
-                    "process_source": "Unstructured",
-                    "file_size": file_size,
-                    "create_time": create_time,
-                    "languages": metadata.get("languages", []),
-                    "embedding_model_name": embedding_model_name
-                }
-
-                documents.append(document)
+            documents = ElasticSearchService._build_index_documents(data, embedding_model)
+            page = {} if batch_offset is None else {"next_offset": batch_offset + len(data)}
 
             total_submitted = len(documents)
             if total_submitted == 0:
@@ -560,7 +628,8 @@ class ElasticSearchService:
                     "success": True,
                     "message": "No documents to index",
                     "total_indexed": 0,
-                    "total_submitted": 0
+                    "total_submitted": 0,
+                    **page
                 }
 
             # Index documents (use default batch_size and content_field)
@@ -569,13 +638,15 @@ class ElasticSearchService:
                     index_name=index_name,
                     embedding_model=embedding_model,
                     documents=documents,
+                    position_offset=batch_offset,
                 )
 
                 return {
                     "success": True,
                     "message": f"Successfully indexed {total_indexed} documents",
                     "total_indexed": total_indexed,
-                    "total_submitted": total_submitted
+                    "total_submitted": total_submitted,
+                    **page
                 }
             except Exception as e:
                 error_msg = str(e)
@@ -587,6 +658,58 @@ class ElasticSearchService:
             logger.error(f"Error indexing documents: {error_msg}")
             raise Exception(f"Error indexing documents: {error_msg}")
 
+    @staticmethod
+    def update_documents(
+            embedding_model: BaseEmbedding,
+            index_name: str = Path(..., description="Name of the index"),
+            path_or_url: str = Query(..., description="Path or URL of the updated document"),
+            data: List[Dict[str, Any]
+                       ] = Body(..., description="All chunks of the new document version"),
+            es_core: ElasticSearchCore = Depends(get_es_core)
+    ):
+        """
+        Replace the indexed chunks of a document with a new version, only re-embedding changed chunks
+
+        Args:
+            embedding_model: Embedding model used for new chunks
+            index_name: Index name
+            path_or_url: Path or URL of the document, chunks in data belong to this document
+            data: All chunks of the new version of the document
+            es_core: ElasticSearchCore instance
+
+        Returns:
+            Indexing result with the number of inserted, updated, deleted and unchanged chunks
+        """
+        try:
+            if not index_name:
+                raise Exception("Index name is required")
+            if not es_core.client.indices.exists(index=index_name):
+                raise Exception(f"Index {index_name} does not exist")
+
+            documents = ElasticSearchService._build_index_documents(data, embedding_model)
+            mismatched = [doc["path_or_url"] for doc in documents if doc["path_or_url"] != path_or_url]
+            if mismatched:
+                raise Exception(f"Chunks of {mismatched[0]} cannot update document {path_or_url}")
+
+            result = es_core.update_documents_by_path_or_url(
+                index_name=index_name,
+                embedding_model=embedding_model,
+                path_or_url=path_or_url,
+                documents=documents,
+            )
+            return {
+                "success": result["failed"] == 0,
+                "message": (f"Updated {path_or_url}: {result['inserted']} chunks indexed, {result['updated']} updated, "
+                            f"{result['deleted']} deleted, {result['unchanged']} unchanged"),
+                "total_indexed": result["inserted"],
+                "total_submitted": len(documents),
+                **result
+            }
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error updating documents: {error_msg}")
+            raise Exception(f"Error updating documents: {error_msg}")
+
     @staticmethod
     async def list_files(
             index_name: str = Path(..., description="Name of the index"),
@@ -12,7 +12,7 @@ from fastapi import UploadFile
 from agents.preprocess_manager import preprocess_manager
 from consts.const import UPLOAD_FOLDER, MAX_CONCURRENT_UPLOADS, DATA_PROCESS_SERVICE, LANGUAGE
 from database.attachment_db import (
-    upload_fileobj,
+    upload_stream,
     get_file_url,
     get_content_type,
     get_file_stream,
@@ -124,15 +124,9 @@ async def upload_to_minio(files: List[UploadFile], folder: str) -> List[dict]:
     results = []
     for f in files:
         try:
-            # Read file content
-            file_content = await f.read()
-
-            # Convert file content to BytesIO object
-            file_obj = BytesIO(file_content)
-
-            # Upload file
-            result = upload_fileobj(
-                file_obj=file_obj,
+            # Stream the file to MinIO part by part instead of reading it into memory
+            result = await upload_stream(
+                read=f.read,
                 file_name=f.filename or "",
                 prefix=folder
             )
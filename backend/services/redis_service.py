@@ -5,6 +5,7 @@ from typing import Dict, Any
 import redis
 
 from consts.const import REDIS_URL, REDIS_BACKEND_URL
+from utils.task_index_utils import TaskIndex
 
 logger = logging.getLogger(__name__)
 
@@ -185,53 +186,14 @@ class RedisService:
         processed_tasks = set()  # Track tasks that have been processed to avoid redundant work
 
         try:
-            # Get all Celery task result keys
-            task_keys = self.backend_client.keys('celery-task-meta-*')
-
-            for key in task_keys:
-                try:
-                    # Get task data
-                    task_data = self.backend_client.get(key)
-                    if task_data:
-                        import json
-                        task_info = json.loads(task_data)
-
-                        # Check if this task is related to our knowledge base
-                        result = task_info.get('result', {})
-                        task_index_name = None
-
-                        if isinstance(result, dict):
-                            # Standard check for successful tasks
-                            task_index_name = (
-                                result.get('index_name') or
-                                task_info.get('index_name') or
-                                result.get('kwargs', {}).get('index_name')
-                            )
-
-                            # Check for failed tasks where metadata is in the exception message
-                            if task_index_name is None and 'exc_message' in result:
-                                try:
-                                    exc_str = str(result['exc_message'])
-                                    if '{' in exc_str and '}' in exc_str:
-                                        json_part = exc_str[exc_str.find('{'):exc_str.rfind('}')+1]
-                                        cleaned_json_part = json_part.replace('\\"', '"')
-                                        error_data = json.loads(cleaned_json_part)
-                                        task_index_name = error_data.get('index_name')
-                                except (json.JSONDecodeError, TypeError, IndexError) as e:
-                                    key_str = key.decode('utf-8') if isinstance(key, bytes) else key
-                                    logger.warning(f"Could not parse exception metadata for task key {key_str}: {e}")
-
-                        if task_index_name == index_name:
-                            key_str = key.decode('utf-8') if isinstance(key, bytes) else key
-                            task_id = key_str.replace('celery-task-meta-', '')
-                            if task_id not in processed_tasks:
-                                deleted, processed_chain = self._recursively_delete_task_and_parents(task_id)
-                                total_deleted_count += deleted
-                                processed_tasks.update(processed_chain)
-
-                except Exception as e:
-                    logger.warning(f"Error processing task key {key} for cleanup: {str(e)}")
-                    continue
+            # The task index knows the tasks of the knowledge base, no need to scan every task result
+            task_index = TaskIndex(self.backend_client)
+            for task_id in task_index.get_task_ids(index_name):
+                if task_id not in processed_tasks:
+                    deleted, processed_chain = self._recursively_delete_task_and_parents(task_id)
+                    total_deleted_count += deleted
+                    processed_tasks.update(processed_chain)
+            task_index.remove_index(index_name)
 
         except Exception as e:
             logger.error(f"Error cleaning up Celery tasks: {str(e)}")
@@ -294,69 +256,14 @@ class RedisService:
         processed_tasks = set()
 
         try:
-            # Get all Celery task result keys
-            task_keys = self.backend_client.keys('celery-task-meta-*')
-
-            for key in task_keys:
-                key_str = key.decode('utf-8') if isinstance(key, bytes) else key
-                task_id = key_str.replace('celery-task-meta-', '')
-
-                if task_id in processed_tasks:
-                    continue
-
-                try:
-                    # Get task data
-                    task_data = self.backend_client.get(key)
-                    if task_data:
-                        import json
-                        task_info = json.loads(task_data)
-
-                        # Check if this task is related to our specific document
-                        result = task_info.get('result', {})
-                        task_index_name = None
-                        task_source = None
-
-                        if isinstance(result, dict):
-                            # Standard check for successful tasks
-                            task_index_name = (
-                                result.get('index_name') or
-                                task_info.get('index_name') or
-                                result.get('kwargs', {}).get('index_name')
-                            )
-
-                            task_source = (
-                                result.get('source') or
-                                result.get('path_or_url') or
-                                task_info.get('source') or
-                                task_info.get('path_or_url') or
-                                result.get('kwargs', {}).get('source') or
-                                result.get('kwargs', {}).get('path_or_url')
-                            )
-
-                            # Check for failed tasks where metadata is in the exception message
-                            if task_index_name is None and 'exc_message' in result:
-                                try:
-                                    exc_str = str(result['exc_message'])
-                                    if '{' in exc_str and '}' in exc_str:
-                                        json_part = exc_str[exc_str.find('{'):exc_str.rfind('}')+1]
-                                        cleaned_json_part = json_part.replace('\\"', '"')
-                                        error_data = json.loads(cleaned_json_part)
-                                        task_index_name = error_data.get('index_name')
-                                        task_source = error_data.get('source') or error_data.get('path_or_url')
-                                except (json.JSONDecodeError, TypeError, IndexError) as e:
-                                    logger.warning(f"Could not parse exception metadata for task {task_id}: {e}")
-
-                        # Match both index name and document path/source
-                        if task_index_name == index_name and task_source == path_or_url:
-                            # Recursively delete this task and its parents
-                            if task_id not in processed_tasks:
-                                deleted, processed_chain = self._recursively_delete_task_and_parents(task_id)
-                                total_deleted_count += deleted
-                                processed_tasks.update(processed_chain)
-
-                except Exception as e:
-                    logger.warning(f"Error processing task key {key} for document cleanup: {str(e)}")
-                    continue
+            # The task index holds the latest tasks of the document, no need to scan every task result
+            task_index = TaskIndex(self.backend_client)
+            for task_id in task_index.get_document_task_ids(index_name, path_or_url):
+                if task_id not in processed_tasks:
+                    deleted, processed_chain = self._recursively_delete_task_and_parents(task_id)
+                    total_deleted_count += deleted
+                    processed_tasks.update(processed_chain)
+            task_index.remove_document(index_name, path_or_url, processed_tasks)
 
         except Exception as e:
             logger.error(f"Error cleaning up document Celery tasks: {str(e)}")
@@ -429,24 +336,7 @@ class RedisService:
 
         try:
             # Count Celery tasks
-            task_keys = self.backend_client.keys('celery-task-meta-*')
-            for key in task_keys:
-                try:
-                    task_data = self.backend_client.get(key)
-                    if task_data:
-                        import json
-                        task_info = json.loads(task_data)
-                        result = task_info.get('result', {})
-                        if isinstance(result, dict):
-                            task_index_name = (
-                                result.get('index_name') or
-                                task_info.get('index_name') or
-                                result.get('kwargs', {}).get('index_name')
-                            )
-                            if task_index_name == index_name:
-                                count += 1
-                except Exception:
-                    continue
+            count += TaskIndex(self.backend_client).count(index_name)
 
             # Count cache keys
             patterns = [f"*{index_name}*", f"kb:{index_name}:*", f"index:{index_name}:*"]
@@ -15,12 +15,18 @@ from database.attachment_db import get_file_size_from_minio
 
 logger = logging.getLogger("file_management_utils")
 
+# Uploads are copied to disk in chunks of this size so large files are never held in memory as a whole
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+
 
 async def save_upload_file(file: UploadFile, upload_path: Path) -> bool:
     try:
         async with aiofiles.open(upload_path, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
+            while True:
+                content = await file.read(UPLOAD_COPY_CHUNK_SIZE)
+                if not content:
+                    break
+                await out_file.write(content)
         return True
     except Exception as e:
         logger.error(f"Error saving file {file.filename}: {str(e)}")
@@ -0,0 +1,169 @@
+"""
+Redis index of data process tasks by knowledge base.
+
+Celery keeps one celery-task-meta-<id> key per task and nothing that relates tasks to a knowledge base, so finding
+the tasks of one index used to take a KEYS scan over the whole backend and a GET and JSON parse of every result.
+The index is maintained when tasks are submitted and whenever they change state instead:
+
+- {prefix}:{index_name}:ids, a sorted set of the task IDs of the index scored by submission time
+- {prefix}:{index_name}:latest, a hash holding the latest state of every path, one field per task name and path
+
+Listing the tasks of an index reads both keys in a single pipeline, in O(tasks of that index).
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("task_index_utils")
+
+# Result fields of finished tasks carried into the index, like get_task_info does
+RESULT_FIELDS = ("chunks_count", "processing_time", "storage_time", "es_result")
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class TaskIndex:
+    """Per knowledge base index of task IDs and latest task state per path"""
+
+    def __init__(self, client, prefix: str = "dp:tasks"):
+        """
+        Args:
+            client: Redis client of the Celery result backend, responses may be decoded or not
+            prefix: Prefix of all keys of the index
+        """
+        self._client = client
+        self._prefix = prefix
+
+    def add_submitted(self, task_ids: Dict[str, str], index_name: str, source: str,
+                      source_type: Optional[str] = None, original_filename: Optional[str] = None):
+        """
+        Record the tasks of a newly submitted chain as PENDING.
+
+        Args:
+            task_ids: Task ID by task name, e.g. {"process": ..., "forward": ...}
+            index_name: Knowledge base the file is indexed into
+            source: Path or URL of the file
+            source_type: Type of the source ("local", "minio")
+            original_filename: The original name of the file
+        """
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        for task_name, task_id in task_ids.items():
+            self._record(pipe, now, task_id, task_name, index_name, source, "PENDING", source_type,
+                         original_filename)
+        pipe.execute()
+
+    def record_state(self, task_id: str, task_name: str, index_name: str, source: str, status: str,
+                     source_type: Optional[str] = None, original_filename: Optional[str] = None,
+                     error: Optional[str] = None, **result):
+        """
+        Record a state change of a task as the latest state of its path.
+
+        Args:
+            task_id: Celery task ID
+            task_name: "process" or "forward"
+            index_name: Knowledge base the file is indexed into
+            source: Path or URL of the file
+            status: Celery state of the task
+            source_type: Type of the source ("local", "minio")
+            original_filename: The original name of the file
+            error: Error message of a failed task
+            **result: Result fields of a finished task, only RESULT_FIELDS are kept
+        """
+        pipe = self._client.pipeline(transaction=False)
+        self._record(pipe, time.time(), task_id, task_name, index_name, source, status, source_type,
+                     original_filename, error, result)
+        pipe.execute()
+
+    def get_index_tasks(self, index_name: str) -> List[Dict[str, Any]]:
+        """
+        Get the latest task of every path and task name of a knowledge base.
+
+        Returns:
+            Task information shaped like get_task_info, created_at being the submission time
+        """
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zrange(self._ids_key(index_name), 0, -1, withscores=True)
+        pipe.hgetall(self._latest_key(index_name))
+        scored_ids, latest = pipe.execute()
+
+        submitted_at = {_decode(task_id): score for task_id, score in scored_ids}
+        tasks = []
+        for field, value in latest.items():
+            try:
+                task = json.loads(value)
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.warning(f"Skipping unreadable task index entry {_decode(field)}: {e}")
+                continue
+            task["created_at"] = submitted_at.get(task["id"], task["updated_at"])
+            tasks.append(task)
+        return tasks
+
+    def get_task_ids(self, index_name: str) -> List[str]:
+        """Get the IDs of all tasks of a knowledge base in submission order"""
+        return [_decode(task_id) for task_id in self._client.zrange(self._ids_key(index_name), 0, -1)]
+
+    def get_document_task_ids(self, index_name: str, source: str,
+                              task_names: Iterable[str] = ("process", "forward")) -> List[str]:
+        """Get the IDs of the latest tasks of one path of a knowledge base"""
+        values = self._client.hmget(self._latest_key(index_name),
+                                    [self._field(task_name, source) for task_name in task_names])
+        task_ids = []
+        for value in values:
+            if value:
+                try:
+                    task_ids.append(json.loads(value)["id"])
+                except (json.JSONDecodeError, TypeError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable task index entry of {source}: {e}")
+        return task_ids
+
+    def count(self, index_name: str) -> int:
+        """Number of tasks of a knowledge base"""
+        return self._client.zcard(self._ids_key(index_name))
+
+    def remove_index(self, index_name: str):
+        """Forget every task of a knowledge base"""
+        self._client.delete(self._ids_key(index_name), self._latest_key(index_name))
+
+    def remove_document(self, index_name: str, source: str, task_ids: Iterable[str],
+                        task_names: Iterable[str] = ("process", "forward")):
+        """Forget the given tasks and the latest state of one path of a knowledge base"""
+        task_ids = list(task_ids)
+        pipe = self._client.pipeline(transaction=False)
+        if task_ids:
+            pipe.zrem(self._ids_key(index_name), *task_ids)
+        pipe.hdel(self._latest_key(index_name), *[self._field(task_name, source) for task_name in task_names])
+        pipe.execute()
+
+    def _record(self, pipe, now: float, task_id: str, task_name: str, index_name: str, source: str, status: str,
+                source_type: Optional[str] = None, original_filename: Optional[str] = None,
+                error: Optional[str] = None, result: Optional[Dict[str, Any]] = None):
+        task = {
+            "id": task_id,
+            "index_name": index_name,
+            "task_name": task_name,
+            "path_or_url": source,
+            "source_type": source_type or "",
+            "original_filename": original_filename or "",
+            "status": status,
+            "updated_at": now,
+            "error": error,
+        }
+        task.update({key: value for key, value in (result or {}).items() if key in RESULT_FIELDS})
+        # The first record of a task keeps its score, which is the submission time
+        pipe.zadd(self._ids_key(index_name), {task_id: now}, nx=True)
+        pipe.hset(self._latest_key(index_name), self._field(task_name, source),
+                  json.dumps(task, ensure_ascii=False, default=str))
+
+    def _ids_key(self, index_name: str) -> str:
+        return f"{self._prefix}:{index_name}:ids"
+
+    def _latest_key(self, index_name: str) -> str:
+        return f"{self._prefix}:{index_name}:latest"
+
+    @staticmethod
+    def _field(task_name: str, source: str) -> str:
+        return f"{task_name}:{source}"
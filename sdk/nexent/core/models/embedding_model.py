@@ -1,9 +1,293 @@
 import asyncio
+import hashlib
+import json
 import logging
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Union
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+
+
+class EmbeddingCache:
+    """
+    Process-wide LRU cache for query embeddings with TTL expiry.
+
+    Entries are keyed by (model, base_url, dims, normalized text). An optional Redis client can be
+    attached as a second tier, so that embeddings are shared between processes and survive restarts.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl_seconds: float = 3600.0,
+        redis_client: Any = None,
+        redis_prefix: str = "nexent:embedding:",
+    ):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            max_size: Maximum number of vectors kept in the local tier
+            ttl_seconds: Time to live of an entry in seconds, applied to both tiers
+            redis_client: Optional Redis client used as the second tier (needs get/setex)
+            redis_prefix: Key prefix used in Redis
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self.redis_prefix = redis_prefix
+        self.enabled = True
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace so that trivially different queries share one entry."""
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, model: str, base_url: str, dims: Optional[int], text: str) -> str:
+        """Build the cache key for a text embedded by a given model endpoint."""
+        raw = "\x1f".join([str(model), str(base_url), str(dims), cls.normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Look up an embedding vector.
+
+        Args:
+            key: Key created by make_key
+
+        Returns:
+            The cached vector, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, vector = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+
+        vector = self._redis_get(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.redis_hits += 1
+            self._store_local(key, vector, now)
+        return vector
+
+    def set(self, key: str, vector: List[float]) -> None:
+        """
+        Store an embedding vector in both tiers.
+
+        Args:
+            key: Key created by make_key
+            vector: Embedding vector
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._store_local(key, vector, time.monotonic())
+        self._redis_set(key, vector)
+
+    def clear(self) -> None:
+        """Drop all local entries and reset counters. Redis entries expire on their own."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.redis_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size of the local tier."""
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            }
+
+    def _store_local(self, key: str, vector: List[float], now: float) -> None:
+        """Insert into the local tier, evicting the least recently used entries. Caller holds the lock."""
+        self._entries[key] = (now + self.ttl_seconds, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        if self.redis_client is None:
+            return None
+        try:
+            raw = self.redis_client.get(self.redis_prefix + key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logging.warning(f"Embedding cache Redis lookup failed: {str(e)}")
+            return None
+
+    def _redis_set(self, key: str, vector: List[float]) -> None:
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.setex(self.redis_prefix + key, int(self.ttl_seconds), json.dumps(vector))
+        except Exception as e:
+            logging.warning(f"Embedding cache Redis write failed: {str(e)}")
+
+
+_embedding_cache = EmbeddingCache()
+# Vectors of indexed chunks, so content indexed again (a re-uploaded file, or the same file in
+# several knowledge bases) is not embedded twice. Kept apart so indexing never evicts query vectors.
+_document_embedding_cache = EmbeddingCache(max_size=20000, ttl_seconds=24 * 3600.0,
+                                           redis_prefix="nexent:doc_embedding:")
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache."""
+    return _embedding_cache
+
+
+def get_document_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide cache of document chunk embeddings."""
+    return _document_embedding_cache
+
+
+def configure_embedding_cache(
+    max_size: Optional[int] = None,
+    ttl_seconds: Optional[float] = None,
+    redis_client: Any = None,
+    enabled: Optional[bool] = None,
+) -> EmbeddingCache:
+    """
+    Adjust the process-wide embedding cache. Arguments left as None keep their current value.
+
+    Args:
+        max_size: Maximum number of vectors kept in memory
+        ttl_seconds: Time to live of an entry in seconds
+        redis_client: Redis client enabling the second tier
+        enabled: Turn caching on or off
+
+    Returns:
+        The process-wide embedding cache
+    """
+    return _apply_cache_settings(_embedding_cache, max_size, ttl_seconds, redis_client, enabled)
+
+
+def configure_document_embedding_cache(
+    max_size: Optional[int] = None,
+    ttl_seconds: Optional[float] = None,
+    redis_client: Any = None,
+    enabled: Optional[bool] = None,
+) -> EmbeddingCache:
+    """
+    Adjust the process-wide document chunk embedding cache, see configure_embedding_cache.
+
+    Returns:
+        The process-wide document chunk embedding cache
+    """
+    return _apply_cache_settings(_document_embedding_cache, max_size, ttl_seconds, redis_client, enabled)
+
+
+def _apply_cache_settings(
+    cache: EmbeddingCache,
+    max_size: Optional[int],
+    ttl_seconds: Optional[float],
+    redis_client: Any,
+    enabled: Optional[bool],
+) -> EmbeddingCache:
+    if max_size is not None:
+        cache.max_size = max_size
+    if ttl_seconds is not None:
+        cache.ttl_seconds = ttl_seconds
+    if redis_client is not None:
+        cache.redis_client = redis_client
+    if enabled is not None:
+        cache.enabled = enabled
+    return cache
+
+
+# Keep-alive connection pools shared by every embedding client pointing at the same endpoint
+_http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+# aiohttp sessions are bound to an event loop, so they are pooled per loop and per endpoint
+_async_http_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+HTTP_POOL_MAXSIZE = 16
+
+
+def get_http_session(api_url: str) -> requests.Session:
+    """
+    Get the pooled requests session for an embedding endpoint.
+
+    Args:
+        api_url: URL of the embedding API
+
+    Returns:
+        A session whose connections are kept alive between calls
+    """
+    with _http_sessions_lock:
+        session = _http_sessions.get(api_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_sessions[api_url] = session
+        return session
+
+
+def get_async_http_session(api_url: str) -> aiohttp.ClientSession:
+    """
+    Get the pooled aiohttp session for an embedding endpoint on the running event loop.
+
+    Args:
+        api_url: URL of the embedding API
+
+    Returns:
+        A session whose connections are kept alive between calls
+    """
+    loop = asyncio.get_running_loop()
+    sessions = _async_http_sessions.setdefault(loop, {})
+    session = sessions.get(api_url)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_MAXSIZE, keepalive_timeout=60)
+        session = aiohttp.ClientSession(connector=connector)
+        sessions[api_url] = session
+    return session
+
+
+async def close_async_http_sessions() -> None:
+    """Close the pooled aiohttp sessions of the running event loop, call this on application shutdown."""
+    sessions = _async_http_sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
 
 
 class BaseEmbedding(ABC):
@@ -48,6 +332,38 @@ class BaseEmbedding(ABC):
         """
         pass
 
+    async def aget_embeddings(
+        self,
+        inputs: Union[str, List[str]],
+        with_metadata: bool = False,
+        timeout: Optional[float] = None,
+        retries: int = 3,
+        retry_timeout_step: float = 5.0,
+    ) -> Union[List[List[float]], Dict[str, Any]]:
+        """
+        Asynchronously get the embedding vectors for the input.
+
+        Subclasses with a native async client override this; the default runs get_embeddings in a worker thread.
+
+        Args:
+            inputs: Objects to be embedded
+            with_metadata: Whether to return the full response with metadata
+            timeout: Base timeout in seconds for the first attempt. If None, uses retry_timeout_step.
+            retries: Number of retries on timeout (not counting the first attempt)
+            retry_timeout_step: Linear increment in seconds for each retry timeout
+
+        Returns:
+            If with_metadata is False, returns a list of embedding vectors; otherwise, returns a dictionary containing embeddings and metadata
+        """
+        return await asyncio.to_thread(
+            self.get_embeddings,
+            inputs,
+            with_metadata=with_metadata,
+            timeout=timeout,
+            retries=retries,
+            retry_timeout_step=retry_timeout_step,
+        )
+
     @abstractmethod
     async def dimension_check(self, timeout: float = 5.0) -> List[List[float]]:
         """
@@ -61,6 +377,26 @@ class BaseEmbedding(ABC):
         """
         pass
 
+    def _get_cached_embedding(self, inputs: Union[str, List[str]], with_metadata: bool) -> Optional[List[List[float]]]:
+        """
+        Look up a single query text in the embedding cache.
+
+        Only single-string inputs without metadata are cached, these are the search queries that agents
+        and memory search repeat. Batch inputs come from document indexing and would only evict them.
+        """
+        if with_metadata or not isinstance(inputs, str):
+            return None
+        key = EmbeddingCache.make_key(self.model, self.api_url, self.embedding_dim, inputs)
+        vector = _embedding_cache.get(key)
+        return [vector] if vector is not None else None
+
+    def _cache_embedding(self, inputs: Union[str, List[str]], with_metadata: bool, embeddings: Any) -> None:
+        """Store the embedding of a single query text returned by get_embeddings."""
+        if with_metadata or not isinstance(inputs, str) or not embeddings:
+            return
+        key = EmbeddingCache.make_key(self.model, self.api_url, self.embedding_dim, inputs)
+        _embedding_cache.set(key, embeddings[0])
+
 
 class TextEmbedding(BaseEmbedding):
     """
@@ -163,10 +499,28 @@ class JinaEmbedding(MultimodalEmbedding):
         Returns:
             Dict[str, Any]: API response
         """
-        response = requests.post(self.api_url, headers=self.headers, json=data, timeout=timeout)
+        response = get_http_session(self.api_url).post(self.api_url, headers=self.headers, json=data, timeout=timeout)
         response.raise_for_status()
         return response.json()
 
+    async def _make_async_request(self, data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Make the API request on the pooled aiohttp session and return the response.
+
+        Args:
+            data: Request data
+            timeout: Timeout in seconds
+
+        Returns:
+            Dict[str, Any]: API response
+        """
+        session = get_async_http_session(self.api_url)
+        async with session.post(
+            self.api_url, headers=self.headers, json=data, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
     def get_embeddings(
         self,
         inputs: Union[str, List[str]],
@@ -186,6 +540,10 @@ class JinaEmbedding(MultimodalEmbedding):
         Returns:
             A list of embedding vectors, or a dictionary with metadata if with_metadata is True.
         """
+        cached = self._get_cached_embedding(inputs, with_metadata)
+        if cached is not None:
+            return cached
+
         if isinstance(inputs, str):
             multimodal_inputs = [{"text": inputs}]
         else:
@@ -197,9 +555,11 @@ class JinaEmbedding(MultimodalEmbedding):
         for attempt_index in range(attempts):
             current_timeout = base_timeout + attempt_index * retry_timeout_step
             try:
-                return self.get_multimodal_embeddings(
+                embeddings = self.get_multimodal_embeddings(
                     multimodal_inputs, with_metadata=with_metadata, timeout=current_timeout
                 )
+                self._cache_embedding(inputs, with_metadata, embeddings)
+                return embeddings
             except requests.exceptions.Timeout as e:
                 logging.warning(
                     f"JinaEmbedding API connection test timed out in {current_timeout}s ({attempt_index + 1}/{attempts})"
@@ -272,21 +632,103 @@ class JinaEmbedding(MultimodalEmbedding):
             raise last_timeout
         return []
 
+    async def aget_embeddings(
+        self,
+        inputs: Union[str, List[str]],
+        with_metadata: bool = False,
+        timeout: Optional[float] = None,
+        retries: int = 3,
+        retry_timeout_step: float = 5.0,
+    ) -> Union[List[List[float]], Dict[str, Any]]:
+        """
+        Asynchronously get embeddings for text inputs on the pooled aiohttp session.
+
+        Args:
+            inputs: A single text string or a list of text strings.
+            with_metadata: Whether to return the full response with metadata.
+            timeout: Base timeout in seconds for the first attempt. If None, uses retry_timeout_step.
+            retries: Number of retries on timeout (not counting the first attempt).
+            retry_timeout_step: Linear increment in seconds for each retry timeout.
+        Returns:
+            A list of embedding vectors, or a dictionary with metadata if with_metadata is True.
+        """
+        cached = self._get_cached_embedding(inputs, with_metadata)
+        if cached is not None:
+            return cached
+
+        if isinstance(inputs, str):
+            multimodal_inputs = [{"text": inputs}]
+        else:
+            multimodal_inputs = [{"text": item} for item in inputs]
+
+        embeddings = await self.aget_multimodal_embeddings(
+            multimodal_inputs,
+            with_metadata=with_metadata,
+            timeout=timeout,
+            retries=retries,
+            retry_timeout_step=retry_timeout_step,
+        )
+        self._cache_embedding(inputs, with_metadata, embeddings)
+        return embeddings
+
+    async def aget_multimodal_embeddings(
+        self,
+        inputs: List[Dict[str, str]],
+        with_metadata: bool = False,
+        timeout: Optional[float] = None,
+        retries: int = 3,
+        retry_timeout_step: float = 5.0,
+    ) -> Union[List[List[float]], Dict[str, Any]]:
+        """
+        Asynchronously get embeddings for a list of inputs (text or image URLs).
+
+        Args:
+            inputs: List of dictionaries containing either 'text' or 'image' keys
+            with_metadata: Whether to return the full response with metadata or just a list of embedding vectors
+            timeout: Base timeout in seconds for the first attempt. If None, uses retry_timeout_step
+            retries: Number of retries on timeout (not counting the first attempt)
+            retry_timeout_step: Linear increment in seconds for each retry timeout
+
+        Returns:
+            List of embedding vectors
+        """
+        data = self._prepare_multimodal_input(inputs)
+
+        base_timeout = timeout if timeout is not None else retry_timeout_step
+        attempts = retries + 1
+        for attempt_index in range(attempts):
+            current_timeout = base_timeout + attempt_index * retry_timeout_step
+            try:
+                response = await self._make_async_request(data, timeout=current_timeout)
+
+                if with_metadata:
+                    return response
+
+                return [item["embedding"] for item in response["data"]]
+            except asyncio.TimeoutError:
+                logging.warning(
+                    f"JinaEmbedding API connection test timed out in {current_timeout}s ({attempt_index + 1}/{attempts})"
+                )
+                if attempt_index == attempts - 1:
+                    logging.error("JinaEmbedding API connection test timed out.")
+                    raise
+        return []
+
     async def dimension_check(self, timeout: float = 5.0) -> List[List[float]]:
         try:
-            # Create a simple test input
-            test_input = "Hello, nexent!"
+            # Create a simple test input, a list input bypasses the query cache so the API is really called
+            test_input = ["Hello, nexent!"]
 
             # Try to get embedding vectors, setting a timeout
-            embeddings = await asyncio.to_thread(self.get_embeddings, test_input, timeout=timeout)
+            embeddings = await self.aget_embeddings(test_input, timeout=timeout)
 
             # If embedding vectors are successfully obtained, the connection is normal
             return embeddings
 
-        except requests.exceptions.Timeout:
+        except (requests.exceptions.Timeout, asyncio.TimeoutError):
             logging.error(f"Embedding API connection test timed out ({timeout} seconds)")
             return []
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, aiohttp.ClientConnectionError):
             logging.error("Embedding API connection error, unable to establish connection")
             return []
         except Exception as e:
@@ -321,10 +763,28 @@ class OpenAICompatibleEmbedding(TextEmbedding):
         Returns:
             Dict[str, Any]: API response
         """
-        response = requests.post(self.api_url, headers=self.headers, json=data, timeout=timeout)
+        response = get_http_session(self.api_url).post(self.api_url, headers=self.headers, json=data, timeout=timeout)
         response.raise_for_status()
         return response.json()
 
+    async def _make_async_request(self, data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Make the API request on the pooled aiohttp session and return the response.
+
+        Args:
+            data: Request data
+            timeout: Timeout in seconds
+
+        Returns:
+            Dict[str, Any]: API response
+        """
+        session = get_async_http_session(self.api_url)
+        async with session.post(
+            self.api_url, headers=self.headers, json=data, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
     def get_embeddings(
         self,
         inputs: Union[str, List[str]],
@@ -346,6 +806,10 @@ class OpenAICompatibleEmbedding(TextEmbedding):
         Returns:
             List of embedding vectors, or a dictionary with metadata if with_metadata is True.
         """
+        cached = self._get_cached_embedding(inputs, with_metadata)
+        if cached is not None:
+            return cached
+
         data = self._prepare_input(inputs)
 
         base_timeout = timeout if timeout is not None else retry_timeout_step
@@ -360,6 +824,7 @@ class OpenAICompatibleEmbedding(TextEmbedding):
                     return response
 
                 embeddings = [item["embedding"] for item in response["data"]]
+                self._cache_embedding(inputs, with_metadata, embeddings)
                 return embeddings
             except requests.exceptions.Timeout as e:
                 logging.warning(
@@ -375,21 +840,70 @@ class OpenAICompatibleEmbedding(TextEmbedding):
             raise last_timeout
         return []
 
+    async def aget_embeddings(
+        self,
+        inputs: Union[str, List[str]],
+        with_metadata: bool = False,
+        timeout: Optional[float] = None,
+        retries: int = 3,
+        retry_timeout_step: float = 5.0,
+    ) -> Union[List[List[float]], Dict[str, Any]]:
+        """
+        Asynchronously get embeddings for text inputs on the pooled aiohttp session.
+
+        Args:
+            inputs: A single text string or a list of text strings
+            with_metadata: Whether to return the full response with metadata or just a list of embedding vectors
+            timeout: Base timeout in seconds for the first attempt. If None, uses retry_timeout_step.
+            retries: Number of retries on timeout (not counting the first attempt)
+            retry_timeout_step: Linear increment in seconds for each retry timeout
+
+        Returns:
+            List of embedding vectors, or a dictionary with metadata if with_metadata is True.
+        """
+        cached = self._get_cached_embedding(inputs, with_metadata)
+        if cached is not None:
+            return cached
+
+        data = self._prepare_input(inputs)
+
+        base_timeout = timeout if timeout is not None else retry_timeout_step
+        attempts = retries + 1
+        for attempt_index in range(attempts):
+            current_timeout = base_timeout + attempt_index * retry_timeout_step
+            try:
+                response = await self._make_async_request(data, timeout=current_timeout)
+
+                if with_metadata:
+                    return response
+
+                embeddings = [item["embedding"] for item in response["data"]]
+                self._cache_embedding(inputs, with_metadata, embeddings)
+                return embeddings
+            except asyncio.TimeoutError:
+                logging.warning(
+                    f"OpenAI API connection test timed out in {current_timeout}s ({attempt_index + 1}/{attempts})"
+                )
+                if attempt_index == attempts - 1:
+                    logging.error("OpenAI API connection test timed out.")
+                    raise
+        return []
+
     async def dimension_check(self, timeout: float = 5.0) -> List[List[float]]:
         try:
-            # Create a simple test input
-            test_input = "Hello, nexent!"
+            # Create a simple test input, a list input bypasses the query cache so the API is really called
+            test_input = ["Hello, nexent!"]
 
-            # Try to get embedding vectors in a background thread, setting a timeout
-            embeddings = await asyncio.to_thread(self.get_embeddings, test_input, timeout=timeout)
+            # Try to get embedding vectors on the pooled async session, setting a timeout
+            embeddings = await self.aget_embeddings(test_input, timeout=timeout)
 
             # If embedding vectors are successfully obtained, the connection is normal
             return embeddings
 
-        except requests.exceptions.Timeout:
+        except (requests.exceptions.Timeout, asyncio.TimeoutError):
             logging.error(f"OpenAI API connection test timed out ({timeout} seconds)")
             return []
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, aiohttp.ClientConnectionError):
             logging.error("OpenAI API connection error, unable to establish connection")
             return []
         except Exception as e:
@@ -1,9 +1,17 @@
+import logging
 import math
+import threading
+import time
 from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
+import jieba
 import jieba.posseg as pseg
 from jieba import analyse
 
+logger = logging.getLogger("tokenizer")
+
 # POS tag weights configuration (Proper noun > Noun > Verb > Adjective > Others)
 POS_WEIGHTS = {
     'n': 1.3,  # Common noun
@@ -18,29 +26,43 @@ POS_WEIGHTS = {
 # Proper noun dictionary (reserved for future dynamic loading from business data)
 HIGH_WEIGHT_NZ_TERMS = {}
 
+# Number of distinct query texts whose POS tagging result is memoized
+TERM_WEIGHT_CACHE_SIZE = 4096
 
-def calculate_term_weights(text, use_idf=False, doc_freqs=None, total_docs=1):
-    """
-    Calculate the weight of each token in the query text
+_warm_up_lock = threading.Lock()
+_warmed_up = False
 
-    Args:
-        text (str): Text to be analyzed
-        use_idf (bool): Whether to use IDF enhancement, default False
-        doc_freqs (dict): Document frequency dictionary for terms {term: number of documents containing the term}
-        total_docs (int): Total number of documents (for IDF calculation), default 1
 
-    Returns:
-        dict: Dictionary of {term: weight}, weights normalized to 0-1 range
+def warm_up_tokenizer() -> float:
     """
-    # Convert English text to lowercase
-    text = text.lower()
+    Load the jieba dictionary, POS tagger and stop words up front so the first search does not pay for it.
+    Safe to call more than once, later calls return immediately.
 
-    # Tokenization with POS tagging
+    Returns:
+        float: Seconds spent loading, 0 if the tokenizer was already warm
+    """
+    global _warmed_up
+    with _warm_up_lock:
+        if _warmed_up:
+            return 0.0
+        start_time = time.time()
+        jieba.initialize()
+        # Tag a mixed Chinese/English sentence to load the HMM model and the TF-IDF stop word list
+        _pos_term_stats("预热分词器 warm up tokenizer")
+        _pos_term_stats.cache_clear()
+        _warmed_up = True
+        elapsed = time.time() - start_time
+        logger.info(f"Tokenizer warmed up in {elapsed:.2f}s")
+        return elapsed
+
+
+@lru_cache(maxsize=TERM_WEIGHT_CACHE_SIZE)
+def _pos_term_stats(text: str) -> Tuple[Tuple[str, float], ...]:
+    """POS tagging pass of calculate_term_weights, memoized because it dominates the cost of a query"""
     words = pseg.cut(text)
     term_stats = defaultdict(float)
-    total_weight = 0.0
 
-    # First pass: calculate term frequency + POS weight + position weight
+    # Calculate term frequency + POS weight + position weight
     for idx, (word, flag) in enumerate(words):
         # Filter out stop words and whitespace
         if word not in analyse.default_tfidf.stop_words and word.strip():
@@ -51,9 +73,45 @@ def calculate_term_weights(text, use_idf=False, doc_freqs=None, total_docs=1):
             # Position weight enhancement (words at the beginning and end of the sentence are more important)
             position_factor = 1.2 if idx < 3 or idx > len(text) / 3 else 1.0
             # Combined weight = POS weight * position factor
-            combined_weight = pos_weight * position_factor
-            term_stats[word] += combined_weight
-            total_weight += combined_weight
+            term_stats[word] += pos_weight * position_factor
+
+    return tuple(term_stats.items())
+
+
+def extract_query_terms(text: str) -> List[str]:
+    """Candidate terms calculate_term_weights can keep for a text, used to look up their document frequencies"""
+    return [term for term, _ in _pos_term_stats(text.lower()) if len(term) > 1]
+
+
+def clear_term_weight_cache():
+    """Drop memoized POS tagging results, e.g. after loading a custom jieba dictionary"""
+    _pos_term_stats.cache_clear()
+
+
+def term_weight_cache_info():
+    """Hit/miss statistics of the POS tagging memo"""
+    return _pos_term_stats.cache_info()
+
+
+def calculate_term_weights(text, use_idf=False, doc_freqs=None, total_docs=1):
+    """
+    Calculate the weight of each token in the query text
+
+    Args:
+        text (str): Text to be analyzed
+        use_idf (bool): Whether to use IDF enhancement, default False
+        doc_freqs (dict): Document frequency dictionary for terms {term: number of documents containing the term}
+        total_docs (int): Total number of documents (for IDF calculation), default 1
+
+    Returns:
+        dict: Dictionary of {term: weight}, weights normalized to 0-1 range
+    """
+    # Convert English text to lowercase
+    text = text.lower()
+
+    # First pass: tokenization with POS tagging, term frequency + POS weight + position weight
+    term_stats = dict(_pos_term_stats(text))
+    total_weight = sum(term_stats.values())
 
     # Calculate TF weight (term frequency weight)
     tf_weights = {term: weight / total_weight for term, weight in term_stats.items()}
@@ -100,3 +158,23 @@ def calculate_term_weights(text, use_idf=False, doc_freqs=None, total_docs=1):
     # Re-normalize
     max_weight = max(weight for _, weight in meaningful_terms)
     return {term: weight / max_weight for term, weight in meaningful_terms}
+
+
+def calculate_term_weights_batch(texts: List[str], use_idf=False, doc_freqs=None, total_docs=1) -> List[Dict[str, float]]:
+    """
+    Calculate term weights for many texts, e.g. the query set of an evaluation job
+
+    Args:
+        texts (list): Texts to be analyzed
+        use_idf, doc_freqs, total_docs: See calculate_term_weights
+
+    Returns:
+        list: One {term: weight} dictionary per text, in input order
+    """
+    warm_up_tokenizer()
+    # Repeated texts are weighted once
+    unique_weights = {}
+    for text in texts:
+        if text not in unique_weights:
+            unique_weights[text] = calculate_term_weights(text, use_idf, doc_freqs, total_docs)
+    return [dict(unique_weights[text]) for text in texts]
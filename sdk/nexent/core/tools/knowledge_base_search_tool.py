@@ -33,6 +33,7 @@ class KnowledgeBaseSearchTool(Tool):
     tool_sign = ToolSign.KNOWLEDGE_BASE.value  # Used to distinguish different index sources for summaries
 
     def __init__(self, top_k: int = Field(description="Maximum number of search results", default=5),
+                       search_profile: str = Field(description="Semantic search profile: default, balanced or high_recall. Leave empty to use the profile of each knowledge base", default=""),
                        index_names: List[str] = Field(description="The list of index names to search", default=None, exclude=True) ,
                        observer: MessageObserver = Field(description="Message observer", default=None, exclude=True),
                        embedding_model: BaseEmbedding = Field(description="The embedding model to use", default=None, exclude=True),
@@ -42,6 +43,7 @@ class KnowledgeBaseSearchTool(Tool):
         
         Args:
             top_k (int, optional): Number of results to return. Defaults to 5.
+            search_profile (str, optional): kNN search profile name, empty uses each index's own profile.
             observer (MessageObserver, optional): Message observer instance. Defaults to None.
         
         Raises:
@@ -49,6 +51,8 @@ class KnowledgeBaseSearchTool(Tool):
         """
         super().__init__()
         self.top_k = top_k
+        # An unset Field default means no explicit profile
+        self.search_profile = search_profile if isinstance(search_profile, str) and search_profile else None
         self.observer = observer
         self.es_core = es_core
         self.index_names = [] if index_names is None else index_names
@@ -122,7 +126,8 @@ class KnowledgeBaseSearchTool(Tool):
             results = self.es_core.hybrid_search(index_names=index_names,
                                                    query_text=query,
                                                    embedding_model=self.embedding_model,
-                                                   top_k=self.top_k)
+                                                   top_k=self.top_k,
+                                                   search_profile=self.search_profile)
 
             # Format results
             formatted_results = []
@@ -165,7 +170,8 @@ class KnowledgeBaseSearchTool(Tool):
             results = self.es_core.semantic_search(index_names=index_names,
                                                    query_text=query,
                                                    embedding_model=self.embedding_model,
-                                                   top_k=self.top_k)
+                                                   top_k=self.top_k,
+                                                   search_profile=self.search_profile)
 
             # Format results
             formatted_results = []
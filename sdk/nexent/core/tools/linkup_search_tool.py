@@ -130,42 +130,26 @@ class LinkupSearchTool(Tool):
 
             # Define the async function to perform the filtering
             async def process_images():
-                # Maximum number of concurrent requests
-                semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
+                # Score all images with a single batch request
+                api_url = f"{self.data_process_service}/tasks/filter_important_images"
+                payload = {
+                    'image_urls': images_list_url,
+                    'positive_prompt': positive_prompt,
+                    'negative_prompt': negative_prompt
+                }
+                timeout = aiohttp.ClientTimeout(total=10)
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.post(api_url, json=payload) as response:
+                        if response.status != 200:
+                            raise Exception(f"API error: {response.status}")
+                        result = await response.json()
 
-                # Create a ClientSession
-                connector = aiohttp.TCPConnector(limit=0)
-                timeout = aiohttp.ClientTimeout(total=2)
+                filtered_images = [item["image_url"] for item in result.get("results", [])
+                                   if item.get("is_important", False)]
+                if self.observer:
+                    filtered_images_json = json.dumps({"images_url": filtered_images}, ensure_ascii=False)
+                    self.observer.add_message("", ProcessType.PICTURE_WEB, filtered_images_json)
 
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                    # Create a function to process a single image
-                    async def process_single_image(img_url):
-                        async with semaphore:
-                            try:
-                                api_url = f"{self.data_process_service}/tasks/filter_important_image"
-                                data = {
-                                    'image_url': img_url,
-                                    'positive_prompt': positive_prompt,
-                                    'negative_prompt': negative_prompt
-                                }
-                                async with session.post(api_url, data=data) as response:
-                                    if response.status != 200:
-                                        logger.info(f"API error for {img_url}: {response.status}")
-                                        return None
-                                    result = await response.json()
-                                    if result.get("is_important", False):
-                                        logger.info(f"Important image: {img_url}")
-                                        return img_url
-                                    return None
-                            except Exception as e:
-                                logger.info(f"Error processing image {img_url}: {str(e)}")
-                                return None
-                    tasks = [process_single_image(url) for url in images_list_url]
-                    results = await asyncio.gather(*tasks)
-                    filtered_images = [url for url in results if url is not None]
-                    if self.observer:
-                        filtered_images_json = json.dumps({"images_url": filtered_images}, ensure_ascii=False)
-                        self.observer.add_message("", ProcessType.PICTURE_WEB, filtered_images_json)
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
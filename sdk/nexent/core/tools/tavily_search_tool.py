@@ -120,61 +120,35 @@ class TavilySearchTool(Tool):
 
             # Define the async function to perform the filtering
             async def process_images():
-                # Maximum number of concurrent requests
-                semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
-
-                # Create a ClientSession
-                connector = aiohttp.TCPConnector(
-                    limit=0)  # No limit on connections
-                timeout = aiohttp.ClientTimeout(total=2)  # 2 seconds timeout
-
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                    # Create a function to process a single image
-                    async def process_single_image(img_url):
-                        async with semaphore:  # Limit concurrency
-                            try:
-                                # Create API endpoint URL
-                                api_url = f"{self.data_process_service}/tasks/filter_important_image"
-
-                                # Prepare form data
-                                data = {
-                                    'image_url': img_url,
-                                    'positive_prompt': positive_prompt,
-                                    'negative_prompt': negative_prompt
-                                }
-
-                                # Make async API request
-                                async with session.post(api_url, data=data) as response:
-                                    if response.status != 200:
-                                        logger.info(
-                                            f"API error for {img_url}: {response.status}")
-                                        return None
-
-                                    result = await response.json()
-                                    if result.get("is_important", False):
-                                        logger.info(f"Important image: {img_url}")
-                                        return img_url
-                                    return None
-                            except Exception as e:
-                                logger.info(
-                                    f"Error processing image {img_url}: {str(e)}")
-                                return None
-
-                    # Process all images concurrently
-                    tasks = [process_single_image(url) for url in images_list_url]
-                    results = await asyncio.gather(*tasks)
-
-                    # Filter out None results
-                    filtered_images = [
-                        url for url in results if url is not None]
-
-                    # Notify results through observer after filtering
-                    if self.observer:
-                        # Send the filtered images list
-                        filtered_images_json = json.dumps(
-                            {"images_url": filtered_images}, ensure_ascii=False)
-                        self.observer.add_message(
-                            "", ProcessType.PICTURE_WEB, filtered_images_json)
+                # Create API endpoint URL
+                api_url = f"{self.data_process_service}/tasks/filter_important_images"
+
+                # Score all images with a single batch request, the service downloads them concurrently
+                payload = {
+                    'image_urls': images_list_url,
+                    'positive_prompt': positive_prompt,
+                    'negative_prompt': negative_prompt
+                }
+                timeout = aiohttp.ClientTimeout(total=10)  # 10 seconds timeout for the whole batch
+
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.post(api_url, json=payload) as response:
+                        if response.status != 200:
+                            raise Exception(f"API error: {response.status}")
+                        result = await response.json()
+
+                # Keep the important images in their original order
+                filtered_images = [
+                    item["image_url"] for item in result.get("results", []) if item.get("is_important", False)]
+                logger.info(f"Important images: {len(filtered_images)}/{len(images_list_url)}")
+
+                # Notify results through observer after filtering
+                if self.observer:
+                    # Send the filtered images list
+                    filtered_images_json = json.dumps(
+                        {"images_url": filtered_images}, ensure_ascii=False)
+                    self.observer.add_message(
+                        "", ProcessType.PICTURE_WEB, filtered_images_json)
 
             # Create a new event loop and run the async function in the current thread
             loop = asyncio.new_event_loop()
@@ -1,7 +1,20 @@
+import io
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional, Union
+
+# Processors accept file content as bytes or as a seekable binary file, such as a spooled temporary file
+FileData = Union[bytes, BinaryIO]
+
+
+def as_binary_stream(file_data: FileData) -> BinaryIO:
+    """Return file content as a binary stream positioned at its start"""
+    if isinstance(file_data, (bytes, bytearray)):
+        return io.BytesIO(file_data)
+    file_data.seek(0)
+    return file_data
+
 
 class FileProcessor(ABC):
     @abstractmethod
-    def process_file(self, file_data: bytes, chunking_strategy: str, filename: Optional[str], path_or_url: Optional[str], **params) -> List[Dict]:
+    def process_file(self, file_data: FileData, chunking_strategy: str, filename: Optional[str], path_or_url: Optional[str], **params) -> List[Dict]:
         pass 
\ No newline at end of file
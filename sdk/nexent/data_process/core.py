@@ -2,7 +2,7 @@ import logging
 import os
 from typing import Dict, List, Optional
 
-from .base import FileProcessor
+from .base import FileData, FileProcessor
 from .unstructured_processor import UnstructuredProcessor
 from .openpyxl_processor import OpenPyxlProcessor
 
@@ -20,6 +20,7 @@ class DataProcessCore:
     
     Supported input methods:
     - In-memory byte data
+    - Seekable binary files, e.g. a spooled temporary file that spilled to disk
     """
 
     # Supported Excel file extensions
@@ -42,7 +43,7 @@ class DataProcessCore:
         logger.debug("DataProcessCore initialization completed")
 
     def file_process(self, 
-                    file_data: bytes, 
+                    file_data: FileData, 
                     filename: str,
                     chunking_strategy: str = "basic", 
                     processor: Optional[str] = None,
@@ -51,7 +52,7 @@ class DataProcessCore:
         Facade pattern that automatically detects file type and processes files
         
         Args:
-            file_data: File content byte data (for in-memory processing)
+            file_data: File content byte data, or a seekable binary file so large files need not be held in memory
             filename: Filename
             chunking_strategy: Chunking strategy, options: "basic", "by_title", "none"
             processor: Optional processor to use. If None, auto-detects from filename. 
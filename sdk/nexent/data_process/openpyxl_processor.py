@@ -1,93 +1,77 @@
-from .base import FileProcessor
-import io
-from copy import deepcopy
+from .base import FileData, FileProcessor, as_binary_stream
 import openpyxl
-from typing import List, Dict, Optional
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.xml.functions import iterparse
+from typing import List, Dict, Iterator, Optional, Tuple
 import os
 
 class OpenPyxlProcessor(FileProcessor):
     """
     Unified Excel file processing class, supports in-memory file processing
+
+    Workbooks are opened in read-only mode and every sheet is streamed row by row, so memory is bounded
+    by a row instead of the expanded workbook. Chunks are produced by a generator as rows are read.
     """
     
-    def process_file(self, file_data: bytes, chunking_strategy: str, filename: str, **params) -> List[Dict]:
-        """Process Excel file in memory"""
-        return self._process_excel(
+    def process_file(self, file_data: FileData, chunking_strategy: str, filename: str, **params) -> List[Dict]:
+        """Process Excel file held in memory or in a seekable binary file"""
+        return list(self.iter_chunks(
             file_data=file_data,
             chunking_strategy=chunking_strategy,
             filename=filename,
             **params
-        )
+        ))
     
-    def _process_excel(self, file_data: bytes, 
-                    chunking_strategy: str = "basic", filename: str = "", **params) -> List[Dict]:
+    def iter_chunks(self, file_data: FileData, chunking_strategy: str = "basic", filename: str = "",
+                    rows_per_chunk: int = 1, **params) -> Iterator[Dict]:
         """
-        Core Excel processing logic, supports byte data input
+        Core Excel processing logic, yields standardized chunks while the workbook is streamed
+
+        Args:
+            file_data: File byte data or seekable binary file
+            chunking_strategy: Chunking strategy
+            filename: Filename
+            rows_per_chunk: Number of table rows put into one chunk
+
+        Yields:
+            Standardized chunks in sheet and row order
         """
-        # Load workbook
-        wb_original, wb_copy = self._load_workbook(file_data)
-        
-        # Extract content
-        raw_content = self._extract_content(wb_original, wb_copy)
-        
-        # Convert to standardized chunk format
-        chunks = self._convert_to_chunks(
-            raw_content, filename
-        )
-        
-        return chunks
+        wb = self._load_workbook(file_data)
+        file_type = self._determine_file_type(filename)
+        try:
+            for i, content_text in enumerate(self._iter_content(wb, max(1, rows_per_chunk))):
+                yield {
+                    "content": content_text,
+                    "filename": filename,
+                    "metadata": {
+                        "chunk_index": i,
+                        "file_type": file_type
+                    }
+                }
+        finally:
+            wb.close()
     
-    def _load_workbook(self, file_data: bytes):
-        """Load Excel workbook"""
+    def _load_workbook(self, file_data: FileData):
+        """Load Excel workbook in read-only mode"""
         try:
-            file_obj = io.BytesIO(file_data)
-            wb_original = openpyxl.load_workbook(file_obj)
-            
-            wb_copy = deepcopy(wb_original)
-            return wb_original, wb_copy
-            
+            return openpyxl.load_workbook(as_binary_stream(file_data), read_only=True)
         except Exception as e:
             raise Exception(f"Failed to load Excel file: {str(e)}")
     
-    def _extract_content(self, wb_original, wb_copy) -> List[str]:
-        """Extract content from all worksheets"""
-        contents = []
-        
-        for sheet_name in wb_original.sheetnames:
-            sheet = wb_original[sheet_name]
-            sheet_copy = wb_copy[sheet_name]
+    def _iter_content(self, wb, rows_per_chunk: int) -> Iterator[str]:
+        """Stream content from all worksheets"""
+        for sheet_name in wb.sheetnames:
+            sheet = wb[sheet_name]
+            column_merges = self._get_column_merges(sheet)
+            begin_row, max_col = self._get_title_row(sheet, column_merges)
             
-            if self._is_single_column(sheet):
+            if max_col < 2:
                 # Process single column data
-                content = self._process_single_column(sheet, sheet_name)
+                yield self._process_single_column(sheet, column_merges, sheet_name)
             else:
                 # Process multi-column table data
-                content = self._process_multi_column(sheet, sheet_copy, sheet_name)
-            
-            contents.extend(content)
-        
-        return contents
-    
-    def _convert_to_chunks(self, raw_content: List[str], 
-                          filename: str) -> List[Dict]:
-        """Convert raw content to standardized chunk format"""
-        chunks = []
-        
-        for i, content_text in enumerate(raw_content):
-            # Determine file type
-            file_type = self._determine_file_type(filename)
-            
-            chunk = {
-                "content": content_text,
-                "filename": filename,
-                "metadata": {
-                    "chunk_index": i,
-                    "file_type": file_type
-                }
-            }
-            chunks.append(chunk)
-        
-        return chunks
+                rows = self._process_multi_column(sheet, column_merges, begin_row, sheet_name)
+                yield from self._group_rows(rows, rows_per_chunk)
     
     def _determine_file_type(self, filename: str) -> str:
         """Determine Excel file type"""
@@ -96,97 +80,115 @@ class OpenPyxlProcessor(FileProcessor):
         else:
             return "xls"
     
-    def _is_single_column(self, sheet) -> bool:
-        """Check if it's single column data"""
-        _, max_col = self._get_title_row(sheet)
-        return max_col < 2
+    @staticmethod
+    def _get_column_merges(sheet) -> List[Tuple[int, int, int]]:
+        """
+        Read the merged ranges spanning several rows of a single column from the sheet XML.
+
+        Read-only worksheets do not expose merged cells, the mergeCells element is read with a streaming parser.
+
+        Returns:
+            List of (column, first row, last row)
+        """
+        get_source = getattr(sheet, "_get_source", None)
+        if get_source is None:
+            return []
+        merges = []
+        with get_source() as source:
+            for _, element in iterparse(source):
+                tag = element.tag.rsplit("}", 1)[-1]
+                if tag == "mergeCell":
+                    min_col, min_row, max_col, max_row = range_boundaries(element.get("ref"))
+                    if min_col == max_col and max_row > min_row:
+                        merges.append((min_col, min_row, max_row))
+                elif tag == "row":
+                    # Rows are not needed here, drop them as soon as they are parsed
+                    element.clear()
+        return merges
     
-    def _process_single_column(self, sheet, sheet_name: str) -> List[str]:
+    @staticmethod
+    def _iter_rows(sheet, column_merges: List[Tuple[int, int, int]]) -> Iterator[Tuple[int, tuple]]:
+        """
+        Stream the row values of a sheet, filling merged column ranges with their top value.
+
+        Yields:
+            Tuple of (row number, row values)
+        """
+        starts: Dict[int, List[Tuple[int, int]]] = {}
+        for col, min_row, max_row in column_merges:
+            starts.setdefault(min_row, []).append((col, max_row))
+        active: Dict[int, Tuple[int, object]] = {}
+        
+        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            if active or row_idx in starts:
+                values = list(row)
+                for col, (last_row, value) in list(active.items()):
+                    if row_idx > last_row:
+                        del active[col]
+                        continue
+                    if len(values) < col:
+                        values.extend([None] * (col - len(values)))
+                    values[col - 1] = value
+                for col, last_row in starts.pop(row_idx, []):
+                    active[col] = (last_row, values[col - 1] if col <= len(values) else None)
+                row = tuple(values)
+            yield row_idx, row
+    
+    def _process_single_column(self, sheet, column_merges: List[Tuple[int, int, int]], sheet_name: str) -> str:
         """Process single column data"""
-        content_str = ""
+        lines = []
         
-        for row in sheet.iter_rows(values_only=True):
+        for _, row in self._iter_rows(sheet, column_merges):
             if any(cell is not None for cell in row):
                 # Process first non-empty cell
                 cell_value = next((cell for cell in row if cell is not None), "")
-                content_str += str(cell_value).replace("\n", "<br>") + "\n"
+                lines.append(str(cell_value).replace("\n", "<br>") + "\n")
         
-        return [content_str + "\n————" + sheet_name]
+        return "".join(lines) + "\n————" + sheet_name
     
-    def _process_multi_column(self, sheet, sheet_copy, sheet_name: str) -> List[str]:
-        """Process multi-column table data"""
-        # Get title row position
-        begin_row, _ = self._get_title_row(sheet_copy)
-        
-        # Process merged cells
-        self._merge_all_cells(sheet_copy)
-        
-        # Get title and remarks
-        title_key = self._get_title_key(begin_row, sheet)
-        remark = self._get_remark(sheet, begin_row)
-        
-        # Extract table content
-        content = self._extract_table_content(
-            title_key, remark, sheet, begin_row, sheet_name
-        )
+    def _process_multi_column(self, sheet, column_merges: List[Tuple[int, int, int]], begin_row: int,
+                              sheet_name: str) -> Iterator[str]:
+        """Stream multi-column table data, remarks above the title row are added to every row"""
+        remark = ""
+        title_key: Optional[List[str]] = None
         
-        return content
+        for row_idx, row in self._iter_rows(sheet, column_merges):
+            if not any(cell is not None for cell in row):
+                continue
+            if row_idx < begin_row:
+                remark += "<br>" + self._join_tuple_elements(row)
+            elif row_idx == begin_row:
+                title_key = [str(cell) if cell is not None else "" for cell in row]
+            else:
+                if len(row) < len(title_key):
+                    row = row + (None,) * (len(title_key) - len(row))
+                yield self._build_row_content(title_key, row, remark, sheet_name)
     
-    def _get_title_row(self, sheet) -> tuple:
+    @staticmethod
+    def _group_rows(rows: Iterator[str], rows_per_chunk: int) -> Iterator[str]:
+        """Join consecutive rows into chunks of rows_per_chunk rows"""
+        group = []
+        for row in rows:
+            group.append(row)
+            if len(group) >= rows_per_chunk:
+                yield "\n\n".join(group)
+                group = []
+        if group:
+            yield "\n\n".join(group)
+    
+    def _get_title_row(self, sheet, column_merges: List[Tuple[int, int, int]]) -> tuple:
         """Get title row position and maximum column count"""
         max_col = 0
         position_max_col = 0
         
-        # First process column merging
-        self._merge_columns(sheet)
-        
-        for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-            non_empty_cells = sum(1 for cell in row if cell.value is not None)
+        for row_idx, row in self._iter_rows(sheet, column_merges):
+            non_empty_cells = sum(1 for cell in row if cell is not None)
             if non_empty_cells > max_col:
                 max_col = non_empty_cells
                 position_max_col = row_idx
         
         return position_max_col, max_col
     
-    def _get_remark(self, sheet, begin_row: int) -> str:
-        """Get remarks before the title"""
-        remark = ""
-        
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-            if not any(cell is not None for cell in row):
-                continue
-            if row_idx >= begin_row:
-                break
-            remark += "<br>" + self._join_tuple_elements(row)
-        
-        return remark
-    
-    def _get_title_key(self, begin_row: int, sheet) -> List[str]:
-        """Get column headers from title row"""
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-            if not any(cell is not None for cell in row):
-                continue
-            if row_idx == begin_row:
-                return [str(cell) if cell is not None else "" for cell in row]
-        return []
-    
-    def _extract_table_content(self, title_key: List[str], remark: str, 
-                              sheet, begin_row: int, sheet_name: str) -> List[str]:
-        """Extract table content and convert to markdown format"""
-        content = []
-        
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-            if not any(cell is not None for cell in row):
-                continue
-            if row_idx <= begin_row:
-                continue
-            
-            # Build current row content
-            row_content = self._build_row_content(title_key, row, remark, sheet_name)
-            content.append(row_content)
-        
-        return content
-    
     def _build_row_content(self, title_key: List[str], row: tuple, 
                           remark: str, sheet_name: str) -> str:
         """Build single row content"""
@@ -209,44 +211,6 @@ class OpenPyxlProcessor(FileProcessor):
         markdown_table = self._dict_to_markdown_table(result)
         return markdown_table + "\n————" + sheet_name
     
-    def _merge_columns(self, sheet):
-        """Process column merging"""
-        merged_ranges = list(sheet.merged_cells.ranges)
-        
-        # Unmerge cells
-        for merged_range in merged_ranges:
-            if str(merged_range)[0] != str(merged_range)[3]:
-                continue
-            sheet.unmerge_cells(str(merged_range))
-        
-        # Fill merged area values
-        for merged_range in merged_ranges:
-            if str(merged_range)[0] != str(merged_range)[3]:
-                continue
-            min_col, min_row, max_col, max_row = merged_range.bounds
-            top_left_value = sheet.cell(row=min_row, column=min_col).value
-            
-            for row in range(min_row, max_row + 1):
-                for col in range(min_col, max_col + 1):
-                    sheet.cell(row=row, column=col).value = top_left_value
-    
-    def _merge_all_cells(self, sheet):
-        """Process all merged cells"""
-        merged_ranges = list(sheet.merged_cells.ranges)
-        
-        # Unmerge all cells
-        for merged_range in merged_ranges:
-            sheet.unmerge_cells(str(merged_range))
-        
-        # Fill all merged area values
-        for merged_range in merged_ranges:
-            min_col, min_row, max_col, max_row = merged_range.bounds
-            top_left_value = sheet.cell(row=min_row, column=min_col).value
-            
-            for row in range(min_row, max_row + 1):
-                for col in range(min_col, max_col + 1):
-                    sheet.cell(row=row, column=col).value = top_left_value
-    
     @staticmethod
     def _dict_to_markdown_table(data: Dict[str, str]) -> str:
         """Convert dictionary to markdown table"""
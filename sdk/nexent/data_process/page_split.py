@@ -0,0 +1,90 @@
+"""
+Split paged documents (PDF, PPTX) into page ranges that can be partitioned independently.
+"""
+import io
+import os
+from typing import List, Optional, Tuple
+
+from .base import FileData, as_binary_stream
+
+PAGED_EXTENSIONS = {".pdf", ".pptx"}
+
+
+def get_paged_extension(filename: Optional[str]) -> Optional[str]:
+    """Return the extension of a file that can be split by pages, otherwise None"""
+    if not filename:
+        return None
+    _, ext = os.path.splitext(filename.lower())
+    return ext if ext in PAGED_EXTENSIONS else None
+
+
+def count_pages(file_data: FileData, extension: str) -> int:
+    """
+    Count the pages of a PDF or the slides of a PPTX deck.
+
+    Args:
+        file_data: File byte data or seekable binary file
+        extension: ".pdf" or ".pptx"
+
+    Returns:
+        Number of pages
+    """
+    if extension == ".pdf":
+        from pypdf import PdfReader
+        return len(PdfReader(as_binary_stream(file_data)).pages)
+    if extension == ".pptx":
+        from pptx import Presentation
+        return len(Presentation(as_binary_stream(file_data)).slides)
+    raise ValueError(f"Unsupported paged file type: {extension}")
+
+
+def plan_page_ranges(page_count: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """
+    Cut page_count pages into consecutive [start, end) ranges of at most pages_per_range pages.
+
+    Args:
+        page_count: Number of pages of the document
+        pages_per_range: Maximum number of pages per range
+
+    Returns:
+        List of zero-based (start, end) page ranges in document order
+    """
+    if pages_per_range < 1:
+        raise ValueError("pages_per_range must be at least 1")
+    return [(start, min(start + pages_per_range, page_count)) for start in range(0, page_count, pages_per_range)]
+
+
+def extract_page_range(file_data: FileData, extension: str, start: int, end: int) -> bytes:
+    """
+    Build a standalone document holding pages [start, end) of a PDF or PPTX.
+
+    Args:
+        file_data: File byte data or seekable binary file
+        extension: ".pdf" or ".pptx"
+        start: First page, zero-based
+        end: Page after the last page
+
+    Returns:
+        Byte data of the new document
+    """
+    output = io.BytesIO()
+    if extension == ".pdf":
+        from pypdf import PdfReader, PdfWriter
+        reader = PdfReader(as_binary_stream(file_data))
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        writer.write(output)
+    elif extension == ".pptx":
+        from pptx import Presentation
+        presentation = Presentation(as_binary_stream(file_data))
+        # python-pptx cannot copy slides between decks, drop the slides outside the range instead
+        slide_ids = presentation.slides._sldIdLst
+        for index, slide_id in reversed(list(enumerate(list(slide_ids)))):
+            if not start <= index < end:
+                presentation.part.drop_rel(slide_id.rId)
+                slide_ids.remove(slide_id)
+        presentation.save(output)
+    else:
+        raise ValueError(f"Unsupported paged file type: {extension}")
+    return output.getvalue()
@@ -1,8 +1,26 @@
-from .base import FileProcessor
-import io
-from typing import List, Dict, Optional
+from .base import FileData, FileProcessor, as_binary_stream
+from .page_split import count_pages, extract_page_range, get_paged_extension, plan_page_ranges
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Dict, Optional, Tuple
 import os
 
+logger = logging.getLogger("data_process.unstructured_processor")
+
+
+def _partition_page_range(page_data: bytes, chunking_strategy: str, filename: Optional[str],
+                          params: Dict, starting_page_number: int) -> Tuple[List[Dict], int]:
+    """
+    Partition one page range in a worker process.
+
+    Returns:
+        Chunks of the range and the number of elements they were built from
+    """
+    processor = UnstructuredProcessor()
+    elements = processor._partition(page_data, chunking_strategy, params, starting_page_number)
+    return processor._process_elements(elements, chunking_strategy, filename), len(elements)
+
 
 class UnstructuredProcessor(FileProcessor):
     """
@@ -17,16 +35,21 @@ class UnstructuredProcessor(FileProcessor):
             "new_after_n_chars": 1200,
             "strategy": "fast",
             "skip_infer_table_types": [],
-            "task_id": ""
+            "task_id": "",
+            # PDFs and PPTX decks with at least split_min_pages pages are partitioned in ranges of
+            # pages_per_range pages by up to split_max_workers processes, 0 disables splitting
+            "split_min_pages": 100,
+            "pages_per_range": 50,
+            "split_max_workers": max(1, min(4, os.cpu_count() or 1))
         }
     
-    def process_file(self, file_data: bytes, chunking_strategy: str, 
+    def process_file(self, file_data: FileData, chunking_strategy: str, 
                           filename: str, **params) -> List[Dict]:
         """
-        Process file in memory (e.g., file fetched from MinIO) and return structured chunks.
+        Process file in memory or in a seekable binary file (e.g., file fetched from MinIO) and return structured chunks.
         
         Args:
-            file_data: File byte data
+            file_data: File byte data or seekable binary file
             chunking_strategy: Chunking strategy ("basic", "by_title", "none")
             filename: Filename
             **params: Additional processing parameters
@@ -34,8 +57,8 @@ class UnstructuredProcessor(FileProcessor):
         Returns:
             List of dictionaries containing processing results
         """
-        if not isinstance(file_data, bytes):
-            raise ValueError("file_data must be of bytes type")
+        if not isinstance(file_data, bytes) and not hasattr(file_data, "read"):
+            raise ValueError("file_data must be bytes or a binary file object")
         
         return self._process_file(
             file_data=file_data,
@@ -45,7 +68,7 @@ class UnstructuredProcessor(FileProcessor):
         )
     
     def _process_file(self,
-                     file_data: bytes,
+                     file_data: FileData,
                      chunking_strategy: str = "basic",
                      filename: Optional[str] = None,
                      **params) -> List[Dict]:
@@ -53,7 +76,7 @@ class UnstructuredProcessor(FileProcessor):
         Core file processing method that uniformly processes files from byte data.
         
         Args:
-            file_data: File byte data
+            file_data: File byte data or seekable binary file
             chunking_strategy: Chunking strategy
             filename: Filename
             **params: Additional parameters
@@ -61,27 +84,171 @@ class UnstructuredProcessor(FileProcessor):
         Returns:
             List of standardized chunk dictionaries
         """
-        from unstructured.partition.auto import partition
-
         # Validate input parameters
         if not file_data:
             raise ValueError("Must provide binary file_data")
         
         # Merge parameters
         processed_params = self._merge_params(params)
-        
-        # Prepare partition parameters
-        partition_kwargs = self._prepare_partition_kwargs(
-            file_data, chunking_strategy, processed_params
-        )
-        
+
+        # Large paged documents are partitioned range by range
+        page_ranges = self._plan_page_ranges(file_data, filename, processed_params)
+        if page_ranges:
+            return self._process_page_ranges(
+                file_data, chunking_strategy, filename, processed_params, page_ranges
+            )
+
         # Execute file partitioning
-        elements = partition(**partition_kwargs)
+        elements = self._partition(file_data, chunking_strategy, processed_params)
         
         # Process results
         return self._process_elements(
             elements, chunking_strategy, filename
         )
+
+    def _partition(self,
+                   file_data: FileData,
+                   chunking_strategy: str,
+                   params: Dict,
+                   starting_page_number: Optional[int] = None) -> List:
+        """
+        Partition byte data with unstructured.
+
+        Args:
+            file_data: File byte data or seekable binary file
+            chunking_strategy: Chunking strategy
+            params: Merged processing parameters
+            starting_page_number: Page number of the first page, for page ranges of a larger document
+
+        Returns:
+            List of partitioned elements
+        """
+        from unstructured.partition.auto import partition
+
+        partition_kwargs = self._prepare_partition_kwargs(
+            file_data, chunking_strategy, params
+        )
+        if starting_page_number is not None:
+            partition_kwargs["starting_page_number"] = starting_page_number
+        return partition(**partition_kwargs)
+
+    def _plan_page_ranges(self, file_data: FileData, filename: Optional[str],
+                          params: Dict) -> List[Tuple[int, int]]:
+        """
+        Decide whether a document is split into page ranges.
+
+        Args:
+            file_data: File byte data or seekable binary file
+            filename: Filename, its extension tells whether the file is paged
+            params: Merged processing parameters
+
+        Returns:
+            Zero-based (start, end) page ranges, empty when the document is partitioned whole
+        """
+        extension = get_paged_extension(filename)
+        if not extension or not params.get("split_min_pages"):
+            return []
+        try:
+            page_count = count_pages(file_data, extension)
+        except Exception as e:
+            logger.warning(f"Cannot count pages of {filename}, partitioning it whole: {str(e)}")
+            return []
+        if page_count < params["split_min_pages"]:
+            return []
+        return plan_page_ranges(page_count, params["pages_per_range"])
+
+    def _process_page_ranges(self,
+                             file_data: FileData,
+                             chunking_strategy: str,
+                             filename: Optional[str],
+                             params: Dict,
+                             page_ranges: List[Tuple[int, int]]) -> List[Dict]:
+        """
+        Partition page ranges in parallel worker processes and merge them in document order.
+
+        At most split_max_workers ranges are extracted and in flight at a time, so memory is
+        bounded by the ranges being partitioned rather than by the whole document.
+
+        Args:
+            file_data: File byte data or seekable binary file
+            chunking_strategy: Chunking strategy
+            filename: Filename
+            params: Merged processing parameters
+            page_ranges: Zero-based (start, end) page ranges
+
+        Returns:
+            List of standardized document chunks, as if the document was partitioned whole
+        """
+        extension = get_paged_extension(filename)
+        max_workers = max(1, min(params["split_max_workers"], len(page_ranges)))
+        logger.info(f"Partitioning {filename} in {len(page_ranges)} page ranges with {max_workers} workers")
+
+        def range_args(start: int, end: int) -> Tuple:
+            return (extract_page_range(file_data, extension, start, end),
+                    chunking_strategy, filename, params, start + 1)
+
+        results: List[Optional[Tuple[List[Dict], int]]] = [None] * len(page_ranges)
+        if max_workers == 1:
+            for index, (start, end) in enumerate(page_ranges):
+                results[index] = _partition_page_range(*range_args(start, end))
+        else:
+            # Spawned workers do not inherit the state of the calling process, e.g. a Ray actor
+            context = multiprocessing.get_context("spawn")
+            pending_ranges = iter(enumerate(page_ranges))
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+                in_flight = {}
+
+                def submit_next() -> None:
+                    item = next(pending_ranges, None)
+                    if item is not None:
+                        index, (start, end) = item
+                        in_flight[executor.submit(_partition_page_range, *range_args(start, end))] = index
+
+                for _ in range(max_workers):
+                    submit_next()
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[in_flight.pop(future)] = future.result()
+                        submit_next()
+
+        return self._merge_range_results(results, chunking_strategy, filename)
+
+    def _merge_range_results(self, results: List[Tuple[List[Dict], int]], chunking_strategy: str,
+                             filename: Optional[str]) -> List[Dict]:
+        """
+        Merge the chunks of consecutive page ranges.
+
+        chunk_index counts the elements of the whole document, so the indices of each range are
+        shifted by the number of elements in the ranges before it.
+
+        Args:
+            results: Chunks and element count of every range, in document order
+            chunking_strategy: Chunking strategy
+            filename: Filename
+
+        Returns:
+            List of standardized document chunks
+        """
+        if chunking_strategy == "none":
+            docs = [doc for chunks, _ in results for doc in chunks]
+            merged = {
+                "content": "\n\n".join(doc["content"] for doc in docs if doc["content"]),
+                "filename": filename,
+            }
+            language = next((doc["language"] for doc in docs if doc.get("language")), None)
+            if language:
+                merged["language"] = language
+            return [merged]
+
+        merged_chunks = []
+        element_offset = 0
+        for chunks, element_count in results:
+            for chunk in chunks:
+                chunk["metadata"]["chunk_index"] += element_offset
+                merged_chunks.append(chunk)
+            element_offset += element_count
+        return merged_chunks
     
     def _merge_params(self, user_params: Dict) -> Dict:
         """
@@ -98,14 +265,14 @@ class UnstructuredProcessor(FileProcessor):
         return merged_params
     
     def _prepare_partition_kwargs(self,
-                                 file_data: bytes,
+                                 file_data: FileData,
                                  chunking_strategy: str,
                                  params: Dict) -> Dict:
         """
         Prepare parameters required for unstructured.partition.
         
         Args:
-            file_data: File byte data
+            file_data: File byte data or seekable binary file
             chunking_strategy: Chunking strategy
             params: Processing parameters
             
@@ -122,7 +289,7 @@ class UnstructuredProcessor(FileProcessor):
         }
         
         # Set file input source
-        partition_kwargs["file"] = io.BytesIO(file_data)
+        partition_kwargs["file"] = as_binary_stream(file_data)
         
         return partition_kwargs
     
@@ -1,15 +1,21 @@
 import time
+import random
+import hashlib
 import logging
 import threading
-from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Union
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from ..core.models.embedding_model import BaseEmbedding
-from .utils import format_size, format_timestamp, build_weighted_query
-from elasticsearch import Elasticsearch, exceptions
+from ..core.models.embedding_model import BaseEmbedding, EmbeddingCache, get_document_embedding_cache
+from .utils import format_size, format_timestamp, build_weighted_query, build_dense_vector_mapping, compute_chunk_id, \
+    compute_content_hash
+from elasticsearch import Elasticsearch, exceptions, helpers
 
-from ..core.nlp.tokenizer import calculate_term_weights
+from .term_statistics import IndexTermStatistics
+from ..core.nlp.tokenizer import calculate_term_weights, extract_query_terms
 
 logger = logging.getLogger("elasticsearch_core")
 
@@ -21,6 +27,145 @@ class BulkOperation:
     start_time: datetime
     expected_duration: timedelta
 
+
+@dataclass
+class IndexingStats:
+    """Per-stage throughput tracking for pipelined indexing"""
+    embedding_docs: int = 0
+    embedding_seconds: float = 0.0
+    bulk_docs: int = 0
+    bulk_seconds: float = 0.0
+    retries: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_embedding(self, docs: int, seconds: float):
+        with self._lock:
+            self.embedding_docs += docs
+            self.embedding_seconds += seconds
+
+    def add_bulk(self, docs: int, seconds: float):
+        with self._lock:
+            self.bulk_docs += docs
+            self.bulk_seconds += seconds
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def summary(self, wall_seconds: float) -> str:
+        """Format throughput of both stages, busy time is summed over concurrent workers"""
+        embedding_rate = self.embedding_docs / self.embedding_seconds if self.embedding_seconds > 0 else 0
+        bulk_rate = self.bulk_docs / self.bulk_seconds if self.bulk_seconds > 0 else 0
+        overall_rate = self.bulk_docs / wall_seconds if wall_seconds > 0 else 0
+        return (f"embedding: {self.embedding_docs} docs, {self.embedding_seconds:.2f}s busy, {embedding_rate:.1f} docs/s; "
+                f"bulk: {self.bulk_docs} docs, {self.bulk_seconds:.2f}s busy, {bulk_rate:.1f} docs/s; "
+                f"overall: {overall_rate:.1f} docs/s, retries: {self.retries}")
+
+
+@dataclass
+class BulkIndexReport:
+    """Per-item outcome of a streaming bulk write"""
+    success: int = 0
+    retried: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def add_error(self, action: Dict[str, Any], status: Optional[int], error: Any):
+        source = action.get("_source", {})
+        if isinstance(error, dict):
+            error_type = error.get("type")
+            error_reason = error.get("reason")
+            caused_by = error.get("caused_by")
+        else:
+            error_type, error_reason, caused_by = "exception", str(error), None
+        self.errors.append({
+            "id": source.get("id"),
+            "path_or_url": source.get("path_or_url"),
+            "status": status,
+            "type": error_type,
+            "reason": error_reason,
+            "caused_by": caused_by,
+        })
+
+
+@dataclass
+class KnnSearchProfile:
+    """Recall and latency knobs of the kNN query for a knowledge base"""
+    num_candidates_multiplier: float = 2.0  # Candidates examined per shard, relative to top_k
+    min_num_candidates: int = 0  # Lower bound so small top_k values still get a reasonable candidate pool
+    similarity: Optional[float] = None  # Drop hits below this vector similarity
+    path_or_url: List[str] = field(default_factory=list)  # Pre-filter, only search these documents
+    source_type: List[str] = field(default_factory=list)  # Pre-filter, only search these source types
+
+    # Elasticsearch rejects num_candidates above this value
+    MAX_NUM_CANDIDATES = 10000
+
+    def num_candidates(self, top_k: int) -> int:
+        candidates = max(int(top_k * self.num_candidates_multiplier), self.min_num_candidates, top_k)
+        return min(candidates, self.MAX_NUM_CANDIDATES)
+
+    def build_filter(self) -> List[Dict[str, Any]]:
+        """Filter clauses applied while the HNSW graph is explored, not after"""
+        filters = []
+        if self.path_or_url:
+            filters.append({"terms": {"path_or_url": self.path_or_url}})
+        if self.source_type:
+            filters.append({"terms": {"source_type": self.source_type}})
+        return filters
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "num_candidates_multiplier": self.num_candidates_multiplier,
+            "min_num_candidates": self.min_num_candidates,
+            "similarity": self.similarity,
+            "path_or_url": list(self.path_or_url),
+            "source_type": list(self.source_type),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnnSearchProfile":
+        known_fields = ("num_candidates_multiplier", "min_num_candidates", "similarity", "path_or_url", "source_type")
+        return cls(**{key: value for key, value in data.items() if key in known_fields and value is not None})
+
+
+# Named kNN profiles selectable per search, "default" keeps the historical top_k * 2 candidates
+KNN_SEARCH_PROFILES: Dict[str, KnnSearchProfile] = {
+    "default": KnnSearchProfile(),
+    "balanced": KnnSearchProfile(num_candidates_multiplier=5.0, min_num_candidates=50),
+    "high_recall": KnnSearchProfile(num_candidates_multiplier=10.0, min_num_candidates=100),
+}
+
+
+# Where hybrid search fuses the BM25 and kNN legs: auto picks the linear retriever when the cluster supports it
+HYBRID_FUSION_MODES = ("auto", "linear", "rrf", "python")
+
+# First Elasticsearch versions with GA support for each retriever
+_RETRIEVER_MIN_VERSIONS = {"rrf": (8, 16), "linear": (8, 18)}
+
+
+# Fields set per indexing request rather than by the content, ignored when diffing a document against its stored chunks
+INCREMENTAL_VOLATILE_FIELDS = frozenset({"id", "create_time", "date", "embedding"})
+
+
+def _is_retryable_status(status: Optional[int]) -> bool:
+    """Throttling and server side errors are worth retrying, other client errors are not"""
+    return status is None or status == 429 or status >= 500
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter, honoring a Retry-After header when the server sends one"""
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    delay = min(base * (2 ** attempt), cap)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
 class ElasticSearchCore:
     """
     Core class for Elasticsearch operations including:
@@ -39,6 +184,10 @@ class ElasticSearchCore:
         api_key: Optional[str],
         verify_certs: bool = False,
         ssl_show_warn: bool = False,
+        vector_index_type: Optional[str] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        hybrid_fusion: str = "auto",
     ):
         """
         Initialize ElasticSearchCore with Elasticsearch client and JinaEmbedding model.
@@ -48,6 +197,10 @@ class ElasticSearchCore:
             api_key: Elasticsearch API key (defaults to env variable)
             verify_certs: Whether to verify SSL certificates
             ssl_show_warn: Whether to show SSL warnings
+            vector_index_type: Default HNSW variant for new indices (hnsw, int8_hnsw, int4_hnsw, bbq_hnsw)
+            hnsw_m: Default HNSW graph connectivity for new indices
+            hnsw_ef_construction: Default HNSW build-time candidate list size for new indices
+            hybrid_fusion: Default fusion mode of hybrid search, one of HYBRID_FUSION_MODES
         """
         # Get credentials from environment if not provided
         self.host = host
@@ -75,16 +228,63 @@ class ElasticSearchCore:
         self.max_tokens_per_text = 8192
         self.max_total_tokens = 100000
         self.max_retries = 3  # Number of retries for failed embedding batches
+        self.embedding_concurrency = 4  # Embedding requests in flight while earlier batches are bulk-written
+
+        # Streaming bulk writer limits
+        self.bulk_chunk_size = 500  # Upper bound of documents per bulk request
+        self.bulk_max_chunk_bytes = 10 * 1024 * 1024  # Flush a bulk request once it reaches this size
+        self.bulk_thread_count = 2  # Bulk requests in flight
+        self.bulk_queue_size = 2  # Prepared bulk requests waiting for a free thread
+
+        # Default dense_vector index options for new indices, None keeps the Elasticsearch defaults
+        self.vector_index_type = vector_index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+
+        # Per-index kNN search profiles stored in the index _meta, cached to avoid a mapping lookup per query
+        self.search_profile_ttl = 300
+        self._search_profile_cache: Dict[str, Tuple[float, Optional[KnnSearchProfile]]] = {}
+        self._search_profile_lock = threading.Lock()
+
+        # Server-side hybrid fusion, modes rejected by the cluster (old version, license) fall back to Python fusion
+        if hybrid_fusion not in HYBRID_FUSION_MODES:
+            raise ValueError(f"Unsupported hybrid fusion mode '{hybrid_fusion}', expected one of {', '.join(HYBRID_FUSION_MODES)}")
+        self.hybrid_fusion = hybrid_fusion
+        self.hybrid_rank_window_multiplier = 5  # Candidates fused per leg, relative to top_k
+        self._cluster_version: Optional[Tuple[int, int]] = None
+        self._unsupported_fusion_modes = set()
+
+        # Corpus statistics for IDF weighting of accurate search terms
+        self.term_statistics = IndexTermStatistics(self.client)
+        self.use_term_statistics = True
+        self.idf_max_doc_freq_ratio = 0.5  # Terms found in more than this share of documents are dropped from the query
+
+        # Vectors of chunk texts already embedded by the same model are reused instead of embedded again
+        self.document_embedding_cache: Optional[EmbeddingCache] = get_document_embedding_cache()
+
+        # Worker threads used to overlap query embedding with query building in hybrid search
+        self._search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="es_search")
 
     # ---- INDEX MANAGEMENT ----
     
-    def create_vector_index(self, index_name: str, embedding_dim: Optional[int] = None) -> bool:
+    def create_vector_index(
+        self,
+        index_name: str,
+        embedding_dim: Optional[int] = None,
+        index_type: Optional[str] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+    ) -> bool:
         """
         Create a new vector search index with appropriate mappings in a celery-friendly way.
         
         Args:
             index_name: Name of the index to create
             embedding_dim: Dimension of the embedding vectors (optional, will use model's dim if not provided)
+            index_type: HNSW variant of the embedding field, defaults to vector_index_type.
+                int8_hnsw, int4_hnsw and bbq_hnsw trade some recall for 4x, 8x and 32x less vector memory
+            m: HNSW graph connectivity, defaults to hnsw_m
+            ef_construction: HNSW build-time candidate list size, defaults to hnsw_ef_construction
             
         Returns:
             bool: True if creation was successful
@@ -92,67 +292,19 @@ class ElasticSearchCore:
         try:
             # Use provided embedding_dim or get from model
             actual_embedding_dim = embedding_dim or 1024
-            
-            # Use balanced fixed settings to avoid dynamic adjustment
-            settings = {
-                "number_of_shards": 1,
-                "number_of_replicas": 0,
-                "refresh_interval": "5s",
-                "index": {
-                    "max_result_window": 50000,
-                    "translog": {
-                        "durability": "async",
-                        "sync_interval": "5s"
-                    },
-                    "write": {
-                        "wait_for_active_shards": "1"
-                    },
-                    # Memory optimization for bulk operations
-                    "merge": {
-                        "policy": {
-                            "max_merge_at_once": 5,
-                            "segments_per_tier": 5
-                        }
-                    }
-                }
-            }
 
             # Check if index already exists
             if self.client.indices.exists(index=index_name):
                 logger.info(f"Index {index_name} already exists, skipping creation")
                 self._ensure_index_ready(index_name)
                 return True
-                
-            # Define the mapping with vector field
-            mappings = {
-                "properties": {
-                    "id": {"type": "keyword"},
-                    "title": {"type": "text"},
-                    "filename": {"type": "keyword"},
-                    "path_or_url": {"type": "keyword"},
-                    "language": {"type": "keyword"},
-                    "author": {"type": "keyword"},
-                    "date": {"type": "date"},
-                    "content": {"type": "text"},
-                    "process_source": {"type": "keyword"},
-                    "embedding_model_name": {"type": "keyword"},
-                    "file_size": {"type": "long"},
-                    "create_time": {"type": "date"},
-                    "embedding": {
-                        "type": "dense_vector",
-                        "dims": actual_embedding_dim,
-                        "index": "true",
-                        "similarity": "cosine",
-                    },
-                }
-            }
-            
-            # Create the index with the defined mappings
-            self.client.indices.create(
-                index=index_name,
-                mappings=mappings,
-                settings=settings,
-                wait_for_active_shards="1"
+
+            self._create_index_with_mappings(
+                index_name,
+                actual_embedding_dim,
+                index_type or self.vector_index_type,
+                m or self.hnsw_m,
+                ef_construction or self.hnsw_ef_construction,
             )
 
             # Force refresh to ensure visibility
@@ -174,6 +326,176 @@ class ElasticSearchCore:
             logger.error(f"Error creating index: {str(e)}")
             return False
 
+    def _create_index_with_mappings(
+        self,
+        index_name: str,
+        embedding_dim: int,
+        index_type: Optional[str],
+        m: Optional[int],
+        ef_construction: Optional[int],
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Create an index with the knowledge base settings and mappings, raises if the vector options are invalid.
+        meta is stored as the mapping _meta, e.g. the kNN search profile of the index.
+        """
+        # Use balanced fixed settings to avoid dynamic adjustment
+        settings = {
+            "number_of_shards": 1,
+            "number_of_replicas": 0,
+            "refresh_interval": "5s",
+            "index": {
+                "max_result_window": 50000,
+                "translog": {
+                    "durability": "async",
+                    "sync_interval": "5s"
+                },
+                "write": {
+                    "wait_for_active_shards": "1"
+                },
+                # Memory optimization for bulk operations
+                "merge": {
+                    "policy": {
+                        "max_merge_at_once": 5,
+                        "segments_per_tier": 5
+                    }
+                }
+            }
+        }
+
+        # Define the mapping with vector field
+        mappings = {
+            "properties": {
+                "id": {"type": "keyword"},
+                "title": {"type": "text"},
+                "filename": {"type": "keyword"},
+                "path_or_url": {"type": "keyword"},
+                "source_type": {"type": "keyword"},
+                "language": {"type": "keyword"},
+                "author": {"type": "keyword"},
+                "date": {"type": "date"},
+                "content": {"type": "text"},
+                "process_source": {"type": "keyword"},
+                "embedding_model_name": {"type": "keyword"},
+                "content_hash": {"type": "keyword"},
+                "file_size": {"type": "long"},
+                "create_time": {"type": "date"},
+                "embedding": build_dense_vector_mapping(embedding_dim, index_type, m, ef_construction),
+            }
+        }
+        if meta:
+            mappings["_meta"] = meta
+
+        # Create the index with the defined mappings
+        self.client.indices.create(
+            index=index_name,
+            mappings=mappings,
+            settings=settings,
+            wait_for_active_shards="1"
+        )
+
+    def migrate_vector_index(
+        self,
+        index_name: str,
+        index_type: str,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        timeout: int = 3600,
+    ) -> Dict[str, Any]:
+        """
+        Rebuild an existing index with new dense_vector index options via reindex.
+        Documents are copied to a staging index, the original index is recreated with the new mapping and the
+        documents are copied back, so the index keeps its name. Writes to the index are blocked from the first copy
+        on, so no document written during the migration is lost, and the index is unavailable while it is recreated.
+        The mapping _meta, e.g. the kNN search profile, is carried over. If the first copy fails the write block is
+        lifted again, if a later step fails the staging index is kept so no data is lost.
+
+        Args:
+            index_name: Name of the index to migrate
+            index_type: Target HNSW variant (hnsw, int8_hnsw, int4_hnsw, bbq_hnsw)
+            m: HNSW graph connectivity
+            ef_construction: HNSW build-time candidate list size
+            timeout: Maximum seconds to wait for each reindex pass
+
+        Returns:
+            Dict[str, Any]: Migration summary with the number of documents copied
+        """
+        mapping = self.client.indices.get_mapping(index=index_name)
+        meta = mapping[index_name]["mappings"].get("_meta")
+        embedding_mapping = mapping[index_name]["mappings"].get("properties", {}).get("embedding", {})
+        embedding_dim = embedding_mapping.get("dims")
+        if not embedding_dim:
+            raise ValueError(f"Index {index_name} has no indexed embedding field to migrate")
+        # Validate the target options before touching any data
+        build_dense_vector_mapping(embedding_dim, index_type, m, ef_construction)
+
+        staging_index = f"{index_name}_vector_migration"
+        if self.client.indices.exists(index=staging_index):
+            raise Exception(f"Staging index {staging_index} already exists, a previous migration may have failed")
+
+        start_time = time.time()
+        logger.info(f"Migrating vector index {index_name} to {index_type} (m={m}, ef_construction={ef_construction})")
+
+        # Documents written after the copy starts would not be copied, block writes until the index is recreated
+        self.client.indices.put_settings(index=index_name, settings={"index.blocks.write": True})
+        try:
+            self._create_index_with_mappings(staging_index, embedding_dim, index_type, m, ef_construction)
+            copied = self._reindex(index_name, staging_index, timeout)
+            source_count = self.client.count(index=index_name)["count"]
+            if copied != source_count:
+                raise Exception(f"Reindex copied {copied} of {source_count} documents into {staging_index}, keeping {index_name} unchanged")
+        except Exception:
+            self.client.indices.put_settings(index=index_name, settings={"index.blocks.write": False})
+            raise
+
+        self.client.indices.delete(index=index_name)
+        self._create_index_with_mappings(index_name, embedding_dim, index_type, m, ef_construction, meta)
+        with self._search_profile_lock:
+            self._search_profile_cache.pop(index_name, None)
+        restored = self._reindex(staging_index, index_name, timeout)
+        if restored != copied:
+            raise Exception(f"Reindex restored {restored} of {copied} documents into {index_name}, keeping {staging_index} for recovery")
+
+        self.client.indices.delete(index=staging_index)
+        self._ensure_index_ready(index_name)
+
+        elapsed = time.time() - start_time
+        logger.info(f"Migrated {restored} documents of {index_name} to {index_type} in {elapsed:.2f}s")
+        return {
+            "index_name": index_name,
+            "index_type": index_type,
+            "m": m,
+            "ef_construction": ef_construction,
+            "documents": restored,
+            "seconds": round(elapsed, 2),
+        }
+
+    def _reindex(self, source_index: str, dest_index: str, timeout: int) -> int:
+        """Run a sliced reindex as a background task and poll until it completes, returns the documents created"""
+        task = self.client.reindex(
+            source={"index": source_index},
+            dest={"index": dest_index, "op_type": "create"},
+            slices="auto",
+            refresh=True,
+            wait_for_completion=False,
+        )
+        task_id = task["task"]
+        deadline = time.time() + timeout
+        while True:
+            status = self.client.tasks.get(task_id=task_id)
+            if status.get("completed"):
+                break
+            if time.time() > deadline:
+                raise TimeoutError(f"Reindex from {source_index} to {dest_index} did not finish within {timeout}s (task {task_id})")
+            time.sleep(2)
+
+        if status.get("error"):
+            raise Exception(f"Reindex from {source_index} to {dest_index} failed: {status['error']}")
+        response = status.get("response", {})
+        if response.get("failures"):
+            raise Exception(f"Reindex from {source_index} to {dest_index} failed: {response['failures'][0]}")
+        return response.get("created", 0)
+
     def _force_refresh_with_retry(self, index_name: str, max_retries: int = 3) -> bool:
         """
         Force refresh with retry - synchronous version
@@ -302,6 +624,7 @@ class ElasticSearchCore:
         """
         try:
             self.client.indices.delete(index=index_name)
+            self.term_statistics.invalidate(index_name)
             logger.info(f"Successfully deleted the index: {index_name}")
             return True
         except exceptions.NotFoundError:
@@ -337,7 +660,8 @@ class ElasticSearchCore:
         embedding_model: BaseEmbedding,
         documents: List[Dict[str, Any]],
         batch_size: int = 64,
-        content_field: str = "content"
+        content_field: str = "content",
+        position_offset: Optional[int] = None
     ) -> int:
         """
         Smart batch insertion - automatically selecting strategy based on data size
@@ -348,6 +672,9 @@ class ElasticSearchCore:
             documents: List of document dictionaries
             batch_size: Number of documents to process at once
             content_field: Field to use for generating embeddings
+            position_offset: Position of the first document in its file when a file is indexed in pages, 0 when
+                not set. Documents get deterministic IDs from file, position, content and model (see
+                compute_chunk_id), so indexing them again, or retrying a bulk request, overwrites them
             
         Returns:
             int: Number of documents successfully indexed
@@ -358,18 +685,33 @@ class ElasticSearchCore:
         if not documents:
             return 0
 
+        documents = [
+            {**doc, "id": compute_chunk_id(doc.get("path_or_url"), position, doc.get(content_field),
+                                           doc.get("embedding_model_name"))}
+            for position, doc in enumerate(documents, start=position_offset or 0)
+        ]
+        id_field = "id"
+
         # Smart strategy selection
         total_docs = len(documents)
         if total_docs < 64:
             # Small data: direct insertion, using wait_for refresh
-            return self._small_batch_insert(index_name, documents, content_field, embedding_model)
+            indexed = self._small_batch_insert(index_name, documents, content_field, embedding_model, id_field)
         else:
             # Large data: using context manager
             estimated_duration = max(60, total_docs // 100)
             with self.bulk_operation_context(index_name, estimated_duration):
-                return self._large_batch_insert(index_name, documents, batch_size, content_field, embedding_model)
+                indexed = self._large_batch_insert(index_name, documents, batch_size, content_field, embedding_model,
+                                                   id_field)
 
-    def _small_batch_insert(self, index_name: str, documents: List[Dict[str, Any]], content_field: str, embedding_model:BaseEmbedding) -> int:
+        # Document frequencies changed, recompute them on the next search
+        self.term_statistics.invalidate(index_name)
+        if self.document_embedding_cache is not None and self.document_embedding_cache.enabled:
+            logger.info(f"Document embedding cache: {self.document_embedding_cache.stats()}")
+        return indexed
+
+    def _small_batch_insert(self, index_name: str, documents: List[Dict[str, Any]], content_field: str, embedding_model:BaseEmbedding,
+                            id_field: Optional[str] = None) -> int:
         """Small batch insertion: real-time"""
         try:
             # Preprocess documents
@@ -377,134 +719,310 @@ class ElasticSearchCore:
             
             # Get embeddings
             inputs = [doc[content_field] for doc in processed_docs]
-            embeddings = embedding_model.get_embeddings(inputs)
-
-            # Prepare bulk operations
-            operations = []
-            for doc, embedding in zip(processed_docs, embeddings):
-                operations.append({"index": {"_index": index_name}})
-                doc["embedding"] = embedding
-                if "embedding_model_name" not in doc:
-                    doc["embedding_model_name"] = embedding_model.embedding_model_name
-                operations.append(doc)
-
-            # Execute bulk insertion, wait for refresh to complete
-            response = self.client.bulk(
-                index=index_name,
-                operations=operations,
-                refresh='wait_for'
-            )
+            embeddings = self._get_document_embeddings(embedding_model, inputs)
 
-            # Handle errors
-            self._handle_bulk_errors(response)
+            # Stream index actions, wait for refresh to complete
+            actions = self._iter_index_actions(index_name, zip(processed_docs, embeddings), embedding_model, id_field)
+            report = self.stream_bulk_index(index_name, actions, refresh='wait_for')
 
-            logger.info(f"Small batch insert completed: {len(documents)} chunks indexed.")
-            return len(documents)
+            logger.info(f"Small batch insert completed: {report.success}/{len(documents)} chunks indexed.")
+            return report.success
             
         except Exception as e:
             logger.error(f"Small batch insert failed: {e}")
             return 0
 
-    def _large_batch_insert(self, index_name: str, documents: List[Dict[str, Any]], batch_size: int, content_field: str, embedding_model: BaseEmbedding) -> int:
+    def _large_batch_insert(self, index_name: str, documents: List[Dict[str, Any]], batch_size: int, content_field: str, embedding_model: BaseEmbedding,
+                            id_field: Optional[str] = None) -> int:
         """
-        Large batch insertion with sub-batching for embedding API.
-        Splits large document batches into smaller chunks to respect embedding API limits before bulk inserting into Elasticsearch.
+        Large batch insertion with a pipelined embedding and bulk indexing stage.
+        Up to embedding_concurrency ES batches are embedded concurrently while earlier batches are streamed to the bulk writer,
+        so the total time is bounded by the slower of the embedding API and Elasticsearch instead of their sum.
         """
         try:
             processed_docs = self._preprocess_documents(documents, content_field)
-            total_indexed = 0
             total_docs = len(processed_docs)
-            es_total_batches = (total_docs + batch_size - 1) // batch_size
+            es_batches = [processed_docs[i:i + batch_size] for i in range(0, total_docs, batch_size)]
+            es_total_batches = len(es_batches)
+            stats = IndexingStats()
+            embedding_wait = [0.0]
             start_time = time.time()
 
             logger.info(
-                f"=== [INDEXING START] Total chunks: {total_docs}, ES batch size: {batch_size}, Total ES batches: {es_total_batches} ===")
-
-            for i in range(0, total_docs, batch_size):
-                es_batch = processed_docs[i:i + batch_size]
-                es_batch_num = i // batch_size + 1
-                es_batch_start_time = time.time()
-
-                # Store documents and their embeddings for this Elasticsearch batch
-                doc_embedding_pairs = []
-
-                # Sub-batch for embedding API
-                embedding_batch_size = 64
-                for j in range(0, len(es_batch), embedding_batch_size):
-                    embedding_sub_batch = es_batch[j:j + embedding_batch_size]
-                    # Retry logic for embedding API call (3 retries, 1s delay)
-                    # Note: embedding_model.get_embeddings() already has built-in retries with exponential backoff
-                    # This outer retry handles additional failures
-                    max_retries = 3
-                    retry_delay = 1.0
-                    success = False
-
-                    for retry_attempt in range(max_retries):
-                        try:
-                            inputs = [doc[content_field]
-                                      for doc in embedding_sub_batch]
-                            embeddings = embedding_model.get_embeddings(inputs)
-
-                            for doc, embedding in zip(embedding_sub_batch, embeddings):
-                                doc_embedding_pairs.append((doc, embedding))
-
-                            success = True
-                            break  # Success, exit retry loop
-
-                        except Exception as e:
-                            if retry_attempt < max_retries - 1:
-                                logger.warning(
-                                    f"Embedding API error (attempt {retry_attempt + 1}/{max_retries}): {e}, ES batch num: {es_batch_num}, sub-batch start: {j}, size: {len(embedding_sub_batch)}. Retrying in {retry_delay}s...")
-                                time.sleep(retry_delay)
-                            else:
-                                logger.error(
-                                    f"Embedding API error after {max_retries} attempts: {e}, ES batch num: {es_batch_num}, sub-batch start: {j}, size: {len(embedding_sub_batch)}")
-
-                    if not success:
-                        # Skip this sub-batch after all retries failed
+                f"=== [INDEXING START] Total chunks: {total_docs}, ES batch size: {batch_size}, Total ES batches: {es_total_batches}, Embedding concurrency: {self.embedding_concurrency} ===")
+
+            def embedded_pairs(executor: ThreadPoolExecutor) -> Iterator[Tuple[Dict[str, Any], List[float]]]:
+                # Bound the number of embedded batches waiting for the bulk writer to cap memory
+                max_pending = self.embedding_concurrency * 2
+                pending = deque()
+                next_batch = 0
+                while next_batch < es_total_batches or pending:
+                    while next_batch < es_total_batches and len(pending) < max_pending:
+                        es_batch_num = next_batch + 1
+                        future = executor.submit(self._embed_es_batch, es_batches[next_batch], content_field,
+                                                 embedding_model, es_batch_num, stats)
+                        pending.append((es_batch_num, future))
+                        next_batch += 1
+
+                    # Batches are handed to the writer in submission order while later ones keep embedding
+                    es_batch_num, future = pending.popleft()
+                    wait_start_time = time.time()
+                    doc_embedding_pairs = future.result()
+                    embedding_wait[0] += time.time() - wait_start_time
+
+                    if not doc_embedding_pairs:
+                        logger.warning(f"No documents with embeddings to index for ES batch {es_batch_num}")
                         continue
-                
-                # Perform a single bulk insert for the entire Elasticsearch batch
-                if not doc_embedding_pairs:
-                    logger.warning(f"No documents with embeddings to index for ES batch {es_batch_num}")
-                    continue
-
-                operations = []
-                for doc, embedding in doc_embedding_pairs:
-                    operations.append({"index": {"_index": index_name}})
-                    doc["embedding"] = embedding
-                    if "embedding_model_name" not in doc:
-                        doc["embedding_model_name"] = getattr(embedding_model, 'embedding_model_name', 'unknown')
-                    operations.append(doc)
-
-                try:
-                    response = self.client.bulk(
-                        index=index_name,
-                        operations=operations,
-                        refresh=False
-                    )
-                    self._handle_bulk_errors(response)
-                    total_indexed += len(doc_embedding_pairs)
-                    es_batch_elapsed = time.time() - es_batch_start_time
                     logger.info(
-                        f"[ES BATCH {es_batch_num}/{es_total_batches}] Indexed {len(doc_embedding_pairs)} documents in {es_batch_elapsed:.2f}s. Total progress: {total_indexed}/{total_docs}")
+                        f"[ES BATCH {es_batch_num}/{es_total_batches}] Embedded {len(doc_embedding_pairs)} documents, streaming to bulk writer")
+                    yield from doc_embedding_pairs
 
-                except Exception as e:
-                    logger.error(f"Bulk insert error: {e}, ES batch num: {es_batch_num}")
-                    continue
-                
-                # Add 0.1s delay between batches to avoid overloading embedding API
-                time.sleep(0.1)
+            with ThreadPoolExecutor(max_workers=self.embedding_concurrency, thread_name_prefix="es_embedding") as executor:
+                actions = self._iter_index_actions(index_name, embedded_pairs(executor), embedding_model, id_field)
+                report = self.stream_bulk_index(index_name, actions)
 
             self._force_refresh_with_retry(index_name)
             total_elapsed = time.time() - start_time
+            # The writer is busy whenever it is not waiting for the next embedded batch
+            stats.add_bulk(report.success, max(total_elapsed - embedding_wait[0], 0.0))
             logger.info(
-                f"=== [INDEXING COMPLETE] Successfully indexed {total_indexed}/{total_docs} chunks in {total_elapsed:.2f}s (avg: {total_elapsed/es_total_batches:.2f}s/batch) ===")
-            return total_indexed
+                f"=== [INDEXING COMPLETE] Successfully indexed {report.success}/{total_docs} chunks in {total_elapsed:.2f}s (avg: {total_elapsed/max(es_total_batches, 1):.2f}s/batch) ===")
+            logger.info(f"[INDEXING THROUGHPUT] {stats.summary(total_elapsed)}")
+            return report.success
         except Exception as e:
             logger.error(f"Large batch insert failed: {e}")
             return 0
 
+    def _embed_es_batch(self, es_batch: List[Dict[str, Any]], content_field: str, embedding_model: BaseEmbedding,
+                        es_batch_num: int, stats: IndexingStats) -> List[Tuple[Dict[str, Any], List[float]]]:
+        """
+        Embed one ES batch in sub-batches that respect the embedding API limits.
+        Throttling and server errors are retried with exponential backoff, failed sub-batches are skipped.
+        """
+        doc_embedding_pairs = []
+        embedding_batch_size = 64
+        for j in range(0, len(es_batch), embedding_batch_size):
+            embedding_sub_batch = es_batch[j:j + embedding_batch_size]
+            inputs = [doc[content_field] for doc in embedding_sub_batch]
+
+            # Note: embedding_model.get_embeddings() already has built-in retries on timeout
+            # This outer retry handles throttling and server errors
+            for retry_attempt in range(self.max_retries):
+                try:
+                    sub_batch_start_time = time.time()
+                    embeddings = self._get_document_embeddings(embedding_model, inputs)
+                    stats.add_embedding(len(embedding_sub_batch), time.time() - sub_batch_start_time)
+                    doc_embedding_pairs.extend(zip(embedding_sub_batch, embeddings))
+                    break
+
+                except Exception as e:
+                    response = getattr(e, "response", None)
+                    status = getattr(response, "status_code", None)
+                    if retry_attempt < self.max_retries - 1 and _is_retryable_status(status):
+                        retry_after = response.headers.get("Retry-After") if response is not None and getattr(response, "headers", None) else None
+                        retry_delay = _backoff_delay(retry_attempt, retry_after)
+                        stats.add_retry()
+                        logger.warning(
+                            f"Embedding API error (attempt {retry_attempt + 1}/{self.max_retries}): {e}, ES batch num: {es_batch_num}, sub-batch start: {j}, size: {len(embedding_sub_batch)}. Retrying in {retry_delay:.2f}s...")
+                        time.sleep(retry_delay)
+                    else:
+                        logger.error(
+                            f"Embedding API error after {retry_attempt + 1} attempts: {e}, ES batch num: {es_batch_num}, sub-batch start: {j}, size: {len(embedding_sub_batch)}")
+                        break
+
+        return doc_embedding_pairs
+
+    def _get_document_embeddings(self, embedding_model: BaseEmbedding, inputs: List[str]) -> List[List[float]]:
+        """
+        Embed chunk texts, taking the vectors of texts the same model embedded before from the document
+        embedding cache. Only the distinct uncached texts are sent to the embedding API.
+        """
+        cache = self.document_embedding_cache
+        model_name = getattr(embedding_model, "model", None)
+        if cache is None or not cache.enabled or not isinstance(model_name, str):
+            return embedding_model.get_embeddings(inputs)
+
+        keys = [EmbeddingCache.make_key(model_name, getattr(embedding_model, "api_url", ""),
+                                        getattr(embedding_model, "embedding_dim", None), text) for text in inputs]
+        vectors = [cache.get(key) for key in keys]
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, inputs, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if not missing:
+            return vectors
+
+        embeddings = embedding_model.get_embeddings(list(missing.values()))
+        if len(embeddings) != len(missing):
+            raise ValueError(f"Embedding API returned {len(embeddings)} vectors for {len(missing)} texts")
+        computed = dict(zip(missing, embeddings))
+        for key, vector in computed.items():
+            cache.set(key, vector)
+        return [vector if vector is not None else computed[key] for key, vector in zip(keys, vectors)]
+
+    def get_embedding_cache_metrics(self) -> Dict[str, Any]:
+        """Size and hit rate of the document embedding cache"""
+        if self.document_embedding_cache is None:
+            return {"enabled": False}
+        return {"enabled": self.document_embedding_cache.enabled, **self.document_embedding_cache.stats()}
+
+    @staticmethod
+    def _iter_index_actions(index_name: str, doc_embedding_pairs: Iterable[Tuple[Dict[str, Any], List[float]]],
+                            embedding_model: BaseEmbedding, id_field: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily turn (document, embedding) pairs into bulk index actions, using doc[id_field] as _id if set"""
+        for doc, embedding in doc_embedding_pairs:
+            doc["embedding"] = embedding
+            if "embedding_model_name" not in doc:
+                doc["embedding_model_name"] = getattr(embedding_model, 'embedding_model_name', 'unknown')
+            action = {"_index": index_name, "_source": doc}
+            # The id stays in _source as well, search results and hybrid fusion read it from there
+            if id_field and doc.get(id_field):
+                action["_id"] = doc[id_field]
+            yield action
+
+    # ---- STREAMING BULK WRITER ----
+
+    def stream_bulk_index(self, index_name: str, actions: Iterable[Dict[str, Any]], refresh: Any = False) -> BulkIndexReport:
+        """
+        Stream bulk actions to Elasticsearch without materializing them.
+
+        Requests are cut by byte size (bulk_max_chunk_bytes), bulk_thread_count requests are kept in flight,
+        and only items rejected with a retryable status (429/5xx, or the items of a request that failed to
+        connect) are sent again. Index actions are given an _id before they are first sent, so a resend overwrites.
+
+        Args:
+            index_name: Name of the index to write to
+            actions: Iterable of bulk actions, e.g. {"_index": index_name, "_source": document}
+            refresh: Refresh policy passed to every bulk request
+
+        Returns:
+            BulkIndexReport: Number of indexed documents and one error entry per failed document
+        """
+        report = BulkIndexReport()
+        retry_actions = self._write_bulk_actions(index_name, actions, report, refresh)
+
+        for attempt in range(self.max_retries):
+            if not retry_actions:
+                break
+            retry_delay = _backoff_delay(attempt)
+            logger.warning(f"Retrying {len(retry_actions)} rejected bulk items for {index_name} in {retry_delay:.2f}s "
+                           f"(attempt {attempt + 1}/{self.max_retries})")
+            time.sleep(retry_delay)
+            report.retried += len(retry_actions)
+            retry_actions = self._write_bulk_actions(
+                index_name, [action for action, _, _ in retry_actions], report, refresh)
+
+        for action, status, error in retry_actions:
+            report.add_error(action, status, error)
+
+        self._log_bulk_report(index_name, report)
+        return report
+
+    def _iter_bulk_chunks(self, actions: Iterable[Dict[str, Any]]
+                          ) -> Iterator[Tuple[List[Dict[str, Any]], List[bytes]]]:
+        """
+        Cut actions into bulk requests of at most bulk_chunk_size actions and bulk_max_chunk_bytes bytes.
+
+        Index actions without an _id get one derived from their serialized document before they are first sent,
+        so resending a request that may already have been applied overwrites its documents instead of adding copies.
+
+        Yields:
+            The actions of each request and their serialized bulk lines
+        """
+        serializer = self.client.transport.serializers.get_serializer("application/json")
+        chunk_actions: List[Dict[str, Any]] = []
+        operations: List[bytes] = []
+        chunk_bytes = 0
+        for action in actions:
+            header, body = helpers.expand_action(action)
+            lines = [serializer.dumps(body)] if body is not None else []
+            op_type = next(iter(header))
+            if op_type in ("index", "create") and "_id" not in header[op_type]:
+                action["_id"] = hashlib.sha256(
+                    f"{header[op_type].get('_index', '')}\x1f".encode("utf-8") + lines[0]).hexdigest()
+                header[op_type]["_id"] = action["_id"]
+            lines.insert(0, serializer.dumps(header))
+            size = sum(len(line) + 1 for line in lines)
+
+            if chunk_actions and (len(chunk_actions) >= self.bulk_chunk_size
+                                  or chunk_bytes + size > self.bulk_max_chunk_bytes):
+                yield chunk_actions, operations
+                chunk_actions, operations, chunk_bytes = [], [], 0
+            chunk_actions.append(action)
+            operations.extend(lines)
+            chunk_bytes += size
+        if chunk_actions:
+            yield chunk_actions, operations
+
+    def _write_bulk_actions(self, index_name: str, actions: Iterable[Dict[str, Any]], report: BulkIndexReport,
+                            refresh: Any) -> List[Tuple[Dict[str, Any], Optional[int], Any]]:
+        """
+        Send actions in bulk requests, bulk_thread_count at a time, recording successes and permanent failures
+        in the report.
+
+        Requests are cut here rather than by parallel_bulk, so a connection failure only puts the items of the
+        failed request up for retry while later requests keep streaming.
+
+        Returns:
+            The actions that failed with a retryable status, with their status and error
+        """
+        retry_actions = []
+        # Requests in flight plus prepared requests waiting for a free thread, to cap memory
+        max_in_flight = self.bulk_thread_count + self.bulk_queue_size
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=self.bulk_thread_count, thread_name_prefix="es_bulk") as executor:
+            for chunk_actions, operations in self._iter_bulk_chunks(actions):
+                future = executor.submit(self.client.bulk, operations=operations, refresh=refresh)
+                in_flight.append((chunk_actions, future))
+                if len(in_flight) >= max_in_flight:
+                    self._collect_bulk_chunk(index_name, *in_flight.popleft(), report, retry_actions)
+            while in_flight:
+                self._collect_bulk_chunk(index_name, *in_flight.popleft(), report, retry_actions)
+        return retry_actions
+
+    @staticmethod
+    def _collect_bulk_chunk(index_name: str, chunk_actions: List[Dict[str, Any]], future, report: BulkIndexReport,
+                            retry_actions: List[Tuple[Dict[str, Any], Optional[int], Any]]) -> None:
+        """Record the outcome of every item of one bulk request"""
+        try:
+            items = future.result().body["items"]
+        except exceptions.ApiError as e:
+            # The whole request was rejected, e.g. with 429 when the bulk thread pool of the cluster is full
+            status = e.meta.status if e.meta is not None else None
+            for action in chunk_actions:
+                if _is_retryable_status(status):
+                    retry_actions.append((action, status, str(e)))
+                else:
+                    report.add_error(action, status, str(e))
+            return
+        except exceptions.TransportError as e:
+            # Only the items of the failed request are retried, they carry an _id so a resend cannot duplicate them
+            logger.warning(f"Bulk connection error on {index_name}, {len(chunk_actions)} items will be retried: {e}")
+            retry_actions.extend((action, None, str(e)) for action in chunk_actions)
+            return
+
+        for action, entry in zip(chunk_actions, items):
+            op_type, item = next(iter(entry.items()))
+            status = item.get("status", 500)
+            # Version conflicts mean the document is already there, a missing document is already deleted
+            if 200 <= status < 300 or status == 409 or (status == 404 and op_type == "delete"):
+                report.success += 1
+            elif _is_retryable_status(status):
+                retry_actions.append((action, status, item.get("error")))
+            else:
+                report.add_error(action, status, item.get("error"))
+
+    @staticmethod
+    def _log_bulk_report(index_name: str, report: BulkIndexReport) -> None:
+        """Log failed bulk items"""
+        for error in report.errors:
+            logger.error(f"FATAL ERROR {error['type']}: {error['reason']} (doc id: {error['id']}, status: {error['status']})")
+            caused_by = error.get("caused_by")
+            if caused_by:
+                logger.error(f"Caused By: {caused_by.get('type')}: {caused_by.get('reason')}")
+        if report.errors:
+            logger.warning(f"Bulk write to {index_name} finished with {report.success} indexed, {report.failed} failed")
+
     def _preprocess_documents(self, documents: List[Dict[str, Any]], content_field: str) -> List[Dict[str, Any]]:
         """Ensure all documents have the required fields and set default values"""
         current_time = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
@@ -535,28 +1053,89 @@ class ElasticSearchCore:
             if not doc_copy.get("id"):
                 doc_copy["id"] = f"{int(time.time())}_{hash(doc_copy[content_field])}"[:20]
 
+            # Content hash lets an updated document be diffed against the chunks already indexed
+            if not doc_copy.get("content_hash"):
+                doc_copy["content_hash"] = compute_content_hash(doc_copy[content_field])
+
             processed_docs.append(doc_copy)
 
         return processed_docs
 
-    def _handle_bulk_errors(self, response: Dict[str, Any]) -> None:
-        """Handle bulk operation errors"""
-        if response.get('errors'):
-            for item in response['items']:
-                if 'error' in item.get('index', {}):
-                    error_info = item['index']['error']
-                    error_type = error_info.get('type')
-                    error_reason = error_info.get('reason')
-                    error_cause = error_info.get('caused_by', {})
-
-                    if error_type == 'version_conflict_engine_exception':
-                        # ignore version conflict
-                        continue
-                    else:
-                        logger.error(f"FATAL ERROR {error_type}: {error_reason}")
-                        if error_cause:
-                            logger.error(f"Caused By: {error_cause.get('type')}: {error_cause.get('reason')}")
-    
+    def update_documents_by_path_or_url(
+        self,
+        index_name: str,
+        embedding_model: BaseEmbedding,
+        path_or_url: str,
+        documents: List[Dict[str, Any]],
+        batch_size: int = 64,
+        content_field: str = "content"
+    ) -> Dict[str, int]:
+        """
+        Replace the chunks of a document with a new version, embedding only the chunks whose content changed.
+
+        Stored chunks are matched to the new ones by content hash and embedding model. A matched chunk keeps its
+        vector and only gets its changed metadata fields updated, chunks without a stored match are embedded and
+        indexed, and stored chunks left without a new match are deleted. New chunks are indexed before the stale
+        ones are deleted, so the document never disappears from search.
+
+        Args:
+            index_name: Name of the index holding the document
+            embedding_model: Model used to embed new chunks
+            path_or_url: The URL or path of the document
+            documents: All chunks of the new version of the document
+            batch_size: Number of documents to process at once
+            content_field: Field to use for generating embeddings
+
+        Returns:
+            Dict[str, int]: Number of inserted, updated, deleted, unchanged and failed chunks
+        """
+        processed_docs = self._preprocess_documents(documents, content_field)
+
+        stored: Dict[Tuple[str, Any], List[Tuple[str, Dict[str, Any]]]] = {}
+        for hit in helpers.scan(
+            self.client,
+            index=index_name,
+            query={"query": {"term": {"path_or_url": path_or_url}}, "_source": {"excludes": ["embedding"]}},
+            size=1000,
+        ):
+            source = hit["_source"]
+            content_hash = source.get("content_hash") or compute_content_hash(source.get(content_field))
+            stored.setdefault((content_hash, source.get("embedding_model_name")), []).append((hit["_id"], source))
+
+        inserts = []
+        update_actions = []
+        unchanged = 0
+        for doc in processed_docs:
+            matches = stored.get((doc["content_hash"], doc.get("embedding_model_name")))
+            if not matches:
+                inserts.append(doc)
+                continue
+            doc_id, source = matches.pop(0)
+            changed = {key: value for key, value in doc.items()
+                       if key not in INCREMENTAL_VOLATILE_FIELDS and source.get(key) != value}
+            if changed:
+                update_actions.append({"_op_type": "update", "_index": index_name, "_id": doc_id, "doc": changed})
+            else:
+                unchanged += 1
+        delete_actions = [{"_op_type": "delete", "_index": index_name, "_id": doc_id}
+                          for matches in stored.values() for doc_id, _ in matches]
+
+        inserted = self.index_documents(index_name, embedding_model, inserts, batch_size, content_field) if inserts else 0
+        report = BulkIndexReport()
+        if update_actions or delete_actions:
+            report = self.stream_bulk_index(index_name, update_actions + delete_actions, refresh='wait_for')
+            self.term_statistics.invalidate(index_name)
+
+        result = {
+            "inserted": inserted,
+            "updated": len(update_actions),
+            "deleted": len(delete_actions),
+            "unchanged": unchanged,
+            "failed": len(inserts) - inserted + report.failed,
+        }
+        logger.info(f"Incrementally updated {path_or_url} in {index_name}: {result}")
+        return result
+
     def delete_documents_by_path_or_url(self, index_name: str, path_or_url: str) -> int:
         """
         Delete documents based on their path_or_url field
@@ -579,6 +1158,7 @@ class ElasticSearchCore:
                     }
                 }
             )
+            self.term_statistics.invalidate(index_name)
             logger.info(f"Successfully deleted {result['deleted']} documents with path_or_url: {path_or_url} from index: {index_name}")
             return result['deleted']
         except Exception as e:
@@ -602,15 +1182,8 @@ class ElasticSearchCore:
         # Join index names for multi-index search
         index_pattern = ",".join(index_names)
 
-        weights = calculate_term_weights(query_text)
-
         # Prepare the search query using match query for fuzzy matching
-        search_query = build_weighted_query(query_text, weights) | {
-            "size": top_k,
-            "_source": {
-                "excludes": ["embedding"]
-            }
-        }
+        search_query = self._build_accurate_query(index_names, query_text, top_k)
 
         # Execute the search across multiple indices
         return self.exec_query(index_pattern, search_query)
@@ -621,16 +1194,198 @@ class ElasticSearchCore:
             body=search_query
         )
         # Process and return results
+        return self._parse_hits(response)
+
+    @staticmethod
+    def _parse_hits(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert a raw search response into the result format used by all search methods"""
         results = []
         for hit in response["hits"]["hits"]:
+            document = hit["_source"]
+            # Documents indexed without an id in _source are identified by their _id
+            if "id" not in document and hit.get("_id"):
+                document["id"] = hit["_id"]
             results.append({
                 "score": hit["_score"],
-                "document": hit["_source"],
+                "document": document,
                 "index": hit["_index"]  # Include source index in results
             })
         return results
 
-    def semantic_search(self, index_names: List[str], query_text: str, embedding_model: BaseEmbedding, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _build_accurate_query(self, index_names: List[str], query_text: str, top_k: int) -> Dict[str, Any]:
+        """Build the weighted BM25 query body used by accurate search"""
+        weights = self._calculate_query_term_weights(index_names, query_text)
+        return build_weighted_query(query_text, weights) | {
+            "size": top_k,
+            "_source": {
+                "excludes": ["embedding"]
+            }
+        }
+
+    def _calculate_query_term_weights(self, index_names: List[str], query_text: str) -> Dict[str, float]:
+        """
+        Weight query terms by TF x IDF with document frequencies of the searched indices,
+        then drop terms so common that their term filters only add scoring cost.
+        Falls back to TF weights when the statistics are disabled or unavailable.
+        """
+        terms = extract_query_terms(query_text) if self.use_term_statistics else []
+        if not terms:
+            return calculate_term_weights(query_text)
+        try:
+            doc_freqs, total_docs = self.term_statistics.get_doc_freqs(index_names, terms)
+        except Exception as e:
+            logger.warning(f"Term statistics unavailable for {index_names}, using TF weights: {str(e)}")
+            return calculate_term_weights(query_text)
+        if total_docs == 0:
+            return calculate_term_weights(query_text)
+
+        weights = calculate_term_weights(query_text, use_idf=True, doc_freqs=doc_freqs, total_docs=total_docs)
+        return self._drop_common_terms(weights, doc_freqs, total_docs, self.idf_max_doc_freq_ratio)
+
+    @staticmethod
+    def _drop_common_terms(
+        weights: Dict[str, float],
+        doc_freqs: Dict[str, int],
+        total_docs: int,
+        max_doc_freq_ratio: float
+    ) -> Dict[str, float]:
+        """Remove low-IDF terms, the highest weighted term is always kept so the query still boosts something"""
+        kept = {term: weight for term, weight in weights.items()
+                if doc_freqs.get(term, 0) / total_docs <= max_doc_freq_ratio}
+        if not kept and weights:
+            best_term = max(weights, key=weights.get)
+            kept = {best_term: weights[best_term]}
+        if len(kept) < len(weights):
+            logger.debug(f"Dropped common query terms: {sorted(set(weights) - set(kept))}")
+        return kept
+
+    @staticmethod
+    def _build_semantic_query(
+        query_embedding: List[float],
+        top_k: int,
+        profiles: Optional[Dict[str, KnnSearchProfile]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the kNN query body used by semantic search.
+        Indices sharing a profile are searched with one kNN clause, otherwise every index gets its own clause
+        restricted to that index so each knowledge base keeps its own candidate pool, threshold and filters.
+        """
+        profiles = profiles or {}
+        distinct_profiles = []
+        for profile in profiles.values():
+            if profile not in distinct_profiles:
+                distinct_profiles.append(profile)
+
+        if len(distinct_profiles) <= 1:
+            profile = distinct_profiles[0] if distinct_profiles else KNN_SEARCH_PROFILES["default"]
+            knn = ElasticSearchCore._build_knn_clause(query_embedding, top_k, profile)
+        else:
+            knn = []
+            for index_name, profile in profiles.items():
+                clause = ElasticSearchCore._build_knn_clause(query_embedding, top_k, profile)
+                clause["filter"] = [{"term": {"_index": index_name}}] + clause.get("filter", [])
+                knn.append(clause)
+
+        return {
+            "knn": knn,
+            "size": top_k,
+            "_source": {
+                "excludes": ["embedding"]
+            }
+        }
+
+    @staticmethod
+    def _build_knn_clause(query_embedding: List[float], top_k: int, profile: KnnSearchProfile) -> Dict[str, Any]:
+        clause = {
+            "field": "embedding",
+            "query_vector": query_embedding,
+            "k": top_k,
+            "num_candidates": profile.num_candidates(top_k),
+        }
+        if profile.similarity is not None:
+            clause["similarity"] = profile.similarity
+        filters = profile.build_filter()
+        if filters:
+            clause["filter"] = filters
+        return clause
+
+    def set_search_profile(self, index_name: str, profile: KnnSearchProfile) -> bool:
+        """
+        Store the kNN search profile of an index in its mapping _meta.
+
+        Args:
+            index_name: Name of the index
+            profile: Profile used by semantic and hybrid search on this index
+
+        Returns:
+            bool: True if the profile was stored
+        """
+        try:
+            self.client.indices.put_mapping(index=index_name, meta={"knn_search_profile": profile.to_dict()})
+            with self._search_profile_lock:
+                self._search_profile_cache[index_name] = (time.monotonic(), profile)
+            logger.info(f"Updated kNN search profile of {index_name}: {profile.to_dict()}")
+            return True
+        except Exception as e:
+            logger.error(f"Error setting search profile for index {index_name}: {str(e)}")
+            return False
+
+    def get_search_profiles(self, index_names: List[str]) -> Dict[str, KnnSearchProfile]:
+        """
+        Get the kNN search profile of every index, indices without a stored profile use the default profile.
+        Profiles are cached for search_profile_ttl seconds and missing ones are fetched in one mapping request.
+        """
+        now = time.monotonic()
+        profiles = {}
+        missing = []
+        with self._search_profile_lock:
+            for index_name in index_names:
+                cached = self._search_profile_cache.get(index_name)
+                if cached and now - cached[0] < self.search_profile_ttl:
+                    profiles[index_name] = cached[1]
+                else:
+                    missing.append(index_name)
+
+        if missing:
+            fetched = dict.fromkeys(missing)
+            try:
+                mappings = self.client.indices.get_mapping(index=",".join(missing))
+                for index_name, mapping in mappings.items():
+                    stored = mapping.get("mappings", {}).get("_meta", {}).get("knn_search_profile")
+                    if stored:
+                        fetched[index_name] = KnnSearchProfile.from_dict(stored)
+            except Exception as e:
+                logger.warning(f"Could not load search profiles for {missing}, using the default profile: {str(e)}")
+            with self._search_profile_lock:
+                for index_name, profile in fetched.items():
+                    self._search_profile_cache[index_name] = (now, profile)
+            profiles.update(fetched)
+
+        default_profile = KNN_SEARCH_PROFILES["default"]
+        return {index_name: profiles.get(index_name) or default_profile for index_name in index_names}
+
+    def _resolve_search_profiles(
+        self,
+        index_names: List[str],
+        search_profile: Optional[Union[str, KnnSearchProfile]]
+    ) -> Dict[str, KnnSearchProfile]:
+        """An explicit profile applies to every index, otherwise each index uses its stored profile"""
+        if not search_profile:
+            return self.get_search_profiles(index_names)
+        if isinstance(search_profile, str):
+            if search_profile not in KNN_SEARCH_PROFILES:
+                raise ValueError(f"Unknown search profile '{search_profile}', expected one of {', '.join(KNN_SEARCH_PROFILES)}")
+            search_profile = KNN_SEARCH_PROFILES[search_profile]
+        return dict.fromkeys(index_names, search_profile)
+
+    def semantic_search(
+        self,
+        index_names: List[str],
+        query_text: str,
+        embedding_model: BaseEmbedding,
+        top_k: int = 5,
+        search_profile: Optional[Union[str, KnnSearchProfile]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for similar documents using vector similarity across multiple indices.
         
@@ -639,6 +1394,8 @@ class ElasticSearchCore:
             query_text: The text query to search for
             embedding_model: The embedding model to use
             top_k: Number of results to return
+            search_profile: Name in KNN_SEARCH_PROFILES or a profile applied to all indices,
+                defaults to the profile stored on each index
             
         Returns:
             List of search results with scores and document content
@@ -646,22 +1403,13 @@ class ElasticSearchCore:
         # Join index names for multi-index search
         index_pattern = ",".join(index_names)
 
+        profiles = self._resolve_search_profiles(index_names, search_profile)
+
         # Get query embedding
         query_embedding = embedding_model.get_embeddings(query_text)[0]
         
         # Prepare the search query
-        search_query = {
-            "knn": {
-                "field": "embedding",
-                "query_vector": query_embedding,
-                "k": top_k,
-                "num_candidates": top_k * 2,
-            },
-            "size": top_k,
-            "_source": {
-                "excludes": ["embedding"]
-            }
-        }
+        search_query = self._build_semantic_query(query_embedding, top_k, profiles)
         
         # Execute the search across multiple indices
         return self.exec_query(index_pattern, search_query)
@@ -672,10 +1420,16 @@ class ElasticSearchCore:
         query_text: str,
         embedding_model: BaseEmbedding,
         top_k: int = 5,
-        weight_accurate: float = 0.3
+        weight_accurate: float = 0.3,
+        search_profile: Optional[Union[str, KnnSearchProfile]] = None,
+        fusion: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Hybrid search method, combining accurate matching and semantic search results across multiple indices.
+
+        The query embedding is requested in a background thread while the BM25 query is being built.
+        On clusters with retriever support both legs are fused by Elasticsearch in one search request over a
+        rank window larger than top_k, otherwise both legs are sent in a single _msearch round-trip and fused here.
         
         Args:
             index_names: List of index names to search in
@@ -683,14 +1437,148 @@ class ElasticSearchCore:
             embedding_model: The embedding model to use
             top_k: Number of results to return
             weight_accurate: The weight of the accurate matching score (0-1), the semantic search weight is 1-weight_accurate
+            search_profile: kNN search profile of the semantic leg, see semantic_search
+            fusion: One of HYBRID_FUSION_MODES, defaults to hybrid_fusion. linear honours weight_accurate,
+                rrf ranks by reciprocal rank and ignores it
 
         Returns:
             List of search results sorted by combined score
         """
-        # Get results from both searches
-        accurate_results = self.accurate_search(index_names, query_text, top_k=top_k)
-        semantic_results = self.semantic_search(index_names, query_text, embedding_model=embedding_model, top_k=top_k)
+        if fusion is not None and fusion not in HYBRID_FUSION_MODES:
+            raise ValueError(f"Unsupported hybrid fusion mode '{fusion}', expected one of {', '.join(HYBRID_FUSION_MODES)}")
+        index_pattern = ",".join(index_names)
+
+        # Start the embedding call first, it is usually the slowest part of the query
+        embedding_future = self._search_executor.submit(embedding_model.get_embeddings, query_text)
+
+        # Term weighting and profile lookup run on this thread while the embedding request is in flight
+        accurate_query = self._build_accurate_query(index_names, query_text, top_k)
+        profiles = self._resolve_search_profiles(index_names, search_profile)
+        query_embedding = embedding_future.result()[0]
+        semantic_query = self._build_semantic_query(query_embedding, top_k, profiles)
+
+        server_fusion = self._select_server_fusion(fusion or self.hybrid_fusion)
+        if server_fusion:
+            retriever_query = self._build_retriever_query(
+                accurate_query, semantic_query, top_k, weight_accurate, server_fusion)
+            try:
+                return self.exec_query(index_pattern, retriever_query)
+            except exceptions.ApiError as e:
+                # Unknown retriever or a license restriction, remember it and use the Python fusion from now on
+                if e.status_code not in (400, 403):
+                    raise
+                logger.warning(f"Server-side {server_fusion} fusion rejected ({e.status_code}), falling back to Python fusion: {e}")
+                self._unsupported_fusion_modes.add(server_fusion)
+
+        accurate_results, semantic_results = self.exec_multi_query(
+            index_pattern, [accurate_query, semantic_query]
+        )
+
+        return self._fuse_hybrid_results(accurate_results, semantic_results, top_k, weight_accurate)
+
+    def _get_cluster_version(self) -> Tuple[int, int]:
+        """Major and minor version of the cluster, (0, 0) if it cannot be determined"""
+        if self._cluster_version is None:
+            try:
+                number = self.client.info()["version"]["number"]
+                major, minor = number.split(".")[:2]
+                self._cluster_version = (int(major), int(minor))
+            except Exception as e:
+                logger.warning(f"Could not determine Elasticsearch version: {str(e)}")
+                return 0, 0
+        return self._cluster_version
+
+    def _select_server_fusion(self, mode: str) -> Optional[str]:
+        """Resolve a fusion mode to the retriever to use, None means fusing in Python"""
+        if mode == "python":
+            return None
+        if mode == "auto":
+            mode = "linear"
+        if mode in self._unsupported_fusion_modes:
+            return None
+        if self._get_cluster_version() < _RETRIEVER_MIN_VERSIONS[mode]:
+            return None
+        return mode
+
+    def _build_retriever_query(
+        self,
+        accurate_query: Dict[str, Any],
+        semantic_query: Dict[str, Any],
+        top_k: int,
+        weight_accurate: float,
+        fusion: str
+    ) -> Dict[str, Any]:
+        """Combine the BM25 query and the kNN clauses in a single rrf or linear retriever"""
+        rank_window_size = max(top_k * self.hybrid_rank_window_multiplier, top_k)
+
+        knn_clauses = semantic_query["knn"] if isinstance(semantic_query["knn"], list) else [semantic_query["knn"]]
+        knn_retrievers = []
+        for clause in knn_clauses:
+            # Each kNN leg has to return the whole rank window, not just top_k
+            clause = dict(clause, k=rank_window_size)
+            clause["num_candidates"] = min(max(clause["num_candidates"], rank_window_size),
+                                           KnnSearchProfile.MAX_NUM_CANDIDATES)
+            knn_retrievers.append({"knn": clause})
+        standard_retriever = {"standard": {"query": accurate_query["query"]}}
+
+        if fusion == "linear":
+            # Indices searched by separate kNN clauses never overlap, so each clause carries the full semantic weight
+            retriever = {"linear": {
+                "retrievers": [{"retriever": standard_retriever, "weight": weight_accurate, "normalizer": "minmax"}] + [
+                    {"retriever": knn_retriever, "weight": 1 - weight_accurate, "normalizer": "minmax"}
+                    for knn_retriever in knn_retrievers
+                ],
+                "rank_window_size": rank_window_size,
+            }}
+        else:
+            retriever = {"rrf": {
+                "retrievers": [standard_retriever] + knn_retrievers,
+                "rank_window_size": rank_window_size,
+            }}
 
+        return {
+            "retriever": retriever,
+            "size": top_k,
+            "_source": {
+                "excludes": ["embedding"]
+            }
+        }
+
+    def exec_multi_query(self, index_pattern: str, search_queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Execute several search bodies against the same indices in one _msearch request.
+
+        Args:
+            index_pattern: Comma separated index names
+            search_queries: Search bodies to execute
+
+        Returns:
+            One result list per search body, in the same order as search_queries
+        """
+        searches = []
+        for search_query in search_queries:
+            searches.append({"index": index_pattern})
+            searches.append(search_query)
+
+        response = self.client.msearch(searches=searches)
+
+        all_results = []
+        for item in response["responses"]:
+            if "error" in item:
+                error_info = item["error"]
+                reason = error_info.get("reason") if isinstance(error_info, dict) else error_info
+                raise Exception(f"Multi search failed: {reason}")
+            all_results.append(self._parse_hits(item))
+        return all_results
+
+    @staticmethod
+    def _fuse_hybrid_results(
+        accurate_results: List[Dict[str, Any]],
+        semantic_results: List[Dict[str, Any]],
+        top_k: int,
+        weight_accurate: float
+    ) -> List[Dict[str, Any]]:
+        """Merge the two legs of a hybrid search with max-normalized weighted scores"""
         # Create a mapping from document ID to results
         combined_results = {}
 
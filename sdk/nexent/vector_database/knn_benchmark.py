@@ -0,0 +1,147 @@
+"""
+Recall benchmark for kNN search profiles.
+
+Samples documents from an index, uses their embeddings as queries and compares the approximate kNN hits of
+each profile with an exact brute-force script_score ranking over the same documents. The cheapest profile
+that reaches the recall target can then be stored on the index with ElasticSearchCore.set_search_profile.
+
+Usage:
+    python -m nexent.vector_database.knn_benchmark --host http://localhost:9200 --index my_kb --k 5 --target 0.95
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .elasticsearch_core import ElasticSearchCore, KnnSearchProfile, KNN_SEARCH_PROFILES
+
+logger = logging.getLogger("knn_benchmark")
+
+
+def sample_query_vectors(es_core: ElasticSearchCore, index_name: str, sample_size: int = 50, seed: int = 42) -> List[Dict[str, Any]]:
+    """Pick random documents of the index and return their ids and embeddings to use as queries"""
+    response = es_core.client.search(
+        index=index_name,
+        size=sample_size,
+        query={"function_score": {"query": {"exists": {"field": "embedding"}},
+                                  "random_score": {"seed": seed, "field": "_seq_no"}}},
+        source=["embedding"],
+    )
+    return [{"id": hit["_id"], "vector": hit["_source"]["embedding"]}
+            for hit in response["hits"]["hits"] if hit["_source"].get("embedding")]
+
+
+def _exclude_query_doc(filters: List[Dict[str, Any]], doc_id: str) -> Dict[str, Any]:
+    # The sampled document is always its own nearest neighbour, leaving it in would inflate recall
+    return {"bool": {"filter": filters, "must_not": [{"ids": {"values": [doc_id]}}]}}
+
+
+def exact_top_k(es_core: ElasticSearchCore, index_name: str, query: Dict[str, Any], k: int,
+                profile: KnnSearchProfile) -> List[str]:
+    """Exact ranking by brute-force cosine similarity over every document matching the profile filters"""
+    response = es_core.client.search(
+        index=index_name,
+        size=k,
+        query={"script_score": {
+            "query": _exclude_query_doc(profile.build_filter(), query["id"]),
+            "script": {
+                "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
+                "params": {"query_vector": query["vector"]},
+            },
+        }},
+        source=False,
+    )
+    # kNN similarity thresholds apply to the raw cosine similarity, the script score adds 1.0
+    hits = response["hits"]["hits"]
+    if profile.similarity is not None:
+        hits = [hit for hit in hits if hit["_score"] - 1.0 >= profile.similarity]
+    return [hit["_id"] for hit in hits]
+
+
+def approximate_top_k(es_core: ElasticSearchCore, index_name: str, query: Dict[str, Any], k: int,
+                      profile: KnnSearchProfile) -> Dict[str, Any]:
+    """Approximate ranking of the kNN query built for the given profile"""
+    clause = ElasticSearchCore._build_knn_clause(query["vector"], k, profile)
+    clause["filter"] = _exclude_query_doc(clause.get("filter", []), query["id"])
+    response = es_core.client.search(index=index_name, size=k, knn=clause, source=False)
+    return {"ids": [hit["_id"] for hit in response["hits"]["hits"]], "took": response.get("took", 0)}
+
+
+def benchmark_profiles(
+    es_core: ElasticSearchCore,
+    index_name: str,
+    profiles: Optional[Dict[str, KnnSearchProfile]] = None,
+    k: int = 5,
+    sample_size: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k and latency of each profile against exact scoring on a sample of the index.
+
+    Args:
+        es_core: ElasticSearchCore connected to the cluster
+        index_name: Index to benchmark
+        profiles: Profiles to compare, defaults to KNN_SEARCH_PROFILES
+        k: Number of neighbours compared per query
+        sample_size: Number of sampled query vectors
+
+    Returns:
+        List of results sorted by num_candidates, each with the profile name, num_candidates,
+        mean recall@k and mean server-side latency in ms
+    """
+    profiles = profiles or KNN_SEARCH_PROFILES
+    queries = sample_query_vectors(es_core, index_name, sample_size)
+    if not queries:
+        raise ValueError(f"Index {index_name} has no documents with embeddings to sample")
+
+    results = []
+    for name, profile in profiles.items():
+        recalls = []
+        took = []
+        for query in queries:
+            exact = exact_top_k(es_core, index_name, query, k, profile)
+            if not exact:
+                continue
+            approximate = approximate_top_k(es_core, index_name, query, k, profile)
+            recalls.append(len(set(exact) & set(approximate["ids"])) / len(exact))
+            took.append(approximate["took"])
+        results.append({
+            "profile": name,
+            "num_candidates": profile.num_candidates(k),
+            "recall_at_k": sum(recalls) / len(recalls) if recalls else 0.0,
+            "mean_took_ms": sum(took) / len(took) if took else 0.0,
+            "queries": len(recalls),
+        })
+        logger.info(f"Profile {name}: recall@{k}={results[-1]['recall_at_k']:.3f}, "
+                    f"num_candidates={results[-1]['num_candidates']}, took={results[-1]['mean_took_ms']:.1f}ms")
+
+    return sorted(results, key=lambda result: (result["num_candidates"], result["mean_took_ms"]))
+
+
+def cheapest_profile(results: List[Dict[str, Any]], target_recall: float) -> Optional[Dict[str, Any]]:
+    """Return the benchmark result with the fewest candidates that reaches the recall target"""
+    for result in sorted(results, key=lambda r: (r["num_candidates"], r["mean_took_ms"])):
+        if result["recall_at_k"] >= target_recall:
+            return result
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure recall@k of kNN search profiles against exact scoring")
+    parser.add_argument("--host", default="http://localhost:9200", help="Elasticsearch URL")
+    parser.add_argument("--api-key", default=None, help="Elasticsearch API key")
+    parser.add_argument("--index", required=True, help="Index to benchmark")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--sample-size", type=int, default=50)
+    parser.add_argument("--target", type=float, default=0.95, help="Recall@k target")
+    args = parser.parse_args()
+
+    es_core = ElasticSearchCore(host=args.host, api_key=args.api_key)
+    start_time = time.time()
+    results = benchmark_profiles(es_core, args.index, k=args.k, sample_size=args.sample_size)
+    best = cheapest_profile(results, args.target)
+    print(json.dumps({"results": results, "cheapest": best, "seconds": round(time.time() - start_time, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("term_statistics")
+
+
+class IndexTermStatistics:
+    """
+    Document frequencies of query terms per index, pulled from Elasticsearch on demand and cached.
+
+    A term's document frequency counts the documents where any of the scored fields contains the exact term,
+    the same term filter build_weighted_query scores with, so the IDF matches what the query can actually hit.
+    Frequencies for all uncached terms and indices of a query are fetched with a single aggregation request.
+    """
+
+    def __init__(
+        self,
+        client,
+        fields: Sequence[str] = ("title", "content"),
+        ttl_seconds: float = 600,
+        max_entries: int = 50000,
+    ):
+        self.client = client
+        self.fields = tuple(fields)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._doc_freqs: "OrderedDict[Tuple[str, str], Tuple[float, int]]" = OrderedDict()
+        self._doc_counts: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get_doc_freqs(self, index_names: List[str], terms: List[str]) -> Tuple[Dict[str, int], int]:
+        """
+        Get document frequencies of terms summed over the given indices.
+
+        Args:
+            index_names: Indices the query searches
+            terms: Query terms
+
+        Returns:
+            Tuple of ({term: number of documents containing the term}, total number of documents)
+        """
+        now = time.monotonic()
+        missing_indices = set()
+        missing_terms = set()
+        with self._lock:
+            for index_name in index_names:
+                if not self._is_fresh(self._doc_counts.get(index_name), now):
+                    missing_indices.add(index_name)
+                    missing_terms.update(terms)
+                    continue
+                for term in terms:
+                    if not self._is_fresh(self._doc_freqs.get((index_name, term)), now):
+                        missing_indices.add(index_name)
+                        missing_terms.add(term)
+
+        if missing_indices:
+            self._fetch(sorted(missing_indices), sorted(missing_terms), now)
+
+        doc_freqs = dict.fromkeys(terms, 0)
+        total_docs = 0
+        with self._lock:
+            for index_name in index_names:
+                total_docs += self._doc_counts.get(index_name, (now, 0))[1]
+                for term in terms:
+                    entry = self._doc_freqs.get((index_name, term))
+                    if entry:
+                        self._doc_freqs.move_to_end((index_name, term))
+                        doc_freqs[term] += entry[1]
+        return doc_freqs, total_docs
+
+    def invalidate(self, index_name: Optional[str] = None):
+        """Forget cached statistics of an index after its documents changed, or of all indices"""
+        with self._lock:
+            if index_name is None:
+                self._doc_freqs.clear()
+                self._doc_counts.clear()
+                return
+            self._doc_counts.pop(index_name, None)
+            for key in [key for key in self._doc_freqs if key[0] == index_name]:
+                del self._doc_freqs[key]
+
+    def _is_fresh(self, entry: Optional[Tuple[float, int]], now: float) -> bool:
+        return entry is not None and now - entry[0] < self.ttl_seconds
+
+    def _fetch(self, index_names: List[str], terms: List[str], now: float):
+        term_filters = {
+            term: {"bool": {"should": [{"term": {field: term}} for field in self.fields]}}
+            for term in terms
+        }
+        aggs = {"per_index": {"terms": {"field": "_index", "size": len(index_names)}}}
+        if term_filters:
+            aggs["per_index"]["aggs"] = {"doc_freqs": {"filters": {"filters": term_filters}}}
+
+        response = self.client.search(
+            index=",".join(index_names),
+            size=0,
+            aggs=aggs,
+            ignore_unavailable=True,
+        )
+
+        # Indices without documents have no bucket, their statistics are all zero
+        doc_counts = dict.fromkeys(index_names, 0)
+        doc_freqs = {(index_name, term): 0 for index_name in index_names for term in terms}
+        for bucket in response["aggregations"]["per_index"]["buckets"]:
+            index_name = bucket["key"]
+            doc_counts[index_name] = bucket["doc_count"]
+            for term, term_bucket in bucket.get("doc_freqs", {}).get("buckets", {}).items():
+                doc_freqs[(index_name, term)] = term_bucket["doc_count"]
+
+        with self._lock:
+            for index_name, count in doc_counts.items():
+                self._doc_counts[index_name] = (now, count)
+            for key, count in doc_freqs.items():
+                self._doc_freqs[key] = (now, count)
+                self._doc_freqs.move_to_end(key)
+            while len(self._doc_freqs) > self.max_entries:
+                self._doc_freqs.popitem(last=False)
+        logger.debug(f"Fetched document frequencies of {len(terms)} terms in {index_names}")
@@ -1,5 +1,9 @@
+import hashlib
 from datetime import datetime
 
+# HNSW variants supported for the embedding field, ordered from most to least memory per vector
+VECTOR_INDEX_TYPES = ("hnsw", "int8_hnsw", "int4_hnsw", "bbq_hnsw")
+
 def format_size(size_in_bytes):
     """Convert size in bytes to human readable format"""
     for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -84,4 +88,80 @@ def build_weighted_query(text, term_weights, field_weights=None, boost_factor=2.
         }
     }
 
-    return query_body
\ No newline at end of file
+    return query_body
+
+def build_dense_vector_mapping(dims, index_type=None, m=None, ef_construction=None, similarity="cosine"):
+    """
+    Build the dense_vector field mapping for the embedding field
+
+    Parameters:
+        dims (int): Embedding dimension
+        index_type (str): One of VECTOR_INDEX_TYPES, None keeps the cluster default. Quantized types keep the raw
+            float vectors in _source but hold int8 (4x smaller), int4 (8x smaller) or binary (32x smaller) vectors
+            in the HNSW graph
+        m (int): Number of neighbors per node in the HNSW graph, Elasticsearch default 16
+        ef_construction (int): Candidates considered while building the graph, Elasticsearch default 100
+        similarity (str): Vector similarity function
+
+    Returns:
+        dict: dense_vector field mapping
+    """
+    if index_type is not None and index_type not in VECTOR_INDEX_TYPES:
+        raise ValueError(f"Unsupported vector index type '{index_type}', expected one of {', '.join(VECTOR_INDEX_TYPES)}")
+    if index_type is None and (m is not None or ef_construction is not None):
+        raise ValueError("HNSW m and ef_construction require an explicit vector index type")
+    if index_type == "int4_hnsw" and dims % 2 != 0:
+        raise ValueError(f"int4_hnsw requires an even number of dimensions, got {dims}")
+    if index_type == "bbq_hnsw" and dims < 64:
+        raise ValueError(f"bbq_hnsw requires at least 64 dimensions, got {dims}")
+    if m is not None and m < 2:
+        raise ValueError(f"HNSW m must be at least 2, got {m}")
+    if ef_construction is not None and m is not None and ef_construction < m:
+        raise ValueError(f"HNSW ef_construction ({ef_construction}) must not be lower than m ({m})")
+
+    mapping = {
+        "type": "dense_vector",
+        "dims": dims,
+        "index": "true",
+        "similarity": similarity,
+    }
+
+    if index_type is not None:
+        index_options = {"type": index_type}
+        if m is not None:
+            index_options["m"] = m
+        if ef_construction is not None:
+            index_options["ef_construction"] = ef_construction
+        mapping["index_options"] = index_options
+
+    return mapping
+
+
+def compute_content_hash(text):
+    """
+    Stable hash of a chunk text, used to find chunks whose content is already indexed
+
+    Parameters:
+        text (str): Chunk content
+
+    Returns:
+        str: SHA-256 hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def compute_chunk_id(path_or_url, position, text, embedding_model_name=""):
+    """
+    Deterministic document ID of a chunk, so indexing the same chunk again overwrites it instead of adding a copy
+
+    Parameters:
+        path_or_url (str): Path or URL of the file the chunk belongs to
+        position (int): Position of the chunk in the file
+        text (str): Chunk content
+        embedding_model_name (str): Model the chunk is embedded with
+
+    Returns:
+        str: SHA-256 hex digest identifying the chunk
+    """
+    key = "\x1f".join([path_or_url or "", str(position), compute_content_hash(text), embedding_model_name or ""])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
@@ -44,6 +44,13 @@ class TestBaseApp(unittest.TestCase):
         """Test that the FastAPI app is initialized with correct root path."""
         self.assertEqual(app.root_path, "/api")
 
+    def test_shutdown_closes_async_http_sessions(self):
+        """Test that the pooled aiohttp sessions of the embedding clients are closed on shutdown."""
+        with patch('apps.base_app.close_async_http_sessions') as mock_close:
+            with TestClient(app):
+                mock_close.assert_not_called()
+            mock_close.assert_called_once()
+
     def test_cors_middleware(self):
         """Test that CORS middleware is properly configured."""
         # Find the CORS middleware
@@ -164,6 +164,46 @@ async def test_create_new_index_error(es_core_mock, auth_data):
             "detail": "Error creating index: Test error"}
 
 
+@pytest.mark.asyncio
+async def test_migrate_vector_index_success(es_core_mock, auth_data):
+    """
+    Test migrating an index to a quantized vector index type.
+    """
+    with patch("backend.apps.elasticsearch_app.get_es_core", return_value=es_core_mock), \
+            patch("backend.apps.elasticsearch_app.get_current_user_id", return_value=(auth_data["user_id"], auth_data["tenant_id"])), \
+            patch("backend.apps.elasticsearch_app.ElasticSearchService.migrate_vector_index") as mock_migrate:
+
+        mock_migrate.return_value = {"status": "success", "documents": 10}
+
+        response = client.post(f"/indices/{auth_data['index_name']}/vector_index/migrate",
+                               params={"vector_index_type": "int8_hnsw", "hnsw_m": 32},
+                               headers=auth_data["auth_header"])
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "success", "documents": 10}
+        mock_migrate.assert_called_once_with(
+            auth_data["index_name"], "int8_hnsw", 32, None, ANY)
+
+
+@pytest.mark.asyncio
+async def test_migrate_vector_index_invalid_options(es_core_mock, auth_data):
+    """
+    Test invalid vector index options are reported as a bad request.
+    """
+    with patch("backend.apps.elasticsearch_app.get_es_core", return_value=es_core_mock), \
+            patch("backend.apps.elasticsearch_app.get_current_user_id", return_value=(auth_data["user_id"], auth_data["tenant_id"])), \
+            patch("backend.apps.elasticsearch_app.ElasticSearchService.migrate_vector_index") as mock_migrate:
+
+        mock_migrate.side_effect = ValueError("Unsupported vector index type 'pq_hnsw'")
+
+        response = client.post(f"/indices/{auth_data['index_name']}/vector_index/migrate",
+                               params={"vector_index_type": "pq_hnsw"},
+                               headers=auth_data["auth_header"])
+
+        assert response.status_code == 400
+        assert "Unsupported vector index type" in response.json()["detail"]
+
+
 @pytest.mark.asyncio
 async def test_delete_index_success(es_core_mock, redis_service_mock, auth_data):
     """
@@ -387,6 +427,27 @@ async def test_create_index_documents_success(es_core_mock, auth_data):
         mock_index.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_create_index_documents_page_passes_batch_offset(es_core_mock, auth_data):
+    """
+    Test indexing one page of a file.
+    Verifies that batch_offset reaches the service and next_offset is returned.
+    """
+    with patch("backend.apps.elasticsearch_app.get_es_core", return_value=es_core_mock), \
+            patch("backend.apps.elasticsearch_app.get_current_user_id", return_value=(auth_data["user_id"], auth_data["tenant_id"])), \
+            patch("backend.apps.elasticsearch_app.ElasticSearchService.index_documents") as mock_index, \
+            patch("backend.apps.elasticsearch_app.get_embedding_model", return_value=MagicMock()):
+        mock_index.return_value = {"success": True, "message": "ok", "total_indexed": 1, "total_submitted": 1,
+                                   "next_offset": 201}
+
+        response = client.post("/indices/test_index/documents", params={"batch_offset": 200},
+                               json=[{"content": "test doc"}], headers=auth_data["auth_header"])
+
+        assert response.status_code == 200
+        assert response.json()["next_offset"] == 201
+        assert mock_index.call_args.args[4] == 200
+
+
 @pytest.mark.asyncio
 async def test_create_index_documents_exception(es_core_mock, auth_data):
     """
@@ -420,6 +481,28 @@ async def test_create_index_documents_exception(es_core_mock, auth_data):
         mock_index.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_update_index_documents_success(es_core_mock, auth_data):
+    """
+    Test updating the chunks of a document.
+    Verifies that the document path and chunks are passed to the incremental update.
+    """
+    with patch("backend.apps.elasticsearch_app.get_es_core", return_value=es_core_mock), \
+            patch("backend.apps.elasticsearch_app.get_current_user_id", return_value=(auth_data["user_id"], auth_data["tenant_id"])), \
+            patch("backend.apps.elasticsearch_app.ElasticSearchService.update_documents") as mock_update, \
+            patch("backend.apps.elasticsearch_app.get_embedding_model", return_value=MagicMock()):
+        mock_update.return_value = {"success": True, "inserted": 1, "unchanged": 2}
+
+        response = client.put(
+            "/indices/test_index/documents", params={"path_or_url": "doc"},
+            json=[{"content": "chunk"}], headers=auth_data["auth_header"])
+
+        assert response.status_code == 200
+        assert response.json()["inserted"] == 1
+        args = mock_update.call_args.args
+        assert args[1:4] == ("test_index", "doc", [{"content": "chunk"}])
+
+
 @pytest.mark.asyncio
 async def test_create_index_documents_auth_exception(es_core_mock, auth_data):
     """
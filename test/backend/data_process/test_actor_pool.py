@@ -0,0 +1,163 @@
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+class FakeProcessorActor:
+    created = 0
+
+    def __init__(self):
+        FakeProcessorActor.created += 1
+        self.id = FakeProcessorActor.created
+
+    @classmethod
+    def remote(cls):
+        return cls()
+
+
+@pytest.fixture
+def actor_pool(monkeypatch):
+    killed = []
+    fake_ray = types.ModuleType("ray")
+    fake_ray.remote = lambda **kwargs: (lambda obj: obj)
+    fake_ray.kill = killed.append
+    fake_ray.cluster_resources = lambda: {"CPU": 9.0}
+    monkeypatch.setitem(sys.modules, "ray", fake_ray)
+
+    # Stub the package and the processing actor so the pool module is imported on its own
+    project_root = Path(__file__).resolve().parents[3]
+    backend_pkg = types.ModuleType("backend")
+    backend_pkg.__path__ = [str(project_root / "backend")]
+    monkeypatch.setitem(sys.modules, "backend", backend_pkg)
+    dp_pkg = types.ModuleType("backend.data_process")
+    dp_pkg.__path__ = [str(project_root / "backend" / "data_process")]
+    monkeypatch.setitem(sys.modules, "backend.data_process", dp_pkg)
+    fake_ray_actors = types.ModuleType("backend.data_process.ray_actors")
+    fake_ray_actors.DataProcessorRayActor = FakeProcessorActor
+    monkeypatch.setitem(sys.modules, "backend.data_process.ray_actors", fake_ray_actors)
+    monkeypatch.delitem(sys.modules, "backend.data_process.actor_pool", raising=False)
+
+    module = importlib.import_module("backend.data_process.actor_pool")
+    module.killed = killed
+    return module
+
+
+def pool_slot(pool, lease_id):
+    """Slot of the actor a lease holds"""
+    return pool._leases[lease_id]["slot"]
+
+
+def test_default_pool_size(actor_pool):
+    assert actor_pool.default_pool_size(2) == 4
+    assert actor_pool.default_pool_size(16) == 1
+
+
+def test_large_files_use_their_own_lane(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(4, large_file_bytes=100)
+
+    async def run():
+        large_lease, _ = await pool.acquire(500)
+        small_lease, _ = await pool.acquire(10)
+        return pool_slot(pool, large_lease), pool_slot(pool, small_lease)
+
+    large_slot, small_slot = asyncio.run(run())
+    metrics = asyncio.run(pool.get_metrics())
+    lanes = {actor["slot"]: actor["lane"] for actor in metrics["actors"]}
+    assert lanes[large_slot] == "large"
+    assert lanes[small_slot] == "small"
+
+
+def test_dispatch_prefers_least_loaded_actor(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(4, large_file_bytes=10 ** 9)
+
+    async def run():
+        first, _ = await pool.acquire(300)
+        second, _ = await pool.acquire(100)
+        third, _ = await pool.acquire(50)
+        slots = [pool_slot(pool, lease) for lease in (first, second, third)]
+        await pool.release(second)
+        fourth, _ = await pool.acquire(10)
+        return slots + [pool_slot(pool, fourth)]
+
+    first, second, third, fourth = asyncio.run(run())
+    assert len({first, second, third}) == 3
+    assert fourth == second
+
+
+def test_pool_grows_under_load_and_shrinks_when_idle(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(1, max_size=2, idle_timeout_s=0)
+
+    async def run():
+        first, _ = await pool.acquire(10)
+        second, _ = await pool.acquire(10)
+        assert pool_slot(pool, first) != pool_slot(pool, second)
+        size_under_load = (await pool.get_metrics())["size"]
+        await pool.release(second)
+        await pool.release(first)
+        await asyncio.sleep(0.01)
+        await pool.acquire(10)
+        return first, second, size_under_load
+
+    first, second, size_under_load = asyncio.run(run())
+    assert first != second
+    assert size_under_load == 2
+    assert asyncio.run(pool.get_metrics())["size"] == 1
+    assert len(actor_pool.killed) == 1
+
+
+def test_metrics_track_utilisation(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(1)
+
+    async def run():
+        lease, _ = await pool.acquire(10)
+        await asyncio.sleep(0.02)
+        await pool.release(lease, success=False)
+        return await pool.get_metrics()
+
+    metrics = asyncio.run(run())
+    actor = metrics["actors"][0]
+    assert actor["in_flight"] == 0
+    assert actor["queued_bytes"] == 0
+    assert actor["failed"] == 1
+    assert actor["busy_seconds"] > 0
+    assert 0 < actor["utilisation"] <= 1
+
+
+def test_small_file_takes_idle_large_lane_actor_before_queueing(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(4, large_file_bytes=100)
+
+    async def run():
+        small_leases = [(await pool.acquire(10))[0] for _ in range(3)]
+        borrowed, _ = await pool.acquire(10)
+        queued, _ = await pool.acquire(10)
+        return [pool_slot(pool, lease) for lease in small_leases], pool_slot(pool, borrowed), pool_slot(pool, queued)
+
+    small_slots, borrowed, queued = asyncio.run(run())
+    lanes = {actor["slot"]: actor["lane"] for actor in asyncio.run(pool.get_metrics())["actors"]}
+    assert {lanes[slot] for slot in small_slots} == {"small"}
+    assert lanes[borrowed] == "large"
+    assert lanes[queued] == "small"
+
+
+def test_expired_lease_is_reaped(actor_pool):
+    pool = actor_pool.ActorPoolDispatcher(1, lease_timeout_s=0)
+
+    async def run():
+        lease, _ = await pool.acquire(10)
+        await asyncio.sleep(0.01)
+        metrics = await pool.get_metrics()
+        # A late release of the reaped lease is not counted again
+        await pool.release(lease)
+        return metrics, await pool.get_metrics()
+
+    metrics, after_release = asyncio.run(run())
+    assert metrics["reaped_leases"] == 1
+    assert metrics["leases"] == 0
+    assert metrics["actors"][0]["in_flight"] == 0
+    assert metrics["actors"][0]["queued_bytes"] == 0
+    assert metrics["actors"][0]["failed"] == 1
+    assert after_release["actors"][0]["completed"] == 0
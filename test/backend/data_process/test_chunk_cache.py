@@ -0,0 +1,171 @@
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def chunk_cache(monkeypatch):
+    # Stub the package so chunk_cache and chunk_store are imported without the Celery app
+    project_root = Path(__file__).resolve().parents[3]
+    backend_pkg = types.ModuleType("backend")
+    backend_pkg.__path__ = [str(project_root / "backend")]
+    monkeypatch.setitem(sys.modules, "backend", backend_pkg)
+    dp_pkg = types.ModuleType("backend.data_process")
+    dp_pkg.__path__ = [str(project_root / "backend" / "data_process")]
+    monkeypatch.setitem(sys.modules, "backend.data_process", dp_pkg)
+    monkeypatch.delitem(sys.modules, "backend.data_process.chunk_cache", raising=False)
+    monkeypatch.delitem(sys.modules, "backend.data_process.chunk_store", raising=False)
+    return importlib.import_module("backend.data_process.chunk_cache")
+
+
+class FakeRedis:
+    """In-memory Redis supporting the list, hash and sorted set commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.expirations = {}
+
+    def type(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return b"none"
+        return b"list" if isinstance(value, list) else b"hash"
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def lindex(self, key, index):
+        values = self.data.get(key, [])
+        return values[index] if index < len(values) else None
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def expire(self, key, seconds):
+        self.expirations[key] = seconds
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrange(self, key, start, end):
+        return [member.encode() for member, _ in sorted(self.data.get(key, {}).items(), key=lambda item: item[1])]
+
+    def zrangebyscore(self, key, low, high):
+        return [member.encode() for member, score in self.data.get(key, {}).items() if low <= score <= high]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.data.get(key, {}).pop(member, None)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def hincrby(self, key, field, amount):
+        values = self.data.setdefault(key, {})
+        values[field] = values.get(field, 0) + amount
+
+    def hgetall(self, key):
+        return {field.encode(): str(value).encode() for field, value in self.data.get(key, {}).items()}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+def test_key_depends_on_content_strategy_and_params(chunk_cache):
+    key = chunk_cache.chunk_cache_key("digest1", "a.pdf", "basic", {"max_characters": 1500})
+
+    assert key == chunk_cache.chunk_cache_key("digest1", "other/b.pdf", "basic", {"max_characters": 1500})
+    assert key != chunk_cache.chunk_cache_key("digest2", "a.pdf", "basic", {"max_characters": 1500})
+    assert key != chunk_cache.chunk_cache_key("digest1", "a.docx", "basic", {"max_characters": 1500})
+    assert key != chunk_cache.chunk_cache_key("digest1", "a.pdf", "none", {"max_characters": 1500})
+    assert key != chunk_cache.chunk_cache_key("digest1", "a.pdf", "basic", {"max_characters": 500})
+
+
+def test_key_ignores_volatile_params(chunk_cache):
+    assert chunk_cache.chunk_cache_key("digest1", "a.pdf", "basic", {"task_id": "1", "split_max_workers": 2}) == \
+        chunk_cache.chunk_cache_key("digest1", "a.pdf", "basic", {"task_id": "2"})
+
+
+def test_put_then_get_replaces_filename(chunk_cache):
+    client = FakeRedis()
+    cache = chunk_cache.ChunkCache(client, ttl_seconds=60)
+    cache.put("k", [{"content": "a", "filename": "bucket/old.pdf"}, {"content": "b"}])
+
+    chunks = cache.get("k", filename="bucket/new.pdf")
+
+    assert chunks == [{"content": "a", "filename": "bucket/new.pdf"}, {"content": "b"}]
+    assert client.expirations["dp:cache:chunks:k"] == 60
+
+
+def test_metrics_track_hit_rate(chunk_cache):
+    cache = chunk_cache.ChunkCache(FakeRedis())
+    assert cache.get("k") is None
+    cache.put("k", [{"content": "a"}])
+    cache.get("k")
+    cache.get("k")
+
+    metrics = cache.get_metrics()
+    assert metrics["entries"] == 1
+    assert metrics["bytes"] > 0
+    assert (metrics["hits"], metrics["misses"], metrics["stores"]) == (2, 1, 1)
+    assert metrics["hit_rate"] == pytest.approx(0.6667)
+
+
+def test_least_recently_used_entries_are_evicted_above_max_bytes(chunk_cache, monkeypatch):
+    client = FakeRedis()
+    cache = chunk_cache.ChunkCache(client)
+    now = [1000.0]
+    monkeypatch.setattr(chunk_cache.time, "time", lambda: now[0])
+    size = cache.put("first", [{"content": "x" * 100}])
+    cache.max_bytes = size * 2
+    now[0] += 1
+    cache.put("second", [{"content": "y" * 100}])
+    now[0] += 1
+    cache.get("first")
+    now[0] += 1
+    cache.put("third", [{"content": "z" * 100}])
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert cache.get_metrics()["evictions"] == 1
+
+
+def test_expired_entries_are_forgotten(chunk_cache, monkeypatch):
+    client = FakeRedis()
+    cache = chunk_cache.ChunkCache(client, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr(chunk_cache.time, "time", lambda: now[0])
+    cache.put("old", [{"content": "a"}])
+    # Redis expired the data key on its own
+    client.delete("dp:cache:chunks:old")
+    now[0] += 20
+    cache.put("new", [{"content": "b"}])
+
+    assert cache.get_metrics()["entries"] == 1
+    assert "old" not in client.data["dp:cache:chunks:index"]
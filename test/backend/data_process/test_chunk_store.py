@@ -0,0 +1,141 @@
+import importlib.util
+import json
+import zlib
+from pathlib import Path
+
+import pytest
+
+
+def load_chunk_store():
+    # Load the module on its own to avoid importing the Celery app through backend.data_process
+    path = Path(__file__).resolve().parents[3] / "backend" / "data_process" / "chunk_store.py"
+    spec = importlib.util.spec_from_file_location("chunk_store_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+chunk_store = load_chunk_store()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expirations = {}
+        self.transactions = 0
+
+    def type(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return b"none"
+        return b"list" if isinstance(value, list) else b"string"
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def lindex(self, key, index):
+        values = self.data.get(key, [])
+        return values[index] if index < len(values) else None
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    def expire(self, key, seconds):
+        self.expirations[key] = seconds
+
+    def pipeline(self, transaction=True):
+        self.transactions += 1
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+def test_write_and_iterate_segments():
+    client = FakeRedis()
+    chunks = [{"content": f"chunk {i}\nline", "metadata": {"page": i}} for i in range(5)]
+
+    stored = chunk_store.write_chunks(client, "dp:t:chunks", chunks, segment_size=2, ttl_seconds=60)
+
+    assert stored == sum(len(segment) for segment in client.data["dp:t:chunks"])
+    assert client.transactions == 1
+    assert client.expirations["dp:t:chunks"] == 60
+    segments = list(chunk_store.iter_chunk_segments(client, "dp:t:chunks"))
+    assert [len(segment) for segment in segments] == [2, 2, 1]
+    assert [chunk for segment in segments for chunk in segment] == chunks
+
+
+def test_write_replaces_previous_segments():
+    client = FakeRedis()
+    chunk_store.write_chunks(client, "k", [{"content": "old"}] * 3, segment_size=1)
+    chunk_store.write_chunks(client, "k", [{"content": "new"}])
+
+    assert list(chunk_store.iter_chunk_segments(client, "k")) == [[{"content": "new"}]]
+
+
+def test_empty_chunks_are_stored_as_one_empty_segment():
+    client = FakeRedis()
+    chunk_store.write_chunks(client, "k", [])
+
+    assert list(chunk_store.iter_chunk_segments(client, "k")) == [[]]
+
+
+def test_segments_are_compressed():
+    chunks = [{"content": "repeated text " * 50, "metadata": {}}] * 20
+    segment = chunk_store.encode_segment(chunks)
+
+    assert len(segment) < len(json.dumps(chunks)) / 10
+    assert chunk_store.decode_segment(segment) == chunks
+
+
+def test_decode_zlib_segment_written_without_zstandard():
+    chunks = [{"content": "a"}, {"content": "b"}]
+    payload = "\n".join(json.dumps(chunk) for chunk in chunks).encode("utf-8")
+
+    assert chunk_store.decode_segment(chunk_store.CODEC_ZLIB + zlib.compress(payload)) == chunks
+
+
+def test_decode_unknown_codec_raises():
+    with pytest.raises(ValueError):
+        chunk_store.decode_segment(b"?data")
+
+
+def test_iterate_legacy_json_value():
+    client = FakeRedis()
+    client.data["k"] = json.dumps([{"content": "legacy"}]).encode("utf-8")
+
+    assert list(chunk_store.iter_chunk_segments(client, "k")) == [[{"content": "legacy"}]]
+
+
+def test_iterate_missing_key_returns_none():
+    assert chunk_store.iter_chunk_segments(FakeRedis(), "missing") is None
+
+
+def test_segments_are_fetched_lazily():
+    client = FakeRedis()
+    chunk_store.write_chunks(client, "k", [{"content": str(i)} for i in range(4)], segment_size=2)
+    fetched = []
+    original_lindex = client.lindex
+    client.lindex = lambda key, index: fetched.append(index) or original_lindex(key, index)
+
+    segments = chunk_store.iter_chunk_segments(client, "k")
+    assert fetched == []
+    next(segments)
+    assert fetched == [0]
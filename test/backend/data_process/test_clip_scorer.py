@@ -0,0 +1,64 @@
+import importlib
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def clip_scorer(monkeypatch):
+    # Stub the package so clip_scorer is imported without the Celery app
+    project_root = Path(__file__).resolve().parents[3]
+    backend_pkg = types.ModuleType("backend")
+    backend_pkg.__path__ = [str(project_root / "backend")]
+    monkeypatch.setitem(sys.modules, "backend", backend_pkg)
+    dp_pkg = types.ModuleType("backend.data_process")
+    dp_pkg.__path__ = [str(project_root / "backend" / "data_process")]
+    monkeypatch.setitem(sys.modules, "backend.data_process", dp_pkg)
+    monkeypatch.delitem(sys.modules, "backend.data_process.clip_scorer", raising=False)
+    return importlib.import_module("backend.data_process.clip_scorer")
+
+
+def test_embedding_cache_evicts_least_recently_used(clip_scorer):
+    cache = clip_scorer.EmbeddingCache(max_entries=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+
+    # Reading a makes b the least recently used entry
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 3, "misses": 1, "hit_rate": 0.75}
+
+
+def test_embedding_cache_disabled_with_zero_entries(clip_scorer):
+    cache = clip_scorer.EmbeddingCache(max_entries=0)
+    cache.put("a", [1.0])
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_embedding_cache_is_thread_safe(clip_scorer):
+    cache = clip_scorer.EmbeddingCache(max_entries=50)
+
+    def worker(offset):
+        for number in range(500):
+            key = (offset + number) % 80
+            if cache.get(key) is None:
+                cache.put(key, [key])
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["entries"] == 50
+    assert stats["hits"] + stats["misses"] == 8 * 500
@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def inference_executor(monkeypatch):
+    # Stub the package so inference_executor is imported without the Celery app
+    project_root = Path(__file__).resolve().parents[3]
+    backend_pkg = types.ModuleType("backend")
+    backend_pkg.__path__ = [str(project_root / "backend")]
+    monkeypatch.setitem(sys.modules, "backend", backend_pkg)
+    dp_pkg = types.ModuleType("backend.data_process")
+    dp_pkg.__path__ = [str(project_root / "backend" / "data_process")]
+    monkeypatch.setitem(sys.modules, "backend.data_process", dp_pkg)
+    monkeypatch.delitem(sys.modules, "backend.data_process.clip_scorer", raising=False)
+    monkeypatch.delitem(sys.modules, "backend.data_process.inference_executor", raising=False)
+    return importlib.import_module("backend.data_process.inference_executor")
+
+
+@pytest.fixture
+def executor(inference_executor):
+    executor = inference_executor.InferenceExecutor("clip", workers=2, max_pending=2, timeout_s=5.0)
+    # Threads stand in for the worker processes, they share the scorer global of the module
+    executor._pool = ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+class FakeScorer:
+    def __init__(self):
+        self.scored = []
+
+    def embed_images(self, images):
+        return {url: [float(len(url))] for url in images}
+
+    def score(self, embeddings, positive_prompt, negative_prompt):
+        self.scored.append(sorted(embeddings))
+        return {url: (0.3, 0.7) for url in embeddings}
+
+
+def add(a, b):
+    return a + b
+
+
+def wait_for(event):
+    event.wait(5)
+    return "done"
+
+
+def test_run_returns_result_and_records_latency(executor):
+    assert asyncio.run(executor.run(add, 1, 2)) == 3
+
+    metrics = executor.get_metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["completed"] == 1
+    assert metrics["latency_ms"]["max"] >= metrics["inference_ms"]["max"] >= 0.0
+
+
+def test_full_queue_rejects_requests(inference_executor, executor):
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(wait_for, release)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(inference_executor.InferenceQueueFullError):
+            await executor.run(add, 1, 2)
+        assert executor.get_metrics()["queue_depth"] == 2
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(scenario()) == ["done", "done"]
+    metrics = executor.get_metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["completed"] == 2
+
+
+def test_timed_out_request_stays_pending_until_the_worker_is_done(inference_executor, executor):
+    release = threading.Event()
+
+    with pytest.raises(inference_executor.InferenceTimeoutError):
+        asyncio.run(executor.run(wait_for, release, timeout=0.05))
+
+    assert executor.get_metrics()["timeouts"] == 1
+    assert executor.get_metrics()["queue_depth"] == 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while executor.get_metrics()["queue_depth"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.get_metrics()["queue_depth"] == 0
+
+
+def test_score_images_caches_embeddings_by_url(inference_executor, executor, monkeypatch):
+    scorer = FakeScorer()
+    monkeypatch.setattr(inference_executor, "_scorer", scorer)
+
+    first = asyncio.run(executor.score_images({"a.png": "image"}, "important", "unimportant"))
+    cached = executor.get_cached_images(["a.png", "b.png"])
+    second = asyncio.run(executor.score_images({"b.png": "image"}, "important", "unimportant", cached))
+
+    assert first == {"a.png": (0.3, 0.7)}
+    assert cached == {"a.png": [5.0]}
+    assert second == {"a.png": (0.3, 0.7), "b.png": (0.3, 0.7)}
+    assert scorer.scored == [["a.png"], ["a.png", "b.png"]]
+    assert executor.get_metrics()["image_cache"]["hits"] == 1
+
+
+def test_score_images_without_model(inference_executor, executor, monkeypatch):
+    monkeypatch.setattr(inference_executor, "_scorer", None)
+
+    assert asyncio.run(executor.score_images({"a.png": "image"}, "important", "unimportant")) is None
+    assert executor.get_cached_images(["a.png"]) == {}
@@ -1,5 +1,6 @@
+import asyncio
+import hashlib
 import io
-import json
 import sys
 import types
 
@@ -34,6 +35,15 @@ class FakeDataProcessCore:
         ]
 
 
+def fake_get_file_spooled(source, **kwargs):
+    data = b"file-bytes"
+    return io.BytesIO(data), {
+        "file_size": len(data),
+        "md5": hashlib.md5(data).hexdigest(),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
 class FakeRedisClient:
     def __init__(self):
         self.store = {}
@@ -52,6 +62,29 @@ class FakeRedisClient:
     def expire(self, key, seconds):
         self.expirations[key] = seconds
 
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.store.setdefault(key, []).extend(values)
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
 
 @pytest.fixture(autouse=True)
 def stub_ray_before_import(monkeypatch):
@@ -68,12 +101,12 @@ def import_module(monkeypatch):
     import os
     from pathlib import Path
 
-    # Stub DataProcessCore and get_file_stream
+    # Stub DataProcessCore and get_file_spooled
     monkeypatch.setitem(sys.modules, "nexent.data_process", types.SimpleNamespace(DataProcessCore=FakeDataProcessCore))
 
     # Provide a full stub module for database.attachment_db to avoid importing real Minio client
     fake_attachment_db_mod = types.ModuleType("database.attachment_db")
-    fake_attachment_db_mod.get_file_stream = lambda source: io.BytesIO(b"file-bytes")
+    fake_attachment_db_mod.get_file_spooled = fake_get_file_spooled
     fake_attachment_db_mod.get_file_size_from_minio = lambda path_or_url: 0
     monkeypatch.setitem(sys.modules, "database.attachment_db", fake_attachment_db_mod)
 
@@ -134,6 +167,10 @@ def import_module(monkeypatch):
     fake_consts_const = types.ModuleType("consts.const")
     fake_consts_const.RAY_ACTOR_NUM_CPUS = 1
     fake_consts_const.REDIS_BACKEND_URL = ""
+    fake_consts_const.DP_CHUNK_CACHE_ENABLED = False
+    fake_consts_const.DP_CHUNK_CACHE_MAX_MB = 1
+    fake_consts_const.DP_CHUNK_CACHE_TTL_S = 60
+    fake_consts_const.DP_FILE_SPOOL_MAX_MB = 1
     monkeypatch.setitem(sys.modules, "consts", fake_consts_pkg)
     monkeypatch.setitem(sys.modules, "consts.const", fake_consts_const)
 
@@ -159,10 +196,101 @@ def test_process_file_happy_path(monkeypatch):
     assert chunks[0]["content"] == "hello world"
 
 
+def test_process_file_with_metadata(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    actor = ray_actors.DataProcessorRayActor()
+
+    result = actor.process_file_with_metadata(
+        source="bucket/report.pdf",
+        chunking_strategy="basic",
+        destination="minio",
+    )
+
+    assert result["chunks"][0]["content"] == "hello world"
+    metadata = result["file_metadata"]
+    assert metadata["content_type"] == "application/pdf"
+    assert metadata["file_size"] > 0
+    assert len(metadata["etag"]) == 32
+
+
+def test_process_file_passes_spooled_stream_and_closes_it(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    received = []
+
+    class StreamCore(FakeDataProcessCore):
+        def file_process(self, file_data, filename, chunking_strategy, **params):
+            received.append(file_data)
+            assert file_data.read() == b"file-bytes"
+            return super().file_process(file_data, filename, chunking_strategy, **params)
+
+    actor = ray_actors.DataProcessorRayActor()
+    actor._processor = StreamCore()
+
+    actor.process_file("bucket/a.txt", "basic", destination="minio")
+
+    assert len(received) == 1
+    assert received[0].closed
+
+
+class FakeChunkCache:
+    def __init__(self, cached=None):
+        self.cached = cached
+        self.gets = []
+        self.puts = []
+
+    def get(self, key, filename=None):
+        self.gets.append((key, filename))
+        return self.cached
+
+    def put(self, key, chunks):
+        self.puts.append((key, chunks))
+
+
+def test_process_file_stores_chunks_in_cache(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    monkeypatch.setattr(ray_actors, "DP_CHUNK_CACHE_ENABLED", True)
+    monkeypatch.setattr(ray_actors, "REDIS_BACKEND_URL", "redis://test")
+    actor = ray_actors.DataProcessorRayActor()
+    actor._chunk_cache = FakeChunkCache()
+
+    chunks = actor.process_file("bucket/a.txt", "basic", destination="minio", task_id="tid-1")
+
+    assert actor._chunk_cache.puts == [(actor._chunk_cache.gets[0][0], chunks)]
+    assert actor._chunk_cache.gets[0][0].startswith(hashlib.sha256(b"file-bytes").hexdigest() + ":")
+    assert actor._chunk_cache.gets[0][1] == "bucket/a.txt"
+    assert len(actor._processor.calls) == 1
+
+
+def test_process_file_served_from_cache(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    monkeypatch.setattr(ray_actors, "DP_CHUNK_CACHE_ENABLED", True)
+    monkeypatch.setattr(ray_actors, "REDIS_BACKEND_URL", "redis://test")
+    actor = ray_actors.DataProcessorRayActor()
+    actor._chunk_cache = FakeChunkCache(cached=[{"content": "cached", "filename": "bucket/a.txt"}])
+
+    chunks = actor.process_file("bucket/a.txt", "basic", destination="minio")
+
+    assert chunks == [{"content": "cached", "filename": "bucket/a.txt"}]
+    assert actor._processor.calls == []
+    assert actor._chunk_cache.puts == []
+
+
+def test_build_file_metadata_unknown_type(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+
+    metadata = ray_actors.build_file_metadata("bucket/data.unknownext", 3, "900150983cd24fb0d6963f7d28e17f72")
+
+    assert metadata == {
+        "file_size": 3,
+        "content_type": "application/octet-stream",
+        "etag": "900150983cd24fb0d6963f7d28e17f72",
+    }
+
+
 def test_process_file_get_stream_none_raises(monkeypatch):
-    # Override get_file_stream to return None
+    # Override get_file_spooled to return None
     fake_attachment_db_mod = types.ModuleType("database.attachment_db")
-    fake_attachment_db_mod.get_file_stream = lambda source: None
+    fake_attachment_db_mod.get_file_spooled = lambda source, **kwargs: None
     fake_attachment_db_mod.get_file_size_from_minio = lambda path_or_url: 0
     monkeypatch.setitem(sys.modules, "database.attachment_db", fake_attachment_db_mod)
 
@@ -222,6 +350,10 @@ def test_process_file_get_stream_none_raises(monkeypatch):
     fake_consts_const = types.ModuleType("consts.const")
     fake_consts_const.RAY_ACTOR_NUM_CPUS = 1
     fake_consts_const.REDIS_BACKEND_URL = ""
+    fake_consts_const.DP_CHUNK_CACHE_ENABLED = False
+    fake_consts_const.DP_CHUNK_CACHE_MAX_MB = 1
+    fake_consts_const.DP_CHUNK_CACHE_TTL_S = 60
+    fake_consts_const.DP_FILE_SPOOL_MAX_MB = 1
     monkeypatch.setitem(sys.modules, "consts", fake_consts_pkg)
     monkeypatch.setitem(sys.modules, "consts.const", fake_consts_const)
 
@@ -257,7 +389,7 @@ def test_process_file_core_returns_none_list_variants(monkeypatch):
         )
         # Stub attachment_db to avoid importing real Minio client
         fake_attachment_db_mod = types.ModuleType("database.attachment_db")
-        fake_attachment_db_mod.get_file_stream = lambda source: io.BytesIO(b"file-bytes")
+        fake_attachment_db_mod.get_file_spooled = fake_get_file_spooled
         fake_attachment_db_mod.get_file_size_from_minio = lambda path_or_url: 0
         monkeypatch.setitem(sys.modules, "database.attachment_db", fake_attachment_db_mod)
         # Also stub celery.result.AsyncResult and redis module
@@ -309,6 +441,10 @@ def test_process_file_core_returns_none_list_variants(monkeypatch):
         fake_consts_const = types.ModuleType("consts.const")
         fake_consts_const.RAY_ACTOR_NUM_CPUS = 1
         fake_consts_const.REDIS_BACKEND_URL = ""
+        fake_consts_const.DP_CHUNK_CACHE_ENABLED = False
+        fake_consts_const.DP_CHUNK_CACHE_MAX_MB = 1
+        fake_consts_const.DP_CHUNK_CACHE_TTL_S = 60
+        fake_consts_const.DP_FILE_SPOOL_MAX_MB = 1
         monkeypatch.setitem(sys.modules, "consts", fake_consts_pkg)
         monkeypatch.setitem(sys.modules, "consts.const", fake_consts_const)
         from importlib import reload
@@ -339,18 +475,19 @@ def test_store_chunks_in_redis_handles_none_and_serialization_error(monkeypatch)
     fake_client = FakeRedisClient()
     fake_redis_module = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda *a, **k: fake_client))
     monkeypatch.setitem(sys.modules, "redis", fake_redis_module)
+    from backend.data_process.chunk_store import decode_segment
 
     actor = ray_actors.DataProcessorRayActor()
 
     # None chunks -> stored []
     ok_none = actor.store_chunks_in_redis("k-none", None)
     assert ok_none is True
-    assert json.loads(fake_client.get("k-none")) == []
+    assert [decode_segment(seg) for seg in fake_client.get("k-none")] == [[]]
 
     # Non-serializable -> fallback []
     ok_bad = actor.store_chunks_in_redis("k-bad", [{"s": {1, 2, 3}}])
     assert ok_bad is True
-    assert json.loads(fake_client.get("k-bad")) == []
+    assert [decode_segment(seg) for seg in fake_client.get("k-bad")] == [[]]
 
 
 def test_store_chunks_in_redis_no_url_returns_false(monkeypatch):
@@ -359,3 +496,57 @@ def test_store_chunks_in_redis_no_url_returns_false(monkeypatch):
     actor = ray_actors.DataProcessorRayActor()
     assert actor.store_chunks_in_redis("k", [{"content": "x"}]) is False
 
+
+
+def test_summarize_processing_result(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    result = {"chunks": [{"content": "a"}, {"content": "b"}], "file_metadata": {"file_size": 3}}
+    assert ray_actors.summarize_processing_result(result) == {"chunks_count": 2, "file_metadata": {"file_size": 3}}
+    assert ray_actors.summarize_processing_result({"chunks": None}) == {"chunks_count": 0, "file_metadata": None}
+
+
+def test_chunk_handoff_take_keeps_result_until_ack(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    handoff = ray_actors.ChunkHandoffRayActor()
+
+    async def run():
+        await handoff.put("k", ["result_ref"])
+        taken = await handoff.take("k", timeout=1)
+        # A redelivered forward task takes the same result again
+        again = await handoff.take("k", timeout=0.01)
+        await handoff.ack("k")
+        after_ack = await handoff.take("k", timeout=0.01)
+        return taken, again, after_ack
+
+    taken, again, after_ack = asyncio.run(run())
+    assert taken == ["result_ref"]
+    assert again == ["result_ref"]
+    assert after_ack is None
+    assert handoff._results == {}
+    assert handoff._events == {}
+
+
+def test_chunk_handoff_take_waits_for_put(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    handoff = ray_actors.ChunkHandoffRayActor()
+
+    async def run():
+        waiter = asyncio.ensure_future(handoff.take("k", timeout=1))
+        await asyncio.sleep(0)
+        await handoff.put("k", ["result_ref"])
+        return await waiter
+
+    assert asyncio.run(run()) == ["result_ref"]
+
+
+def test_chunk_handoff_drops_expired_results_on_take(monkeypatch):
+    ray_actors = import_module(monkeypatch)
+    handoff = ray_actors.ChunkHandoffRayActor(ttl_seconds=0)
+
+    async def run():
+        await handoff.put("old", ["result_ref"])
+        await asyncio.sleep(0.01)
+        return await handoff.take("old", timeout=0.01)
+
+    assert asyncio.run(run()) is None
+    assert handoff._results == {}
@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def task_events(monkeypatch):
+    # Stub the package so task_events is imported without the Celery app
+    project_root = Path(__file__).resolve().parents[3]
+    backend_pkg = types.ModuleType("backend")
+    backend_pkg.__path__ = [str(project_root / "backend")]
+    monkeypatch.setitem(sys.modules, "backend", backend_pkg)
+    dp_pkg = types.ModuleType("backend.data_process")
+    dp_pkg.__path__ = [str(project_root / "backend" / "data_process")]
+    monkeypatch.setitem(sys.modules, "backend.data_process", dp_pkg)
+    monkeypatch.delitem(sys.modules, "backend.data_process.task_events", raising=False)
+    return importlib.import_module("backend.data_process.task_events")
+
+
+class FakePublisher:
+    def __init__(self, error=None):
+        self.published = []
+        self.error = error
+
+    def publish(self, channel, message):
+        if self.error:
+            raise self.error
+        self.published.append((channel, json.loads(message)))
+
+
+class FakePubSub:
+    """Asyncio pub/sub returning queued messages, None when a get times out"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.subscribed = []
+
+    async def subscribe(self, *channels):
+        self.subscribed.extend(channels)
+
+    async def psubscribe(self, *patterns):
+        self.subscribed.extend(patterns)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+
+TASK_KWARGS = {"index_name": "kb", "source": "bucket/a.pdf", "original_filename": "a.pdf"}
+
+
+def test_build_task_event_maps_states_to_stages(task_events):
+    stages = [task_events.build_task_event("t1", f"data_process.tasks.{name}", status, TASK_KWARGS)["stage"]
+              for name, status in [("process", "STARTED"), ("forward", "STARTED"), ("forward", "SUCCESS")]]
+
+    assert stages == ["extracting_text", "vectorizing_and_storing", "completed"]
+
+
+def test_build_task_event_carries_task_and_file(task_events):
+    event = task_events.build_task_event("t1", "data_process.tasks.forward", "FAILURE", TASK_KWARGS, error="ES down")
+
+    assert event["id"] == "t1"
+    assert event["task_name"] == "forward"
+    assert event["index_name"] == "kb"
+    assert event["path_or_url"] == "bucket/a.pdf"
+    assert event["original_filename"] == "a.pdf"
+    assert event["stage"] == "forward_task_failed"
+    assert event["error"] == "ES down"
+
+
+def test_build_task_event_skips_tasks_without_index(task_events):
+    assert task_events.build_task_event("t1", "data_process.tasks.process_sync", "STARTED", TASK_KWARGS) is None
+    assert task_events.build_task_event("t1", "data_process.tasks.process", "STARTED", {"source": "a.pdf"}) is None
+    assert task_events.build_task_event("t1", "data_process.tasks.process", "STARTED", None) is None
+
+
+def test_publish_task_event_uses_index_channel(task_events):
+    publisher = FakePublisher()
+    event = task_events.build_task_event("t1", "process", "STARTED", TASK_KWARGS)
+
+    task_events.publish_task_event(publisher, event)
+    task_events.publish_task_event(publisher, None)
+
+    assert publisher.published == [("dp:task_events:kb", event)]
+
+
+def test_publish_task_event_failure_is_not_raised(task_events):
+    event = task_events.build_task_event("t1", "process", "STARTED", TASK_KWARGS)
+
+    task_events.publish_task_event(FakePublisher(error=ConnectionError("Redis down")), event)
+
+
+def test_subscribe_task_events_to_one_or_all_indexes(task_events):
+    one, every = FakePubSub([]), FakePubSub([])
+
+    asyncio.run(task_events.subscribe_task_events(one, "kb"))
+    asyncio.run(task_events.subscribe_task_events(every))
+
+    assert one.subscribed == ["dp:task_events:kb"]
+    assert every.subscribed == ["dp:task_events:*"]
+
+
+def test_iter_task_events_yields_events_and_heartbeats(task_events):
+    event = task_events.build_task_event("t1", "process", "STARTED", TASK_KWARGS)
+    pubsub = FakePubSub([{"data": json.dumps(event)}, {"data": "not json"}, None, {"data": json.dumps(event)}])
+
+    async def take(count):
+        received = []
+        async for item in task_events.iter_task_events(pubsub, heartbeat_s=0):
+            received.append(item)
+            if len(received) == count:
+                return received
+
+    assert asyncio.run(take(3)) == [event, None, event]
+
+
+def test_format_sse(task_events):
+    assert task_events.format_sse({"id": "t1"}) == 'event: task\ndata: {"id": "t1"}\n\n'
+    assert task_events.format_sse([], event="snapshot") == "event: snapshot\ndata: []\n\n"
@@ -11,6 +11,8 @@ class FakeRay:
         self._initialized = initialized
         self.inits = []
         self.get_returns = None
+        # Values of specific object references, other references get get_returns
+        self.objects = {}
 
     def is_initialized(self):
         return self._initialized
@@ -20,6 +22,8 @@ class FakeRay:
         self.inits.append(kwargs)
 
     def get(self, ref):
+        if isinstance(ref, str) and ref in self.objects:
+            return self.objects[ref]
         return self.get_returns
 
     def remote(self, **kwargs):
@@ -29,6 +33,31 @@ class FakeRay:
         return decorator
 
 
+class FakeSegmentRedis:
+    """In-memory Redis supporting the commands used by chunk_store"""
+
+    def __init__(self, strings=None, lists=None):
+        self.strings = dict(strings or {})
+        self.lists = {k: list(v) for k, v in (lists or {}).items()}
+
+    def type(self, key):
+        if key in self.lists:
+            return b"list"
+        if key in self.strings:
+            return b"string"
+        return b"none"
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lindex(self, key, index):
+        values = self.lists.get(key, [])
+        return values[index] if index < len(values) else None
+
+
 def import_tasks_with_fake_ray(monkeypatch, initialized=False):
     fake_ray = FakeRay(initialized=initialized)
     sys.modules["ray"] = fake_ray
@@ -47,6 +76,20 @@ def import_tasks_with_fake_ray(monkeypatch, initialized=False):
         const_mod.RAY_ACTOR_NUM_CPUS = 1
         const_mod.FORWARD_REDIS_RETRY_DELAY_S = 0
         const_mod.FORWARD_REDIS_RETRY_MAX = 1
+        const_mod.DP_CHUNK_HANDOFF = "redis"
+        const_mod.DP_CHUNK_HANDOFF_TIMEOUT_S = 1
+        const_mod.DP_ACTOR_POOL_ENABLED = False
+        const_mod.DP_ACTOR_POOL_SIZE = 0
+        const_mod.DP_ACTOR_POOL_MAX_SIZE = 0
+        const_mod.DP_ACTOR_POOL_IDLE_S = 300
+        const_mod.DP_ACTOR_LEASE_TIMEOUT_S = 3900
+        const_mod.DP_LARGE_FILE_MB = 20
+        const_mod.DP_FORWARD_PAGE_SIZE = 2
+        const_mod.DP_FORWARD_PAGE_TIMEOUT_S = 120
+        const_mod.DP_CHUNK_CACHE_ENABLED = False
+        const_mod.DP_CHUNK_CACHE_MAX_MB = 1
+        const_mod.DP_CHUNK_CACHE_TTL_S = 60
+        const_mod.DP_FILE_SPOOL_MAX_MB = 1
         sys.modules["consts.const"] = const_mod
     # Minimal stub for consts.model used by utils.file_management_utils
     if "consts.model" not in sys.modules:
@@ -63,6 +106,7 @@ def import_tasks_with_fake_ray(monkeypatch, initialized=False):
     if "database.attachment_db" not in sys.modules:
         sys.modules["database.attachment_db"] = types.SimpleNamespace(
             get_file_stream=lambda source: io.BytesIO(b"stub-bytes"),
+            get_file_spooled=lambda source, **kwargs: (io.BytesIO(b"stub-bytes"), {}),
             get_file_size_from_minio=lambda object_name, bucket=None: 0,
         )
     if "nexent.data_process" not in sys.modules:
@@ -71,6 +115,8 @@ def import_tasks_with_fake_ray(monkeypatch, initialized=False):
         )
     import backend.data_process.tasks as tasks
     importlib.reload(tasks)
+    # Tests hand out actors through get_ray_actor, the pool has its own tests
+    tasks.DP_ACTOR_POOL_ENABLED = False
     # Provide a Celery task shim that allows direct calls and supports .s for chaining
     class _SignatureShim:
         def __init__(self):
@@ -99,6 +145,7 @@ def import_tasks_with_fake_ray(monkeypatch, initialized=False):
     # Inject a default Ray actor so get_ray_actor works even when not monkeypatched in tests
     default_actor = types.SimpleNamespace(
         process_file=types.SimpleNamespace(remote=lambda *a, **k: "ref"),
+        process_file_with_metadata=types.SimpleNamespace(remote=lambda *a, **k: "ref"),
         store_chunks_in_redis=types.SimpleNamespace(remote=lambda *a, **k: None),
     )
     if not hasattr(tasks, "DataProcessorRayActor") or not hasattr(getattr(tasks, "DataProcessorRayActor"), "remote"):
@@ -220,12 +267,12 @@ def test_process_local_happy_path(monkeypatch, tmp_path):
                 self.args = (a, k)
         def __init__(self):
             self.calls = []
-            self.process_file = types.SimpleNamespace(remote=lambda *a, **k: "ref1")
+            self.process_file_with_metadata = types.SimpleNamespace(remote=lambda *a, **k: "ref1")
             self.store_chunks_in_redis = types.SimpleNamespace(remote=lambda *a, **k: None)
 
     monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
     # Mock ray.get to return chunks instead of reference
-    fake_ray.get_returns = mock_chunks
+    fake_ray.get_returns = {"chunks": mock_chunks, "file_metadata": None}
 
     self = FakeSelf("p1")
 
@@ -247,12 +294,12 @@ def test_process_minio_path(monkeypatch):
 
     class FakeActor:
         def __init__(self):
-            self.process_file = types.SimpleNamespace(remote=lambda *a, **k: "ref")
+            self.process_file_with_metadata = types.SimpleNamespace(remote=lambda *a, **k: "ref")
             self.store_chunks_in_redis = types.SimpleNamespace(remote=lambda *a, **k: None)
 
     monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
     # Mock ray.get to return chunks
-    fake_ray.get_returns = mock_chunks
+    fake_ray.get_returns = {"chunks": mock_chunks, "file_metadata": None}
 
     self = FakeSelf("m1")
     result = tasks.process(self, source="http://minio/bucket/x", source_type="minio", chunking_strategy="basic")
@@ -277,14 +324,14 @@ def test_process_large_file_with_many_chunks(monkeypatch, tmp_path):
 
     class FakeActor:
         def __init__(self):
-            self.process_file = types.SimpleNamespace(
+            self.process_file_with_metadata = types.SimpleNamespace(
                 remote=lambda *a, **k: "ref_large")
             self.store_chunks_in_redis = types.SimpleNamespace(
                 remote=lambda *a, **k: None)
 
     monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
     # Mock ray.get to return large chunks
-    fake_ray.get_returns = mock_chunks
+    fake_ray.get_returns = {"chunks": mock_chunks, "file_metadata": None}
 
     self = FakeSelf("large1")
 
@@ -319,12 +366,9 @@ def test_forward_redis_cached_invalid_json_raises(monkeypatch):
     monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
     monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
 
-    class FakeRedisClient:
-        def get(self, k):
-            return "not-json"
-
+    fake_client = FakeSegmentRedis(strings={"dp:rid:badjson": b"not-json"})
     fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(
-        from_url=lambda url, decode_responses=True: FakeRedisClient()))
+        from_url=lambda url, decode_responses=False: fake_client))
     monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
 
     self = FakeSelf("r3")
@@ -342,7 +386,7 @@ def test_forward_redis_client_from_url_failure(monkeypatch):
 
     class FakeRedis:
         @staticmethod
-        def from_url(url, decode_responses=True):
+        def from_url(url, decode_responses=False):
             raise RuntimeError("cannot connect")
 
     fake_redis_mod = types.SimpleNamespace(Redis=FakeRedis)
@@ -359,9 +403,7 @@ def test_forward_skips_empty_chunk_without_preprocess(monkeypatch):
     tasks, _ = import_tasks_with_fake_ray(monkeypatch)
     monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
     monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: 0)
-    # Ensure API success without calling real aiohttp
-    monkeypatch.setattr(tasks, "run_async", lambda coro: {
-                        "success": True, "total_indexed": 1, "total_submitted": 1, "message": "ok"})
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
 
     self = FakeSelf("f9")
     # Use tuple to bypass preprocess filtering (preprocess only filters list)
@@ -598,6 +640,168 @@ def test_process_and_forward_returns_empty_when_apply_async_none(monkeypatch):
         self, source="/a.txt", source_type="local", chunking_strategy="basic", index_name="idx")
     assert out == ""
 
+def test_process_passes_file_metadata_to_forward(monkeypatch):
+    """Test the file metadata described by the actor is returned for the forward task"""
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch, initialized=True)
+    file_metadata = {"file_size": 3 * 1024 * 1024, "content_type": "application/pdf", "etag": "abc"}
+
+    class FakeActor:
+        def __init__(self):
+            self.process_file_with_metadata = types.SimpleNamespace(remote=lambda *a, **k: "ref")
+            self.store_chunks_in_redis = types.SimpleNamespace(remote=lambda *a, **k: None)
+
+    monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
+    fake_ray.get_returns = {"chunks": [{"content": "c", "metadata": {}}], "file_metadata": file_metadata}
+
+    self = FakeSelf("meta1")
+    result = tasks.process(self, source="bucket/doc.pdf", source_type="minio", chunking_strategy="basic")
+
+    assert result["file_metadata"] == file_metadata
+    success_state = [s for s in self.states if s.get("state") == tasks.states.SUCCESS][0]
+    assert success_state.get("meta", {}).get("file_size_mb") == 3
+
+
+def test_forward_uses_file_metadata_without_size_lookup(monkeypatch):
+    """Test forward takes the file size from the payload instead of querying the file store"""
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+
+    def fail_get_file_size(*a, **k):
+        raise AssertionError("file size must not be queried")
+
+    monkeypatch.setattr(tasks, "get_file_size", fail_get_file_size)
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
+
+    self = FakeSelf("meta2")
+    chunks = [{"content": "a", "metadata": {}}, {"content": "b", "metadata": {}}]
+    result = tasks.forward(self, processed_data={"chunks": chunks, "file_metadata": {"file_size": 42}},
+                           index_name="idx", source="bucket/doc.pdf", source_type="minio")
+
+    assert result["chunks_stored"] == 2
+
+
+def test_forward_without_file_metadata_queries_size_once(monkeypatch):
+    """Test payloads without file metadata look the size up once per document"""
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    calls = []
+    monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: calls.append(a) or 7)
+    monkeypatch.setattr(tasks, "run_async", lambda coro: {"success": True, "total_indexed": 3, "total_submitted": 3})
+
+    self = FakeSelf("meta3")
+    chunks = [{"content": f"c{i}", "metadata": {}} for i in range(3)]
+    tasks.forward(self, processed_data={"chunks": chunks}, index_name="idx", source="bucket/doc.pdf", source_type="minio")
+
+    assert calls == [("minio", "bucket/doc.pdf")]
+
+
+def make_paged_aiohttp(responses=None):
+    """
+    Stub aiohttp whose session answers posted pages from responses, an exception in it is raised instead.
+    Without responses every page is indexed.
+    """
+    posted = []
+
+    class ClientResponseError(Exception):
+        pass
+
+    class ClientConnectorError(Exception):
+        pass
+
+    class Response:
+        def __init__(self, result):
+            self.result = result
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *a):
+            return False
+
+        async def json(self):
+            return self.result
+
+    class Session:
+        def __init__(self, *a, **k):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *a):
+            return False
+
+        def post(self, url, headers=None, params=None, json=None, raise_for_status=False):
+            posted.append((params["batch_offset"], [chunk["content"] for chunk in json]))
+            if responses is None:
+                return Response(page_result(len(json), len(json), params["batch_offset"] + len(json)))
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return Response(result)
+
+    fake_aiohttp = types.SimpleNamespace(
+        ClientResponseError=ClientResponseError,
+        ClientConnectorError=ClientConnectorError,
+        TCPConnector=lambda **k: None,
+        ClientTimeout=lambda **k: None,
+        ClientSession=Session,
+    )
+    return fake_aiohttp, posted
+
+
+def page_result(indexed, submitted, next_offset):
+    return {"success": True, "total_indexed": indexed, "total_submitted": submitted, "next_offset": next_offset}
+
+
+def test_forward_sends_chunks_in_pages_and_retries_only_failed_page(monkeypatch):
+    """Test forward pages chunks with a cursor and resends only the page that timed out"""
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    monkeypatch.setattr(tasks, "DP_FORWARD_PAGE_SIZE", 2)
+    monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: 0)
+
+    async def no_sleep(_):
+        return None
+    monkeypatch.setattr(tasks.asyncio, "sleep", no_sleep)
+    fake_aiohttp, posted = make_paged_aiohttp([
+        page_result(2, 2, 2),
+        tasks.asyncio.TimeoutError(),
+        page_result(2, 2, 4),
+        page_result(1, 1, 5),
+    ])
+    monkeypatch.setattr(tasks, "aiohttp", fake_aiohttp)
+
+    self = FakeSelf("paged")
+    chunks = [{"content": f"c{i}", "metadata": {}} for i in range(5)]
+    result = tasks.forward(self, processed_data={"chunks": chunks}, index_name="idx", source="/a.txt")
+
+    assert posted == [(0, ["c0", "c1"]), (2, ["c2", "c3"]), (2, ["c2", "c3"]), (4, ["c4"])]
+    assert result["es_result"]["total_indexed"] == 5
+    assert result["es_result"]["total_submitted"] == 5
+
+
+def test_forward_resends_partially_indexed_page(monkeypatch):
+    """Test a page main_service only partly stored is sent again before moving on"""
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    monkeypatch.setattr(tasks, "DP_FORWARD_PAGE_SIZE", 2)
+    monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: 0)
+
+    async def no_sleep(_):
+        return None
+    monkeypatch.setattr(tasks.asyncio, "sleep", no_sleep)
+    fake_aiohttp, posted = make_paged_aiohttp([page_result(1, 2, 2), page_result(2, 2, 2), page_result(1, 1, 3)])
+    monkeypatch.setattr(tasks, "aiohttp", fake_aiohttp)
+
+    self = FakeSelf("partial_page")
+    chunks = [{"content": f"c{i}", "metadata": {}} for i in range(3)]
+    result = tasks.forward(self, processed_data={"chunks": chunks}, index_name="idx", source="/a.txt")
+
+    assert [offset for offset, _ in posted] == [0, 0, 2]
+    assert result["es_result"]["total_indexed"] == 3
+
+
 def test_process_unsupported_source_type(monkeypatch):
     tasks, _ = import_tasks_with_fake_ray(monkeypatch, initialized=True)
     self = FakeSelf("e2")
@@ -613,8 +817,7 @@ def test_forward_with_chunks_success(monkeypatch):
     # Avoid calling real util
     monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: 123)
 
-    # run_async should return a successful response matching formatted chunk count (1)
-    monkeypatch.setattr(tasks, "run_async", lambda coro: {"success": True, "total_indexed": 1, "total_submitted": 1, "message": "ok"})
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
 
     self = FakeSelf("f1")
     chunks = [
@@ -668,23 +871,236 @@ def test_forward_loads_chunks_from_redis(monkeypatch):
     monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
     monkeypatch.setattr(tasks, "get_file_size", lambda *a, **k: 1)
 
-    class FakeRedisClient:
-        def __init__(self):
-            self.kv = {"dp:rid:chunks": json.dumps([{"content": "x", "metadata": {}}])}
-        def get(self, k):
-            return self.kv.get(k)
-
-    fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, decode_responses=True: FakeRedisClient()))
+    fake_client = FakeSegmentRedis(strings={"dp:rid:chunks": json.dumps([{"content": "x", "metadata": {}}]).encode()})
+    fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, decode_responses=False: fake_client))
     monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
 
-    # run_async returns success for 1 chunk
-    monkeypatch.setattr(tasks, "run_async", lambda coro: {"success": True, "total_indexed": 1, "total_submitted": 1, "message": "ok"})
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
 
     self = FakeSelf("f6")
     result = tasks.forward(self, processed_data={"redis_key": "dp:rid:chunks"}, index_name="idx", source="/a.txt")
     assert result["chunks_stored"] == 1
 
 
+def test_forward_reads_compressed_segments_from_redis(monkeypatch):
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    from backend.data_process.chunk_store import encode_segment
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
+    segments = [
+        encode_segment([{"content": "a", "metadata": {}}, {"content": " ", "metadata": {}}]),
+        encode_segment([{"content": "b", "metadata": {}}]),
+    ]
+    fake_client = FakeSegmentRedis(lists={"dp:rid:chunks": segments})
+    fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, decode_responses=False: fake_client))
+    monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
+
+    self = FakeSelf("seg1")
+    result = tasks.forward(self, processed_data={"redis_key": "dp:rid:chunks", "file_metadata": {"file_size": 1}},
+                           index_name="idx", source="/a.txt")
+    assert result["chunks_stored"] == 3
+
+
+def test_forward_indexes_each_segment_once_decoded(monkeypatch):
+    """Test a Redis segment is indexed before the next one is read, with batch_offset carried across segments"""
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    from backend.data_process.chunk_store import encode_segment
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
+    monkeypatch.setattr(tasks, "DP_FORWARD_PAGE_SIZE", 2)
+    fake_aiohttp, posted = make_paged_aiohttp()
+    monkeypatch.setattr(tasks, "aiohttp", fake_aiohttp)
+    reads = []
+
+    class RecordingRedis(FakeSegmentRedis):
+        def lindex(self, key, index):
+            # Pages posted when the segment is read
+            reads.append((index, len(posted)))
+            return super().lindex(key, index)
+
+    fake_client = RecordingRedis(lists={"dp:rid:chunks": [
+        encode_segment([{"content": "a", "metadata": {}}, {"content": " ", "metadata": {}},
+                        {"content": "b", "metadata": {}}]),
+        encode_segment([{"content": c, "metadata": {}} for c in "cde"]),
+    ]})
+    fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, decode_responses=False: fake_client))
+    monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
+
+    self = FakeSelf("seg3")
+    result = tasks.forward(self, processed_data={"redis_key": "dp:rid:chunks", "file_metadata": {"file_size": 1}},
+                           index_name="idx", source="/a.txt")
+
+    assert reads == [(0, 0), (1, 1)]
+    assert posted == [(0, ["a", "b"]), (2, ["c", "d"]), (4, ["e"])]
+    assert result["chunks_stored"] == 6
+    assert result["es_result"]["total_indexed"] == 5
+    assert result["es_result"]["total_submitted"] == 5
+
+
+def test_forward_corrupt_segment_raises(monkeypatch):
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
+    fake_client = FakeSegmentRedis(lists={"dp:rid:chunks": [b"?garbage"]})
+    fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, decode_responses=False: fake_client))
+    monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
+
+    self = FakeSelf("seg2")
+    with pytest.raises(Exception) as ei:
+        tasks.forward(self, processed_data={"redis_key": "dp:rid:chunks", "file_metadata": {"file_size": 1}},
+                      index_name="idx", source="/a.txt")
+    assert "Failed to read chunks" in json.loads(str(ei.value))["message"]
+
+
+def test_process_ray_handoff_keeps_chunks_in_ray(monkeypatch):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch, initialized=True)
+    monkeypatch.setattr(tasks, "DP_CHUNK_HANDOFF", "ray")
+    stored = []
+    put_calls = []
+
+    class FakeActor:
+        def __init__(self):
+            self.process_file_with_metadata = types.SimpleNamespace(remote=lambda *a, **k: "result_ref")
+            self.store_chunks_in_redis = types.SimpleNamespace(remote=lambda *a, **k: stored.append(a))
+
+    fake_handoff = types.SimpleNamespace(put=types.SimpleNamespace(
+        remote=lambda key, refs: put_calls.append((key, refs)) or "put_ref"))
+    monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
+    monkeypatch.setattr(tasks, "get_chunk_handoff", lambda: fake_handoff)
+    monkeypatch.setattr(tasks, "summarize_processing_result", types.SimpleNamespace(
+        remote=lambda ref: "summary_ref" if ref == "result_ref" else None))
+    fake_ray.objects["summary_ref"] = {"chunks_count": 4, "file_metadata": {"file_size": 10}}
+
+    self = FakeSelf("h1")
+    result = tasks.process(self, source="bucket/x.pdf", source_type="minio", chunking_strategy="basic")
+
+    # The reference is wrapped so the hand-off actor holds it without Ray fetching the chunks into it
+    assert put_calls == [("dp:h1:chunks", ["result_ref"])]
+    assert stored == []
+    assert result["handoff_key"] == "dp:h1:chunks"
+    assert result["redis_key"] is None
+    assert result["file_metadata"] == {"file_size": 10}
+    success_state = [s for s in self.states if s.get("state") == tasks.states.SUCCESS][0]
+    assert success_state.get("meta", {}).get("chunks_count") == 4
+
+
+def test_forward_takes_chunks_from_ray_handoff(monkeypatch):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    take_calls = []
+    ack_calls = []
+    fake_handoff = types.SimpleNamespace(
+        take=types.SimpleNamespace(remote=lambda key, timeout: take_calls.append(key) or "take_ref"),
+        ack=types.SimpleNamespace(remote=lambda key: ack_calls.append(key)))
+    monkeypatch.setattr(tasks, "get_chunk_handoff", lambda: fake_handoff)
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
+    fake_ray.objects["take_ref"] = ["result_ref"]
+    fake_ray.objects["result_ref"] = {"chunks": [{"content": "a", "metadata": {}}, {"content": "b", "metadata": {}}]}
+
+    self = FakeSelf("h2")
+    result = tasks.forward(self, processed_data={"handoff_key": "dp:h1:chunks", "redis_key": None,
+                                                 "file_metadata": {"file_size": 1}},
+                           index_name="idx", source="bucket/x.pdf")
+
+    assert take_calls == ["dp:h1:chunks"]
+    assert ack_calls == ["dp:h1:chunks"]
+    assert result["chunks_stored"] == 2
+
+
+def test_forward_keeps_ray_handoff_when_indexing_fails(monkeypatch):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch)
+    monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
+    ack_calls = []
+    fake_handoff = types.SimpleNamespace(
+        take=types.SimpleNamespace(remote=lambda key, timeout: "take_ref"),
+        ack=types.SimpleNamespace(remote=lambda key: ack_calls.append(key)))
+    monkeypatch.setattr(tasks, "get_chunk_handoff", lambda: fake_handoff)
+    monkeypatch.setattr(tasks, "run_async", lambda coro: {"success": False, "message": "es down"})
+    fake_ray.objects["take_ref"] = ["result_ref"]
+    fake_ray.objects["result_ref"] = {"chunks": [{"content": "a", "metadata": {}}]}
+
+    self = FakeSelf("h4")
+    with pytest.raises(Exception):
+        tasks.forward(self, processed_data={"handoff_key": "dp:h1:chunks", "file_metadata": {"file_size": 1}},
+                      index_name="idx", source="bucket/x.pdf")
+    # A redelivered forward task can still take the chunks
+    assert ack_calls == []
+
+
+def test_forward_ray_handoff_timeout_raises(monkeypatch):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch)
+    fake_handoff = types.SimpleNamespace(take=types.SimpleNamespace(remote=lambda key, timeout: "take_ref"))
+    monkeypatch.setattr(tasks, "get_chunk_handoff", lambda: fake_handoff)
+    fake_ray.get_returns = None
+
+    self = FakeSelf("h3")
+    with pytest.raises(Exception) as ei:
+        tasks.forward(self, processed_data={"handoff_key": "dp:h1:chunks"}, index_name="idx", source="bucket/x.pdf")
+    assert "did not arrive" in json.loads(str(ei.value))["message"]
+
+
+class FakeActorPool:
+    def __init__(self, actor):
+        self.actor = actor
+        self.released = []
+        self.acquire = types.SimpleNamespace(remote=lambda file_size: ("lease", file_size))
+        self.release = types.SimpleNamespace(remote=lambda *a: self.released.append(a))
+
+
+def test_process_leases_actor_from_pool(monkeypatch, tmp_path):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch, initialized=True)
+    f = tmp_path / "a.txt"
+    f.write_text("content")
+
+    class FakeActor:
+        def __init__(self):
+            self.process_file_with_metadata = types.SimpleNamespace(remote=lambda *a, **k: "ref")
+            self.store_chunks_in_redis = types.SimpleNamespace(remote=lambda *a, **k: None)
+
+    pool = FakeActorPool(FakeActor())
+    monkeypatch.setattr(tasks, "DP_ACTOR_POOL_ENABLED", True)
+    monkeypatch.setattr(tasks, "get_actor_pool", lambda: pool)
+    gets = []
+
+    def fake_get(ref):
+        gets.append(ref)
+        if isinstance(ref, tuple) and ref[0] == "lease":
+            return "lease-3", pool.actor
+        return {"chunks": [{"content": "c", "metadata": {}}], "file_metadata": None}
+
+    monkeypatch.setattr(fake_ray, "get", fake_get)
+
+    self = FakeSelf("pool1")
+    tasks.process(self, source=str(f), source_type="local", chunking_strategy="basic")
+
+    assert gets[0] == ("lease", 7)
+    assert pool.released == [("lease-3", True)]
+
+
+def test_process_releases_actor_on_failure(monkeypatch, tmp_path):
+    tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch, initialized=True)
+    f = tmp_path / "a.txt"
+    f.write_text("content")
+
+    class FailingActor:
+        def __init__(self):
+            def fail(*a, **k):
+                raise RuntimeError("actor died")
+            self.process_file_with_metadata = types.SimpleNamespace(remote=fail)
+
+    pool = FakeActorPool(FailingActor())
+    monkeypatch.setattr(tasks, "DP_ACTOR_POOL_ENABLED", True)
+    monkeypatch.setattr(tasks, "get_actor_pool", lambda: pool)
+    monkeypatch.setattr(fake_ray, "get", lambda ref: ("lease-5", pool.actor))
+
+    self = FakeSelf("pool2")
+    with pytest.raises(Exception):
+        tasks.process(self, source=str(f), source_type="local", chunking_strategy="basic")
+
+    assert pool.released == [("lease-5", False)]
+
+
 def test_process_and_forward_returns_chain_id(monkeypatch):
     tasks, _ = import_tasks_with_fake_ray(monkeypatch)
 
@@ -702,6 +1118,62 @@ def test_process_and_forward_returns_chain_id(monkeypatch):
     assert chain_id == "123"
 
 
+class FakeTaskIndex:
+    def __init__(self):
+        self.submitted = []
+        self.states = []
+
+    def add_submitted(self, task_ids, index_name, source, **kwargs):
+        self.submitted.append((task_ids, index_name, source, kwargs))
+
+    def record_state(self, task_id, task_name, index_name, source, status, **fields):
+        self.states.append((task_id, task_name, index_name, source, status, fields))
+
+
+def test_process_and_forward_records_submitted_chain(monkeypatch):
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    task_index = FakeTaskIndex()
+    monkeypatch.setattr(tasks, "get_task_index", lambda: task_index)
+
+    class FakeChain:
+        def apply_async(self):
+            return types.SimpleNamespace(id="f1", parent=types.SimpleNamespace(id="p1"))
+
+    monkeypatch.setattr(tasks, "chain", lambda *a, **k: FakeChain())
+    tasks.process_and_forward(FakeSelf("c1"), source="/a.txt", source_type="local", chunking_strategy="basic",
+                              index_name="idx", original_filename="a.txt")
+
+    assert task_index.submitted == [({"forward": "f1", "process": "p1"}, "idx", "/a.txt",
+                                     {"source_type": "local", "original_filename": "a.txt"})]
+
+
+def test_logging_task_records_failure_in_task_index(monkeypatch):
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    task_index = FakeTaskIndex()
+    monkeypatch.setattr(tasks, "get_task_index", lambda: task_index)
+    task = tasks.LoggingTask()
+    task.name = "data_process.tasks.forward"
+    exc = Exception(json.dumps({"message": "ES down", "index_name": "idx", "task_name": "forward",
+                                "source": "/a.txt", "original_filename": "a.txt"}))
+
+    task.on_failure(exc, "f1", (), {"index_name": "idx", "source": "/a.txt"}, None)
+
+    assert task_index.states == [("f1", "forward", "idx", "/a.txt", "FAILURE",
+                                  {"source_type": None, "original_filename": "a.txt", "error": "ES down"})]
+
+
+def test_logging_task_failure_without_index_is_not_recorded(monkeypatch):
+    tasks, _ = import_tasks_with_fake_ray(monkeypatch)
+    task_index = FakeTaskIndex()
+    monkeypatch.setattr(tasks, "get_task_index", lambda: task_index)
+    task = tasks.LoggingTask()
+    task.name = "data_process.tasks.process_sync"
+
+    task.on_failure(Exception("boom"), "s1", (), {"source": "/a.txt"}, None)
+
+    assert task_index.states == []
+
+
 def test_process_sync_local_returns(monkeypatch):
     tasks, fake_ray = import_tasks_with_fake_ray(monkeypatch, initialized=True)
 
@@ -744,12 +1216,8 @@ def test_forward_redis_retry_when_value_absent(monkeypatch):
     monkeypatch.setattr(tasks, "ELASTICSEARCH_SERVICE", "http://api")
     monkeypatch.setattr(tasks, "REDIS_BACKEND_URL", "redis://test")
 
-    class FakeRedisClient:
-        def get(self, k):
-            return None
-
     fake_redis_mod = types.SimpleNamespace(Redis=types.SimpleNamespace(
-        from_url=lambda url, decode_responses=True: FakeRedisClient()))
+        from_url=lambda url, decode_responses=False: FakeSegmentRedis()))
     monkeypatch.setitem(sys.modules, "redis", fake_redis_mod)
 
     self = FakeSelf("r2")
@@ -800,13 +1268,13 @@ def test_process_zero_file_size_speed_calculation(monkeypatch, tmp_path):
 
     class FakeActor:
         def __init__(self):
-            self.process_file = types.SimpleNamespace(
+            self.process_file_with_metadata = types.SimpleNamespace(
                 remote=lambda *a, **k: "ref")
             self.store_chunks_in_redis = types.SimpleNamespace(
                 remote=lambda *a, **k: None)
 
     monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
-    fake_ray.get_returns = mock_chunks
+    fake_ray.get_returns = {"chunks": mock_chunks, "file_metadata": None}
 
     self = FakeSelf("empty1")
 
@@ -829,13 +1297,13 @@ def test_process_url_source_with_many_chunks(monkeypatch):
 
     class FakeActor:
         def __init__(self):
-            self.process_file = types.SimpleNamespace(
+            self.process_file_with_metadata = types.SimpleNamespace(
                 remote=lambda *a, **k: "ref_url")
             self.store_chunks_in_redis = types.SimpleNamespace(
                 remote=lambda *a, **k: None)
 
     monkeypatch.setattr(tasks, "get_ray_actor", lambda: FakeActor())
-    fake_ray.get_returns = mock_chunks
+    fake_ray.get_returns = {"chunks": mock_chunks, "file_metadata": None}
 
     self = FakeSelf("url1")
 
@@ -859,13 +1327,7 @@ def test_forward_large_chunks_batch_success(monkeypatch):
     large_chunks = [{"content": f"content_{i}",
                      "metadata": {"page": i}} for i in range(150)]
 
-    # Mock successful indexing of all chunks
-    monkeypatch.setattr(tasks, "run_async", lambda coro: {
-        "success": True,
-        "total_indexed": 150,
-        "total_submitted": 150,
-        "message": "All chunks indexed"
-    })
+    monkeypatch.setattr(tasks, "aiohttp", make_paged_aiohttp()[0])
 
     self = FakeSelf("large_forward")
     result = tasks.forward(
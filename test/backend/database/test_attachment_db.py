@@ -0,0 +1,200 @@
+import hashlib
+import random
+import sys
+import threading
+import time
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Mock the consts module to avoid ModuleNotFoundError
+consts_mock = MagicMock()
+consts_mock.const = MagicMock()
+consts_mock.const.MINIO_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+consts_mock.const.MINIO_UPLOAD_CONCURRENCY = 4
+consts_mock.const.MINIO_DOWNLOAD_RANGE_SIZE = 8 * 1024 * 1024
+consts_mock.const.MINIO_DOWNLOAD_CONCURRENCY = 4
+sys.modules['consts'] = consts_mock
+sys.modules['consts.const'] = consts_mock.const
+
+# Mock the entire client module
+client_mock = MagicMock()
+client_mock.minio_client = MagicMock()
+sys.modules['database.client'] = client_mock
+sys.modules['backend.database.client'] = client_mock
+
+from backend.database import attachment_db
+from backend.database.attachment_db import get_file_spooled, upload_stream
+
+PART_SIZE = 16
+
+
+def make_reader(data: bytes, max_read: int = None):
+    """Coroutine function reading data like UploadFile.read, optionally with short reads"""
+    position = 0
+
+    async def read(size: int = -1) -> bytes:
+        nonlocal position
+        if max_read is not None:
+            size = min(size, max_read)
+        chunk = data[position:position + size]
+        position += len(chunk)
+        return chunk
+
+    return read
+
+
+@pytest.fixture
+def minio():
+    client = MagicMock()
+    client.put_object.side_effect = lambda object_name, data, bucket, content_type: f"/bucket/{object_name}"
+    client.create_multipart_upload.return_value = "upload-1"
+    client.complete_multipart_upload.side_effect = lambda object_name, upload_id, parts, bucket: f"/bucket/{object_name}"
+    with patch.object(attachment_db, 'minio_client', client), \
+            patch.object(attachment_db, 'MULTIPART_MIN_PART_SIZE', PART_SIZE):
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_small_file_uses_single_request(minio):
+    data = b"small file"
+
+    result = await upload_stream(make_reader(data), "notes.txt", prefix="folder", part_size=PART_SIZE)
+
+    assert result["success"] is True
+    assert result["object_name"].startswith("folder/")
+    assert result["url"] == f"/bucket/{result['object_name']}"
+    assert result["file_size"] == len(data)
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+    minio.put_object.assert_called_once_with(result["object_name"], data, None, "text/plain")
+    minio.create_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_large_file_uses_multipart_upload(minio):
+    data = bytes(range(256)) * 2
+    minio.upload_part.side_effect = lambda object_name, upload_id, part_number, part, bucket: {
+        "PartNumber": part_number, "ETag": hashlib.md5(part).hexdigest()}
+
+    # Short reads must still produce full parts, only the last one may be smaller
+    result = await upload_stream(make_reader(data, max_read=5), "data.bin", part_size=PART_SIZE)
+
+    assert result["success"] is True
+    assert result["file_size"] == len(data)
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+    minio.put_object.assert_not_called()
+    uploaded = sorted(minio.upload_part.call_args_list, key=lambda call: call.args[2])
+    assert [call.args[2] for call in uploaded] == list(range(1, len(data) // PART_SIZE + 1))
+    assert all(len(call.args[3]) == PART_SIZE for call in uploaded)
+    assert b"".join(call.args[3] for call in uploaded) == data
+    object_name, upload_id, parts, _ = minio.complete_multipart_upload.call_args.args
+    assert upload_id == "upload-1"
+    assert sorted(part["PartNumber"] for part in parts) == [call.args[2] for call in uploaded]
+    minio.abort_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_bounds_parts_in_flight(minio):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def upload_part(object_name, upload_id, part_number, part, bucket):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return {"PartNumber": part_number, "ETag": str(part_number)}
+
+    minio.upload_part.side_effect = upload_part
+
+    result = await upload_stream(make_reader(b"x" * PART_SIZE * 12), "data.bin", part_size=PART_SIZE,
+                                 max_concurrency=3)
+
+    assert result["success"] is True
+    assert minio.upload_part.call_count == 12
+    assert 1 < peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_multipart_upload_on_failure(minio):
+    def upload_part(object_name, upload_id, part_number, part, bucket):
+        if part_number == 2:
+            raise Exception("Part upload failed")
+        return {"PartNumber": part_number, "ETag": str(part_number)}
+
+    minio.upload_part.side_effect = upload_part
+
+    result = await upload_stream(make_reader(b"x" * PART_SIZE * 4), "data.bin", part_size=PART_SIZE)
+
+    assert result["success"] is False
+    assert result["error"] == "Part upload failed"
+    assert "sha256" not in result
+    minio.complete_multipart_upload.assert_not_called()
+    minio.abort_multipart_upload.assert_called_once_with(result["object_name"], "upload-1", None)
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_reports_read_errors(minio):
+    async def read(size):
+        raise Exception("Read error")
+
+    result = await upload_stream(read, "notes.txt", part_size=PART_SIZE)
+
+    assert result["success"] is False
+    assert result["error"] == "Read error"
+    minio.put_object.assert_not_called()
+
+
+def make_ranged_minio(data: bytes):
+    client = MagicMock()
+    client.get_object_size.return_value = len(data)
+
+    def get_file_range(object_name, start, end, bucket):
+        # Ranges complete out of order, they must still be written in order
+        time.sleep(random.random() / 100)
+        return data[start:end + 1]
+
+    client.get_file_range.side_effect = get_file_range
+    return client
+
+
+def test_get_file_spooled_reads_ranges_in_order():
+    data = bytes(range(256)) * 10
+    client = make_ranged_minio(data)
+
+    with patch.object(attachment_db, 'minio_client', client):
+        spooled, digests = get_file_spooled("folder/a.pdf", max_memory_size=len(data) * 2, range_size=100,
+                                            max_concurrency=4)
+
+    with spooled:
+        assert spooled.read() == data
+    assert digests == {
+        "file_size": len(data),
+        "md5": hashlib.md5(data).hexdigest(),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    assert client.get_file_range.call_count == 26
+    assert client.get_file_range.call_args_list[-1].args[1:3] == (2500, 2559)
+
+
+def test_get_file_spooled_spills_large_files_to_disk():
+    data = b"x" * 1000
+    with patch.object(attachment_db, 'minio_client', make_ranged_minio(data)):
+        spooled, digests = get_file_spooled("folder/a.pdf", max_memory_size=100, range_size=300)
+
+    with spooled:
+        assert spooled._rolled
+        assert spooled.read() == data
+    assert digests["file_size"] == 1000
+
+
+def test_get_file_spooled_returns_none_on_failure():
+    client = MagicMock()
+    client.get_object_size.side_effect = Exception("Not found")
+
+    with patch.object(attachment_db, 'minio_client', client):
+        assert get_file_spooled("folder/missing.pdf") is None
@@ -40,6 +40,12 @@ sys.modules['nexent.data_process.core'].DataProcessCore = MagicMock()
 mock_const = MagicMock()
 mock_const.CLIP_MODEL_PATH = "mock_clip_path"
 mock_const.IMAGE_FILTER = True
+mock_const.IMAGE_FILTER_BATCH_SIZE = 32
+mock_const.IMAGE_FILTER_CACHE_SIZE = 4096
+mock_const.IMAGE_FILTER_DOWNLOAD_CONCURRENCY = 16
+mock_const.IMAGE_FILTER_WORKERS = 2
+mock_const.IMAGE_FILTER_QUEUE_SIZE = 64
+mock_const.IMAGE_FILTER_TIMEOUT_S = 30.0
 mock_const.REDIS_BACKEND_URL = "redis://mock:6379/0"
 mock_const.REDIS_URL = "redis://mock:6379/0"
 sys.modules['consts.const'] = mock_const
@@ -48,6 +54,7 @@ sys.modules['consts.const'] = mock_const
 with patch('data_process.utils.get_task_info') as mock_get_task_info, \
         patch('data_process.utils.get_all_task_ids_from_redis') as mock_get_redis_task_ids:
     from backend.services.data_process_service import DataProcessService, get_data_process_service
+    from backend.services.data_process_service import InferenceQueueFullError
 
 
 class TestDataProcessService(unittest.TestCase):
@@ -157,53 +164,6 @@ class TestDataProcessService(unittest.TestCase):
         self.assertIsNone(service.redis_client)
         self.assertIsNone(service.redis_pool)
 
-    @patch('backend.services.data_process_service.CLIPModel.from_pretrained')
-    @patch('backend.services.data_process_service.CLIPProcessor.from_pretrained')
-    def test_init_clip_model_success(self, mock_processor, mock_model):
-        """
-        Test successful CLIP model initialization.
-
-        This test verifies that the CLIP model and processor are correctly initialized.
-        It ensures that:
-        1. The CLIPModel and CLIPProcessor are loaded from the pretrained path
-        2. The model and processor objects are stored in the service instance
-        3. The clip_available flag is set to True indicating the model is ready for use
-        """
-        # Setup mocks
-        mock_model.return_value = MagicMock()
-        mock_processor.return_value = MagicMock()
-
-        # Initialize CLIP model
-        self.service._init_clip_model()
-
-        # Verify CLIP model was properly initialized
-        self.assertTrue(self.service.clip_available)
-        self.assertIsNotNone(self.service.model)
-        self.assertIsNotNone(self.service.processor)
-
-    @patch('backend.services.data_process_service.CLIPModel.from_pretrained')
-    def test_init_clip_model_failure(self, mock_model):
-        """
-        Test CLIP model initialization failure.
-
-        This test verifies the service's error handling when CLIP model loading fails.
-        It ensures that:
-        1. When an exception occurs during model loading, it's handled gracefully
-        2. The clip_available flag is set to False
-        3. Both model and processor attributes are set to None
-        4. The service can still function without the CLIP model
-        """
-        # Setup mock to raise exception
-        mock_model.side_effect = Exception("Failed to load model")
-
-        # Initialize CLIP model
-        self.service._init_clip_model()
-
-        # Verify CLIP model was not initialized
-        self.assertFalse(self.service.clip_available)
-        self.assertIsNone(self.service.model)
-        self.assertIsNone(self.service.processor)
-
     def test_check_image_size(self):
         """
         Test image size checking functionality.
@@ -516,6 +476,74 @@ class TestDataProcessService(unittest.TestCase):
         # Verify result
         mock_get_task_info.assert_not_called()
 
+    @patch('backend.services.data_process_service.get_actor_pool')
+    def test_get_actor_pool_metrics(self, mock_get_pool):
+        """
+        Test the actor pool metrics are read from the pool dispatcher.
+        """
+        async def fake_metrics():
+            return {"size": 2, "actors": [{"slot": 0, "utilisation": 0.5}]}
+        mock_get_pool.return_value.get_metrics.remote.return_value = fake_metrics()
+
+        result = asyncio.run(self.service.get_actor_pool_metrics())
+
+        self.assertEqual(result, {"enabled": True, "size": 2, "actors": [{"slot": 0, "utilisation": 0.5}]})
+
+    @patch('backend.services.data_process_service.DP_ACTOR_POOL_ENABLED', False)
+    @patch('backend.services.data_process_service.get_actor_pool')
+    def test_get_actor_pool_metrics_disabled(self, mock_get_pool):
+        """
+        Test no pool is created when the actor pool is disabled.
+        """
+        result = asyncio.run(self.service.get_actor_pool_metrics())
+
+        self.assertEqual(result, {"enabled": False, "actors": []})
+        mock_get_pool.assert_not_called()
+
+    @patch('backend.services.data_process_service.DP_CHUNK_CACHE_ENABLED', True)
+    @patch('backend.services.data_process_service.ChunkCache')
+    def test_get_chunk_cache_metrics(self, mock_chunk_cache):
+        """
+        Test the chunk cache metrics are read through the service Redis client.
+        """
+        self.service.redis_client = MagicMock()
+        mock_chunk_cache.return_value.get_metrics.return_value = {"entries": 3, "hit_rate": 0.5}
+
+        result = self.service.get_chunk_cache_metrics()
+
+        self.assertEqual(result, {"enabled": True, "entries": 3, "hit_rate": 0.5})
+        self.assertIs(mock_chunk_cache.call_args.args[0], self.service.redis_client)
+
+    @patch('backend.services.data_process_service.DP_CHUNK_CACHE_ENABLED', False)
+    def test_get_chunk_cache_metrics_disabled(self):
+        """
+        Test the chunk cache reports disabled when turned off.
+        """
+        self.assertEqual(self.service.get_chunk_cache_metrics(), {"enabled": False})
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('backend.services.data_process_service.InferenceExecutor')
+    def test_get_inference_metrics(self, mock_executor_class):
+        """
+        Test the inference metrics are read from the executor, which is created once.
+        """
+        mock_executor_class.return_value.get_metrics.return_value = {"queue_depth": 2, "rejected": 1}
+
+        result = self.service.get_inference_metrics()
+        self.service.get_inference_metrics()
+
+        self.assertEqual(result, {"enabled": True, "queue_depth": 2, "rejected": 1})
+        mock_executor_class.assert_called_once()
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', False)
+    @patch('backend.services.data_process_service.InferenceExecutor')
+    def test_get_inference_metrics_disabled(self, mock_executor_class):
+        """
+        Test the inference metrics report disabled, without starting workers, when image filtering is off.
+        """
+        self.assertEqual(self.service.get_inference_metrics(), {"enabled": False})
+        mock_executor_class.assert_not_called()
+
     def test_get_task(self):
         """
         Test retrieval of task by ID.
@@ -645,7 +673,8 @@ class TestDataProcessService(unittest.TestCase):
         2. Tasks are filtered based on the index_name property
         3. Only tasks matching the specified index are returned
         """
-        # Setup mock
+        # Setup mock, without Redis the tasks of every index are read and filtered
+        self.service.redis_client = None
         mock_get_all_tasks.return_value = [
             {'id': 'task1', 'index_name': 'index1', 'task_name': 'task_name1'},
             {'id': 'task2', 'index_name': 'index2', 'task_name': 'task_name2'},
@@ -1221,26 +1250,39 @@ class TestDataProcessService(unittest.TestCase):
         asyncio.run(self.async_test_load_image_temp_file_fallback())
         asyncio.run(self.async_test_load_image_local_file_exception())
 
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
+    def _mock_inference_executor(self, probabilities=None, error=None, cached=None):
+        """Give the service a mocked inference executor scoring images with the given result or error"""
+        executor = MagicMock()
+        executor.get_cached_images.return_value = cached or {}
+        executor.score_images = AsyncMock(return_value=probabilities, side_effect=error)
+        self.service.inference_executor = executor
+        return executor
+
+    def _mock_image(self, width=300, height=300):
+        mock_img = MagicMock()
+        mock_img.width = width
+        mock_img.height = height
+        mock_img.mode = 'RGB'
+        return mock_img
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
     @patch('backend.services.data_process_service.DataProcessService.check_image_size')
-    @patch('backend.services.data_process_service.DataProcessService._init_clip_model')
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_size_filter(self, mock_init_clip, mock_check_size, mock_load_image):
+    async def async_test_filter_important_image_size_filter(self, mock_check_size, mock_load_image, mock_session):
         """
         Async implementation for testing image filtering by size.
 
         This test verifies the initial size filtering stage of the image importance filter.
         It ensures that:
         1. Images that don't meet size requirements are immediately rejected
-        2. The CLIP model is not initialized for such images (optimization)
+        2. No CLIP inference is requested for such images (optimization)
         3. The result indicates the image is not important with zero confidence
         """
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_img.width = 100  # Small image
-        mock_img.height = 100
-        mock_load_image.return_value = mock_img
+        mock_load_image.return_value = self._mock_image(100, 100)  # Small image
         mock_check_size.return_value = False  # Image doesn't meet size requirements
+        executor = self._mock_inference_executor()
 
         # Filter image
         result = await self.service.filter_important_image("http://example.com/small_image.png")
@@ -1248,30 +1290,27 @@ class TestDataProcessService(unittest.TestCase):
         # Verify result
         self.assertFalse(result["is_important"])
         self.assertEqual(result["confidence"], 0.0)
-        mock_load_image.assert_called_once_with(
-            "http://example.com/small_image.png")
+        self.assertNotIn("image_url", result)
+        self.assertEqual(mock_load_image.call_args.args[1], "http://example.com/small_image.png")
         mock_check_size.assert_called_once_with(100, 100)
-        mock_init_clip.assert_not_called()  # CLIP should not be initialized
+        executor.score_images.assert_not_called()  # CLIP should not be used
 
     @patch('backend.services.data_process_service.IMAGE_FILTER', False)
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
-    @patch('backend.services.data_process_service.DataProcessService.check_image_size')
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
+    @patch('backend.services.data_process_service.DataProcessService._get_inference_executor')
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_filter_disabled(self, mock_check_size, mock_load_image):
+    async def async_test_filter_important_image_filter_disabled(self, mock_get_executor, mock_load_image,
+                                                               mock_session):
         """
         Async implementation for testing behavior when image filtering is disabled.
 
         This test verifies that when IMAGE_FILTER is disabled:
-        1. All images are considered important regardless of content
+        1. All images of sufficient size are considered important regardless of content
         2. The result indicates the image is important with maximum confidence
-        3. The CLIP model is not used (optimization)
+        3. No inference worker is started (optimization)
         """
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_img.width = 300
-        mock_img.height = 300
-        mock_load_image.return_value = mock_img
-        mock_check_size.return_value = True  # Image meets size requirements
+        mock_load_image.return_value = self._mock_image()
 
         # Filter image
         result = await self.service.filter_important_image("http://example.com/image.png")
@@ -1279,46 +1318,26 @@ class TestDataProcessService(unittest.TestCase):
         # Verify result
         self.assertTrue(result["is_important"])
         self.assertEqual(result["confidence"], 1.0)
+        mock_get_executor.assert_not_called()
 
     @patch('backend.services.data_process_service.IMAGE_FILTER', True)
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
-    @patch('backend.services.data_process_service.DataProcessService.check_image_size')
-    @patch('torch.no_grad')
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_with_clip(self, mock_no_grad, mock_check_size, mock_load_image):
+    async def async_test_filter_important_image_with_clip(self, mock_load_image, mock_session):
         """
         Async implementation for testing image filtering with CLIP model.
 
         This test verifies the complete image filtering process with CLIP:
         1. The image is loaded and passes size requirements
-        2. The CLIP model processes the image with positive and negative prompts
+        2. The image is scored by the inference executor with the positive and negative prompts
         3. The model's output probabilities determine the image importance
         4. The result includes the correct confidence scores and classification
         """
-        # Setup image mock
-        mock_img = MagicMock()
-        mock_img.width = 300
-        mock_img.height = 300
-        mock_img.mode = 'RGB'
+        mock_img = self._mock_image()
         mock_load_image.return_value = mock_img
-        mock_check_size.return_value = True  # Image meets size requirements
-
-        # Setup CLIP model mocks
-        self.service.clip_available = True
-        self.service.model = MagicMock()
-        self.service.processor = MagicMock()
-
-        # Setup model outputs
-        mock_outputs = MagicMock()
-        mock_logits = MagicMock()
-        mock_probs = MagicMock()
-        mock_probs[0].tolist.return_value = [0.3, 0.7]  # [negative, positive]
-        mock_logits.softmax.return_value = mock_probs
-        mock_outputs.logits_per_image = mock_logits
-        self.service.model.return_value = mock_outputs
-
-        # Setup processor
-        self.service.processor.return_value = {"inputs": "processed"}
+        executor = self._mock_inference_executor(
+            probabilities={"http://example.com/image.png": (0.3, 0.7)})  # (negative, positive)
 
         # Filter image
         result = await self.service.filter_important_image(
@@ -1333,34 +1352,91 @@ class TestDataProcessService(unittest.TestCase):
         self.assertEqual(result["probabilities"]["positive"], 0.7)
         self.assertEqual(result["probabilities"]["negative"], 0.3)
 
-        # Verify CLIP was used
-        self.service.processor.assert_called_once()
-        self.service.model.assert_called_once()
+        # Verify the image was sent to the inference executor
+        executor.score_images.assert_awaited_once_with(
+            {"http://example.com/image.png": mock_img}, "an important image", "an unimportant image", {})
 
     @patch('backend.services.data_process_service.IMAGE_FILTER', True)
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
-    @patch('backend.services.data_process_service.DataProcessService.check_image_size')
-    @patch('backend.services.data_process_service.DataProcessService._init_clip_model')
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def async_test_filter_important_image_downscaled_for_clip(self, mock_load_image, mock_session):
+        """
+        Async implementation for testing large images are reduced to the CLIP input size before they are scored.
+        """
+        mock_load_image.return_value = Image.new('RGB', (4000, 3000), color='red')
+        executor = self._mock_inference_executor(probabilities={"http://example.com/photo.jpg": (0.3, 0.7)})
+
+        result = await self.service.filter_important_image("http://example.com/photo.jpg")
+
+        self.assertTrue(result["is_important"])
+        scored = executor.score_images.call_args.args[0]["http://example.com/photo.jpg"]
+        self.assertEqual(scored.size, (448, 336))
+
+    def test_downscale_for_clip(self):
+        """Test images are reduced to the CLIP input size on their shortest side and small images are kept."""
+        import backend.services.data_process_service as dps_module
+        self.assertEqual(dps_module._downscale_for_clip(Image.new('RGB', (1000, 3000))).size, (336, 1008))
+        small = Image.new('RGB', (300, 400))
+        self.assertIs(dps_module._downscale_for_clip(small), small)
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def async_test_filter_important_image_cached_embedding(self, mock_load_image, mock_session):
+        """
+        Async implementation for testing images whose embedding is cached are not downloaded again.
+        """
+        cached = {"http://example.com/image.png": [0.6, 0.8]}
+        executor = self._mock_inference_executor(
+            probabilities={"http://example.com/image.png": (0.9, 0.1)}, cached=cached)
+
+        result = await self.service.filter_important_image("http://example.com/image.png")
+
+        self.assertFalse(result["is_important"])
+        mock_load_image.assert_not_called()
+        executor.score_images.assert_awaited_once_with({}, "an important image", "an unimportant image", cached)
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
     @patch('backend.services.data_process_service.logger')
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_clip_not_available(self, mock_logger, mock_init_clip, mock_check_size, mock_load_image):
+    async def async_test_filter_important_images_clip_not_available_with_cached(self, mock_logger, mock_load_image,
+                                                                               mock_session):
         """
-        Async implementation for testing behavior when CLIP model is not available.
+        Async implementation for testing images with a cached embedding are kept when CLIP is not available.
+        """
+        mock_load_image.return_value = self._mock_image()
+        cached = {"http://example.com/cached.png": [0.6, 0.8]}
+        self._mock_inference_executor(probabilities=None, cached=cached)
+
+        results = await self.service.filter_important_images(
+            ["http://example.com/cached.png", "http://example.com/image.png"])
 
-        This test verifies that when the CLIP model is not available:
-        1. The service attempts to initialize the CLIP model
-        2. If initialization fails, all images that pass size filtering are considered important
-        3. The result indicates the image is important with maximum confidence
+        self.assertEqual([result["image_url"] for result in results],
+                         ["http://example.com/cached.png", "http://example.com/image.png"])
+        self.assertTrue(all(result["is_important"] for result in results))
+        self.assertTrue(all(result["confidence"] == 1.0 for result in results))
+        mock_load_image.assert_called_once()
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
+    @patch('backend.services.data_process_service.logger')
+    @pytest.mark.asyncio
+    async def async_test_filter_important_image_clip_not_available(self, mock_logger, mock_load_image,
+                                                                   mock_session):
         """
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_img.width = 300
-        mock_img.height = 300
-        mock_load_image.return_value = mock_img
-        mock_check_size.return_value = True  # Image meets size requirements
+        Async implementation for testing behavior when CLIP model is not available.
 
-        # Make CLIP unavailable
-        self.service.clip_available = False
+        This test verifies that when the inference workers could not load the CLIP model:
+        1. All images that pass size filtering are considered important
+        2. The result indicates the image is important with maximum confidence
+        """
+        mock_load_image.return_value = self._mock_image()
+        self._mock_inference_executor(probabilities=None)
 
         # Filter image
         result = await self.service.filter_important_image("http://example.com/image.png")
@@ -1368,44 +1444,29 @@ class TestDataProcessService(unittest.TestCase):
         # Verify result
         self.assertTrue(result["is_important"])
         self.assertEqual(result["confidence"], 1.0)
-        mock_init_clip.assert_called_once()  # CLIP initialization attempted
+        mock_logger.warning.assert_called_once()
 
     @patch('backend.services.data_process_service.IMAGE_FILTER', True)
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
-    @patch('backend.services.data_process_service.DataProcessService.check_image_size')
-    @patch('backend.services.data_process_service.DataProcessService._init_clip_model')
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
     @patch('backend.services.data_process_service.logger')
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_clip_processing_failure(self, mock_logger, mock_init_clip, mock_check_size, mock_load_image):
+    async def async_test_filter_important_image_clip_processing_failure(self, mock_logger, mock_load_image,
+                                                                        mock_session):
         """
         Async implementation for testing CLIP model processing failure fallback.
 
-        This test verifies that when CLIP model processing fails, the service falls back
+        This test verifies that when CLIP inference fails or times out, the service falls back
         to size-only filtering with predefined confidence values.
         It ensures that:
         1. The image passes size requirements
-        2. CLIP model is available and initialized
-        3. CLIP processing fails during model execution
-        4. The service falls back to size-only filtering
-        5. A warning is logged about the CLIP processing failure
-        6. The result indicates the image is important with fallback confidence values
+        2. The inference executor raises an error
+        3. The service falls back to size-only filtering
+        4. A warning is logged about the CLIP processing failure
+        5. The result indicates the image is important with fallback confidence values
         """
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_img.width = 300
-        mock_img.height = 300
-        mock_img.mode = 'RGB'
-        mock_load_image.return_value = mock_img
-        mock_check_size.return_value = True  # Image meets size requirements
-
-        # Setup CLIP model mocks
-        self.service.clip_available = True
-        self.service.model = MagicMock()
-        self.service.processor = MagicMock()
-
-        # Setup processor to raise exception during processing
-        self.service.processor.side_effect = Exception(
-            "CLIP model processing failed")
+        mock_load_image.return_value = self._mock_image()
+        executor = self._mock_inference_executor(error=Exception("CLIP model processing failed"))
 
         # Filter image
         result = await self.service.filter_important_image("http://example.com/image.png")
@@ -1424,16 +1485,29 @@ class TestDataProcessService(unittest.TestCase):
         self.assertIn("CLIP model processing failed", warning_call)
 
         # Verify CLIP was attempted
-        self.service.processor.assert_called_once()
+        executor.score_images.assert_awaited_once()
 
     @patch('backend.services.data_process_service.IMAGE_FILTER', True)
-    @patch('backend.services.data_process_service.DataProcessService.load_image')
-    @patch('backend.services.data_process_service.DataProcessService.check_image_size')
-    @patch('backend.services.data_process_service.DataProcessService._init_clip_model')
+    @patch('aiohttp.ClientSession')
+    @patch('backend.services.data_process_service.DataProcessService._load_image', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def async_test_filter_important_image_queue_full(self, mock_load_image, mock_session):
+        """
+        Async implementation for testing a full inference queue is reported to the caller.
+
+        Rejected requests are not scored with the size-only fallback, so the client can retry them later.
+        """
+        mock_load_image.return_value = self._mock_image()
+        self._mock_inference_executor(error=InferenceQueueFullError("Inference queue is full"))
+
+        with self.assertRaises(InferenceQueueFullError):
+            await self.service.filter_important_image("http://example.com/image.png")
+
+    @patch('backend.services.data_process_service.IMAGE_FILTER', True)
+    @patch('aiohttp.ClientSession')
     @patch('backend.services.data_process_service.logger')
-    @patch('PIL.Image.new')
     @pytest.mark.asyncio
-    async def async_test_filter_important_image_general_exception(self, mock_image_new, mock_logger, mock_init_clip, mock_check_size, mock_load_image):
+    async def async_test_filter_important_image_general_exception(self, mock_logger, mock_session):
         """
         Async implementation for testing general exception handling in image filtering.
 
@@ -1445,21 +1519,8 @@ class TestDataProcessService(unittest.TestCase):
         3. An exception is raised to the caller
         4. The exception message includes the original error details
         """
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_img.width = 300
-        mock_img.height = 300
-        mock_img.mode = 'RGBA'  # Set to RGBA to trigger the conversion path
-        mock_load_image.return_value = mock_img
-        mock_check_size.return_value = True  # Image meets size requirements
-
-        # Setup CLIP model mocks
-        self.service.clip_available = True
-        self.service.model = MagicMock()
-        self.service.processor = MagicMock()
-
-        # Make the image mode conversion fail to trigger the outer exception handler
-        mock_image_new.side_effect = Exception("Image conversion failed")
+        self._mock_inference_executor()
+        mock_session.side_effect = Exception("Session creation failed")
 
         # Filter image - should raise exception
         with self.assertRaises(Exception) as context:
@@ -1467,16 +1528,13 @@ class TestDataProcessService(unittest.TestCase):
 
         # Verify exception message
         self.assertIn(
-            "Error processing image: Image conversion failed", str(context.exception))
+            "Error processing image: Session creation failed", str(context.exception))
 
         # Verify error was logged
         mock_logger.error.assert_called_once()
         error_call = mock_logger.error.call_args[0][0]
         self.assertIn(
-            "Error processing image: Image conversion failed", error_call)
-
-        # Verify image conversion was attempted
-        mock_image_new.assert_called_once()
+            "Error processing image: Session creation failed", error_call)
 
     def test_filter_important_image(self):
         """
@@ -1485,17 +1543,22 @@ class TestDataProcessService(unittest.TestCase):
         This test serves as a wrapper to run the async tests for filter_important_image.
         It verifies that the service can filter images based on:
         1. Size requirements
-        2. CLIP model assessment when available
+        2. CLIP inference when available, reusing cached embeddings
         3. Global configuration settings
         4. CLIP processing failure fallback
-        5. General exception handling
+        5. Inference queue back-pressure
+        6. General exception handling
         """
         asyncio.run(self.async_test_filter_important_image_size_filter())
         asyncio.run(self.async_test_filter_important_image_filter_disabled())
         asyncio.run(self.async_test_filter_important_image_clip_not_available())
         asyncio.run(self.async_test_filter_important_image_with_clip())
+        asyncio.run(self.async_test_filter_important_image_cached_embedding())
+        asyncio.run(self.async_test_filter_important_image_downscaled_for_clip())
+        asyncio.run(self.async_test_filter_important_images_clip_not_available_with_cached())
         asyncio.run(
             self.async_test_filter_important_image_clip_processing_failure())
+        asyncio.run(self.async_test_filter_important_image_queue_full())
         asyncio.run(self.async_test_filter_important_image_general_exception())
 
     @patch('backend.services.data_process_service.DataProcessService')
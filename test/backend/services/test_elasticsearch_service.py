@@ -169,9 +169,60 @@ class TestElasticSearchService(unittest.TestCase):
         self.mock_es_core.client.indices.exists.assert_called_once_with(
             index="test_index")
         self.mock_es_core.create_vector_index.assert_called_once_with(
-            "test_index", embedding_dim=768)
+            "test_index", embedding_dim=768, index_type=None, m=None, ef_construction=None)
         mock_create_knowledge.assert_called_once()
 
+    @patch('backend.services.elasticsearch_service.create_knowledge_record')
+    def test_create_index_with_vector_index_options(self, mock_create_knowledge):
+        """
+        Test index creation forwards the requested vector index options.
+        """
+        self.mock_es_core.client.indices.exists.return_value = False
+        self.mock_es_core.create_vector_index.return_value = True
+
+        ElasticSearchService.create_index(
+            index_name="test_index",
+            embedding_dim=768,
+            es_core=self.mock_es_core,
+            user_id="test_user",
+            tenant_id="test_tenant",
+            vector_index_type="int8_hnsw",
+            hnsw_m=32,
+            hnsw_ef_construction=200
+        )
+
+        self.mock_es_core.create_vector_index.assert_called_once_with(
+            "test_index", embedding_dim=768, index_type="int8_hnsw", m=32, ef_construction=200)
+
+    def test_migrate_vector_index_success(self):
+        """
+        Test migrating an existing index to a quantized vector index type.
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+        self.mock_es_core.migrate_vector_index.return_value = {
+            "index_name": "test_index", "index_type": "bbq_hnsw", "documents": 42}
+
+        result = ElasticSearchService.migrate_vector_index(
+            "test_index", "bbq_hnsw", None, None, self.mock_es_core)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["documents"], 42)
+        self.mock_es_core.migrate_vector_index.assert_called_once_with(
+            "test_index", "bbq_hnsw", m=None, ef_construction=None)
+
+    def test_migrate_vector_index_not_found(self):
+        """
+        Test migrating an index that does not exist.
+        """
+        self.mock_es_core.client.indices.exists.return_value = False
+
+        with self.assertRaises(Exception) as context:
+            ElasticSearchService.migrate_vector_index(
+                "missing_index", "int8_hnsw", None, None, self.mock_es_core)
+
+        self.assertIn("not found", str(context.exception))
+        self.mock_es_core.migrate_vector_index.assert_not_called()
+
     @patch('backend.services.elasticsearch_service.create_knowledge_record')
     def test_create_index_already_exists(self, mock_create_knowledge):
         """
@@ -225,6 +276,37 @@ class TestElasticSearchService(unittest.TestCase):
         self.assertIn("Failed to create index", str(context.exception))
         mock_create_knowledge.assert_not_called()
 
+    @patch('backend.services.elasticsearch_service.KnnSearchProfile')
+    def test_set_search_profile_success(self, mock_profile_class):
+        """
+        Test storing a kNN search profile on an existing index.
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+        self.mock_es_core.set_search_profile.return_value = True
+        mock_profile = mock_profile_class.from_dict.return_value
+        mock_profile.to_dict.return_value = {"num_candidates_multiplier": 5}
+
+        result = ElasticSearchService.set_search_profile(
+            "test_index", {"num_candidates_multiplier": 5}, self.mock_es_core)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["profile"], {"num_candidates_multiplier": 5})
+        mock_profile_class.from_dict.assert_called_once_with({"num_candidates_multiplier": 5})
+        self.mock_es_core.set_search_profile.assert_called_once_with("test_index", mock_profile)
+
+    def test_set_search_profile_failure(self):
+        """
+        Test a failed profile update is reported.
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+        self.mock_es_core.set_search_profile.return_value = False
+
+        with self.assertRaises(Exception) as context:
+            ElasticSearchService.set_search_profile(
+                "test_index", {}, self.mock_es_core)
+
+        self.assertIn("Failed to update search profile", str(context.exception))
+
     @patch('backend.services.elasticsearch_service.delete_knowledge_record')
     def test_delete_index_success(self, mock_delete_knowledge):
         """
@@ -700,6 +782,34 @@ class TestElasticSearchService(unittest.TestCase):
         self.assertEqual(result["total_submitted"], 2)
         self.mock_es_core.index_documents.assert_called_once()
 
+    def test_index_documents_page_gets_deterministic_ids(self):
+        """
+        Test indexing one page of a file sent in pages.
+
+        The offset is passed on so chunk IDs derive from the position in the file,
+        and the response carries the offset of the next page.
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+        self.mock_es_core.index_documents.return_value = 2
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.model = "test-model"
+        test_data = [
+            {"metadata": {}, "path_or_url": "bucket/a.pdf", "content": "chunk 10"},
+            {"metadata": {}, "path_or_url": "bucket/a.pdf", "content": "chunk 11"},
+        ]
+
+        result = ElasticSearchService.index_documents(
+            embedding_model=mock_embedding_model,
+            index_name="test_index",
+            data=test_data,
+            es_core=self.mock_es_core,
+            batch_offset=10
+        )
+
+        self.assertEqual(result["next_offset"], 12)
+        self.assertEqual(result["total_indexed"], 2)
+        self.assertEqual(self.mock_es_core.index_documents.call_args.kwargs["position_offset"], 10)
+
     def test_index_documents_empty_data(self):
         """
         Test document indexing with empty data.
@@ -797,6 +907,45 @@ class TestElasticSearchService(unittest.TestCase):
 
         self.assertIn("Error during indexing", str(context.exception))
 
+    def test_update_documents_success(self):
+        """
+        Test an incremental document update.
+
+        This test verifies that:
+        1. Chunks are transformed like for indexing and handed to the incremental update
+        2. The response reports the inserted, updated, deleted and unchanged chunks
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+        self.mock_es_core.update_documents_by_path_or_url.return_value = {
+            "inserted": 1, "updated": 0, "deleted": 1, "unchanged": 4, "failed": 0}
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.model = "test-model"
+        test_data = [{"path_or_url": "doc", "content": f"chunk {i}", "metadata": {}} for i in range(5)]
+
+        result = ElasticSearchService.update_documents(
+            mock_embedding_model, "test_index", "doc", test_data, self.mock_es_core)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["total_indexed"], 1)
+        self.assertEqual(result["total_submitted"], 5)
+        self.assertEqual(result["unchanged"], 4)
+        kwargs = self.mock_es_core.update_documents_by_path_or_url.call_args.kwargs
+        self.assertEqual(kwargs["path_or_url"], "doc")
+        self.assertEqual(kwargs["documents"][0]["embedding_model_name"], "test-model")
+
+    def test_update_documents_rejects_chunks_of_other_documents(self):
+        """
+        Test chunks of another path_or_url cannot update a document.
+        """
+        self.mock_es_core.client.indices.exists.return_value = True
+
+        with self.assertRaises(Exception) as context:
+            ElasticSearchService.update_documents(
+                MagicMock(), "test_index", "doc", [{"path_or_url": "other", "content": "x"}], self.mock_es_core)
+
+        self.assertIn("cannot update document doc", str(context.exception))
+        self.mock_es_core.update_documents_by_path_or_url.assert_not_called()
+
     @patch('backend.services.elasticsearch_service.get_all_files_status')
     def test_list_files_without_chunks(self, mock_get_files_status):
         """
@@ -74,7 +74,7 @@ def setup_patches():
     patches = [
         patch('backend.database.client.db_client', MagicMock()),
         patch('backend.database.attachment_db.minio_client', minio_mock),
-        patch('backend.database.attachment_db.upload_fileobj', MagicMock()),
+        patch('backend.database.attachment_db.upload_stream', AsyncMock()),
         patch('backend.database.attachment_db.get_file_url', MagicMock()),
         patch('backend.database.attachment_db.get_content_type', MagicMock()),
         patch('backend.database.attachment_db.get_file_stream', MagicMock()),
@@ -379,7 +379,7 @@ class TestUploadToMinio:
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock()
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(return_value={
             "success": True, "file_name": "test.txt", "object_name": "folder/test.txt"
         })) as mock_upload:
             # Execute
@@ -390,9 +390,9 @@ class TestUploadToMinio:
             assert results[0]["success"] is True
             assert results[0]["file_name"] == "test.txt"
             assert results[0]["object_name"] == "folder/test.txt"
-            mock_file.read.assert_called_once()
             mock_file.seek.assert_called_once_with(0)
-            mock_upload.assert_called_once()
+            mock_upload.assert_called_once_with(
+                read=mock_file.read, file_name="test.txt", prefix="folder")
 
     @pytest.mark.asyncio
     async def test_upload_to_minio_file_read_exception(self):
@@ -402,7 +402,11 @@ class TestUploadToMinio:
         mock_file.filename = "test.txt"
         mock_file.read = AsyncMock(side_effect=Exception("Read error"))
 
-        with patch('backend.services.file_management_service.logger', MagicMock()) as mock_logger:
+        async def stream(read, file_name, prefix):
+            await read(1024)
+
+        with patch('backend.services.file_management_service.upload_stream', stream), \
+                patch('backend.services.file_management_service.logger', MagicMock()) as mock_logger:
             # Execute
             results = await upload_to_minio(files=[mock_file], folder="folder")
 
@@ -415,14 +419,14 @@ class TestUploadToMinio:
 
     @pytest.mark.asyncio
     async def test_upload_to_minio_upload_exception(self):
-        """Test MinIO upload with upload_fileobj exception"""
+        """Test MinIO upload with upload_stream exception"""
         # Create mock UploadFile
         mock_file = MagicMock()
         mock_file.filename = "test.txt"
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock()
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(side_effect=Exception("Upload error"))) as mock_upload, \
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(side_effect=Exception("Upload error"))) as mock_upload, \
                 patch('backend.services.file_management_service.logger', MagicMock()) as mock_logger:
             # Execute
             results = await upload_to_minio(files=[mock_file], folder="folder")
@@ -432,8 +436,8 @@ class TestUploadToMinio:
             assert results[0]["success"] is False
             assert results[0]["file_name"] == "test.txt"
             assert results[0]["error"] == "An error occurred while processing the file."
-            mock_file.read.assert_called_once()
-            # seek is not called when upload_fileobj throws exception
+            mock_upload.assert_called_once()
+            # seek is not called when upload_stream throws exception
             mock_file.seek.assert_not_called()
             mock_logger.error.assert_called_once()
 
@@ -446,7 +450,7 @@ class TestUploadToMinio:
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock()
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(return_value={
             "success": True, "file_name": "", "object_name": "folder/"
         })) as mock_upload:
             # Execute
@@ -474,9 +478,10 @@ class TestUploadToMinio:
         mock_file2.filename = "test2.txt"
         mock_file2.read = AsyncMock(side_effect=Exception("Read error"))
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
-            "success": True, "file_name": "test1.txt", "object_name": "folder/test1.txt"
-        })) as mock_upload, \
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(side_effect=[
+            {"success": True, "file_name": "test1.txt", "object_name": "folder/test1.txt"},
+            Exception("Read error")
+        ])) as mock_upload, \
                 patch('backend.services.file_management_service.logger', MagicMock()) as mock_logger:
             # Execute
             results = await upload_to_minio(files=[mock_file1, mock_file2], folder="folder")
@@ -493,7 +498,7 @@ class TestUploadToMinio:
             assert results[1]["file_name"] == "test2.txt"
             assert results[1]["error"] == "An error occurred while processing the file."
 
-            mock_upload.assert_called_once()  # Only called for successful file
+            assert mock_upload.call_count == 2
             mock_logger.error.assert_called_once()  # Called for failed file
 
     @pytest.mark.asyncio
@@ -505,7 +510,7 @@ class TestUploadToMinio:
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock(side_effect=Exception("Seek error"))
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(return_value={
             "success": True, "file_name": "test.txt", "object_name": "folder/test.txt"
         })) as mock_upload, \
                 patch('backend.services.file_management_service.logger', MagicMock()) as mock_logger:
@@ -517,7 +522,7 @@ class TestUploadToMinio:
             assert results[0]["success"] is False
             assert results[0]["file_name"] == "test.txt"
             assert results[0]["error"] == "An error occurred while processing the file."
-            mock_file.read.assert_called_once()
+            mock_upload.assert_called_once()
             mock_file.seek.assert_called_once_with(0)
             mock_logger.error.assert_called_once()
 
@@ -1535,7 +1540,7 @@ class TestConcurrencyAndFileTypes:
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock()
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(return_value={
             "success": True, "file_name": "test.txt", "object_name": "test.txt"
         })) as mock_upload:
             # Execute with None folder
@@ -1559,7 +1564,7 @@ class TestConcurrencyAndFileTypes:
         mock_file.read = AsyncMock(return_value=b"test content")
         mock_file.seek = AsyncMock()
 
-        with patch('backend.services.file_management_service.upload_fileobj', MagicMock(return_value={
+        with patch('backend.services.file_management_service.upload_stream', AsyncMock(return_value={
             "success": True, "file_name": "test.txt", "object_name": "test.txt"
         })) as mock_upload:
             # Execute with empty folder
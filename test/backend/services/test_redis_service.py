@@ -217,54 +217,27 @@ class TestRedisService(unittest.TestCase):
         self.assertIn("Test error", result["errors"][0])
     
     def test_cleanup_celery_tasks(self):
-        """Test _cleanup_celery_tasks method"""
+        """Test _cleanup_celery_tasks deletes the tasks of the task index without scanning task results"""
         # Setup
         self.redis_service._backend_client = self.mock_backend_client
-        
-        # Create mock task data
-        task_keys = [b'celery-task-meta-1', b'celery-task-meta-2', b'celery-task-meta-3']
-        
-        # Task 1 matches our index
-        task1_data = json.dumps({
-            'result': {'index_name': 'test_index', 'some_key': 'some_value'},
-            'parent_id': '2'  # This will trigger a parent lookup
-        }).encode()
-        
-        # Task 2 has index name in a different location
-        task2_data = json.dumps({
-            'index_name': 'test_index', 
-            'result': {'some_key': 'some_value'},
-            'parent_id': None  # No parent
-        }).encode()
-        
-        # Task 3 is for a different index
-        task3_data = json.dumps({
-            'result': {'index_name': 'other_index', 'some_key': 'some_value'}
-        }).encode()
-        
-        # Configure mock responses
-        self.mock_backend_client.keys.return_value = task_keys
-        self.mock_backend_client.get.side_effect = [task1_data, task2_data, task3_data]
-        
-        # We expect delete to be called and return 1 each time
-        self.mock_backend_client.delete.return_value = 1
-        
+        self.mock_backend_client.zrange.return_value = [b'1', b'2', b'3']
+
         # Execute
         with patch.object(self.redis_service, '_recursively_delete_task_and_parents') as mock_recursive_delete:
-            mock_recursive_delete.side_effect = [(1, {'1'}), (1, {'2'})]
+            # Deleting task 1 also deletes its parent task 2
+            mock_recursive_delete.side_effect = [(2, {'1', '2'}), (1, {'3'})]
             result = self.redis_service._cleanup_celery_tasks("test_index")
-        
+
         # Verify
-        self.mock_backend_client.keys.assert_called_once_with('celery-task-meta-*')
-        # We expect 3 calls - one for each task key
-        self.assertEqual(self.mock_backend_client.get.call_count, 3)
-        
-        # Should have called recursive delete twice (for task1 and task2)
-        self.assertEqual(mock_recursive_delete.call_count, 2)
-        
+        self.mock_backend_client.keys.assert_not_called()
+        self.mock_backend_client.zrange.assert_called_once_with('dp:tasks:test_index:ids', 0, -1)
+        self.assertEqual(mock_recursive_delete.call_args_list, [call('1'), call('3')])
+        self.mock_backend_client.delete.assert_called_once_with('dp:tasks:test_index:ids',
+                                                                'dp:tasks:test_index:latest')
+
         # Return value should be the number of deleted tasks
-        self.assertEqual(result, 2)
-    
+        self.assertEqual(result, 3)
+
     def test_cleanup_cache_keys(self):
         """Test _cleanup_cache_keys method"""
         # Setup
@@ -303,62 +276,33 @@ class TestRedisService(unittest.TestCase):
         self.assertEqual(result, 4)  # 4 successful delete operations
     
     def test_cleanup_document_celery_tasks(self):
-        """Test _cleanup_document_celery_tasks method"""
+        """Test _cleanup_document_celery_tasks deletes the latest tasks of the document from the task index"""
         # Setup
         self.redis_service._backend_client = self.mock_backend_client
-        
-        # Create mock task data
-        task_keys = [b'celery-task-meta-1', b'celery-task-meta-2', b'celery-task-meta-3']
-        
-        # Task 1 matches our index and document
-        task1_data = json.dumps({
-            'result': {
-                'index_name': 'test_index',
-                'source': 'path/to/doc.pdf'
-            },
-            'parent_id': '2'  # This will trigger a parent lookup
-        }).encode()
-        
-        # Task 2 has the right index but wrong document
-        task2_data = json.dumps({
-            'result': {
-                'index_name': 'test_index',
-                'source': 'other/doc.pdf'
-            }
-        }).encode()
-        
-        # Task 3 has document path in a different field
-        task3_data = json.dumps({
-            'result': {
-                'index_name': 'test_index',
-                'path_or_url': 'path/to/doc.pdf'
-            },
-            'parent_id': None  # No parent
-        }).encode()
-        
-        # Configure mock responses
-        self.mock_backend_client.keys.return_value = task_keys
-        self.mock_backend_client.get.side_effect = [task1_data, task2_data, task3_data]
-        
-        # We expect delete to be called and return 1 each time
-        self.mock_backend_client.delete.return_value = 1
-        
+        pipe = self.mock_backend_client.pipeline.return_value
+        self.mock_backend_client.hmget.return_value = [
+            json.dumps({'id': 'p1', 'task_name': 'process'}).encode(),
+            json.dumps({'id': 'f1', 'task_name': 'forward'}).encode(),
+        ]
+
         # Execute
         with patch.object(self.redis_service, '_recursively_delete_task_and_parents') as mock_recursive_delete:
-            mock_recursive_delete.side_effect = [(1, {'1'}), (1, {'3'})]
+            # Deleting the forward task also deletes its parent process task
+            mock_recursive_delete.side_effect = [(1, {'p1'}), (1, {'f1'})]
             result = self.redis_service._cleanup_document_celery_tasks("test_index", "path/to/doc.pdf")
-        
+
         # Verify
-        self.mock_backend_client.keys.assert_called_once_with('celery-task-meta-*')
-        # We expect 3 calls - one for each task key
-        self.assertEqual(self.mock_backend_client.get.call_count, 3)
-        
-        # Should have called recursive delete twice (for task1 and task3)
-        self.assertEqual(mock_recursive_delete.call_count, 2)
-        
+        self.mock_backend_client.keys.assert_not_called()
+        self.mock_backend_client.hmget.assert_called_once_with(
+            'dp:tasks:test_index:latest', ['process:path/to/doc.pdf', 'forward:path/to/doc.pdf'])
+        self.assertEqual(mock_recursive_delete.call_args_list, [call('p1'), call('f1')])
+        self.assertEqual(set(pipe.zrem.call_args.args[1:]), {'p1', 'f1'})
+        pipe.hdel.assert_called_once_with('dp:tasks:test_index:latest', 'process:path/to/doc.pdf',
+                                          'forward:path/to/doc.pdf')
+
         # Return value should be the number of deleted tasks
         self.assertEqual(result, 2)
-    
+
     @patch('hashlib.md5')
     @patch('urllib.parse.quote')
     def test_cleanup_document_cache_keys(self, mock_quote, mock_md5):
@@ -402,46 +346,32 @@ class TestRedisService(unittest.TestCase):
         # Setup
         self.redis_service._client = self.mock_redis_client
         self.redis_service._backend_client = self.mock_backend_client
-        
-        # Create mock task data
-        task_keys = [b'celery-task-meta-1', b'celery-task-meta-2']
-        
-        # Task 1 matches our index
-        task1_data = json.dumps({
-            'result': {'index_name': 'test_index'}
-        }).encode()
-        
-        # Task 2 is for a different index
-        task2_data = json.dumps({
-            'result': {'index_name': 'other_index'}
-        }).encode()
-        
-        # Configure mock responses for Celery tasks
-        self.mock_backend_client.keys.return_value = task_keys
-        self.mock_backend_client.get.side_effect = [task1_data, task2_data]
-        
+
+        # The task index holds 3 tasks of the knowledge base
+        self.mock_backend_client.zcard.return_value = 3
+
         # Configure mock responses for cache keys
         cache_keys = {
             '*test_index*': [b'key1', b'key2'],
             'kb:test_index:*': [b'key3', b'key4'],
             'index:test_index:*': [b'key5']
         }
-        
+
         def mock_keys_side_effect(pattern):
             return cache_keys.get(pattern, [])
-        
+
         self.mock_redis_client.keys.side_effect = mock_keys_side_effect
-        
+
         # Execute
         result = self.redis_service.get_knowledgebase_task_count("test_index")
-        
+
         # Verify
-        self.mock_backend_client.keys.assert_called_once_with('celery-task-meta-*')
-        self.assertEqual(self.mock_backend_client.get.call_count, 2)
-        
-        # Should count 1 matching task and 5 cache keys
-        self.assertEqual(result, 6)
-    
+        self.mock_backend_client.keys.assert_not_called()
+        self.mock_backend_client.zcard.assert_called_once_with('dp:tasks:test_index:ids')
+
+        # Should count 3 indexed tasks and 5 cache keys
+        self.assertEqual(result, 8)
+
     def test_ping_success(self):
         """Test ping method when connection is successful"""
         # Setup
@@ -568,55 +498,30 @@ class TestRedisService(unittest.TestCase):
         self.assertEqual(deleted_count, 0)
         self.assertEqual(processed_ids, {"task123"})
     
-    def test_cleanup_celery_tasks_with_failed_task_metadata(self):
-        """Test _cleanup_celery_tasks handles failed tasks with exception metadata"""
+    def test_cleanup_celery_tasks_without_indexed_tasks(self):
+        """Test _cleanup_celery_tasks deletes nothing for a knowledge base without indexed tasks"""
         # Setup
         self.redis_service._backend_client = self.mock_backend_client
-        
-        task_keys = [b'celery-task-meta-1']
-        
-        # Task with exception metadata containing index name
-        task_data = json.dumps({
-            'result': {
-                'exc_message': 'Error processing task: {"index_name": "test_index", "error": "failed"}'
-            }
-        }).encode()
-        
-        self.mock_backend_client.keys.return_value = task_keys
-        self.mock_backend_client.get.return_value = task_data
-        
+        self.mock_backend_client.zrange.return_value = []
+
         # Execute
         with patch.object(self.redis_service, '_recursively_delete_task_and_parents') as mock_recursive_delete:
-            mock_recursive_delete.return_value = (1, {'1'})
             result = self.redis_service._cleanup_celery_tasks("test_index")
-        
+
         # Verify
-        self.assertEqual(result, 1)
-        mock_recursive_delete.assert_called_once_with('1')
-    
-    def test_cleanup_celery_tasks_invalid_exception_metadata(self):
-        """Test _cleanup_celery_tasks handles invalid exception metadata gracefully"""
+        self.assertEqual(result, 0)
+        mock_recursive_delete.assert_not_called()
+
+    def test_cleanup_celery_tasks_index_error_raises(self):
+        """Test _cleanup_celery_tasks raises when the task index cannot be read"""
         # Setup
         self.redis_service._backend_client = self.mock_backend_client
-        
-        task_keys = [b'celery-task-meta-1']
-        
-        # Task with invalid exception metadata
-        task_data = json.dumps({
-            'result': {
-                'exc_message': 'Invalid JSON metadata'
-            }
-        }).encode()
-        
-        self.mock_backend_client.keys.return_value = task_keys
-        self.mock_backend_client.get.return_value = task_data
-        
-        # Execute
-        result = self.redis_service._cleanup_celery_tasks("test_index")
-        
-        # Verify - should not crash and return 0
-        self.assertEqual(result, 0)
-    
+        self.mock_backend_client.zrange.side_effect = redis.RedisError("Backend connection failed")
+
+        # Execute & Verify
+        with self.assertRaises(redis.RedisError):
+            self.redis_service._cleanup_celery_tasks("test_index")
+
     def test_cleanup_cache_keys_partial_failure(self):
         """Test _cleanup_cache_keys handles partial failures gracefully"""
         # Setup
@@ -683,7 +588,7 @@ class TestRedisService(unittest.TestCase):
         self.redis_service._backend_client = self.mock_backend_client
         
         # Setup backend client to fail - this will be caught by outer try block
-        self.mock_backend_client.keys.side_effect = redis.RedisError("Backend connection failed")
+        self.mock_backend_client.zcard.side_effect = redis.RedisError("Backend connection failed")
         
         # Setup regular client to succeed (but it won't be reached due to outer exception)
         self.mock_redis_client.keys.return_value = [b'key1', b'key2', b'key3']
@@ -691,12 +596,12 @@ class TestRedisService(unittest.TestCase):
         # Execute
         result = self.redis_service.get_knowledgebase_task_count("test_index")
         
-        # Verify - when backend_client.keys() fails, the outer try catches it
+        # Verify - when the task index count fails, the outer try catches it
         # and the method returns 0 without processing cache keys
         self.assertEqual(result, 0)
         
-        # Verify that backend keys was called and failed
-        self.mock_backend_client.keys.assert_called_once_with('celery-task-meta-*')
+        # Verify that the task index count was called and failed
+        self.mock_backend_client.zcard.assert_called_once_with('dp:tasks:test_index:ids')
         # Verify that regular client keys was NOT called due to the exception
         self.mock_redis_client.keys.assert_not_called()
     
@@ -707,7 +612,7 @@ class TestRedisService(unittest.TestCase):
         self.redis_service._backend_client = self.mock_backend_client
         
         # Both clients fail
-        self.mock_backend_client.keys.side_effect = redis.RedisError("Backend failed")
+        self.mock_backend_client.zcard.side_effect = redis.RedisError("Backend failed")
         self.mock_redis_client.keys.side_effect = redis.RedisError("Cache failed")
         
         # Execute
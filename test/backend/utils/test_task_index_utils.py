@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from backend.utils.task_index_utils import TaskIndex
+
+
+class FakeRedis:
+    """In-memory Redis supporting the hash and sorted set commands the task index uses, returning bytes"""
+
+    def __init__(self):
+        self.data = {}
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return FakePipeline(self)
+
+    def zadd(self, key, mapping, nx=False):
+        members = self.data.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and member in members):
+                members[member] = score
+
+    def zrange(self, key, start, end, withscores=False):
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1])
+        if withscores:
+            return [(member.encode(), score) for member, score in members]
+        return [member.encode() for member, _ in members]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.data.get(key, {}).pop(member, None)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value.encode()
+
+    def hgetall(self, key):
+        return {field.encode(): value for field, value in self.data.get(key, {}).items()}
+
+    def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        return [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+@pytest.fixture
+def client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def index(client):
+    return TaskIndex(client)
+
+
+def test_submitted_tasks_are_listed_as_pending(index):
+    index.add_submitted({"process": "p1", "forward": "f1"}, "kb", "bucket/a.pdf", source_type="minio",
+                        original_filename="a.pdf")
+
+    tasks = sorted(index.get_index_tasks("kb"), key=lambda task: task["task_name"])
+
+    assert [(task["id"], task["task_name"], task["status"]) for task in tasks] == [
+        ("f1", "forward", "PENDING"), ("p1", "process", "PENDING")]
+    assert all(task["path_or_url"] == "bucket/a.pdf" and task["original_filename"] == "a.pdf" for task in tasks)
+    assert index.get_index_tasks("other") == []
+
+
+def test_state_changes_replace_the_latest_state_of_a_path(index):
+    index.add_submitted({"process": "p1", "forward": "f1"}, "kb", "bucket/a.pdf")
+    index.record_state("p1", "process", "kb", "bucket/a.pdf", "STARTED", source_type="minio")
+    index.record_state("p1", "process", "kb", "bucket/a.pdf", "SUCCESS", chunks_count=3, stage="text_extracted")
+
+    process = next(task for task in index.get_index_tasks("kb") if task["task_name"] == "process")
+
+    assert process["status"] == "SUCCESS"
+    assert process["chunks_count"] == 3
+    assert "stage" not in process
+    assert process["created_at"] <= process["updated_at"]
+    assert index.count("kb") == 2
+
+
+def test_resubmitted_path_lists_only_the_latest_tasks(index):
+    index.add_submitted({"process": "p1", "forward": "f1"}, "kb", "bucket/a.pdf")
+    index.record_state("p1", "process", "kb", "bucket/a.pdf", "FAILURE", error="broken")
+    index.add_submitted({"process": "p2", "forward": "f2"}, "kb", "bucket/a.pdf")
+
+    tasks = index.get_index_tasks("kb")
+
+    assert sorted(task["id"] for task in tasks) == ["f2", "p2"]
+    assert all(task["error"] is None for task in tasks)
+    # Earlier tasks stay in the index so deleting the knowledge base deletes their results too
+    assert set(index.get_task_ids("kb")) == {"p1", "f1", "p2", "f2"}
+
+
+def test_listing_reads_the_index_in_one_pipeline(index, client):
+    for number in range(50):
+        index.add_submitted({"process": f"p{number}", "forward": f"f{number}"}, "kb", f"bucket/{number}.pdf")
+    client.pipelines = 0
+
+    assert len(index.get_index_tasks("kb")) == 100
+    assert client.pipelines == 1
+
+
+def test_unreadable_entries_are_skipped(index, client):
+    index.add_submitted({"process": "p1"}, "kb", "bucket/a.pdf")
+    client.data["dp:tasks:kb:latest"]["process:bucket/b.pdf"] = b"not json"
+
+    assert [task["id"] for task in index.get_index_tasks("kb")] == ["p1"]
+
+
+def test_remove_document_and_index(index):
+    index.add_submitted({"process": "p1", "forward": "f1"}, "kb", "bucket/a.pdf")
+    index.add_submitted({"process": "p2", "forward": "f2"}, "kb", "bucket/b.pdf")
+
+    assert index.get_document_task_ids("kb", "bucket/a.pdf") == ["p1", "f1"]
+    index.remove_document("kb", "bucket/a.pdf", ["p1", "f1"])
+
+    assert sorted(task["id"] for task in index.get_index_tasks("kb")) == ["f2", "p2"]
+    assert index.get_document_task_ids("kb", "bucket/a.pdf") == []
+    assert index.count("kb") == 2
+
+    index.remove_index("kb")
+    assert index.get_index_tasks("kb") == []
+    assert index.count("kb") == 0
+
+
+def test_entries_are_json_with_task_info_shape(index, client):
+    index.record_state("f1", "forward", "kb", "bucket/a.pdf", "FAILURE", error="ES down")
+
+    entry = json.loads(client.data["dp:tasks:kb:latest"]["forward:bucket/a.pdf"])
+
+    assert set(entry) == {"id", "index_name", "task_name", "path_or_url", "source_type", "original_filename",
+                          "status", "updated_at", "error"}
+    assert entry["error"] == "ES down"
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import requests
 import importlib.util
@@ -23,6 +25,7 @@ spec.loader.exec_module(embedding_model_module)
 
 OpenAICompatibleEmbedding = embedding_model_module.OpenAICompatibleEmbedding
 JinaEmbedding = embedding_model_module.JinaEmbedding
+EmbeddingCache = embedding_model_module.EmbeddingCache
 
 
 # ---------------------------------------------------------------------------
@@ -30,6 +33,15 @@ JinaEmbedding = embedding_model_module.JinaEmbedding
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(autouse=True)
+def clear_embedding_cache():
+    """Start every test with an empty process-wide embedding cache."""
+
+    embedding_model_module.get_embedding_cache().clear()
+    yield
+    embedding_model_module.get_embedding_cache().clear()
+
+
 @pytest.fixture()
 def openai_embedding_instance():
     """Return an OpenAICompatibleEmbedding instance with minimal viable attributes for tests."""
@@ -61,29 +73,29 @@ async def test_dimension_check_success(openai_embedding_instance):
     expected_embeddings = [[0.1, 0.2, 0.3]]
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.OpenAICompatibleEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         return_value=expected_embeddings,
-    ) as mock_to_thread:
+    ) as mock_aget_embeddings:
         result = await openai_embedding_instance.dimension_check()
 
         assert result == expected_embeddings
-        mock_to_thread.assert_awaited_once()
+        mock_aget_embeddings.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_dimension_check_failure(openai_embedding_instance):
-    """dimension_check should return an empty list when an exception is raised inside to_thread."""
+    """dimension_check should return an empty list when an exception is raised inside aget_embeddings."""
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.OpenAICompatibleEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         side_effect=Exception("connection error"),
-    ) as mock_to_thread:
+    ) as mock_aget_embeddings:
         result = await openai_embedding_instance.dimension_check()
 
         assert result == []
-        mock_to_thread.assert_awaited_once()
+        mock_aget_embeddings.assert_awaited_once()
 
 
 # ---------------------------------------------------------------------------
@@ -98,29 +110,29 @@ async def test_jina_dimension_check_success(jina_embedding_instance):
     expected_embeddings = [[0.5, 0.4, 0.3]]
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.JinaEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         return_value=expected_embeddings,
-    ) as mock_to_thread:
+    ) as mock_aget_embeddings:
         result = await jina_embedding_instance.dimension_check()
 
         assert result == expected_embeddings
-        mock_to_thread.assert_awaited_once()
+        mock_aget_embeddings.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_jina_dimension_check_failure(jina_embedding_instance):
-    """dimension_check should return an empty list when an exception is raised inside to_thread."""
+    """dimension_check should return an empty list when an exception is raised inside aget_embeddings."""
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.JinaEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         side_effect=Exception("connection error"),
-    ) as mock_to_thread:
+    ) as mock_aget_embeddings:
         result = await jina_embedding_instance.dimension_check()
 
         assert result == []
-        mock_to_thread.assert_awaited_once()
+        mock_aget_embeddings.assert_awaited_once()
 
 
 # ---------------------------------------------------------------------------
@@ -313,7 +325,7 @@ def test_jina_get_multimodal_embeddings_parses_embeddings(jina_embedding_instanc
     mock_resp.json = Mock(return_value=fake_response)
 
     with patch(
-        "embedding_model_under_test.requests.post", return_value=mock_resp
+        "embedding_model_under_test.requests.Session.post", return_value=mock_resp
     ) as mock_post:
         inputs = [{"text": "t1"}, {"image": "http://x/y.jpg"}]
         result = jina_embedding_instance.get_multimodal_embeddings(
@@ -341,7 +353,7 @@ def test_jina_get_multimodal_embeddings_with_metadata(jina_embedding_instance):
     mock_resp.raise_for_status = Mock()
     mock_resp.json = Mock(return_value=fake_response)
 
-    with patch("embedding_model_under_test.requests.post", return_value=mock_resp) as mock_post:
+    with patch("embedding_model_under_test.requests.Session.post", return_value=mock_resp) as mock_post:
         inputs = [{"text": "t"}]
         result = jina_embedding_instance.get_multimodal_embeddings(
             inputs, with_metadata=True, timeout=4
@@ -377,7 +389,7 @@ def test_jina_get_multimodal_embeddings_timeout_retry_succeeds(jina_embedding_in
     side_effect.calls = 0
 
     with patch(
-        "embedding_model_under_test.requests.post", side_effect=side_effect
+        "embedding_model_under_test.requests.Session.post", side_effect=side_effect
     ) as mock_post:
         inputs = [{"text": "t"}]
         result = jina_embedding_instance.get_multimodal_embeddings(
@@ -398,7 +410,7 @@ def test_jina_get_multimodal_embeddings_timeout_exhausts_raises(
     """Should raise Timeout after exhausting retries."""
 
     with patch(
-        "embedding_model_under_test.requests.post",
+        "embedding_model_under_test.requests.Session.post",
         side_effect=requests.exceptions.Timeout(),
     ) as mock_post:
         with pytest.raises(requests.exceptions.Timeout):
@@ -445,7 +457,7 @@ async def test_jina_dimension_check_connection_error_returns_empty(jina_embeddin
     """dimension_check should return [] on ConnectionError."""
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.JinaEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         side_effect=requests.exceptions.ConnectionError(),
     ):
@@ -476,8 +488,8 @@ def test_openai_get_embeddings_string_prepares_input_list(openai_embedding_insta
         mock_make_request.assert_called_once()
 
 
-def test_openai_make_request_invokes_requests_post(openai_embedding_instance):
-    """Cover OpenAI _make_request by patching requests.post path."""
+def test_openai_make_request_invokes_session_post(openai_embedding_instance):
+    """Cover OpenAI _make_request by patching the pooled session post path."""
 
     fake_response = {"data": [{"embedding": [7, 8]}]}
 
@@ -485,7 +497,7 @@ def test_openai_make_request_invokes_requests_post(openai_embedding_instance):
     mock_resp.raise_for_status = Mock()
     mock_resp.json = Mock(return_value=fake_response)
 
-    with patch("embedding_model_under_test.requests.post", return_value=mock_resp) as mock_post:
+    with patch("embedding_model_under_test.requests.Session.post", return_value=mock_resp) as mock_post:
         result = openai_embedding_instance.get_embeddings(
             ["hi"], with_metadata=False, timeout=2
         )
@@ -509,10 +521,278 @@ async def test_openai_dimension_check_connection_error_returns_empty(openai_embe
     """dimension_check should return [] on ConnectionError."""
 
     with patch(
-        "embedding_model_under_test.asyncio.to_thread",
+        "embedding_model_under_test.OpenAICompatibleEmbedding.aget_embeddings",
         new_callable=AsyncMock,
         side_effect=requests.exceptions.ConnectionError(),
     ):
         result = await openai_embedding_instance.dimension_check()
 
         assert result == []
+
+
+# ---------------------------------------------------------------------------
+# Tests for the query embedding cache
+# ---------------------------------------------------------------------------
+
+
+def test_openai_get_embeddings_caches_single_query(openai_embedding_instance):
+    """Repeated single-string queries should only call the API once."""
+
+    fake_response = {"data": [{"embedding": [0.1, 0.2]}]}
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_request",
+        return_value=fake_response,
+    ) as mock_make_request:
+        first = openai_embedding_instance.get_embeddings("what is nexent")
+        # Whitespace differences map to the same cache entry
+        second = openai_embedding_instance.get_embeddings("  what is   nexent ")
+
+        assert first == [[0.1, 0.2]]
+        assert second == [[0.1, 0.2]]
+        mock_make_request.assert_called_once()
+
+    stats = embedding_model_module.get_embedding_cache().stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_openai_get_embeddings_does_not_cache_batches(openai_embedding_instance):
+    """Batch inputs come from indexing and should never be served from the cache."""
+
+    fake_response = {"data": [{"embedding": [0.1, 0.2]}]}
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_request",
+        return_value=fake_response,
+    ) as mock_make_request:
+        openai_embedding_instance.get_embeddings(["hello"])
+        openai_embedding_instance.get_embeddings(["hello"])
+
+        assert mock_make_request.call_count == 2
+    assert embedding_model_module.get_embedding_cache().stats()["size"] == 0
+
+
+def test_cache_key_depends_on_model_endpoint(openai_embedding_instance):
+    """The same text embedded by another model must not share an entry."""
+
+    other_instance = OpenAICompatibleEmbedding(
+        model_name="other-model",
+        base_url="https://api.example.com",
+        api_key="dummy-key",
+        embedding_dim=1536,
+    )
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_request",
+        return_value={"data": [{"embedding": [0.5]}]},
+    ) as mock_make_request:
+        openai_embedding_instance.get_embeddings("hello")
+        other_instance.get_embeddings("hello")
+
+        assert mock_make_request.call_count == 2
+
+
+def test_jina_get_embeddings_caches_single_query(jina_embedding_instance):
+    """Jina text queries share the same cache."""
+
+    with patch(
+        "embedding_model_under_test.JinaEmbedding.get_multimodal_embeddings",
+        return_value=[[0.3, 0.4]],
+    ) as mock_delegate:
+        assert jina_embedding_instance.get_embeddings("hello") == [[0.3, 0.4]]
+        assert jina_embedding_instance.get_embeddings("hello") == [[0.3, 0.4]]
+
+        mock_delegate.assert_called_once()
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    """The local tier should stay bounded by max_size."""
+
+    cache = EmbeddingCache(max_size=2)
+    cache.set("a", [1.0])
+    cache.set("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.set("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+
+
+def test_embedding_cache_expires_entries():
+    """Entries older than the TTL should be treated as misses."""
+
+    cache = EmbeddingCache(ttl_seconds=10)
+
+    with patch("embedding_model_under_test.time.monotonic", return_value=100.0):
+        cache.set("a", [1.0])
+    with patch("embedding_model_under_test.time.monotonic", return_value=105.0):
+        assert cache.get("a") == [1.0]
+    with patch("embedding_model_under_test.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+
+
+def test_embedding_cache_redis_second_tier():
+    """Local misses should fall back to Redis and repopulate the local tier."""
+
+    redis_client = Mock()
+    redis_client.get.return_value = "[0.7, 0.8]"
+    cache = EmbeddingCache(redis_client=redis_client, ttl_seconds=60)
+
+    assert cache.get("key") == [0.7, 0.8]
+    assert cache.get("key") == [0.7, 0.8]
+    redis_client.get.assert_called_once_with("nexent:embedding:key")
+
+    cache.set("other", [1.0])
+    redis_client.setex.assert_called_once_with("nexent:embedding:other", 60, "[1.0]")
+
+    stats = cache.stats()
+    assert stats["redis_hits"] == 1
+    assert stats["hits"] == 1
+
+
+def test_embedding_cache_redis_errors_are_ignored():
+    """A broken Redis tier must not break embedding lookups."""
+
+    redis_client = Mock()
+    redis_client.get.side_effect = Exception("redis down")
+    redis_client.setex.side_effect = Exception("redis down")
+    cache = EmbeddingCache(redis_client=redis_client)
+
+    assert cache.get("key") is None
+    cache.set("key", [1.0])
+    assert cache.get("key") == [1.0]
+
+
+# ---------------------------------------------------------------------------
+# Tests for pooled HTTP sessions and the async embedding API
+# ---------------------------------------------------------------------------
+
+
+def test_http_session_is_shared_per_endpoint(openai_embedding_instance):
+    """Clients pointing at the same endpoint should reuse one keep-alive session."""
+
+    other_instance = OpenAICompatibleEmbedding(
+        model_name="other-model",
+        base_url="https://api.example.com",
+        api_key="other-key",
+        embedding_dim=1024,
+    )
+
+    session = embedding_model_module.get_http_session(openai_embedding_instance.api_url)
+
+    assert embedding_model_module.get_http_session(other_instance.api_url) is session
+    assert embedding_model_module.get_http_session("https://other.example.com") is not session
+
+
+@pytest.mark.asyncio
+async def test_async_http_session_is_reused_on_same_loop():
+    """The aiohttp session should be created once per loop and endpoint."""
+
+    first = embedding_model_module.get_async_http_session("https://api.example.com")
+    second = embedding_model_module.get_async_http_session("https://api.example.com")
+
+    assert first is second
+    await embedding_model_module.close_async_http_sessions()
+    assert first.closed
+
+
+@pytest.mark.asyncio
+async def test_openai_aget_embeddings_success(openai_embedding_instance):
+    """aget_embeddings should parse embeddings from the async response."""
+
+    fake_response = {"data": [{"embedding": [0.4, 0.5]}]}
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_async_request",
+        new_callable=AsyncMock,
+        return_value=fake_response,
+    ) as mock_request:
+        result = await openai_embedding_instance.aget_embeddings(["hello"], timeout=3)
+
+        assert result == [[0.4, 0.5]]
+        mock_request.assert_awaited_once()
+        assert mock_request.call_args.args[0]["input"] == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_openai_aget_embeddings_timeout_retry_succeeds(openai_embedding_instance):
+    """First async call times out, second succeeds; timeouts increase linearly."""
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_async_request",
+        new_callable=AsyncMock,
+        side_effect=[asyncio.TimeoutError(), {"data": [{"embedding": [1.0]}]}],
+    ) as mock_request:
+        result = await openai_embedding_instance.aget_embeddings(
+            ["a"], timeout=None, retries=2, retry_timeout_step=2
+        )
+
+        assert result == [[1.0]]
+        timeouts = [call.kwargs.get("timeout") for call in mock_request.call_args_list]
+        assert timeouts == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_openai_aget_embeddings_timeout_exhausts_raises(openai_embedding_instance):
+    """Should raise TimeoutError after exhausting async retries."""
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_async_request",
+        new_callable=AsyncMock,
+        side_effect=asyncio.TimeoutError(),
+    ) as mock_request:
+        with pytest.raises(asyncio.TimeoutError):
+            await openai_embedding_instance.aget_embeddings(["a"], retries=1, retry_timeout_step=1)
+
+        assert mock_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_openai_aget_embeddings_uses_query_cache(openai_embedding_instance):
+    """Sync and async calls share the query embedding cache."""
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_request",
+        return_value={"data": [{"embedding": [0.9]}]},
+    ), patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_async_request",
+        new_callable=AsyncMock,
+    ) as mock_async_request:
+        openai_embedding_instance.get_embeddings("cached query")
+        result = await openai_embedding_instance.aget_embeddings("cached query")
+
+        assert result == [[0.9]]
+        mock_async_request.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_jina_aget_embeddings_converts_text(jina_embedding_instance):
+    """Jina async text input should be converted to multimodal input."""
+
+    with patch(
+        "embedding_model_under_test.JinaEmbedding._make_async_request",
+        new_callable=AsyncMock,
+        return_value={"data": [{"embedding": [0.3]}]},
+    ) as mock_request:
+        result = await jina_embedding_instance.aget_embeddings("hello", timeout=2)
+
+        assert result == [[0.3]]
+        payload = mock_request.call_args.args[0]
+        assert payload["input"] == [{"text": "hello"}]
+        assert payload["truncate"] is True
+
+
+@pytest.mark.asyncio
+async def test_openai_dimension_check_async_timeout_returns_empty(openai_embedding_instance):
+    """dimension_check should return [] when the async request times out."""
+
+    with patch(
+        "embedding_model_under_test.OpenAICompatibleEmbedding._make_async_request",
+        new_callable=AsyncMock,
+        side_effect=asyncio.TimeoutError(),
+    ):
+        result = await openai_embedding_instance.dimension_check(timeout=1)
+
+        assert result == []
@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import patch
+
+from sdk.nexent.core.nlp import tokenizer
+from sdk.nexent.core.nlp.tokenizer import (
+    calculate_term_weights,
+    calculate_term_weights_batch,
+    clear_term_weight_cache,
+    extract_query_terms,
+    term_weight_cache_info,
+    warm_up_tokenizer,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    clear_term_weight_cache()
+    yield
+    clear_term_weight_cache()
+
+
+def test_calculate_term_weights_normalized():
+    """Test weights are normalized with the strongest term at 1.0"""
+    weights = calculate_term_weights("人工智能 machine learning")
+    assert weights
+    assert max(weights.values()) == 1.0
+    assert all(0 < weight <= 1.0 for weight in weights.values())
+
+
+def test_calculate_term_weights_memoizes_pos_tagging():
+    """Test repeated queries reuse the POS tagging result"""
+    with patch.object(tokenizer.pseg, "cut", wraps=tokenizer.pseg.cut) as mock_cut:
+        first = calculate_term_weights("知识库检索 Elasticsearch")
+        second = calculate_term_weights("知识库检索 ELASTICSEARCH")
+
+    assert first == second
+    mock_cut.assert_called_once()
+    assert term_weight_cache_info().hits == 1
+
+
+def test_calculate_term_weights_memo_with_idf():
+    """Test IDF weighting is applied on top of the memoized tagging result"""
+    plain = calculate_term_weights("apple banana")
+    weighted = calculate_term_weights("apple banana", use_idf=True, doc_freqs={"apple": 100, "banana": 1}, total_docs=100)
+
+    # The frequent term loses weight relative to the rare one, here enough to be dropped
+    assert weighted["banana"] == 1.0
+    assert weighted.get("apple", 0) < plain["apple"]
+
+
+def test_extract_query_terms_shares_memo():
+    """Test query terms come from the same memoized tagging as the weights"""
+    with patch.object(tokenizer.pseg, "cut", wraps=tokenizer.pseg.cut) as mock_cut:
+        terms = extract_query_terms("Elasticsearch quantization")
+        weights = calculate_term_weights("Elasticsearch quantization")
+
+    mock_cut.assert_called_once()
+    assert set(weights) <= set(terms)
+
+
+def test_calculate_term_weights_batch():
+    """Test the batch API keeps input order and weights repeated texts once"""
+    texts = ["向量数据库", "hybrid search", "向量数据库"]
+    with patch.object(tokenizer, "calculate_term_weights", wraps=calculate_term_weights) as mock_weights:
+        results = calculate_term_weights_batch(texts)
+
+    assert len(results) == 3
+    assert results[0] == results[2] == calculate_term_weights("向量数据库")
+    assert results[1] == calculate_term_weights("hybrid search")
+    assert mock_weights.call_count == 2
+    # Each entry is an independent dictionary
+    results[0]["extra"] = 1.0
+    assert "extra" not in results[2]
+
+
+def test_warm_up_tokenizer_runs_once():
+    """Test the warm-up loads jieba only on the first call"""
+    with patch.object(tokenizer, "_warmed_up", False), \
+            patch.object(tokenizer.jieba, "initialize") as mock_initialize:
+        assert warm_up_tokenizer() >= 0
+        assert warm_up_tokenizer() == 0.0
+
+    mock_initialize.assert_called_once()
@@ -35,6 +35,7 @@ with patch.dict('sys.modules', module_mocks):
     # Import all required modules
     from sdk.nexent.core.utils.observer import MessageObserver, ProcessType
     # Import target module
+    from sdk.nexent.core.tools import exa_search_tool as exa_search_tool_module
     from sdk.nexent.core.tools.exa_search_tool import ExaSearchTool
 
 
@@ -220,6 +221,32 @@ def test_filter_images_success(exa_search_tool, mock_observer):
         assert isinstance(called_images, list)
 
 
+def test_filter_images_sends_one_batch_request(exa_search_tool, mock_observer):
+    """Test image filtering scores all images with a single batch request"""
+    images_list = ["https://example.com/image1.jpg", "https://example.com/image2.jpg",
+                   "https://example.com/image3.jpg"]
+    response = MagicMock(status=200)
+    response.json = AsyncMock(return_value={"results": [
+        {"image_url": images_list[0], "is_important": True},
+        {"image_url": images_list[1], "is_important": False},
+        {"image_url": images_list[2], "is_important": True},
+    ]})
+    session = MagicMock()
+    session.post.return_value.__aenter__.return_value = response
+    session_context = MagicMock()
+    session_context.__aenter__.return_value = session
+
+    with patch.object(exa_search_tool_module.aiohttp, 'ClientSession', return_value=session_context):
+        exa_search_tool._filter_images(images_list, "test query")
+
+    session.post.assert_called_once()
+    assert session.post.call_args[0][0].endswith("/tasks/filter_important_images")
+    assert session.post.call_args[1]["json"]["image_urls"] == images_list
+    assert session.post.call_args[1]["json"]["positive_prompt"] == "test query"
+    mock_observer.add_message.assert_called_with(
+        "", ProcessType.PICTURE_WEB, json.dumps({"images_url": [images_list[0], images_list[2]]}, ensure_ascii=False))
+
+
 def test_filter_images_api_error(exa_search_tool, mock_observer):
     """Test image filtering API error handling"""
     # Set up test data
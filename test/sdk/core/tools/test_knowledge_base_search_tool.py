@@ -131,7 +131,8 @@ class TestKnowledgeBaseSearchTool:
             index_names=["test_index1"],
             query_text="test query",
             embedding_model=knowledge_base_search_tool.embedding_model,
-            top_k=5
+            top_k=5,
+            search_profile=None
         )
 
     def test_es_search_accurate_success(self, knowledge_base_search_tool):
@@ -170,7 +171,30 @@ class TestKnowledgeBaseSearchTool:
             index_names=["test_index1"],
             query_text="test query",
             embedding_model=knowledge_base_search_tool.embedding_model,
-            top_k=5
+            top_k=5,
+            search_profile=None
+        )
+
+    def test_es_search_semantic_with_search_profile(self, mock_es_core, mock_embedding_model):
+        """Test the configured search profile is forwarded to the semantic search"""
+        tool = KnowledgeBaseSearchTool(
+            top_k=5,
+            search_profile="high_recall",
+            index_names=["test_index1"],
+            observer=None,
+            embedding_model=mock_embedding_model,
+            es_core=mock_es_core
+        )
+        mock_es_core.semantic_search.return_value = create_mock_search_result(1)
+
+        tool.es_search_semantic("test query", ["test_index1"])
+
+        mock_es_core.semantic_search.assert_called_once_with(
+            index_names=["test_index1"],
+            query_text="test query",
+            embedding_model=mock_embedding_model,
+            top_k=5,
+            search_profile="high_recall"
         )
 
     def test_es_search_hybrid_error(self, knowledge_base_search_tool):
@@ -255,7 +279,8 @@ class TestKnowledgeBaseSearchTool:
             index_names=["custom_index1", "custom_index2"],
             query_text="test query",
             embedding_model=knowledge_base_search_tool.embedding_model,
-            top_k=5
+            top_k=5,
+            search_profile=None
         )
 
     def test_forward_chinese_language_observer(self, knowledge_base_search_tool):
@@ -0,0 +1,84 @@
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Create all necessary mocks
+mock_linkup = MagicMock()
+mock_linkup_client = MagicMock()
+mock_linkup.LinkupClient = mock_linkup_client
+mock_linkup.LinkupSearchImageResult = MagicMock()
+mock_linkup.LinkupSearchTextResult = MagicMock()
+
+# Apply mocks
+with patch.dict('sys.modules', {'linkup': mock_linkup}):
+    from sdk.nexent.core.utils.observer import MessageObserver, ProcessType
+    from sdk.nexent.core.tools.linkup_search_tool import LinkupSearchTool
+
+
+@pytest.fixture
+def mock_observer():
+    observer = MagicMock(spec=MessageObserver)
+    observer.lang = "en"
+    return observer
+
+
+@pytest.fixture
+def linkup_search_tool(mock_observer):
+    with patch('sdk.nexent.core.tools.linkup_search_tool.LinkupClient', return_value=mock_linkup_client):
+        tool = LinkupSearchTool(
+            linkup_api_key="test_api_key",
+            observer=mock_observer,
+            max_results=3,
+            image_filter=True
+        )
+
+    os.environ["DATA_PROCESS_SERVICE"] = "http://test-service"
+    tool.data_process_service = "http://test-service"
+    return tool
+
+
+def mock_client_session(response):
+    """Helper method to create a mock aiohttp session context returning the response on post"""
+    session = MagicMock()
+    session.post.return_value.__aenter__.return_value = response
+    session_context = MagicMock()
+    session_context.__aenter__.return_value = session
+    return session, session_context
+
+
+def test_filter_images_sends_one_batch_request(linkup_search_tool, mock_observer):
+    """Test image filtering scores all images with a single batch request"""
+    images_list = ["https://example.com/image1.jpg", "https://example.com/image2.jpg",
+                   "https://example.com/image3.jpg"]
+    response = MagicMock(status=200)
+    response.json = AsyncMock(return_value={"results": [
+        {"image_url": images_list[0], "is_important": False},
+        {"image_url": images_list[1], "is_important": True},
+        {"image_url": images_list[2], "is_important": True},
+    ]})
+    session, session_context = mock_client_session(response)
+
+    with patch('aiohttp.ClientSession', return_value=session_context):
+        linkup_search_tool._filter_images(images_list, "test query")
+
+    session.post.assert_called_once()
+    assert session.post.call_args[0][0] == "http://test-service/tasks/filter_important_images"
+    assert session.post.call_args[1]["json"]["image_urls"] == images_list
+    assert session.post.call_args[1]["json"]["positive_prompt"] == "test query"
+    mock_observer.add_message.assert_called_once_with(
+        "", ProcessType.PICTURE_WEB, json.dumps({"images_url": images_list[1:]}, ensure_ascii=False))
+
+
+def test_filter_images_api_error_returns_unfiltered_images(linkup_search_tool, mock_observer):
+    """Test all images are sent unfiltered when the batch request fails"""
+    images_list = ["https://example.com/image1.jpg", "https://example.com/image2.jpg"]
+    session, session_context = mock_client_session(MagicMock(status=500))
+
+    with patch('aiohttp.ClientSession', return_value=session_context):
+        linkup_search_tool._filter_images(images_list, "test query")
+
+    session.post.assert_called_once()
+    mock_observer.add_message.assert_called_once_with(
+        "", ProcessType.PICTURE_WEB, json.dumps({"images_url": images_list}, ensure_ascii=False))
@@ -0,0 +1,3 @@
+"""
+Tests for the data processing module of the SDK.
+"""
@@ -0,0 +1,116 @@
+import io
+import tempfile
+import types
+
+import openpyxl
+import pytest
+
+from sdk.nexent.data_process.openpyxl_processor import OpenPyxlProcessor
+
+
+def workbook_bytes(build):
+    wb = openpyxl.Workbook()
+    build(wb)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def build_report(wb):
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Quarterly report"])
+    ws.append(["Region", "Product", "Sales"])
+    ws.append(["North", "A", 10])
+    ws.append([None, "B", 12])
+    ws.append(["South", "A", 3])
+    ws.merge_cells("A3:A4")
+    single = wb.create_sheet("Single")
+    for value in ["one", "two\nlines", None, "three"]:
+        single.append([value])
+
+
+@pytest.fixture
+def processor():
+    return OpenPyxlProcessor()
+
+
+def test_rows_become_markdown_chunks_with_merged_cells_filled(processor):
+    chunks = processor.process_file(workbook_bytes(build_report), "basic", "report.xlsx")
+
+    assert [chunk["metadata"]["chunk_index"] for chunk in chunks] == [0, 1, 2, 3]
+    assert chunks[0]["content"] == (
+        "| Region | Product | Sales | Remark before title |\n"
+        "| --- | --- | --- | --- |\n"
+        "| North | A | 10 | <br>Quarterly report |\n"
+        "————Data"
+    )
+    # The merged Region cell is repeated on the second row of the merge
+    assert "| North | B | 12 |" in chunks[1]["content"]
+    assert "| South | A | 3 |" in chunks[2]["content"]
+    assert chunks[0]["metadata"]["file_type"] == "xlsx"
+
+
+def test_single_column_sheet_is_one_chunk(processor):
+    chunks = processor.process_file(workbook_bytes(build_report), "basic", "report.xlsx")
+
+    assert chunks[-1]["content"] == "one\ntwo<br>lines\nthree\n\n————Single"
+
+
+def test_spooled_file_gives_same_chunks_as_bytes(processor):
+    data = workbook_bytes(build_report)
+    with tempfile.SpooledTemporaryFile(max_size=16) as spooled:
+        spooled.write(data)
+
+        chunks = processor.process_file(spooled, "basic", "report.xlsx")
+
+    assert chunks == processor.process_file(data, "basic", "report.xlsx")
+
+
+def test_rows_per_chunk_groups_rows(processor):
+    chunks = processor.process_file(workbook_bytes(build_report), "basic", "report.xlsx", rows_per_chunk=2)
+
+    assert len(chunks) == 3
+    assert chunks[0]["content"].count("————Data") == 2
+    assert chunks[1]["content"].count("————Data") == 1
+
+
+def test_merges_below_row_nine_are_filled(processor):
+    def build(wb):
+        ws = wb.active
+        ws.append(["Key", "Value"])
+        for row in range(2, 15):
+            ws.append([f"k{row}" if row == 10 else None, row])
+        ws.merge_cells("A10:A12")
+
+    chunks = processor.process_file(workbook_bytes(build), "basic", "data.xlsx")
+
+    assert [chunk["content"].split("\n")[2] for chunk in chunks[8:12]] == [
+        "| k10 | 10 |", "| k10 | 11 |", "| k10 | 12 |", "|  | 13 |"]
+
+
+def test_chunks_are_streamed_from_a_read_only_workbook(processor, monkeypatch):
+    opened = []
+    original_load = processor._load_workbook
+
+    def load(file_data):
+        wb = original_load(file_data)
+        opened.append(wb)
+        close = wb.close
+        wb.close = types.MethodType(lambda self: (opened.append("closed"), close()), wb)
+        return wb
+
+    monkeypatch.setattr(processor, "_load_workbook", load)
+    chunks = processor.iter_chunks(workbook_bytes(build_report), "basic", "report.xlsx")
+
+    first = next(chunks)
+    assert first["metadata"]["chunk_index"] == 0
+    assert opened[0].read_only
+    assert "closed" not in opened
+    list(chunks)
+    assert opened[-1] == "closed"
+
+
+def test_invalid_file_raises(processor):
+    with pytest.raises(Exception, match="Failed to load Excel file"):
+        processor.process_file(b"not a workbook", "basic", "broken.xlsx")
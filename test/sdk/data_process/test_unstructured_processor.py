@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import patch
+
+from sdk.nexent.data_process import unstructured_processor
+from sdk.nexent.data_process.page_split import get_paged_extension, plan_page_ranges
+from sdk.nexent.data_process.unstructured_processor import UnstructuredProcessor
+
+
+class FakeMetadata:
+    def __init__(self, page_number):
+        self.page_number = page_number
+
+    def to_dict(self):
+        return {"page_number": self.page_number, "languages": ["eng"]}
+
+
+class Text:
+    def __init__(self, text, page_number):
+        self.text = text
+        self.metadata = FakeMetadata(page_number)
+
+
+class PageBreak:
+    pass
+
+
+def fake_partition(page_data, chunking_strategy, params, starting_page_number=None):
+    """Two text elements and a page break per page of a range encoded as b"start-end" """
+    start, end = (int(page) for page in page_data.decode().split("-"))
+    elements = []
+    for page in range(start, end):
+        page_number = (starting_page_number or 1) + page - start
+        elements.extend([Text(f"p{page_number}a", page_number), Text(f"p{page_number}b", page_number), PageBreak()])
+    return elements
+
+
+@pytest.fixture
+def processor():
+    with patch.object(UnstructuredProcessor, "_partition", side_effect=fake_partition) as partition, \
+            patch.object(unstructured_processor, "extract_page_range",
+                         side_effect=lambda data, ext, start, end: f"{start}-{end}".encode()):
+        processor = UnstructuredProcessor()
+        processor.partition_mock = partition
+        yield processor
+
+
+def test_plan_page_ranges():
+    assert plan_page_ranges(5, 2) == [(0, 2), (2, 4), (4, 5)]
+    assert plan_page_ranges(0, 2) == []
+    with pytest.raises(ValueError):
+        plan_page_ranges(5, 0)
+
+
+def test_get_paged_extension():
+    assert get_paged_extension("Report.PDF") == ".pdf"
+    assert get_paged_extension("deck.pptx") == ".pptx"
+    assert get_paged_extension("notes.txt") is None
+    assert get_paged_extension(None) is None
+
+
+def test_large_pdf_is_partitioned_by_page_range(processor):
+    with patch.object(unstructured_processor, "count_pages", return_value=5):
+        chunks = processor.process_file(b"0-5", "basic", "report.pdf", split_min_pages=3,
+                                        pages_per_range=2, split_max_workers=1)
+
+    assert processor.partition_mock.call_count == 3
+    assert [call.args[3] for call in processor.partition_mock.call_args_list] == [1, 3, 5]
+    whole = processor._process_elements(fake_partition(b"0-5", "basic", {}, 1), "basic", "report.pdf")
+    assert chunks == whole
+    assert [chunk["metadata"]["page_number"] for chunk in chunks] == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+
+def test_page_ranges_merge_into_single_document(processor):
+    with patch.object(unstructured_processor, "count_pages", return_value=4):
+        docs = processor.process_file(b"0-4", "none", "deck.pptx", split_min_pages=3,
+                                      pages_per_range=2, split_max_workers=1)
+
+    assert len(docs) == 1
+    assert docs[0]["content"] == "\n\n".join(f"p{page}{part}" for page in range(1, 5) for part in "ab")
+    assert docs[0]["language"] == "eng"
+
+
+def test_small_documents_are_partitioned_whole(processor):
+    with patch.object(unstructured_processor, "count_pages", return_value=2):
+        processor.process_file(b"0-2", "basic", "short.pdf", split_min_pages=3, pages_per_range=1)
+
+    processor.partition_mock.assert_called_once()
+    assert len(processor.partition_mock.call_args.args) == 3
+
+
+def test_unreadable_page_count_falls_back_to_whole_document(processor):
+    with patch.object(unstructured_processor, "count_pages", side_effect=ValueError("broken")):
+        chunks = processor.process_file(b"0-1", "basic", "broken.pdf", split_min_pages=1, pages_per_range=1)
+
+    processor.partition_mock.assert_called_once()
+    assert len(chunks) == 2
+
+
+def test_splitting_disabled(processor):
+    with patch.object(unstructured_processor, "count_pages") as count_pages:
+        processor.process_file(b"0-1", "basic", "report.pdf", split_min_pages=0)
+
+    count_pages.assert_not_called()
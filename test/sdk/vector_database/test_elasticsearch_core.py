@@ -1,10 +1,11 @@
 import pytest
 from unittest.mock import MagicMock, patch
+import json
 import time
 from typing import List, Dict, Any
 
 # Import the class under test
-from sdk.nexent.vector_database.elasticsearch_core import ElasticSearchCore
+from sdk.nexent.vector_database.elasticsearch_core import ElasticSearchCore, KnnSearchProfile
 
 
 # ----------------------------------------------------------------------------
@@ -22,6 +23,19 @@ def elasticsearch_core_instance():
     )
 
 
+def bulk_response(operations, statuses=None, **kwargs):
+    """Build a bulk API response with one item per serialized index action."""
+    item_count = len(operations) // 2
+    statuses = statuses or [201] * item_count
+    items = []
+    for status in statuses:
+        item = {"status": status}
+        if status >= 300:
+            item["error"] = {"type": "mapper_parsing_exception", "reason": "Failed to parse mapping"}
+        items.append({"index": item})
+    return MagicMock(body={"errors": any(s >= 300 for s in statuses), "items": items})
+
+
 @pytest.fixture
 def sample_documents():
     """Sample documents for testing."""
@@ -432,6 +446,114 @@ def test_create_vector_index_already_exists(elasticsearch_core_instance):
         mock_ready.assert_called_once_with("existing_index")
 
 
+def test_create_vector_index_quantized(elasticsearch_core_instance):
+    """Test creating an index with quantized HNSW options."""
+    with patch.object(elasticsearch_core_instance.client.indices, 'exists', return_value=False), \
+            patch.object(elasticsearch_core_instance.client.indices, 'create') as mock_create, \
+            patch.object(elasticsearch_core_instance, '_force_refresh_with_retry'), \
+            patch.object(elasticsearch_core_instance, '_ensure_index_ready'):
+
+        result = elasticsearch_core_instance.create_vector_index(
+            "test_index", embedding_dim=1024, index_type="int8_hnsw", m=32, ef_construction=200)
+
+        assert result is True
+        embedding_mapping = mock_create.call_args.kwargs["mappings"]["properties"]["embedding"]
+        assert embedding_mapping["dims"] == 1024
+        assert embedding_mapping["index_options"] == {"type": "int8_hnsw", "m": 32, "ef_construction": 200}
+
+
+def test_create_vector_index_uses_instance_defaults(elasticsearch_core_instance):
+    """Test index options fall back to the instance defaults, and are omitted when unset."""
+    with patch.object(elasticsearch_core_instance.client.indices, 'exists', return_value=False), \
+            patch.object(elasticsearch_core_instance.client.indices, 'create') as mock_create, \
+            patch.object(elasticsearch_core_instance, '_force_refresh_with_retry'), \
+            patch.object(elasticsearch_core_instance, '_ensure_index_ready'):
+
+        elasticsearch_core_instance.create_vector_index("plain_index", embedding_dim=1024)
+        assert "index_options" not in mock_create.call_args.kwargs["mappings"]["properties"]["embedding"]
+
+        elasticsearch_core_instance.vector_index_type = "bbq_hnsw"
+        elasticsearch_core_instance.create_vector_index("bbq_index", embedding_dim=1024)
+        embedding_mapping = mock_create.call_args.kwargs["mappings"]["properties"]["embedding"]
+        assert embedding_mapping["index_options"] == {"type": "bbq_hnsw"}
+
+
+def test_create_vector_index_invalid_options(elasticsearch_core_instance):
+    """Test invalid vector index options fail without creating the index."""
+    with patch.object(elasticsearch_core_instance.client.indices, 'exists', return_value=False), \
+            patch.object(elasticsearch_core_instance.client.indices, 'create') as mock_create:
+
+        assert elasticsearch_core_instance.create_vector_index(
+            "test_index", embedding_dim=1024, index_type="pq_hnsw") is False
+        assert elasticsearch_core_instance.create_vector_index(
+            "test_index", embedding_dim=32, index_type="bbq_hnsw") is False
+        mock_create.assert_not_called()
+
+
+def test_migrate_vector_index(elasticsearch_core_instance):
+    """Test migrating an index reindexes through a staging index and keeps the name."""
+    client = elasticsearch_core_instance.client
+    with patch.object(client.indices, 'get_mapping') as mock_mapping, \
+            patch.object(client.indices, 'exists', return_value=False), \
+            patch.object(client.indices, 'create') as mock_create, \
+            patch.object(client.indices, 'delete') as mock_delete, \
+            patch.object(client.indices, 'put_settings') as mock_put_settings, \
+            patch.object(client, 'reindex') as mock_reindex, \
+            patch.object(client.tasks, 'get') as mock_task, \
+            patch.object(client, 'count', return_value={"count": 10}), \
+            patch.object(elasticsearch_core_instance, '_ensure_index_ready'), \
+            patch('time.sleep'):
+
+        mock_mapping.return_value = {"kb": {"mappings": {
+            "_meta": {"knn_search_profile": {"num_candidates_multiplier": 4.0}},
+            "properties": {"embedding": {"type": "dense_vector", "dims": 1024}}}}}
+        elasticsearch_core_instance._search_profile_cache["kb"] = (time.monotonic(), None)
+        mock_reindex.side_effect = [{"task": "t1"}, {"task": "t2"}]
+        mock_task.side_effect = [
+            {"completed": False},
+            {"completed": True, "response": {"created": 10, "failures": []}},
+            {"completed": True, "response": {"created": 10, "failures": []}},
+        ]
+
+        result = elasticsearch_core_instance.migrate_vector_index("kb", "int4_hnsw", m=24)
+
+        assert result["documents"] == 10
+        assert result["index_type"] == "int4_hnsw"
+        assert [c.kwargs["index"] for c in mock_create.call_args_list] == ["kb_vector_migration", "kb"]
+        assert [c.kwargs["index"] for c in mock_delete.call_args_list] == ["kb", "kb_vector_migration"]
+        assert mock_reindex.call_args_list[0].kwargs["source"] == {"index": "kb"}
+        assert mock_reindex.call_args_list[1].kwargs["dest"]["index"] == "kb"
+        options = mock_create.call_args.kwargs["mappings"]["properties"]["embedding"]["index_options"]
+        assert options == {"type": "int4_hnsw", "m": 24}
+        # Writes are blocked before the first copy and the recreated index keeps the search profile
+        mock_put_settings.assert_called_once_with(index="kb", settings={"index.blocks.write": True})
+        assert mock_create.call_args.kwargs["mappings"]["_meta"] == {
+            "knn_search_profile": {"num_candidates_multiplier": 4.0}}
+        assert "kb" not in elasticsearch_core_instance._search_profile_cache
+
+
+def test_migrate_vector_index_keeps_source_on_incomplete_copy(elasticsearch_core_instance):
+    """Test the original index is left untouched when the staging copy is incomplete."""
+    client = elasticsearch_core_instance.client
+    with patch.object(client.indices, 'get_mapping') as mock_mapping, \
+            patch.object(client.indices, 'exists', return_value=False), \
+            patch.object(client.indices, 'create'), \
+            patch.object(client.indices, 'delete') as mock_delete, \
+            patch.object(client.indices, 'put_settings') as mock_put_settings, \
+            patch.object(client, 'reindex', return_value={"task": "t1"}), \
+            patch.object(client.tasks, 'get', return_value={"completed": True, "response": {"created": 7}}), \
+            patch.object(client, 'count', return_value={"count": 10}):
+
+        mock_mapping.return_value = {"kb": {"mappings": {"properties": {
+            "embedding": {"type": "dense_vector", "dims": 1024}}}}}
+
+        with pytest.raises(Exception, match="copied 7 of 10"):
+            elasticsearch_core_instance.migrate_vector_index("kb", "int8_hnsw")
+        mock_delete.assert_not_called()
+        # The write block is lifted again so the unchanged index stays writable
+        assert mock_put_settings.call_args.kwargs["settings"] == {"index.blocks.write": False}
+
+
 def test_delete_index_success(elasticsearch_core_instance):
     """Test deleting an index successfully."""
     with patch.object(elasticsearch_core_instance.client.indices, 'delete') as mock_delete:
@@ -510,7 +632,7 @@ def test_index_documents_small_batch(elasticsearch_core_instance):
 
         mock_strftime.side_effect = lambda fmt, t: "2025-01-15T10:30:00" if "T" in fmt else "2025-01-15"
         mock_time.return_value = 1642234567
-        mock_bulk.return_value = {"errors": False, "items": []}
+        mock_bulk.side_effect = bulk_response
 
         result = elasticsearch_core_instance.index_documents(
             "test_index",
@@ -524,6 +646,28 @@ def test_index_documents_small_batch(elasticsearch_core_instance):
         mock_bulk.assert_called_once()
 
 
+def test_index_documents_page_uses_deterministic_ids(elasticsearch_core_instance):
+    """Test a page indexed with position_offset gets the same IDs every time, so resending it overwrites it."""
+    from sdk.nexent.vector_database.utils import compute_chunk_id
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024] * 2
+    mock_embedding_model.embedding_model_name = "test-model"
+    ids = [compute_chunk_id("bucket/a.pdf", position, f"chunk {position}", "test-model") for position in (4, 5)]
+    documents = [{"content": f"chunk {position}", "path_or_url": "bucket/a.pdf", "embedding_model_name": "test-model"}
+                 for position in (4, 5)]
+
+    for _ in range(2):
+        with patch.object(elasticsearch_core_instance.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            result = elasticsearch_core_instance.index_documents("test_index", mock_embedding_model, documents,
+                                                                 position_offset=4)
+
+        assert result == 2
+        operations = mock_bulk.call_args.kwargs["operations"]
+        assert [json.loads(operation)["index"]["_id"] for operation in operations[::2]] == ids
+    assert compute_chunk_id("bucket/a.pdf", 4, "chunk 4", "test-model") == ids[0]
+    assert compute_chunk_id("bucket/a.pdf", 5, "chunk 4", "test-model") != ids[0]
+
+
 def test_index_documents_large_batch(elasticsearch_core_instance):
     """Test indexing a large batch of documents (>= 64)."""
     mock_embedding_model = MagicMock()
@@ -543,7 +687,7 @@ def test_index_documents_large_batch(elasticsearch_core_instance):
 
         mock_strftime.side_effect = lambda fmt, t: "2025-01-15T10:30:00" if "T" in fmt else "2025-01-15"
         mock_time.return_value = 1642234567
-        mock_bulk.return_value = {"errors": False, "items": []}
+        mock_bulk.side_effect = bulk_response
         mock_refresh.return_value = True
 
         result = elasticsearch_core_instance.index_documents(
@@ -608,6 +752,45 @@ def test_accurate_search_success(elasticsearch_core_instance):
         mock_exec.assert_called_once()
 
 
+def test_accurate_search_drops_common_terms(elasticsearch_core_instance):
+    """Test accurate search weights terms by IDF and drops terms found in most documents."""
+    with patch.object(elasticsearch_core_instance, 'exec_query', return_value=[]) as mock_exec, \
+            patch.object(elasticsearch_core_instance.term_statistics, 'get_doc_freqs') as mock_stats:
+        mock_stats.return_value = ({"elasticsearch": 90, "quantization": 2}, 100)
+
+        elasticsearch_core_instance.accurate_search(["test_index"], "elasticsearch quantization", top_k=5)
+
+        mock_stats.assert_called_once_with(["test_index"], ["elasticsearch", "quantization"])
+        functions = mock_exec.call_args[0][1]["query"]["function_score"]["functions"]
+        assert {list(f["filter"]["term"].values())[0] for f in functions} == {"quantization"}
+
+
+def test_accurate_search_keeps_best_term(elasticsearch_core_instance):
+    """Test the highest weighted term is kept even if every term is common."""
+    weights = elasticsearch_core_instance._drop_common_terms(
+        {"common": 1.0, "frequent": 0.5}, {"common": 80, "frequent": 90}, 100, 0.5)
+    assert weights == {"common": 1.0}
+
+
+def test_accurate_search_without_statistics(elasticsearch_core_instance):
+    """Test accurate search falls back to TF weights when statistics fail."""
+    with patch.object(elasticsearch_core_instance, 'exec_query', return_value=[]), \
+            patch.object(elasticsearch_core_instance.term_statistics, 'get_doc_freqs', side_effect=Exception("boom")), \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"test": 1.0}) as mock_weights:
+        elasticsearch_core_instance.accurate_search(["test_index"], "test query", top_k=5)
+
+    mock_weights.assert_called_once_with("test query")
+
+
+def test_index_documents_invalidates_term_statistics(elasticsearch_core_instance):
+    """Test indexing documents invalidates the cached term statistics of the index."""
+    with patch.object(elasticsearch_core_instance, '_small_batch_insert', return_value=1), \
+            patch.object(elasticsearch_core_instance.term_statistics, 'invalidate') as mock_invalidate:
+        elasticsearch_core_instance.index_documents("test_index", MagicMock(), [{"content": "x"}])
+
+    mock_invalidate.assert_called_once_with("test_index")
+
+
 def test_semantic_search_success(elasticsearch_core_instance):
     """Test semantic search with vector similarity."""
     mock_embedding_model = MagicMock()
@@ -636,33 +819,93 @@ def test_semantic_search_success(elasticsearch_core_instance):
         mock_exec.assert_called_once()
 
 
+def test_semantic_search_named_profile(elasticsearch_core_instance):
+    """Test a named profile widens the candidate pool without a mapping lookup."""
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+
+    with patch.object(elasticsearch_core_instance, 'exec_query', return_value=[]) as mock_exec, \
+            patch.object(elasticsearch_core_instance.client.indices, 'get_mapping') as mock_mapping:
+        elasticsearch_core_instance.semantic_search(
+            ["test_index"], "test query", mock_embedding_model, top_k=5, search_profile="high_recall")
+
+        knn = mock_exec.call_args[0][1]["knn"]
+        assert knn["k"] == 5
+        assert knn["num_candidates"] == 100
+        mock_mapping.assert_not_called()
+
+
+def test_semantic_search_unknown_profile(elasticsearch_core_instance):
+    """Test an unknown profile name is rejected."""
+    with pytest.raises(ValueError, match="Unknown search profile"):
+        elasticsearch_core_instance.semantic_search(
+            ["test_index"], "test query", MagicMock(), search_profile="fastest")
+
+
+def test_semantic_search_stored_profiles(elasticsearch_core_instance):
+    """Test stored per-index profiles produce one restricted kNN clause per index and are cached."""
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+
+    with patch.object(elasticsearch_core_instance, 'exec_query', return_value=[]) as mock_exec, \
+            patch.object(elasticsearch_core_instance.client.indices, 'get_mapping') as mock_mapping:
+        mock_mapping.return_value = {
+            "kb1": {"mappings": {"_meta": {"knn_search_profile": {
+                "num_candidates_multiplier": 20, "similarity": 0.5, "source_type": ["minio"]}}}},
+            "kb2": {"mappings": {}},
+        }
+
+        for _ in range(2):
+            elasticsearch_core_instance.semantic_search(["kb1", "kb2"], "test query", mock_embedding_model, top_k=5)
+
+        mock_mapping.assert_called_once_with(index="kb1,kb2")
+        kb1_clause, kb2_clause = mock_exec.call_args[0][1]["knn"]
+        assert kb1_clause["num_candidates"] == 100
+        assert kb1_clause["similarity"] == 0.5
+        assert kb1_clause["filter"] == [{"term": {"_index": "kb1"}}, {"terms": {"source_type": ["minio"]}}]
+        assert kb2_clause["num_candidates"] == 10
+        assert kb2_clause["filter"] == [{"term": {"_index": "kb2"}}]
+
+
+def test_set_search_profile(elasticsearch_core_instance):
+    """Test storing a profile writes the index _meta and updates the cache."""
+    profile = KnnSearchProfile(num_candidates_multiplier=4, path_or_url=["/a.pdf"])
+    with patch.object(elasticsearch_core_instance.client.indices, 'put_mapping') as mock_put, \
+            patch.object(elasticsearch_core_instance.client.indices, 'get_mapping') as mock_mapping:
+        assert elasticsearch_core_instance.set_search_profile("kb", profile) is True
+
+        mock_put.assert_called_once_with(index="kb", meta={"knn_search_profile": profile.to_dict()})
+        assert elasticsearch_core_instance.get_search_profiles(["kb"]) == {"kb": profile}
+        mock_mapping.assert_not_called()
+
+
+def test_get_search_profiles_falls_back_to_default(elasticsearch_core_instance):
+    """Test a failed mapping lookup falls back to the default profile."""
+    with patch.object(elasticsearch_core_instance.client.indices, 'get_mapping', side_effect=Exception("boom")):
+        profiles = elasticsearch_core_instance.get_search_profiles(["kb"])
+    assert profiles["kb"].num_candidates(5) == 10
+
+
 def test_hybrid_search_success(elasticsearch_core_instance):
     """Test hybrid search combining accurate and semantic results."""
     mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
 
-    with patch.object(elasticsearch_core_instance, 'accurate_search') as mock_accurate, \
-            patch.object(elasticsearch_core_instance, 'semantic_search') as mock_semantic:
+    with patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights') as mock_weights:
 
-        mock_accurate.return_value = [
-            {
-                "score": 10.0,
-                "document": {"id": "doc1", "content": "Test doc 1"},
-                "index": "test_index"
-            }
-        ]
-
-        mock_semantic.return_value = [
-            {
-                "score": 0.9,
-                "document": {"id": "doc1", "content": "Test doc 1"},
-                "index": "test_index"
-            },
-            {
-                "score": 0.8,
-                "document": {"id": "doc2", "content": "Test doc 2"},
-                "index": "test_index"
-            }
-        ]
+        mock_weights.return_value = {"test": 1.0}
+        mock_msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": [
+                    {"_score": 10.0, "_source": {"id": "doc1", "content": "Test doc 1"}, "_index": "test_index"}
+                ]}},
+                {"hits": {"hits": [
+                    {"_score": 0.9, "_source": {"id": "doc1", "content": "Test doc 1"}, "_index": "test_index"},
+                    {"_score": 0.8, "_source": {"id": "doc2", "content": "Test doc 2"}, "_index": "test_index"}
+                ]}}
+            ]
+        }
 
         result = elasticsearch_core_instance.hybrid_search(
             ["test_index"],
@@ -675,8 +918,172 @@ def test_hybrid_search_success(elasticsearch_core_instance):
         assert len(result) == 2
         assert all("score" in r for r in result)
         assert all("document" in r for r in result)
-        mock_accurate.assert_called_once()
-        mock_semantic.assert_called_once()
+        assert result[0]["document"]["id"] == "doc1"
+        assert result[0]["score"] == pytest.approx(1.0)
+        mock_embedding_model.get_embeddings.assert_called_once_with("test query")
+        # Both legs are sent in a single multi search request
+        mock_msearch.assert_called_once()
+        searches = mock_msearch.call_args.kwargs["searches"]
+        assert len(searches) == 4
+        assert searches[0] == {"index": "test_index"}
+        assert "function_score" in searches[1]["query"]
+        assert searches[3]["knn"]["query_vector"] == [0.1] * 1024
+
+
+def test_indexed_documents_are_fused_by_id_in_python_hybrid_search(elasticsearch_core_instance):
+    """Test documents indexed with chunk IDs keep their id in _source and are matched across both hybrid legs."""
+    elasticsearch_core_instance.use_term_statistics = False
+    elasticsearch_core_instance._cluster_version = (8, 15)
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024] * 2
+    mock_embedding_model.embedding_model_name = "test-model"
+    documents = [{"content": f"chunk {i}", "path_or_url": "bucket/a.pdf"} for i in range(2)]
+
+    with patch.object(elasticsearch_core_instance.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+        elasticsearch_core_instance.index_documents("test_index", mock_embedding_model, documents)
+    operations = [json.loads(operation) for operation in mock_bulk.call_args.kwargs["operations"]]
+    hits = [{"_id": action["index"]["_id"], "_source": source, "_index": "test_index"}
+            for action, source in zip(operations[::2], operations[1::2])]
+    assert all(hit["_source"]["id"] == hit["_id"] for hit in hits)
+
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+    with patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"chunk": 1.0}):
+        mock_msearch.return_value = {"responses": [
+            {"hits": {"hits": [{**hits[0], "_score": 2.0}]}},
+            {"hits": {"hits": [{**hits[0], "_score": 0.9}, {**hits[1], "_score": 0.6}]}},
+        ]}
+        result = elasticsearch_core_instance.hybrid_search(
+            ["test_index"], "chunk", mock_embedding_model, top_k=5, search_profile="default")
+
+    assert [r["document"]["id"] for r in result] == [hits[0]["_id"], hits[1]["_id"]]
+
+
+def test_parse_hits_takes_missing_id_from_hit_id(elasticsearch_core_instance):
+    """Test documents stored without an id in _source are identified by their _id."""
+    response = {"hits": {"hits": [{"_id": "c1", "_score": 1.0, "_source": {"content": "x"}, "_index": "kb"}]}}
+    assert elasticsearch_core_instance._parse_hits(response)[0]["document"] == {"content": "x", "id": "c1"}
+
+
+def test_hybrid_search_linear_retriever(elasticsearch_core_instance):
+    """Test hybrid search fuses both legs server-side in one request on clusters with the linear retriever."""
+    elasticsearch_core_instance.use_term_statistics = False
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+
+    with patch.object(elasticsearch_core_instance.client, 'info', return_value={"version": {"number": "8.18.1"}}), \
+            patch.object(elasticsearch_core_instance.client, 'search') as mock_search, \
+            patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"test": 1.0}):
+        mock_search.return_value = {"hits": {"hits": [
+            {"_score": 0.8, "_source": {"id": "doc1", "content": "Test doc 1"}, "_index": "test_index"}
+        ]}}
+
+        result = elasticsearch_core_instance.hybrid_search(
+            ["test_index"], "test query", mock_embedding_model, top_k=5, weight_accurate=0.4, search_profile="default")
+
+        assert result == [{"score": 0.8, "document": {"id": "doc1", "content": "Test doc 1"}, "index": "test_index"}]
+        mock_msearch.assert_not_called()
+        body = mock_search.call_args.kwargs["body"]
+        linear = body["retriever"]["linear"]
+        assert body["size"] == 5
+        assert linear["rank_window_size"] == 25
+        standard, knn = linear["retrievers"]
+        assert standard["weight"] == 0.4
+        assert "function_score" in standard["retriever"]["standard"]["query"]
+        assert knn["weight"] == pytest.approx(0.6)
+        assert knn["retriever"]["knn"]["k"] == 25
+        assert knn["retriever"]["knn"]["num_candidates"] == 25
+
+
+def test_hybrid_search_rrf_retriever(elasticsearch_core_instance):
+    """Test an explicit rrf fusion builds a reciprocal rank fusion retriever."""
+    elasticsearch_core_instance.use_term_statistics = False
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+    elasticsearch_core_instance._cluster_version = (8, 17)
+
+    with patch.object(elasticsearch_core_instance.client, 'search', return_value={"hits": {"hits": []}}) as mock_search, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"test": 1.0}):
+        elasticsearch_core_instance.hybrid_search(
+            ["test_index"], "test query", mock_embedding_model, top_k=5, search_profile="default", fusion="rrf")
+
+    rrf = mock_search.call_args.kwargs["body"]["retriever"]["rrf"]
+    assert [list(r.keys())[0] for r in rrf["retrievers"]] == ["standard", "knn"]
+    assert rrf["rank_window_size"] == 25
+
+
+def test_hybrid_search_falls_back_on_old_cluster(elasticsearch_core_instance):
+    """Test clusters without the linear retriever use the msearch and Python fusion path."""
+    elasticsearch_core_instance.use_term_statistics = False
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+    elasticsearch_core_instance._cluster_version = (8, 15)
+
+    with patch.object(elasticsearch_core_instance.client, 'search') as mock_search, \
+            patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"test": 1.0}):
+        mock_msearch.return_value = {"responses": [{"hits": {"hits": []}}, {"hits": {"hits": []}}]}
+
+        elasticsearch_core_instance.hybrid_search(
+            ["test_index"], "test query", mock_embedding_model, search_profile="default")
+
+        mock_search.assert_not_called()
+        mock_msearch.assert_called_once()
+
+
+def test_hybrid_search_falls_back_when_retriever_rejected(elasticsearch_core_instance):
+    """Test a rejected retriever (e.g. license) falls back to Python fusion and is not retried."""
+    from elasticsearch import exceptions
+    elasticsearch_core_instance.use_term_statistics = False
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+    elasticsearch_core_instance._cluster_version = (9, 0)
+    rejected = exceptions.ApiError("current license is non-compliant for [linear retriever]",
+                                   meta=MagicMock(status=403), body={})
+
+    with patch.object(elasticsearch_core_instance.client, 'search', side_effect=rejected) as mock_search, \
+            patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights', return_value={"test": 1.0}):
+        mock_msearch.return_value = {"responses": [{"hits": {"hits": []}}, {"hits": {"hits": []}}]}
+
+        for _ in range(2):
+            elasticsearch_core_instance.hybrid_search(
+                ["test_index"], "test query", mock_embedding_model, search_profile="default")
+
+        mock_search.assert_called_once()
+        assert mock_msearch.call_count == 2
+
+
+def test_hybrid_search_invalid_fusion(elasticsearch_core_instance):
+    """Test an unknown fusion mode is rejected."""
+    with pytest.raises(ValueError, match="Unsupported hybrid fusion mode"):
+        elasticsearch_core_instance.hybrid_search(["test_index"], "test query", MagicMock(), fusion="borda")
+
+
+def test_hybrid_search_msearch_error(elasticsearch_core_instance):
+    """Test hybrid search raises when one leg of the multi search fails."""
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.get_embeddings.return_value = [[0.1] * 1024]
+
+    with patch.object(elasticsearch_core_instance.client, 'msearch') as mock_msearch, \
+            patch('sdk.nexent.vector_database.elasticsearch_core.calculate_term_weights') as mock_weights:
+
+        mock_weights.return_value = {"test": 1.0}
+        mock_msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": []}},
+                {"error": {"type": "search_phase_execution_exception", "reason": "knn failed"}, "status": 400}
+            ]
+        }
+
+        with pytest.raises(Exception, match="knn failed"):
+            elasticsearch_core_instance.hybrid_search(
+                ["test_index"],
+                "test query",
+                mock_embedding_model,
+                top_k=5
+            )
 
 
 # ----------------------------------------------------------------------------
@@ -795,44 +1202,37 @@ def test_get_index_stats_success(elasticsearch_core_instance):
 # Tests for error handling
 # ----------------------------------------------------------------------------
 
-def test_handle_bulk_errors_with_errors(elasticsearch_core_instance):
-    """Test handling bulk operation errors."""
-    response = {
-        "errors": True,
-        "items": [
-            {
-                "index": {
-                    "error": {
-                        "type": "mapper_parsing_exception",
-                        "reason": "Failed to parse mapping"
-                    }
-                }
-            }
-        ]
-    }
+def test_stream_bulk_index_reports_item_errors(elasticsearch_core_instance):
+    """Test failed bulk items are reported per document instead of failing the batch."""
+    actions = [
+        {"_index": "test_index", "_source": {"id": "doc1", "content": "ok"}},
+        {"_index": "test_index", "_source": {"id": "doc2", "content": "bad", "path_or_url": "/a.pdf"}},
+    ]
 
-    # Should not raise exception, just log errors
-    elasticsearch_core_instance._handle_bulk_errors(response)
+    with patch.object(elasticsearch_core_instance.client, 'bulk') as mock_bulk:
+        mock_bulk.side_effect = lambda operations, **kwargs: bulk_response(operations, [201, 400])
 
+        report = elasticsearch_core_instance.stream_bulk_index("test_index", iter(actions))
+
+    assert report.success == 1
+    assert report.failed == 1
+    assert report.errors[0]["id"] == "doc2"
+    assert report.errors[0]["path_or_url"] == "/a.pdf"
+    assert report.errors[0]["type"] == "mapper_parsing_exception"
+    mock_bulk.assert_called_once()
 
-def test_handle_bulk_errors_version_conflict(elasticsearch_core_instance):
-    """Test handling version conflict errors (should be ignored)."""
-    response = {
-        "errors": True,
-        "items": [
-            {
-                "index": {
-                    "error": {
-                        "type": "version_conflict_engine_exception",
-                        "reason": "Version conflict"
-                    }
-                }
-            }
-        ]
-    }
 
-    # Should not raise exception or log error for version conflicts
-    elasticsearch_core_instance._handle_bulk_errors(response)
+def test_stream_bulk_index_version_conflict(elasticsearch_core_instance):
+    """Test version conflicts are not reported as errors."""
+    actions = [{"_index": "test_index", "_source": {"id": "doc1", "content": "dup"}}]
+
+    with patch.object(elasticsearch_core_instance.client, 'bulk') as mock_bulk:
+        mock_bulk.side_effect = lambda operations, **kwargs: bulk_response(operations, [409])
+
+        report = elasticsearch_core_instance.stream_bulk_index("test_index", iter(actions))
+
+    assert report.success == 1
+    assert report.errors == []
 
 
 def test_bulk_operation_context(elasticsearch_core_instance):
@@ -846,3 +1246,90 @@ def test_bulk_operation_context(elasticsearch_core_instance):
 
         mock_apply.assert_called_once_with("test_index")
         mock_restore.assert_called_once_with("test_index")
+
+
+def test_document_embeddings_reuse_cached_vectors(elasticsearch_core_instance):
+    """Chunk texts embedded before by the same model are not sent to the embedding API again."""
+    from sdk.nexent.core.models.embedding_model import EmbeddingCache
+
+    elasticsearch_core_instance.document_embedding_cache = EmbeddingCache(max_size=10)
+    embedding_model = MagicMock()
+    embedding_model.model = "embed-model"
+    embedding_model.api_url = "http://embed"
+    embedding_model.embedding_dim = 2
+    embedding_model.get_embeddings.side_effect = lambda texts: [[float(len(text)), 0.0] for text in texts]
+
+    first = elasticsearch_core_instance._get_document_embeddings(embedding_model, ["a", "bb", "a"])
+    second = elasticsearch_core_instance._get_document_embeddings(embedding_model, ["bb", "ccc"])
+
+    assert first == [[1.0, 0.0], [2.0, 0.0], [1.0, 0.0]]
+    assert second == [[2.0, 0.0], [3.0, 0.0]]
+    assert [c.args[0] for c in embedding_model.get_embeddings.call_args_list] == [["a", "bb"], ["ccc"]]
+    assert elasticsearch_core_instance.get_embedding_cache_metrics()["hits"] == 1
+
+
+def test_document_embeddings_skip_cache_for_other_models(elasticsearch_core_instance):
+    """Models without a model name are embedded directly."""
+    from sdk.nexent.core.models.embedding_model import EmbeddingCache
+
+    elasticsearch_core_instance.document_embedding_cache = EmbeddingCache(max_size=10)
+    embedding_model = MagicMock()
+    embedding_model.get_embeddings.return_value = [[0.1], [0.2]]
+
+    assert elasticsearch_core_instance._get_document_embeddings(embedding_model, ["a", "a"]) == [[0.1], [0.2]]
+    assert elasticsearch_core_instance.document_embedding_cache.stats()["size"] == 0
+
+
+def test_update_documents_only_embeds_changed_chunks(elasticsearch_core_instance):
+    """Chunks already stored with the same content keep their vectors, only new content is embedded."""
+    from sdk.nexent.vector_database.utils import compute_content_hash
+
+    stored_hits = [
+        {"_id": "es-1", "_source": {"content": "intro", "content_hash": compute_content_hash("intro"),
+                                    "embedding_model_name": "m", "path_or_url": "doc", "title": "Manual"}},
+        # Chunk indexed before content hashes were stored
+        {"_id": "es-2", "_source": {"content": "chapter 1", "embedding_model_name": "m", "path_or_url": "doc",
+                                    "title": "Manual"}},
+        {"_id": "es-3", "_source": {"content": "old chapter 2", "content_hash": compute_content_hash("old chapter 2"),
+                                    "embedding_model_name": "m", "path_or_url": "doc", "title": "Manual"}},
+    ]
+    documents = [
+        {"content": "intro", "embedding_model_name": "m", "path_or_url": "doc", "title": "Manual", "file_size": 0},
+        {"content": "chapter 1", "embedding_model_name": "m", "path_or_url": "doc", "title": "Manual", "file_size": 0},
+        {"content": "new chapter 2", "embedding_model_name": "m", "path_or_url": "doc", "title": "Manual",
+         "file_size": 0},
+    ]
+    for hit in stored_hits:
+        hit["_source"].update(file_size=0, process_source="Unstructured")
+    stored_hits[0]["_source"]["id"] = "keep-me"
+    embedding_model = MagicMock()
+
+    with patch("sdk.nexent.vector_database.elasticsearch_core.helpers.scan", return_value=stored_hits), \
+            patch.object(elasticsearch_core_instance, "index_documents", return_value=1) as mock_index, \
+            patch.object(elasticsearch_core_instance, "stream_bulk_index") as mock_bulk:
+        mock_bulk.return_value = MagicMock(failed=0)
+        result = elasticsearch_core_instance.update_documents_by_path_or_url(
+            "test_index", embedding_model, "doc", documents)
+
+    assert result == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1, "failed": 0}
+    inserted_docs = mock_index.call_args.args[2]
+    assert [doc["content"] for doc in inserted_docs] == ["new chapter 2"]
+    actions = mock_bulk.call_args.args[1]
+    assert actions[0] == {"_op_type": "update", "_index": "test_index", "_id": "es-2",
+                          "doc": {"content_hash": compute_content_hash("chapter 1")}}
+    assert actions[1] == {"_op_type": "delete", "_index": "test_index", "_id": "es-3"}
+
+
+def test_update_documents_reembeds_chunks_of_another_model(elasticsearch_core_instance):
+    """A stored chunk embedded by another model is replaced even when its content is unchanged."""
+    stored_hits = [{"_id": "es-1", "_source": {"content": "intro", "embedding_model_name": "old"}}]
+    documents = [{"content": "intro", "embedding_model_name": "new", "file_size": 1}]
+
+    with patch("sdk.nexent.vector_database.elasticsearch_core.helpers.scan", return_value=stored_hits), \
+            patch.object(elasticsearch_core_instance, "index_documents", return_value=1), \
+            patch.object(elasticsearch_core_instance, "stream_bulk_index") as mock_bulk:
+        mock_bulk.return_value = MagicMock(failed=0)
+        result = elasticsearch_core_instance.update_documents_by_path_or_url(
+            "test_index", MagicMock(), "doc", documents)
+
+    assert (result["inserted"], result["deleted"], result["unchanged"]) == (1, 1, 0)
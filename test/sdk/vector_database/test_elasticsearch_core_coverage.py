@@ -5,6 +5,8 @@ Tests for functions not fully covered in the main test file.
 """
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
+import json
+import threading
 import time
 import os
 import sys
@@ -16,10 +18,22 @@ project_root = os.path.abspath(os.path.join(current_dir, "../../.."))
 sys.path.insert(0, project_root)
 
 # Import the class under test
-from sdk.nexent.vector_database.elasticsearch_core import ElasticSearchCore
+from sdk.nexent.vector_database.elasticsearch_core import ElasticSearchCore, IndexingStats
 from elasticsearch import exceptions
 
 
+def bulk_response(operations, statuses=None, **kwargs):
+    """Build a bulk API response with one item per serialized index action."""
+    statuses = statuses or [201] * (len(operations) // 2)
+    items = []
+    for status in statuses:
+        item = {"status": status}
+        if status >= 300:
+            item["error"] = {"type": "es_rejected_execution_exception", "reason": "rejected"}
+        items.append({"index": item})
+    return MagicMock(body={"errors": any(s >= 300 for s in statuses), "items": items})
+
+
 class TestElasticSearchCoreCoverage:
     """Test class for improving elasticsearch_core coverage"""
     
@@ -167,78 +181,120 @@ class TestElasticSearchCoreCoverage:
         assert result is False
         es_core.client.indices.delete.assert_called_once_with(index="test_index")
     
-    def test_handle_bulk_errors_no_errors(self, es_core):
-        """Test _handle_bulk_errors when no errors in response"""
-        response = {"errors": False, "items": []}
-        es_core._handle_bulk_errors(response)
-        # Should not raise any exceptions
-    
-    def test_handle_bulk_errors_with_version_conflict(self, es_core):
-        """Test _handle_bulk_errors with version conflict (should be ignored)"""
-        response = {
-            "errors": True,
-            "items": [
-                {
-                    "index": {
-                        "error": {
-                            "type": "version_conflict_engine_exception",
-                            "reason": "Document already exists",
-                            "caused_by": {
-                                "type": "version_conflict",
-                                "reason": "Document version conflict"
-                            }
-                        }
-                    }
-                }
-            ]
-        }
-        es_core._handle_bulk_errors(response)
-        # Should not raise any exceptions for version conflicts
-    
-    def test_handle_bulk_errors_with_fatal_error(self, es_core):
-        """Test _handle_bulk_errors with fatal error"""
-        response = {
-            "errors": True,
-            "items": [
-                {
-                    "index": {
-                        "error": {
-                            "type": "mapper_parsing_exception",
-                            "reason": "Failed to parse field",
-                            "caused_by": {
-                                "type": "json_parse_exception",
-                                "reason": "Unexpected character"
-                            }
-                        }
-                    }
-                }
-            ]
-        }
-        es_core._handle_bulk_errors(response)
-        # Should log error but not raise exception
-    
-    def test_handle_bulk_errors_with_caused_by(self, es_core):
-        """Test _handle_bulk_errors with caused_by information"""
-        response = {
-            "errors": True,
-            "items": [
-                {
-                    "index": {
-                        "error": {
-                            "type": "illegal_argument_exception",
-                            "reason": "Invalid argument",
-                            "caused_by": {
-                                "type": "json_parse_exception",
-                                "reason": "JSON parsing failed"
-                            }
-                        }
-                    }
-                }
-            ]
-        }
-        es_core._handle_bulk_errors(response)
-        # Should log both main error and caused_by error
-    
+    def test_stream_bulk_index_no_errors(self, es_core):
+        """Test stream_bulk_index when every action is acknowledged"""
+        actions = [{"_index": "test_index", "_source": {"content": f"c{i}"}} for i in range(3)]
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.success == 3
+        assert report.failed == 0
+        mock_bulk.assert_called_once()
+
+    def test_stream_bulk_index_splits_by_bytes(self, es_core):
+        """Test stream_bulk_index caps each request by serialized size"""
+        es_core.bulk_max_chunk_bytes = 200
+        actions = [{"_index": "test_index", "_source": {"content": "x" * 120}} for _ in range(4)]
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.success == 4
+        assert mock_bulk.call_count == 4
+
+    def test_stream_bulk_index_retries_only_throttled_items(self, es_core):
+        """Test stream_bulk_index resends only items rejected with 429"""
+        actions = [{"_index": "test_index", "_source": {"content": f"c{i}"}} for i in range(3)]
+        responses = [
+            lambda operations, **kwargs: bulk_response(operations, [201, 429, 201]),
+            bulk_response,
+        ]
+        with patch.object(es_core.client, 'bulk', side_effect=lambda *a, **kw: responses.pop(0)(*a, **kw)) as mock_bulk:
+            with patch("time.sleep") as mock_sleep:
+                report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.success == 3
+        assert report.retried == 1
+        assert report.failed == 0
+        retried_ops = mock_bulk.call_args_list[1].kwargs["operations"]
+        assert [json.loads(op) for op in retried_ops][1] == {"content": "c1"}
+        mock_sleep.assert_called_once()
+
+    def test_stream_bulk_index_reports_exhausted_retries(self, es_core):
+        """Test items still throttled after max_retries are reported as errors"""
+        es_core.max_retries = 1
+        actions = [{"_index": "test_index", "_source": {"id": "doc1", "content": "c"}}]
+        with patch.object(es_core.client, 'bulk',
+                          side_effect=lambda operations, **kwargs: bulk_response(operations, [429])) as mock_bulk:
+            with patch("time.sleep"):
+                report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.success == 0
+        assert report.errors[0]["id"] == "doc1"
+        assert report.errors[0]["status"] == 429
+        assert mock_bulk.call_count == 2
+
+    def test_stream_bulk_index_retries_transport_error(self, es_core):
+        """Test a transport failure resends the unacknowledged actions"""
+        actions = [{"_index": "test_index", "_source": {"content": f"c{i}"}} for i in range(2)]
+        responses = [exceptions.ConnectionError("connection reset"), None]
+
+        def bulk(operations, **kwargs):
+            error = responses.pop(0)
+            if error:
+                raise error
+            return bulk_response(operations)
+
+        with patch.object(es_core.client, 'bulk', side_effect=bulk) as mock_bulk:
+            with patch("time.sleep"):
+                report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.success == 2
+        assert report.retried == 2
+        assert mock_bulk.call_count == 2
+
+    def test_stream_bulk_index_transport_error_retries_only_failed_chunk(self, es_core):
+        """Test a connection timeout on one request resends only that request's items, with the same _ids"""
+        es_core.bulk_chunk_size = 2
+        actions = [{"_index": "test_index", "_source": {"content": f"c{i}"}} for i in range(10)]
+        sent = []
+        lock = threading.Lock()
+        failed = []
+
+        def bulk(operations, **kwargs):
+            decoded = [json.loads(op) for op in operations]
+            with lock:
+                sent.append(decoded)
+                if not failed and {"content": "c0"} in decoded:
+                    failed.append(True)
+                    raise exceptions.ConnectionTimeout("timed out")
+            return bulk_response(operations)
+
+        with patch.object(es_core.client, 'bulk', side_effect=bulk) as mock_bulk:
+            with patch("time.sleep"):
+                report = es_core.stream_bulk_index("test_index", iter(actions))
+
+        assert report.success == 10
+        assert report.retried == 2
+        assert mock_bulk.call_count == 6
+        contents = [op["content"] for request in sent for op in request if "content" in op]
+        assert sorted(contents) == sorted([f"c{i}" for i in range(10)] + ["c0", "c1"])
+        ids = [op["index"]["_id"] for request in sent for op in request if "index" in op]
+        assert len(set(ids)) == 10
+
+    def test_stream_bulk_index_with_caused_by(self, es_core):
+        """Test non-retryable errors keep their caused_by detail"""
+        actions = [{"_index": "test_index", "_source": {"id": "doc1", "content": "c"}}]
+        response = MagicMock(body={"errors": True, "items": [{"index": {
+            "status": 400,
+            "error": {
+                "type": "illegal_argument_exception",
+                "reason": "Invalid argument",
+                "caused_by": {"type": "json_parse_exception", "reason": "JSON parsing failed"}
+            }
+        }}]})
+        with patch.object(es_core.client, 'bulk', return_value=response):
+            with patch("time.sleep") as mock_sleep:
+                report = es_core.stream_bulk_index("test_index", iter(actions))
+        assert report.failed == 1
+        assert report.errors[0]["type"] == "illegal_argument_exception"
+        assert report.errors[0]["caused_by"]["type"] == "json_parse_exception"
+        mock_sleep.assert_not_called()
+
     def test_delete_documents_by_path_or_url_success(self, es_core):
         """Test delete_documents_by_path_or_url successful case"""
         es_core.client = MagicMock()
@@ -418,12 +474,9 @@ class TestElasticSearchCoreCoverage:
     
     def test_small_batch_insert_success(self, es_core):
         """Test _small_batch_insert successful case"""
-        es_core.client = MagicMock()
-        es_core.client.bulk.return_value = {"items": [], "errors": False}
         es_core._preprocess_documents = MagicMock(return_value=[
             {"content": "test content", "title": "test"}
         ])
-        es_core._handle_bulk_errors = MagicMock()
         
         mock_embedding_model = MagicMock()
         mock_embedding_model.get_embeddings.return_value = [[0.1, 0.2, 0.3]]
@@ -431,9 +484,11 @@ class TestElasticSearchCoreCoverage:
         
         documents = [{"content": "test content", "title": "test"}]
         
-        result = es_core._small_batch_insert("test_index", documents, "content", mock_embedding_model)
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            result = es_core._small_batch_insert("test_index", documents, "content", mock_embedding_model)
         assert result == 1
-        es_core.client.bulk.assert_called_once()
+        mock_bulk.assert_called_once()
+        assert mock_bulk.call_args.kwargs["refresh"] == "wait_for"
     
     def test_small_batch_insert_exception(self, es_core):
         """Test _small_batch_insert with exception"""
@@ -447,12 +502,10 @@ class TestElasticSearchCoreCoverage:
     
     def test_large_batch_insert_success(self, es_core):
         """Test _large_batch_insert successful case"""
-        es_core.client = MagicMock()
-        es_core.client.bulk.return_value = {"items": [], "errors": False}
         es_core._preprocess_documents = MagicMock(return_value=[
             {"content": "test content", "title": "test"}
         ])
-        es_core._handle_bulk_errors = MagicMock()
+        es_core._force_refresh_with_retry = MagicMock()
         
         mock_embedding_model = MagicMock()
         mock_embedding_model.get_embeddings.return_value = [[0.1, 0.2, 0.3]]
@@ -460,9 +513,10 @@ class TestElasticSearchCoreCoverage:
         
         documents = [{"content": "test content", "title": "test"}]
         
-        result = es_core._large_batch_insert("test_index", documents, 10, "content", mock_embedding_model)
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            result = es_core._large_batch_insert("test_index", documents, 10, "content", mock_embedding_model)
         assert result == 1
-        es_core.client.bulk.assert_called_once()
+        mock_bulk.assert_called_once()
     
     def test_large_batch_insert_embedding_error(self, es_core):
         """Test _large_batch_insert with embedding API error"""
@@ -493,3 +547,74 @@ class TestElasticSearchCoreCoverage:
         
         result = es_core._large_batch_insert("test_index", documents, 10, "content", mock_embedding_model)
         assert result == 0  # No documents indexed
+
+    def test_large_batch_insert_pipelines_batches_in_order(self, es_core):
+        """Test _large_batch_insert embeds batches concurrently and streams them in order"""
+        es_core._force_refresh_with_retry = MagicMock()
+        es_core.embedding_concurrency = 3
+        es_core.bulk_chunk_size = 10
+
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.get_embeddings.side_effect = lambda inputs: [[0.1]] * len(inputs)
+        mock_embedding_model.embedding_model_name = "test_model"
+
+        documents = [{"content": f"content {i}", "title": f"doc {i}"} for i in range(25)]
+
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response) as mock_bulk:
+            result = es_core._large_batch_insert("test_index", documents, 5, "content", mock_embedding_model)
+        assert result == 25
+        assert mock_embedding_model.get_embeddings.call_count == 5
+        # Bulk requests are sized by the writer, not by the embedding batches
+        assert mock_bulk.call_count == 3
+        # Bulk requests follow the original document order
+        written = [json.loads(op) for call in mock_bulk.call_args_list for op in call.kwargs["operations"]]
+        assert [op["content"] for op in written if "content" in op] == [f"content {i}" for i in range(25)]
+
+    def test_large_batch_insert_non_retryable_embedding_error(self, es_core):
+        """Test _large_batch_insert gives up immediately on a non-retryable client error"""
+        es_core._force_refresh_with_retry = MagicMock()
+
+        error = Exception("Bad request")
+        error.response = MagicMock(status_code=400)
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.get_embeddings.side_effect = error
+
+        documents = [{"content": "test content", "title": "test"}]
+
+        with patch.object(es_core.client, 'bulk') as mock_bulk:
+            with patch("time.sleep") as mock_sleep:
+                result = es_core._large_batch_insert("test_index", documents, 10, "content", mock_embedding_model)
+        assert result == 0
+        mock_embedding_model.get_embeddings.assert_called_once()
+        mock_sleep.assert_not_called()
+        mock_bulk.assert_not_called()
+
+    def test_large_batch_insert_retries_throttled_embedding(self, es_core):
+        """Test _large_batch_insert backs off on 429 and honours Retry-After"""
+        es_core._force_refresh_with_retry = MagicMock()
+
+        error = Exception("Too many requests")
+        error.response = MagicMock(status_code=429, headers={"Retry-After": "2"})
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.get_embeddings.side_effect = [error, [[0.1]]]
+        mock_embedding_model.embedding_model_name = "test_model"
+
+        documents = [{"content": "test content", "title": "test"}]
+
+        with patch.object(es_core.client, 'bulk', side_effect=bulk_response):
+            with patch("time.sleep") as mock_sleep:
+                result = es_core._large_batch_insert("test_index", documents, 10, "content", mock_embedding_model)
+        assert result == 1
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_indexing_stats_summary(self):
+        """Test IndexingStats reports per-stage throughput"""
+        stats = IndexingStats()
+        stats.add_embedding(100, 2.0)
+        stats.add_bulk(100, 1.0)
+
+        summary = stats.summary(2.5)
+        assert "50.0 docs/s" in summary
+        assert "100.0 docs/s" in summary
+        assert "overall: 40.0 docs/s" in summary
+
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import MagicMock
+
+from sdk.nexent.vector_database.elasticsearch_core import KnnSearchProfile
+from sdk.nexent.vector_database.knn_benchmark import benchmark_profiles, cheapest_profile
+
+
+def _hits(ids, base_score=2.0):
+    return {"took": 3, "hits": {"hits": [{"_id": doc_id, "_score": base_score - i * 0.1} for i, doc_id in enumerate(ids)]}}
+
+
+@pytest.fixture
+def es_core():
+    """ElasticSearchCore stand-in whose search answers sample, exact and kNN requests."""
+    core = MagicMock()
+
+    def search(index, size, query=None, knn=None, source=None):
+        if knn is not None:
+            # The wide profile finds every exact neighbour, the narrow one misses the last
+            return _hits(["a", "b", "c"] if knn["num_candidates"] >= 50 else ["a", "b", "x"])
+        if "script_score" in query:
+            return _hits(["a", "b", "c"])
+        return {"hits": {"hits": [{"_id": "q1", "_source": {"embedding": [0.1, 0.2]}},
+                                  {"_id": "q2", "_source": {"embedding": [0.3, 0.4]}}]}}
+
+    core.client.search.side_effect = search
+    return core
+
+
+def test_benchmark_profiles_measures_recall(es_core):
+    """Test recall@k is computed against the exact ranking for each profile"""
+    profiles = {
+        "narrow": KnnSearchProfile(num_candidates_multiplier=2),
+        "wide": KnnSearchProfile(num_candidates_multiplier=20),
+    }
+
+    results = benchmark_profiles(es_core, "kb", profiles, k=3, sample_size=2)
+
+    assert [r["profile"] for r in results] == ["narrow", "wide"]
+    assert results[0]["recall_at_k"] == pytest.approx(2 / 3)
+    assert results[1]["recall_at_k"] == 1.0
+    assert results[1]["num_candidates"] == 60
+    assert results[1]["queries"] == 2
+    assert results[1]["mean_took_ms"] == 3
+
+
+def test_benchmark_profiles_excludes_query_document(es_core):
+    """Test the sampled document is excluded from both rankings"""
+    benchmark_profiles(es_core, "kb", {"default": KnnSearchProfile()}, k=3, sample_size=2)
+
+    knn_call = next(c for c in es_core.client.search.call_args_list if c.kwargs.get("knn"))
+    assert knn_call.kwargs["knn"]["filter"]["bool"]["must_not"] == [{"ids": {"values": ["q1"]}}]
+
+
+def test_benchmark_profiles_empty_index():
+    """Test an index without embeddings cannot be benchmarked"""
+    core = MagicMock()
+    core.client.search.return_value = {"hits": {"hits": []}}
+    with pytest.raises(ValueError):
+        benchmark_profiles(core, "kb")
+
+
+def test_cheapest_profile():
+    """Test the cheapest profile meeting the recall target is selected"""
+    results = [
+        {"profile": "high_recall", "num_candidates": 100, "recall_at_k": 0.99, "mean_took_ms": 9},
+        {"profile": "default", "num_candidates": 10, "recall_at_k": 0.8, "mean_took_ms": 2},
+        {"profile": "balanced", "num_candidates": 50, "recall_at_k": 0.96, "mean_took_ms": 5},
+    ]
+    assert cheapest_profile(results, 0.95)["profile"] == "balanced"
+    assert cheapest_profile(results, 0.999) is None
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import MagicMock
+
+from sdk.nexent.vector_database.term_statistics import IndexTermStatistics
+
+
+def stats_response(buckets):
+    """Build the aggregation response for {index: (doc_count, {term: df})}"""
+    return {"aggregations": {"per_index": {"buckets": [
+        {"key": index_name, "doc_count": doc_count,
+         "doc_freqs": {"buckets": {term: {"doc_count": df} for term, df in dfs.items()}}}
+        for index_name, (doc_count, dfs) in buckets.items()
+    ]}}}
+
+
+@pytest.fixture
+def client():
+    return MagicMock()
+
+
+def test_get_doc_freqs_sums_indices(client):
+    """Test frequencies and document counts are summed over the searched indices"""
+    client.search.return_value = stats_response({
+        "kb1": (100, {"vector": 10, "database": 60}),
+        "kb2": (50, {"vector": 5}),
+    })
+    stats = IndexTermStatistics(client)
+
+    doc_freqs, total_docs = stats.get_doc_freqs(["kb1", "kb2"], ["vector", "database"])
+
+    assert total_docs == 150
+    assert doc_freqs == {"vector": 15, "database": 60}
+    aggs = client.search.call_args.kwargs["aggs"]
+    assert client.search.call_args.kwargs["index"] == "kb1,kb2"
+    assert aggs["per_index"]["aggs"]["doc_freqs"]["filters"]["filters"]["vector"] == {
+        "bool": {"should": [{"term": {"title": "vector"}}, {"term": {"content": "vector"}}]}}
+
+
+def test_get_doc_freqs_caches_and_fetches_only_new_terms(client):
+    """Test cached terms are not fetched again and new terms are fetched alone"""
+    client.search.side_effect = [
+        stats_response({"kb1": (100, {"vector": 10})}),
+        stats_response({"kb1": (100, {"search": 3})}),
+    ]
+    stats = IndexTermStatistics(client)
+
+    stats.get_doc_freqs(["kb1"], ["vector"])
+    stats.get_doc_freqs(["kb1"], ["vector"])
+    doc_freqs, _ = stats.get_doc_freqs(["kb1"], ["vector", "search"])
+
+    assert client.search.call_count == 2
+    assert list(client.search.call_args.kwargs["aggs"]["per_index"]["aggs"]["doc_freqs"]["filters"]["filters"]) == ["search"]
+    assert doc_freqs == {"vector": 10, "search": 3}
+
+
+def test_get_doc_freqs_empty_index(client):
+    """Test an index without documents counts as zero"""
+    client.search.return_value = stats_response({})
+    stats = IndexTermStatistics(client)
+
+    doc_freqs, total_docs = stats.get_doc_freqs(["empty"], ["vector"])
+
+    assert doc_freqs == {"vector": 0}
+    assert total_docs == 0
+
+
+def test_invalidate(client):
+    """Test invalidating an index refetches its statistics"""
+    client.search.return_value = stats_response({"kb1": (100, {"vector": 10})})
+    stats = IndexTermStatistics(client)
+
+    stats.get_doc_freqs(["kb1"], ["vector"])
+    stats.invalidate("kb1")
+    stats.get_doc_freqs(["kb1"], ["vector"])
+
+    assert client.search.call_count == 2
+
+
+def test_ttl_expiry(client):
+    """Test statistics older than the TTL are refetched"""
+    client.search.return_value = stats_response({"kb1": (100, {"vector": 10})})
+    stats = IndexTermStatistics(client, ttl_seconds=0)
+
+    stats.get_doc_freqs(["kb1"], ["vector"])
+    stats.get_doc_freqs(["kb1"], ["vector"])
+
+    assert client.search.call_count == 2